@@ -0,0 +1,300 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Batch mode of the Controller CLI
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Batch mode of the Controller CLI.
+
+The batch mode performs the SRv6 commands contained in a file (or read
+from stdin) without starting the interactive CLI. Two formats are
+supported:
+
+* command files, containing a command of the "srv6" section of the CLI
+  for each line (e.g. "path --op add --grpc-ip fcff:1::1 ..."); blank
+  lines and lines starting with "#" are ignored;
+* YAML/JSON job files, containing a list of entities for each section
+  ("paths", "behaviors", "unitunnels", "biditunnels" and
+  "usid_policies"); the fields of an entity are the arguments of the
+  corresponding command, with "_" in place of "-" (e.g. "grpc_ip").
+
+The commands share the gRPC channel to the controller and they are
+performed concurrently: since the order of the commands is not
+preserved, use a parallelism of 1 if the commands depend on each other.
+"""
+
+# General imports
+import logging
+import shlex
+import sys
+import time
+from concurrent import futures
+
+# Controller dependencies
+from apps.cli import srv6_cli
+from apps.nb_grpc_client import utils as nb_utils
+
+# Logger reference
+logger = logging.getLogger(__name__)
+
+# Default number of commands performed concurrently
+DEFAULT_PARALLELISM = 8
+# Default interval between two progress reports (in seconds)
+DEFAULT_PROGRESS_INTERVAL = 1
+
+# Commands supported by the batch mode: parser of the arguments and
+# function performing the command
+COMMANDS = {
+    'path': (srv6_cli.parse_arguments_srv6_path,
+             srv6_cli.handle_srv6_path_args),
+    'behavior': (srv6_cli.parse_arguments_srv6_behavior,
+                 srv6_cli.handle_srv6_behavior_args),
+    'unitunnel': (srv6_cli.parse_arguments_srv6_unitunnel,
+                  srv6_cli.handle_srv6_unitunnel_args),
+    'biditunnel': (srv6_cli.parse_arguments_srv6_biditunnel,
+                   srv6_cli.handle_srv6_biditunnel_args),
+    'usid_policy': (srv6_cli.parse_arguments_srv6_usid_policy,
+                    srv6_cli.handle_srv6_usid_policy_args)
+}
+
+# Sections of a job file and corresponding commands
+JOB_SECTIONS = {
+    'paths': 'path',
+    'behaviors': 'behavior',
+    'unitunnels': 'unitunnel',
+    'biditunnels': 'biditunnel',
+    'usid_policies': 'usid_policy'
+}
+
+
+class BatchTask:
+    """
+    A command of a batch.
+
+    :param source: Location of the command in the input (e.g. "line 3").
+    :type source: str
+    :param command: The command (e.g. "path").
+    :type command: str
+    :param args: The arguments of the command.
+    :type args: list
+    """
+
+    def __init__(self, source, command, args):
+        self.source = source
+        self.command = command
+        self.args = args
+
+
+class BatchSummary:
+    """
+    Results of a batch.
+    """
+
+    def __init__(self):
+        # Number of commands performed
+        self.total = 0
+        # Commands failed, as a list of (task, error) tuples
+        self.failures = list()
+        # Start time of the batch
+        self.start = time.time()
+        # Duration of the batch (in seconds)
+        self.elapsed = 0
+
+    @property
+    def succeeded(self):
+        """
+        Number of commands completed successfully.
+        """
+        return self.total - len(self.failures)
+
+    @property
+    def throughput(self):
+        """
+        Commands performed per second.
+        """
+        elapsed = time.time() - self.start if not self.elapsed \
+            else self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0
+
+    def print_progress(self, file=sys.stderr):
+        """
+        Print the progress of the batch.
+        """
+        print('*** Progress: %d commands (%d failed), %.1f commands/s'
+              % (self.total, len(self.failures), self.throughput),
+              file=file)
+
+    def print_summary(self, file=sys.stderr):
+        """
+        Print the summary of the batch.
+        """
+        print('\n****************** BATCH SUMMARY ******************',
+              file=file)
+        for task, error in self.failures:
+            print('%s: %s failed: %s' % (task.source, task.command, error),
+                  file=file)
+        print('Commands: %d' % self.total, file=file)
+        print('Succeeded: %d' % self.succeeded, file=file)
+        print('Failed: %d' % len(self.failures), file=file)
+        print('Elapsed time: %.3f s' % self.elapsed, file=file)
+        print('Throughput: %.1f commands/s' % self.throughput, file=file)
+        print('***************************************************\n',
+              file=file)
+
+
+def parse_command_line(line, source):
+    """
+    Convert a line of a command file to a task, or return None if the line
+    does not contain a command.
+    """
+    args = shlex.split(line, comments=True)
+    if len(args) == 0:
+        return None
+    # The commands can be prefixed by the "srv6" section of the CLI
+    if args[0] == 'srv6':
+        args = args[1:]
+    if len(args) == 0 or args[0] not in COMMANDS:
+        raise nb_utils.InvalidArgumentError(
+            '%s: unrecognized command: %s' % (source, line.strip()))
+    return BatchTask(source, args[0], args[1:])
+
+
+def entity_to_args(entity):
+    """
+    Convert an entity of a job file to the arguments of a command.
+    """
+    args = list()
+    for name, value in entity.items():
+        if value is None or value is False:
+            continue
+        args.append('--' + name.replace('_', '-'))
+        if value is True:
+            # Flag (e.g. "secure")
+            continue
+        if isinstance(value, (list, tuple)):
+            # Lists (e.g. the segments) are comma-separated
+            value = ','.join(str(item) for item in value)
+        args.append(str(value))
+    return args
+
+
+def parse_job(job):
+    """
+    Convert the content of a job file to a list of tasks.
+    """
+    tasks = list()
+    for section, entities in job.items():
+        if section not in JOB_SECTIONS:
+            raise nb_utils.InvalidArgumentError(
+                'Unrecognized section in job file: %s' % section)
+        for index, entity in enumerate(entities or []):
+            tasks.append(BatchTask('%s[%d]' % (section, index),
+                                   JOB_SECTIONS[section],
+                                   entity_to_args(entity)))
+    return tasks
+
+
+def load_tasks(infile):
+    """
+    Load the tasks from a command file or a YAML/JSON job file. A job file
+    is recognized by its content, a YAML (or JSON) mapping.
+    """
+    # PyYAML is imported on first use to keep the startup of the CLI fast
+    import yaml
+    content = infile.read()
+    try:
+        job = yaml.safe_load(content)
+    except yaml.YAMLError:
+        job = None
+    if isinstance(job, dict):
+        return parse_job(job)
+    # Command file
+    tasks = list()
+    for index, line in enumerate(content.splitlines()):
+        task = parse_command_line(line, 'line %d' % (index + 1))
+        if task is not None:
+            tasks.append(task)
+    return tasks
+
+
+def run_task(controller_channel, task):
+    """
+    Perform a task and return the error, or None if the task completed
+    successfully.
+    """
+    parse_arguments, handler = COMMANDS[task.command]
+    try:
+        args = parse_arguments(prog=task.command, args=task.args)
+    except SystemExit:
+        # The error has been printed by the parser
+        return 'invalid arguments'
+    try:
+        handler(controller_channel, args)
+    except nb_utils.ControllerException as err:
+        return str(err) or type(err).__name__
+    except Exception as err:    # pylint: disable=broad-except
+        logger.debug('%s: %s failed', task.source, task.command,
+                     exc_info=True)
+        return str(err) or type(err).__name__
+    return None
+
+
+def run_batch(controller_channel, tasks, parallelism=DEFAULT_PARALLELISM,
+              progress_interval=DEFAULT_PROGRESS_INTERVAL):
+    """
+    Perform the tasks of a batch concurrently on the same channel to the
+    controller and return a summary of the results.
+
+    :param controller_channel: The gRPC channel to the controller.
+    :type controller_channel: class: `grpc._channel.Channel`
+    :param tasks: The tasks.
+    :type tasks: list
+    :param parallelism: Max number of tasks performed concurrently.
+    :type parallelism: int, optional
+    :param progress_interval: Interval between two progress reports (in
+                              seconds); 0 disables the progress reports.
+    :type progress_interval: float, optional
+    :return: The summary of the batch.
+    :rtype: class: `BatchSummary`
+    """
+    summary = BatchSummary()
+    last_report = summary.start
+    with futures.ThreadPoolExecutor(
+            max_workers=max(parallelism, 1),
+            thread_name_prefix='batch') as executor:
+        pending = {executor.submit(run_task, controller_channel, task): task
+                   for task in tasks}
+        # Collect the results as the tasks complete
+        for future in futures.as_completed(pending):
+            error = future.result()
+            summary.total += 1
+            if error is not None:
+                summary.failures.append((pending[future], error))
+            # Report the progress periodically
+            now = time.time()
+            if progress_interval and now - last_report >= progress_interval:
+                last_report = now
+                summary.print_progress()
+    summary.elapsed = time.time() - summary.start
+    return summary
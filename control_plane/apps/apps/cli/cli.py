@@ -44,11 +44,13 @@ except ImportError:
     readline = None
 import logging
 import os
+import sys
 from argparse import ArgumentParser
 from cmd import Cmd
 
 # Controller dependencies
-from apps.cli import srv6_cli, srv6pm_cli, topo_cli
+from apps.cli import batch, srv6_cli, srv6pm_cli, topo_cli
+from apps.nb_grpc_client import cache as nb_cache
 from apps.nb_grpc_client import utils as nb_utils
 
 # Folder containing this script
@@ -907,21 +909,7 @@ class ControllerCLISRv6(CustomCmd):
             )
         except SystemExit:
             return False  # This workaround avoid exit in case of errors
-        srv6_cli.handle_srv6_path(
-            controller_channel=CONTROLLER_CHANNEL,
-            operation=args.op,
-            grpc_address=args.grpc_ip,
-            grpc_port=args.grpc_port,
-            destination=args.destination,
-            segments=args.segments,
-            device=args.device,
-            encapmode=args.encapmode,
-            table=args.table,
-            metric=args.metric,
-            bsid_addr=args.bsid_addr,
-            fwd_engine=args.fwd_engine,
-            key=args.key
-        )
+        srv6_cli.handle_srv6_path_args(CONTROLLER_CHANNEL, args)
         # Return False in order to keep the CLI subsection open
         # after the command execution
         return False
@@ -938,23 +926,7 @@ class ControllerCLISRv6(CustomCmd):
             )
         except SystemExit:
             return False  # This workaround avoid exit in case of errors
-        srv6_cli.handle_srv6_behavior(
-            controller_channel=CONTROLLER_CHANNEL,
-            operation=args.op,
-            grpc_address=args.grpc_ip,
-            grpc_port=args.grpc_port,
-            segment=args.segment,
-            action=args.action,
-            device=args.device,
-            table=args.table,
-            nexthop=args.nexthop,
-            lookup_table=args.lookup_table,
-            interface=args.interface,
-            segments=args.segments,
-            metric=args.metric,
-            fwd_engine=args.fwd_engine,
-            key=args.key
-        )
+        srv6_cli.handle_srv6_behavior_args(CONTROLLER_CHANNEL, args)
         # Return False in order to keep the CLI subsection open
         # after the command execution
         return False
@@ -971,20 +943,7 @@ class ControllerCLISRv6(CustomCmd):
             )
         except SystemExit:
             return False  # This workaround avoid exit in case of errors
-        srv6_cli.handle_srv6_unitunnel(
-            controller_channel=CONTROLLER_CHANNEL,
-            operation=args.op,
-            ingress_ip=args.ingress_grpc_ip,
-            ingress_port=args.ingress_grpc_port,
-            egress_ip=args.egress_grpc_ip,
-            egress_port=args.egress_grpc_port,
-            destination=args.dest,
-            segments=args.sidlist,
-            localseg=args.localseg,
-            bsid_addr=args.bsid_addr,
-            fwd_engine=args.fwd_engine,
-            key=args.key
-        )
+        srv6_cli.handle_srv6_unitunnel_args(CONTROLLER_CHANNEL, args)
         # Return False in order to keep the CLI subsection open
         # after the command execution
         return False
@@ -1001,23 +960,7 @@ class ControllerCLISRv6(CustomCmd):
             )
         except SystemExit:
             return False  # This workaround avoid exit in case of errors
-        srv6_cli.handle_srv6_biditunnel(
-            controller_channel=CONTROLLER_CHANNEL,
-            operation=args.op,
-            node_l_ip=args.l_grpc_ip,
-            node_r_ip=args.r_grpc_ip,
-            node_l_port=args.l_grpc_port,
-            node_r_port=args.r_grpc_port,
-            sidlist_lr=args.sidlist_lr,
-            sidlist_rl=args.sidlist_rl,
-            dest_lr=args.dest_lr,
-            dest_rl=args.dest_rl,
-            localseg_lr=args.localseg_lr,
-            localseg_rl=args.localseg_rl,
-            bsid_addr=args.bsid_addr,
-            fwd_engine=args.fwd_engine,
-            key=args.key
-        )
+        srv6_cli.handle_srv6_biditunnel_args(CONTROLLER_CHANNEL, args)
         # Return False in order to keep the CLI subsection open
         # after the command execution
         return False
@@ -1035,25 +978,7 @@ class ControllerCLISRv6(CustomCmd):
         except SystemExit:
             return False  # This workaround avoid exit in case of errors
         # Handle the uSID policy
-        srv6_cli.handle_srv6_usid_policy(
-            controller_channel=CONTROLLER_CHANNEL,
-            operation=args.op,
-            lr_destination=args.lr_destination,
-            rl_destination=args.rl_destination,
-            nodes_lr=args.nodes,
-            nodes_rl=args.nodes_rev,
-            table=args.table,
-            metric=args.metric,
-            _id=args.id,
-            l_grpc_ip=args.l_grpc_ip,
-            l_grpc_port=args.l_grpc_port,
-            l_fwd_engine=args.l_fwd_engine,
-            r_grpc_ip=args.r_grpc_ip,
-            r_grpc_port=args.r_grpc_port,
-            r_fwd_engine=args.r_fwd_engine,
-            decap_sid=args.decap_sid,
-            locator=args.locator
-        )
+        srv6_cli.handle_srv6_usid_policy_args(CONTROLLER_CHANNEL, args)
         # Print nodes available
         srv6_cli.print_nodes()
         # Return False in order to keep the CLI subsection open
@@ -1309,12 +1234,70 @@ def parse_arguments():
     parser.add_argument(
         '-d', '--debug', action='store_true', help='Activate debug logs'
     )
+    # Batch mode: perform the commands (or the job) contained in a file
+    parser.add_argument(
+        '-b', '--batch', action='store', metavar='FILE',
+        help='Perform the SRv6 commands (or the YAML/JSON job) contained '
+        'in FILE without starting the interactive CLI ("-" for stdin)'
+    )
+    # Number of commands performed concurrently in batch mode
+    parser.add_argument(
+        '-j', '--parallelism', action='store', type=int,
+        default=batch.DEFAULT_PARALLELISM,
+        help='Number of commands performed concurrently in batch mode'
+    )
+    # Interval between two progress reports in batch mode
+    parser.add_argument(
+        '--progress-interval', action='store', type=float,
+        default=batch.DEFAULT_PROGRESS_INTERVAL,
+        help='Interval between two progress reports in batch mode, in '
+        'seconds (0 to disable)'
+    )
+    # Client cache of the responses of the read-only calls
+    parser.add_argument(
+        '--cache-ttl', action='store', type=float, default=0,
+        help='Cache the responses of the read-only calls (e.g. get '
+        'operations, get_nodes_config) for CACHE_TTL seconds; the cache is '
+        'cleared by any other call (default: 0, disabled)'
+    )
+    parser.add_argument(
+        '--cache-size', action='store', type=int,
+        default=nb_cache.DEFAULT_CACHE_SIZE,
+        help='Max number of responses in the client cache'
+    )
     # Parse input parameters
     args = parser.parse_args()
     # Return the arguments
     return args
 
 
+def run_batch(filename, parallelism, progress_interval):
+    """
+    Perform the commands (or the job) contained in a file, or read from
+    stdin if the filename is "-", and return the exit code.
+    """
+    try:
+        # Load the commands
+        if filename == '-':
+            tasks = batch.load_tasks(sys.stdin)
+        else:
+            with open(filename, 'r') as infile:
+                tasks = batch.load_tasks(infile)
+    except (OSError, nb_utils.ControllerException) as err:
+        logger.error('Cannot load the batch: %s', err)
+        return 2
+    # Perform the commands on the channel to the controller
+    summary = batch.run_batch(
+        controller_channel=CONTROLLER_CHANNEL,
+        tasks=tasks,
+        parallelism=parallelism,
+        progress_interval=progress_interval
+    )
+    summary.print_summary()
+    # Return a non-zero exit code if any command failed
+    return 1 if summary.failures else 0
+
+
 def __main():
     """
     Entry point for this module.
@@ -1339,8 +1322,14 @@ def __main():
     # Try to establish a connection to the controller
     CONTROLLER_CHANNEL = nb_utils.get_grpc_session(
         server_ip=controller_address,
-        server_port=controller_port
+        server_port=controller_port,
+        cache_ttl=args.cache_ttl,
+        cache_size=args.cache_size
     )
+    # Batch mode
+    if args.batch is not None:
+        sys.exit(run_batch(args.batch, args.parallelism,
+                           args.progress_interval))
     # Start the CLI
     ControllerCLI().cmdloop()
 
@@ -251,6 +251,121 @@ def handle_srv6_biditunnel(controller_channel, operation, node_l_ip,
             pprint.pprint(srv6_tunnels)
 
 
+def handle_srv6_usid_policy_args(controller_channel, args):
+    """
+    Handle a SRv6 uSID policy, given the arguments of the "usid_policy"
+    command.
+    """
+    return handle_srv6_usid_policy(
+        controller_channel=controller_channel,
+        operation=args.op,
+        lr_destination=args.lr_destination,
+        rl_destination=args.rl_destination,
+        nodes_lr=args.nodes,
+        nodes_rl=args.nodes_rev,
+        table=args.table,
+        metric=args.metric,
+        _id=args.id,
+        l_grpc_ip=args.l_grpc_ip,
+        l_grpc_port=args.l_grpc_port,
+        l_fwd_engine=args.l_fwd_engine,
+        r_grpc_ip=args.r_grpc_ip,
+        r_grpc_port=args.r_grpc_port,
+        r_fwd_engine=args.r_fwd_engine,
+        decap_sid=args.decap_sid,
+        locator=args.locator
+    )
+
+
+def handle_srv6_path_args(controller_channel, args):
+    """
+    Handle a SRv6 path, given the arguments of the "path" command.
+    """
+    handle_srv6_path(
+        controller_channel=controller_channel,
+        operation=args.op,
+        grpc_address=args.grpc_ip,
+        grpc_port=args.grpc_port,
+        destination=args.destination,
+        segments=args.segments,
+        device=args.device,
+        encapmode=args.encapmode,
+        table=args.table,
+        metric=args.metric,
+        bsid_addr=args.bsid_addr,
+        fwd_engine=args.fwd_engine,
+        key=args.key
+    )
+
+
+def handle_srv6_behavior_args(controller_channel, args):
+    """
+    Handle a SRv6 behavior, given the arguments of the "behavior" command.
+    """
+    handle_srv6_behavior(
+        controller_channel=controller_channel,
+        operation=args.op,
+        grpc_address=args.grpc_ip,
+        grpc_port=args.grpc_port,
+        segment=args.segment,
+        action=args.action,
+        device=args.device,
+        table=args.table,
+        nexthop=args.nexthop,
+        lookup_table=args.lookup_table,
+        interface=args.interface,
+        segments=args.segments,
+        metric=args.metric,
+        fwd_engine=args.fwd_engine,
+        key=args.key
+    )
+
+
+def handle_srv6_unitunnel_args(controller_channel, args):
+    """
+    Handle a SRv6 unidirectional tunnel, given the arguments of the
+    "unitunnel" command.
+    """
+    handle_srv6_unitunnel(
+        controller_channel=controller_channel,
+        operation=args.op,
+        ingress_ip=args.ingress_grpc_ip,
+        ingress_port=args.ingress_grpc_port,
+        egress_ip=args.egress_grpc_ip,
+        egress_port=args.egress_grpc_port,
+        destination=args.dest,
+        segments=args.sidlist,
+        localseg=args.localseg,
+        bsid_addr=args.bsid_addr,
+        fwd_engine=args.fwd_engine,
+        key=args.key
+    )
+
+
+def handle_srv6_biditunnel_args(controller_channel, args):
+    """
+    Handle a SRv6 bidirectional tunnel, given the arguments of the
+    "biditunnel" command.
+    """
+    handle_srv6_biditunnel(
+        controller_channel=controller_channel,
+        operation=args.op,
+        node_l_ip=args.l_grpc_ip,
+        node_r_ip=args.r_grpc_ip,
+        node_l_port=args.l_grpc_port,
+        node_r_port=args.r_grpc_port,
+        sidlist_lr=args.sidlist_lr,
+        sidlist_rl=args.sidlist_rl,
+        dest_lr=args.dest_lr,
+        dest_rl=args.dest_rl,
+        localseg_lr=args.localseg_lr,
+        localseg_rl=args.localseg_rl,
+        bsid_addr=args.bsid_addr,
+        fwd_engine=args.fwd_engine,
+        key=args.key
+    )
+
+
 def args_srv6_usid_policy():
     """
     Command-line arguments for the srv6_usid_policy command
@@ -30,7 +30,6 @@ ArangoDB utilities for Controller CLI.
 
 # General imports
 import sys
-import yaml
 from argparse import ArgumentParser
 
 # Controller dependencies
@@ -187,6 +186,7 @@ def push_nodes_config(controller_channel, nodes_config_filename):
     """
     Push nodes configuration.
     """
+    import yaml
     # Read nodes config from YAML file
     try:
         nodes_config = cli_utils.load_yaml_dump(nodes_config_filename)
@@ -32,7 +32,6 @@ Utilities functions used by Controller CLI.
 import glob as gb
 import os.path as op
 import readline
-import yaml
 
 # Set the delimiters for the auto-completion
 readline.set_completer_delims(' \t\n')
@@ -53,6 +52,8 @@ def save_yaml_dump(obj, filename):
     """
     Export an object to a YAML file.
     """
+    # PyYAML is imported on first use to keep the startup of the CLI fast
+    import yaml
     # Save object to YAML file
     with open(filename, 'w') as outfile:
         yaml.dump(obj, outfile)
@@ -62,6 +63,7 @@ def load_yaml_dump(filename):
     """
     Load a YAML file and return a dict representation
     """
+    import yaml
     # Load YAML file.
     with open(filename, 'r') as infile:
         return yaml.safe_load(infile)
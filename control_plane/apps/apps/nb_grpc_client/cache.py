@@ -0,0 +1,306 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Response cache of the gRPC client
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Response cache of the gRPC client.
+
+The cache is a gRPC interceptor added to the channel to the controller
+(see :func:`intercept_channel`): the responses of the read-only calls
+(e.g. "get" operations on SRv6 entities, GetNodesConfig) are kept for a
+configurable time (TTL), keyed by method and serialized request, and the
+least recently used responses are evicted when the cache is full. Any
+other call sent through the same channel is considered a mutation and
+clears the cache.
+"""
+
+# General imports
+import collections
+import logging
+import threading
+import time
+
+# gRPC dependencies
+import grpc
+
+# Proto dependencies
+from nb_commons_pb2 import STATUS_SUCCESS
+
+# Logger reference
+logger = logging.getLogger(__name__)
+
+# Default time to live of the cached responses (in seconds)
+DEFAULT_CACHE_TTL = 5
+# Default max number of cached responses
+DEFAULT_CACHE_SIZE = 256
+
+# Read-only methods
+READ_ONLY_METHODS = {
+    '/topo_manager.TopologyManager/GetNodesConfig',
+    '/topo_manager.TopologyManager/ExtractTopology'
+}
+# Methods that do not change the state of the controller, but whose
+# responses must not be cached (e.g. the results of a running experiment)
+UNCACHED_METHODS = {
+    '/srv6pm_manager.SRv6PMManager/GetExperimentResults'
+}
+# Methods handling SRv6 entities: read-only if all the entities of the
+# request have the "get" operation
+SRV6_ENTITY_METHODS_PREFIX = '/nb_srv6_manager.SRv6Manager/Handle'
+
+
+def is_read_only(method, request):
+    """
+    Return True if a call does not change the state of the controller and
+    its response can be cached.
+
+    :param method: The name of the method (e.g.
+                   "/topo_manager.TopologyManager/GetNodesConfig").
+    :type method: str
+    :param request: The request message.
+    :type request: class: `google.protobuf.message.Message`
+    :rtype: bool
+    """
+    if method in READ_ONLY_METHODS:
+        return True
+    if method.startswith(SRV6_ENTITY_METHODS_PREFIX):
+        entities = [entity for _, value in request.ListFields()
+                    for entity in value]
+        return len(entities) > 0 and all(entity.operation == 'get'
+                                         for entity in entities)
+    return False
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of responses with a time to live.
+
+    A mutation clears the cache and increases its generation: a response
+    is stored only if no mutation has been started since the request was
+    sent, so that a response read concurrently with a mutation is not
+    cached.
+
+    :param ttl: Time to live of the responses (in seconds).
+    :type ttl: float
+    :param max_size: Max number of cached responses.
+    :type max_size: int
+    """
+
+    def __init__(self, ttl=DEFAULT_CACHE_TTL, max_size=DEFAULT_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        # Map key -> (expiration time, response), in LRU order
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Number of mutations started
+        self.generation = 0
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the cached response for a key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    # Expired
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Return a copy, the caller may change the message
+        response = type(entry[1])()
+        response.CopyFrom(entry[1])
+        return response
+
+    def put(self, key, response, generation):
+        """
+        Store a response, unless a mutation has been started after the
+        request was sent (i.e. the generation has changed).
+        """
+        # Store a copy, the caller may change the message
+        stored = type(response)()
+        stored.CopyFrom(response)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, stored)
+            self._entries.move_to_end(key)
+            # Evict the least recently used responses
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """
+        Clear the cache.
+        """
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+class _CachedCall(grpc.Call, grpc.Future):
+    """
+    Completed call returning a cached response.
+    """
+    # pylint: disable=no-self-use
+
+    def __init__(self, response):
+        self._response = response
+
+    def initial_metadata(self):
+        return None
+
+    def trailing_metadata(self):
+        return None
+
+    def code(self):
+        return grpc.StatusCode.OK
+
+    def details(self):
+        return None
+
+    def is_active(self):
+        return False
+
+    def time_remaining(self):
+        return None
+
+    def cancel(self):
+        return False
+
+    def cancelled(self):
+        return False
+
+    def running(self):
+        return False
+
+    def done(self):
+        return True
+
+    def result(self, timeout=None):
+        return self._response
+
+    def exception(self, timeout=None):
+        return None
+
+    def traceback(self, timeout=None):
+        return None
+
+    def add_callback(self, callback):
+        return False
+
+    def add_done_callback(self, fn):
+        fn(self)
+
+
+class CachingInterceptor(grpc.UnaryUnaryClientInterceptor,
+                         grpc.UnaryStreamClientInterceptor,
+                         grpc.StreamUnaryClientInterceptor,
+                         grpc.StreamStreamClientInterceptor):
+    """
+    Client interceptor caching the responses of the read-only calls and
+    clearing the cache on the other calls.
+
+    :param cache: The cache.
+    :type cache: class: `ResponseCache`
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _mutation(self, continuation, client_call_details, request):
+        # Clear the cache when the mutation is sent and when it completes,
+        # to drop the responses read in the meantime
+        self.cache.invalidate()
+        call = continuation(client_call_details, request)
+        call.add_done_callback(lambda _: self.cache.invalidate())
+        return call
+
+    def intercept_unary_unary(self, continuation, client_call_details,
+                              request):
+        method = client_call_details.method
+        if method in UNCACHED_METHODS:
+            return continuation(client_call_details, request)
+        if not is_read_only(method, request):
+            return self._mutation(continuation, client_call_details, request)
+        key = (method, request.SerializeToString(deterministic=True))
+        response = self.cache.get(key)
+        if response is not None:
+            logger.debug('Response of %s served from the cache', method)
+            return _CachedCall(response)
+        generation = self.cache.generation
+        call = continuation(client_call_details, request)
+
+        def store(call):
+            # Cache only the successful responses
+            if call.code() == grpc.StatusCode.OK and \
+                    call.result().status == STATUS_SUCCESS:
+                self.cache.put(key, call.result(), generation)
+        call.add_done_callback(store)
+        return call
+
+    def intercept_unary_stream(self, continuation, client_call_details,
+                               request):
+        return self._mutation(continuation, client_call_details, request)
+
+    def intercept_stream_unary(self, continuation, client_call_details,
+                               request_iterator):
+        return self._mutation(continuation, client_call_details,
+                              request_iterator)
+
+    def intercept_stream_stream(self, continuation, client_call_details,
+                                request_iterator):
+        return self._mutation(continuation, client_call_details,
+                              request_iterator)
+
+
+def intercept_channel(channel, ttl=DEFAULT_CACHE_TTL,
+                      max_size=DEFAULT_CACHE_SIZE):
+    """
+    Return a channel caching the responses of the read-only calls sent to
+    the controller.
+
+    :param channel: The gRPC channel to the controller.
+    :type channel: class: `grpc._channel.Channel`
+    :param ttl: Time to live of the cached responses (in seconds).
+    :type ttl: float, optional
+    :param max_size: Max number of cached responses.
+    :type max_size: int, optional
+    :return: The channel. The cache is available as the "response_cache"
+             attribute of the channel.
+    :rtype: class: `grpc.Channel`
+    """
+    cache = ResponseCache(ttl=ttl, max_size=max_size)
+    channel = grpc.intercept_channel(channel, CachingInterceptor(cache))
+    channel.response_cache = cache
+    return channel
@@ -513,3 +513,25 @@ def handle_srv6_biditunnel(controller_channel, operation, node_l_ip,
         })
     # Done, return the list of SRv6 bidirectional tunnels, if any
     return srv6_tunnels
+
+
+def stream_srv6_operations(controller_channel, operations):
+    """
+    Send a stream of SRv6 operations (paths, behaviors, tunnels and uSID
+    policies) to the controller. The results are yielded as soon as the
+    operations complete, not necessarily in the order of the stream: each
+    result carries the "id" of its operation.
+
+    :param controller_channel: The gRPC channel to the controller.
+    :type controller_channel: class: `grpc._channel.Channel`
+    :param operations: The operations.
+    :type operations: iterator of
+                      class: `nb_srv6_manager_pb2.SRv6Operation`
+    :return: The results of the operations.
+    :rtype: iterator of class: `nb_srv6_manager_pb2.SRv6OperationResult`
+    """
+    # Get the reference of the stub
+    stub = nb_srv6_manager_pb2_grpc.SRv6ManagerStub(controller_channel)
+    # Send the operations to the gRPC server and yield the results
+    for result in stub.StreamSRv6Operations(iter(operations)):
+        yield result
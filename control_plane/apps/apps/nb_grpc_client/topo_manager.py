@@ -255,14 +255,132 @@ def load_topo_on_arango(controller_channel, nodes_config, edges_config,
     return nodes, edges
 
 
+def grpc_to_py_node(node):
+    """
+    Convert a gRPC Node message to a node dict.
+    """
+    if node.type not in grpc_to_py_node_type:
+        # Invalid node type
+        logger.error('Invalid node type: %s', node.type)
+        raise utils.InvalidArgumentError
+    return {
+        '_key': node.id,
+        'ext_reachability': node.ext_reachability,
+        'ip_address': node.ip_address,
+        'type': grpc_to_py_node_type[node.type]
+    }
+
+
+def grpc_to_py_link(edge):
+    """
+    Convert a gRPC Link message to an edge dict.
+    """
+    if edge.type not in grpc_to_py_link_type:
+        # Invalid link type
+        logger.error('Invalid link type: %s', edge.type)
+        raise utils.InvalidArgumentError
+    return {
+        '_key': edge.id,
+        '_from': edge.source,
+        '_to': edge.target,
+        'type': grpc_to_py_link_type[edge.type]
+    }
+
+
+class TopologyState:
+    """
+    Topology rebuilt from the updates received on the ExtractAndLoadTopology
+    stream, with the sequence number and the epoch of the last update. If
+    the stream is interrupted, a new stream can resume from the last update
+    (see :meth:`fill_resume`): the controller sends only the missing deltas
+    or, if they are not available (e.g. the controller has been restarted),
+    a snapshot.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        # Sequence number and epoch of the last update (0 and '' if no
+        # updates have been received)
+        self.seq = 0
+        self.epoch = ''
+        # Nodes and edges, indexed by key
+        self.nodes = dict()
+        self.edges = dict()
+
+    def fill_resume(self, request):
+        """
+        Set the "resume_from_seq" and "resume_epoch" fields of a
+        TopologyManagerRequest.
+        """
+        request.resume_from_seq = self.seq
+        request.resume_epoch = self.epoch
+
+
+def topology_from_stream(responses, state=None):
+    """
+    Rebuild the topology from the updates received on the
+    ExtractAndLoadTopology stream. The server sends a snapshot of the
+    topology followed by the changes (deltas); this generator applies the
+    deltas and yields the full topology after each update.
+
+    :param responses: The TopologyManagerReply messages.
+    :type responses: iterator
+    :param state: The topology received on a previous stream, which the
+                  deltas are applied to (updated in place).
+    :type state: class: `TopologyState`, optional
+    :return: Tuples (nodes, edges).
+    :rtype: iterator
+    :raises apps.nb_grpc_client.utils.InvalidArgumentError: A delta does not
+                                                            follow the last
+                                                            update received.
+    """
+    if state is None:
+        state = TopologyState()
+    for response in responses:
+        # Check the status code
+        utils.raise_exception_on_error(response.status)
+        # No errors during the topology extraction
+        if response.update_type == topology_manager_pb2.DELTA:
+            # The deltas can only be applied to the topology of the same
+            # epoch
+            if response.epoch != state.epoch:
+                logger.error('Received a delta of epoch %s, expected %s',
+                             response.epoch, state.epoch)
+                raise utils.InvalidArgumentError
+            # Apply the changes
+            for key in response.delta.removed_nodes:
+                state.nodes.pop(key, None)
+            for node in list(response.delta.added_nodes) + \
+                    list(response.delta.changed_nodes):
+                state.nodes[node.id] = grpc_to_py_node(node)
+            for key in response.delta.removed_links:
+                state.edges.pop(key, None)
+            for edge in list(response.delta.added_links) + \
+                    list(response.delta.changed_links):
+                state.edges[edge.id] = grpc_to_py_link(edge)
+        else:
+            # Snapshot, replace the topology
+            state.nodes = {node.id: grpc_to_py_node(node)
+                           for node in response.topology.nodes}
+            state.edges = {edge.id: grpc_to_py_link(edge)
+                           for edge in response.topology.links}
+        state.seq = response.seq
+        state.epoch = response.epoch
+        yield list(state.nodes.values()), list(state.edges.values())
+
+
 def extract_topo_from_isis_and_load_on_arango(controller_channel,
                                               isis_nodes, isisd_pwd,
                                               addrs_config=None,
                                               hosts_config=None,
-                                              period=0, verbose=False):
+                                              period=0, verbose=False,
+                                              state=None):
     """
     Extract the topology from a set of nodes running ISIS protocol
-    and load it on a Arango database
+    and load it on a Arango database. If "state" (see
+    :class:`TopologyState`) contains the topology received on a previous
+    stream, the stream is resumed from its last update.
     """
     # pylint: disable=too-many-arguments
     #
@@ -294,42 +412,16 @@ def extract_topo_from_isis_and_load_on_arango(controller_channel,
             _host.name = host['name']
             _host.ip_address = host['ip_address']
             _host.gateway = host['gw']
+    # Resume from the last update received
+    if state is not None:
+        state.fill_resume(request)
     # Request message is ready
     #
     # Get the reference of the stub
     stub = topology_manager_pb2_grpc.TopologyManagerStub(controller_channel)
     # Extract the topology
-    for response in stub.ExtractAndLoadTopology(request):
-        # Check the status code
-        utils.raise_exception_on_error(response.status)
-        # No errors during the topology extraction
-        #
-        # Extract the nodes from the gRPC response
-        nodes = list()
-        for node in response.topology.nodes:
-            if node.type not in grpc_to_py_node_type:
-                # Invalid node type
-                logger.error('Invalid node type: %s', node.type)
-                raise utils.InvalidArgumentError
-            nodes.append({
-                '_key': node.id,
-                'ext_reachability': node.ext_reachability,
-                'ip_address': node.ip_address,
-                'type': grpc_to_py_node_type[node.type]
-            })
-        # Extract the edges from the gRPC response
-        edges = list()
-        for edge in response.topology.links:
-            if edge.type not in grpc_to_py_link_type:
-                # Invalid link type
-                logger.error('Invalid link type: %s', edge.type)
-                raise utils.InvalidArgumentError
-            edges.append({
-                '_key': edge.id,
-                '_from': edge.source,
-                '_to': edge.target,
-                'type': grpc_to_py_link_type[edge.type]
-            })
+    for nodes, edges in topology_from_stream(
+            stub.ExtractAndLoadTopology(request), state):
         # Done, return the topology
         yield nodes, edges
 
@@ -337,9 +429,11 @@ def extract_topo_from_isis_and_load_on_arango(controller_channel,
 def topology_information_extraction_isis(controller_channel,
                                          routers, period, isisd_pwd,
                                          addrs_config=None, hosts_config=None,
-                                         verbose=False):
+                                         verbose=False, state=None):
     """
-    Run periodical topology extraction
+    Run periodical topology extraction. If "state" (see
+    :class:`TopologyState`) contains the topology received on a previous
+    stream, the stream is resumed from its last update.
     """
     # pylint: disable=too-many-arguments, unused-argument
     #
@@ -371,42 +465,16 @@ def topology_information_extraction_isis(controller_channel,
             _host.name = host['name']
             _host.ip_address = host['ip_address']
             _host.gateway = host['gw']
+    # Resume from the last update received
+    if state is not None:
+        state.fill_resume(request)
     # Request message is ready
     #
     # Get the reference of the stub
     stub = topology_manager_pb2_grpc.TopologyManagerStub(controller_channel)
     # Extract the topology
-    for response in stub.ExtractAndLoadTopology(request):
-        # Check the status code
-        utils.raise_exception_on_error(response.status)
-        # No errors during the topology extraction
-        #
-        # Extract the nodes from the gRPC response
-        nodes = list()
-        for node in response.topology.nodes:
-            if node.type not in grpc_to_py_node_type:
-                # Invalid node type
-                logger.error('Invalid node type: %s', node.type)
-                raise utils.InvalidArgumentError
-            nodes.append({
-                '_key': node.id,
-                'ext_reachability': node.ext_reachability,
-                'ip_address': node.ip_address,
-                'type': grpc_to_py_node_type[node.type]
-            })
-        # Extract the edges from the gRPC response
-        edges = list()
-        for edge in response.topology.links:
-            if edge.type not in grpc_to_py_link_type:
-                # Invalid link type
-                logger.error('Invalid link type: %s', edge.type)
-                raise utils.InvalidArgumentError
-            edges.append({
-                '_key': edge.id,
-                '_from': edge.source,
-                '_to': edge.target,
-                'type': grpc_to_py_link_type[edge.type]
-            })
+    for nodes, edges in topology_from_stream(
+            stub.ExtractAndLoadTopology(request), state):
         # Done, return the topology
         yield nodes, edges
 
@@ -420,7 +488,14 @@ def push_nodes_config(controller_channel, nodes_config):
     # Set the locator bits
     request.nodes_config.locator_bits = nodes_config['locator_bits']
     # Set the uSID ID bits
-    request.nodes_config.locator_bits = nodes_config['usid_id_bits']
+    request.nodes_config.usid_id_bits = nodes_config['usid_id_bits']
+    # Add the locators
+    for locator in nodes_config.get('locators') or []:
+        # Create a new locator
+        _locator = request.nodes_config.locators.add()
+        _locator.locator = locator['locator']
+        _locator.locator_bits = locator['locator_bits']
+        _locator.usid_id_bits = locator['usid_id_bits']
     # Add the nodes
     for node in nodes_config['nodes'].values():
         # Create a new node
@@ -458,9 +533,17 @@ def get_nodes_config(controller_channel):
     # Extract the nodes config
     nodes_config = {
         'locator_bits': response.nodes_config.locator_bits,
-        'usid_id_bits': response.nodes_config.locator_bits,
+        'usid_id_bits': response.nodes_config.usid_id_bits,
+        'locators': [],
         'nodes': []
     }
+    # Add the locators
+    for locator in response.nodes_config.locators:
+        nodes_config['locators'].append({
+            'locator': locator.locator,
+            'locator_bits': locator.locator_bits,
+            'usid_id_bits': locator.usid_id_bits
+        })
     # Add the nodes
     for node in response.nodes_config.nodes:
         nodes_config['nodes'].append({
@@ -52,6 +52,9 @@ from nb_commons_pb2 import (STATUS_SUCCESS,
                             STATUS_NO_SUCH_DEVICE,
                             STATUS_PERSISTENCY_NOT_ENABLED)
 
+# gRPC client dependencies
+from apps.nb_grpc_client import cache
+
 # Logger reference
 logging.basicConfig(level=logging.NOTSET)
 logger = logging.getLogger(__name__)
@@ -175,7 +178,8 @@ def get_address_family(ip_address):
 
 
 # Build a grpc stub
-def get_grpc_session(server_ip, server_port, secure=False, certificate=None):
+def get_grpc_session(server_ip, server_port, secure=False, certificate=None,
+                     cache_ttl=0, cache_size=cache.DEFAULT_CACHE_SIZE):
     """
     Create a Channel to a server.
 
@@ -183,6 +187,12 @@ def get_grpc_session(server_ip, server_port, secure=False, certificate=None):
     :type server_ip: str
     :param server_port: The port of the gRPC server
     :type server_port: int
+    :param cache_ttl: Time to live of the responses of the read-only calls
+                      in the client cache, in seconds (default: 0, the
+                      cache is disabled)
+    :type cache_ttl: float, optional
+    :param cache_size: Max number of responses in the client cache
+    :type cache_size: int, optional
     :return: The requested gRPC Channel or None if the operation has failed.
     :rtype: class: `grpc._channel.Channel`
     """
@@ -212,6 +222,10 @@ def get_grpc_session(server_ip, server_port, secure=False, certificate=None):
         channel = grpc.secure_channel(server_ip, grpc_client_credentials)
     else:
         channel = grpc.insecure_channel(server_ip)
+    # Cache the responses of the read-only calls, if enabled
+    if cache_ttl > 0:
+        channel = cache.intercept_channel(channel, ttl=cache_ttl,
+                                          max_size=cache_size)
     # Return the channel
     return channel
 
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+
+import io
+import threading
+
+import pytest
+
+from apps.cli import batch, srv6_cli
+from apps.nb_grpc_client import utils
+
+PATH_ARGS = ('--op add --grpc-ip fcff:1::1 --grpc-port 12345 '
+             '--destination fd00::/64 --segments fcff:2::1,fcff:3::1')
+
+
+def test_parse_command_line():
+    task = batch.parse_command_line('srv6 path ' + PATH_ARGS, 'line 1')
+    assert (task.source, task.command) == ('line 1', 'path')
+    assert task.args[:2] == ['--op', 'add']
+    # The "srv6" prefix is optional
+    assert batch.parse_command_line('path ' + PATH_ARGS,
+                                    'line 2').args == task.args
+    # Blank lines and comments
+    assert batch.parse_command_line('', 'line 3') is None
+    assert batch.parse_command_line('  # comment', 'line 4') is None
+    for line in ('srv6', 'route --op add'):
+        with pytest.raises(utils.InvalidArgumentError):
+            batch.parse_command_line(line, 'line 5')
+
+
+def test_entity_to_args():
+    args = batch.entity_to_args({
+        'op': 'add', 'grpc_ip': 'fcff:1::1', 'grpc_port': 12345,
+        'segments': ['fcff:2::1', 'fcff:3::1'], 'secure': True,
+        'debug': False, 'device': None})
+    assert args == ['--op', 'add', '--grpc-ip', 'fcff:1::1',
+                    '--grpc-port', '12345', '--segments',
+                    'fcff:2::1,fcff:3::1', '--secure']
+    # The arguments are accepted by the parser of the command
+    parsed = srv6_cli.parse_arguments_srv6_path(prog='path', args=args)
+    assert parsed.segments == 'fcff:2::1,fcff:3::1'
+    assert parsed.secure
+
+
+def test_parse_job():
+    tasks = batch.parse_job({
+        'paths': [{'op': 'add'}, {'op': 'del'}],
+        'usid_policies': [{'op': 'get'}],
+        'behaviors': None})
+    assert [(task.source, task.command, task.args) for task in tasks] == [
+        ('paths[0]', 'path', ['--op', 'add']),
+        ('paths[1]', 'path', ['--op', 'del']),
+        ('usid_policies[0]', 'usid_policy', ['--op', 'get'])]
+    with pytest.raises(utils.InvalidArgumentError):
+        batch.parse_job({'routes': [{'op': 'add'}]})
+
+
+@pytest.mark.parametrize('content', [
+    'paths:\n  - {op: add, grpc_ip: "fcff:1::1"}\n'
+    'biditunnels:\n  - {op: del}\n',
+    '{"paths": [{"op": "add", "grpc_ip": "fcff:1::1"}], '
+    '"biditunnels": [{"op": "del"}]}'])
+def test_load_job_files(content):
+    tasks = batch.load_tasks(io.StringIO(content))
+    assert [(task.command, task.args) for task in tasks] == [
+        ('path', ['--op', 'add', '--grpc-ip', 'fcff:1::1']),
+        ('biditunnel', ['--op', 'del'])]
+
+
+def test_load_command_file():
+    tasks = batch.load_tasks(io.StringIO(
+        '# Paths\n'
+        'srv6 path %s\n'
+        '\n'
+        'path %s\n' % (PATH_ARGS, PATH_ARGS)))
+    assert [task.source for task in tasks] == ['line 2', 'line 4']
+    with pytest.raises(utils.InvalidArgumentError):
+        batch.load_tasks(io.StringIO('path %s\nroute\n' % PATH_ARGS))
+
+
+def test_run_batch(monkeypatch):
+    handled = list()
+    lock = threading.Lock()
+
+    def handle_path(controller_channel, args):
+        with lock:
+            handled.append(args.destination)
+        if args.destination == 'fd00:2::/64':
+            raise utils.InvalidArgumentError('invalid destination')
+        if args.destination == 'fd00:3::/64':
+            raise RuntimeError('unexpected error')
+    monkeypatch.setattr(batch, 'COMMANDS', {
+        'path': (srv6_cli.parse_arguments_srv6_path, handle_path)})
+    tasks = [batch.parse_command_line(
+        'path --op add --destination fd00:%d::/64' % index,
+        'line %d' % index) for index in range(1, 6)]
+    # Invalid arguments are reported as failures
+    tasks.append(batch.BatchTask('line 6', 'path', ['--unknown']))
+    summary = batch.run_batch(None, tasks, parallelism=4,
+                              progress_interval=0)
+    assert sorted(handled) == ['fd00:%d::/64' % index
+                               for index in range(1, 6)]
+    assert (summary.total, summary.succeeded) == (6, 3)
+    assert sorted((task.source, error)
+                  for task, error in summary.failures) == [
+        ('line 2', 'invalid destination'),
+        ('line 3', 'unexpected error'),
+        ('line 6', 'invalid arguments')]
+    output = io.StringIO()
+    summary.print_summary(file=output)
+    assert 'line 3: path failed: unexpected error' in output.getvalue()
+    assert 'Failed: 3' in output.getvalue()
@@ -0,0 +1,246 @@
+#!/usr/bin/python
+
+from collections import namedtuple
+from concurrent import futures
+
+import grpc
+import nb_commons_pb2
+import nb_srv6_manager_pb2
+import pytest
+import topology_manager_pb2
+import topology_manager_pb2_grpc
+
+from apps.nb_grpc_client import cache
+
+GET_NODES_CONFIG = '/topo_manager.TopologyManager/GetNodesConfig'
+HANDLE_SRV6_PATH = '/nb_srv6_manager.SRv6Manager/HandleSRv6Path'
+
+CallDetails = namedtuple('CallDetails', ('method',))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeCall:
+    def __init__(self, response, code=grpc.StatusCode.OK):
+        self._response = response
+        self._code = code
+        self.callbacks = list()
+
+    def code(self):
+        return self._code
+
+    def result(self):
+        return self._response
+
+    def add_done_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def complete(self):
+        for callback in self.callbacks:
+            callback(self)
+
+
+class FakeContinuation:
+    # Record the calls sent to the controller and return the calls to
+    # complete by the test
+    def __init__(self, status=nb_commons_pb2.STATUS_SUCCESS,
+                 code=grpc.StatusCode.OK):
+        self.status = status
+        self.code = code
+        self.calls = list()
+
+    def __call__(self, client_call_details, request):
+        call = FakeCall(topology_manager_pb2.NodesConfigReply(
+            status=self.status), self.code)
+        self.calls.append(call)
+        return call
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(cache, 'time', fake_clock)
+    return fake_clock
+
+
+def reply(status=nb_commons_pb2.STATUS_SUCCESS):
+    return topology_manager_pb2.NodesConfigReply(status=status)
+
+
+def srv6_path_request(*operations):
+    request = nb_srv6_manager_pb2.SRv6PathRequest()
+    for operation in operations:
+        request.srv6_paths.add(operation=operation)
+    return request
+
+
+def test_hit_and_ttl(clock):
+    response_cache = cache.ResponseCache(ttl=5)
+    response = reply()
+    response_cache.put('key', response, response_cache.generation)
+    # The cache keeps a copy of the response stored
+    response.status = nb_commons_pb2.STATUS_INTERNAL_ERROR
+    response = response_cache.get('key')
+    assert response == reply()
+    # The caller gets a copy of the cached response
+    response.status = nb_commons_pb2.STATUS_INTERNAL_ERROR
+    assert response_cache.get('key') == reply()
+    assert response_cache.get('other') is None
+    assert (response_cache.hits, response_cache.misses) == (2, 1)
+    # Expired responses are removed
+    clock.now = 5
+    assert response_cache.get('key') is None
+    assert len(response_cache) == 0
+
+
+def test_lru_eviction(clock):
+    response_cache = cache.ResponseCache(max_size=2)
+    response_cache.put('a', reply(), 0)
+    response_cache.put('b', reply(), 0)
+    # "a" becomes the most recently used response
+    assert response_cache.get('a') is not None
+    response_cache.put('c', reply(), 0)
+    assert len(response_cache) == 2
+    assert response_cache.get('b') is None
+    assert response_cache.get('a') is not None
+    assert response_cache.get('c') is not None
+
+
+def test_generation(clock):
+    response_cache = cache.ResponseCache()
+    # Request sent before a mutation, response received after
+    generation = response_cache.generation
+    response_cache.invalidate()
+    response_cache.put('key', reply(), generation)
+    assert response_cache.get('key') is None
+    response_cache.put('key', reply(), response_cache.generation)
+    response_cache.invalidate()
+    assert response_cache.get('key') is None
+
+
+def test_is_read_only():
+    assert cache.is_read_only(GET_NODES_CONFIG,
+                              topology_manager_pb2.NodesConfigRequest())
+    assert not cache.is_read_only(
+        '/topo_manager.TopologyManager/PushNodesConfig',
+        topology_manager_pb2.NodesConfigRequest())
+    # SRv6 entities: read-only only if all the operations are "get"
+    assert cache.is_read_only(HANDLE_SRV6_PATH,
+                              srv6_path_request('get', 'get'))
+    assert not cache.is_read_only(HANDLE_SRV6_PATH,
+                                  srv6_path_request('get', 'add'))
+    assert not cache.is_read_only(HANDLE_SRV6_PATH, srv6_path_request())
+    assert not cache.is_read_only(
+        '/nb_srv6_manager.SRv6Manager/StreamSRv6Operations',
+        srv6_path_request('get'))
+
+
+def test_interceptor_caches_reads(clock):
+    interceptor = cache.CachingInterceptor(cache.ResponseCache())
+    continuation = FakeContinuation()
+    request = srv6_path_request('get')
+    call = interceptor.intercept_unary_unary(
+        continuation, CallDetails(HANDLE_SRV6_PATH), request)
+    call.complete()
+    call = interceptor.intercept_unary_unary(
+        continuation, CallDetails(HANDLE_SRV6_PATH), request)
+    assert len(continuation.calls) == 1
+    assert call.done() and call.code() == grpc.StatusCode.OK
+    assert call.result() == reply()
+    # Responses of the running experiments are never cached
+    for _ in range(2):
+        interceptor.intercept_unary_unary(
+            continuation,
+            CallDetails(next(iter(cache.UNCACHED_METHODS))), request)
+    assert len(continuation.calls) == 3
+
+
+def test_interceptor_invalidation(clock):
+    response_cache = cache.ResponseCache()
+    interceptor = cache.CachingInterceptor(response_cache)
+    continuation = FakeContinuation()
+    details = CallDetails(GET_NODES_CONFIG)
+    request = topology_manager_pb2.NodesConfigRequest()
+    read = interceptor.intercept_unary_unary(continuation, details, request)
+    # Unary mutation sent while the read is in progress
+    mutation = interceptor.intercept_unary_unary(
+        continuation, CallDetails(HANDLE_SRV6_PATH),
+        srv6_path_request('add'))
+    read.complete()
+    assert len(response_cache) == 0
+    mutation.complete()
+    interceptor.intercept_unary_unary(continuation, details,
+                                      request).complete()
+    assert len(response_cache) == 1
+    # Streaming calls are mutations
+    interceptor.intercept_unary_stream(
+        continuation, CallDetails('/topo_manager.TopologyManager/'
+                                  'ExtractAndLoadTopology'),
+        topology_manager_pb2.TopologyManagerRequest())
+    assert len(response_cache) == 0
+    interceptor.intercept_unary_unary(continuation, details,
+                                      request).complete()
+    interceptor.intercept_stream_stream(
+        continuation, CallDetails('/nb_srv6_manager.SRv6Manager/'
+                                  'StreamSRv6Operations'), iter(()))
+    assert len(response_cache) == 0
+    assert response_cache.generation == 4
+
+
+@pytest.mark.parametrize('status, code', [
+    (nb_commons_pb2.STATUS_INTERNAL_ERROR, grpc.StatusCode.OK),
+    (nb_commons_pb2.STATUS_SUCCESS, grpc.StatusCode.UNAVAILABLE)])
+def test_errors_not_cached(clock, status, code):
+    response_cache = cache.ResponseCache()
+    interceptor = cache.CachingInterceptor(response_cache)
+    continuation = FakeContinuation(status, code)
+    for _ in range(2):
+        interceptor.intercept_unary_unary(
+            continuation, CallDetails(GET_NODES_CONFIG),
+            topology_manager_pb2.NodesConfigRequest()).complete()
+    assert len(continuation.calls) == 2
+    assert len(response_cache) == 0
+
+
+class CountingTopologyManager(
+        topology_manager_pb2_grpc.TopologyManagerServicer):
+    def __init__(self):
+        self.calls = 0
+
+    def GetNodesConfig(self, request, context):
+        self.calls += 1
+        return reply()
+
+    def PushNodesConfig(self, request, context):
+        self.calls += 1
+        return reply()
+
+
+def test_intercept_channel():
+    servicer = CountingTopologyManager()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    topology_manager_pb2_grpc.add_TopologyManagerServicer_to_server(
+        servicer, server)
+    port = server.add_insecure_port('[::1]:0')
+    server.start()
+    try:
+        channel = cache.intercept_channel(
+            grpc.insecure_channel('[::1]:%d' % port))
+        stub = topology_manager_pb2_grpc.TopologyManagerStub(channel)
+        request = topology_manager_pb2.NodesConfigRequest()
+        assert stub.GetNodesConfig(request) == reply()
+        assert stub.GetNodesConfig(request) == reply()
+        assert servicer.calls == 1
+        assert channel.response_cache.hits == 1
+        # A mutation clears the cache
+        stub.PushNodesConfig(request)
+        stub.GetNodesConfig(request)
+        assert servicer.calls == 3
+    finally:
+        server.stop(None)
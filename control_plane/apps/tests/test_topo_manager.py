@@ -0,0 +1,60 @@
+#!/usr/bin/python
+
+import nb_commons_pb2
+import pytest
+import topology_manager_pb2
+
+from apps.nb_grpc_client import topo_manager, utils
+
+
+def snapshot(seq, epoch, routers):
+    response = topology_manager_pb2.TopologyManagerReply(
+        status=nb_commons_pb2.STATUS_SUCCESS, seq=seq, epoch=epoch,
+        update_type=topology_manager_pb2.SNAPSHOT)
+    for router in routers:
+        response.topology.nodes.add(id=router)
+    return response
+
+
+def delta(seq, epoch, added=(), removed=()):
+    response = topology_manager_pb2.TopologyManagerReply(
+        status=nb_commons_pb2.STATUS_SUCCESS, seq=seq, epoch=epoch,
+        update_type=topology_manager_pb2.DELTA)
+    for router in added:
+        response.delta.added_nodes.add(id=router)
+    response.delta.removed_nodes.extend(removed)
+    return response
+
+
+def keys(topology):
+    nodes, _ = topology
+    return sorted(node['_key'] for node in nodes)
+
+
+def test_resume_stream():
+    state = topo_manager.TopologyState()
+    topologies = list(topo_manager.topology_from_stream(
+        [snapshot(1, 'e1', ['r1']), delta(2, 'e1', added=['r2'])], state))
+    assert [keys(topology) for topology in topologies] == \
+        [['r1'], ['r1', 'r2']]
+    # The request of the new stream resumes from the last update
+    request = topology_manager_pb2.TopologyManagerRequest()
+    state.fill_resume(request)
+    assert (request.resume_from_seq, request.resume_epoch) == (2, 'e1')
+    # The deltas are applied to the topology of the previous stream
+    topologies = list(topo_manager.topology_from_stream(
+        [delta(3, 'e1', added=['r3'], removed=['r1'])], state))
+    assert keys(topologies[-1]) == ['r2', 'r3']
+    # After a restart the controller sends a snapshot of the new epoch
+    topologies = list(topo_manager.topology_from_stream(
+        [snapshot(1, 'e2', ['r5']), delta(2, 'e2', added=['r6'])], state))
+    assert keys(topologies[-1]) == ['r5', 'r6']
+    assert (state.seq, state.epoch) == (2, 'e2')
+
+
+def test_delta_of_another_epoch():
+    state = topo_manager.TopologyState()
+    with pytest.raises(utils.InvalidArgumentError):
+        list(topo_manager.topology_from_stream(
+            [snapshot(1, 'e1', ['r1']), delta(2, 'e2', added=['r2'])],
+            state))
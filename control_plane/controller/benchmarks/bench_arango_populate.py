@@ -0,0 +1,396 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# ArangoDB populate benchmark
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Time to load a large topology on ArangoDB.
+
+The benchmark builds a grid topology (two unidirectional edges per link)
+and loads it with the functions of :mod:`db_update.arango_db`:
+
+- per-item: populate2, one has() and one insert() or update() request per
+  document;
+- bulk: populate_bulk, one import_bulk(on_duplicate='update') request per
+  batch of documents.
+
+Both functions are run twice: on empty collections (insert) and on the
+collections already containing the topology (update).
+
+By default the collections are stand-ins, which store the documents in a
+dict; each request costs a round trip (--rtt) plus the JSON encoding of
+its body, as done by the ArangoDB driver. Since the per-item load of a
+large topology takes minutes, it is run on the first --sample documents
+and the time of the whole topology is projected from it. With --arango-url
+the topology is loaded on a real ArangoDB (in the "bench_populate"
+database, dropped at the end) and the per-item load is not projected.
+
+With --files, the time and the peak memory (tracemalloc) to load the
+topology from files are also reported:
+
+- yaml-full: YAML files loaded as a whole with FullLoader (as done by
+  populate_yaml), then imported with populate_bulk;
+- yaml-stream, jsonl: YAML and JSON lines files read incrementally by
+  populate_yaml_bulk (the YAML items are parsed by LibYAML, if available).
+
+On the stand-in, the peak memory includes the documents stored in the
+collections.
+
+Usage::
+
+    python benchmarks/bench_arango_populate.py --size 160
+    python benchmarks/bench_arango_populate.py --size 60 --files
+    python benchmarks/bench_arango_populate.py --size 160 \\
+        --arango-url http://localhost:8529
+"""
+
+# General imports
+import gc
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+# DB update dependencies
+import yaml
+from db_update import arango_db
+
+# Controller dependencies
+from controller import topo_model
+
+# Default size of the grid (size x size routers)
+DEFAULT_SIZE = 160
+# Default round trip time of a request to the stand-in (in ms)
+DEFAULT_RTT = 0.2
+# Default number of documents loaded per-item on the stand-in
+DEFAULT_SAMPLE = 10000
+# Name of the database used on ArangoDB
+BENCH_DATABASE = 'bench_populate'
+
+
+class StandInCollection:
+    """
+    Stand-in for an ArangoDB collection, implementing the methods used by
+    :mod:`db_update.arango_db`. Each request sleeps for the round trip time
+    and encodes its body.
+    """
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.docs = dict()
+
+    def _request(self, body):
+        json.dumps(body)
+        time.sleep(self.rtt)
+
+    def has(self, key):
+        """
+        Check if a document exists.
+        """
+        self._request(None)
+        return key in self.docs
+
+    def insert(self, doc):
+        """
+        Insert a document.
+        """
+        self._request(doc)
+        self.docs[doc['_key']] = dict(doc)
+
+    def update(self, doc):
+        """
+        Update the fields of a document.
+        """
+        self._request(doc)
+        self.docs[doc['_key']].update(doc)
+
+    def import_bulk(self, docs, on_duplicate=None, **kwargs):
+        """
+        Insert (or update, on duplicate) a list of documents.
+        """
+        # pylint: disable=unused-argument
+        self._request(docs)
+        created = updated = 0
+        for doc in docs:
+            if doc['_key'] in self.docs and on_duplicate == 'update':
+                self.docs[doc['_key']].update(doc)
+                updated += 1
+            else:
+                self.docs[doc['_key']] = dict(doc)
+                created += 1
+        return {'created': created, 'updated': updated}
+
+    def truncate(self):
+        """
+        Remove all the documents.
+        """
+        self.docs.clear()
+
+
+def build_grid(size):
+    """
+    Build a grid topology with size x size routers.
+    """
+    name = 'r%d-%d'
+    nodes = [name % (i, j) for i in range(size) for j in range(size)]
+    links = []
+    for i in range(size):
+        for j in range(size):
+            if j + 1 < size:
+                links.append((name % (i, j), name % (i, j + 1),
+                              'fcf0:%x:%x::/64' % (i, j)))
+            if i + 1 < size:
+                links.append((name % (i, j), name % (i + 1, j),
+                              'fcf1:%x:%x::/64' % (i, j)))
+    return topo_model.build_topology(
+        nodes, links, {node: node for node in nodes})
+
+
+def populate_per_item(nodes_collection, edges_collection, nodes, edges,
+                      batch_size):
+    """
+    Load the topology with populate2.
+    """
+    # pylint: disable=unused-argument
+    arango_db.populate2(nodes_collection, edges_collection,
+                        topo_model.iter_docs(nodes),
+                        topo_model.iter_docs(edges))
+
+
+def populate_bulk(nodes_collection, edges_collection, nodes, edges,
+                  batch_size):
+    """
+    Load the topology with populate_bulk.
+    """
+    arango_db.populate_bulk(nodes_collection, edges_collection,
+                            topo_model.iter_docs(nodes),
+                            topo_model.iter_docs(edges),
+                            batch_size=batch_size)
+
+
+def measure(populate, collections, nodes, edges, batch_size):
+    """
+    Load the topology on the empty collections and again on the loaded
+    collections; return the two times (in seconds).
+    """
+    for collection in collections:
+        collection.truncate()
+    elapsed = []
+    for _ in range(2):
+        start = time.perf_counter()
+        populate(*collections, nodes, edges, batch_size)
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def populate_yaml_full(nodes_collection, edges_collection, nodes_file,
+                       edges_file, batch_size):
+    """
+    Load the YAML files as a whole, then import the documents.
+    """
+    with open(nodes_file) as file:
+        nodes_dict = yaml.load(file, Loader=yaml.FullLoader)
+    with open(edges_file) as file:
+        edges_dict = yaml.load(file, Loader=yaml.FullLoader)
+    arango_db.populate_bulk(nodes_collection, edges_collection,
+                            nodes_dict, edges_dict, batch_size=batch_size)
+
+
+def populate_files(nodes_collection, edges_collection, nodes_file,
+                   edges_file, batch_size):
+    """
+    Read the files incrementally and import the documents.
+    """
+    arango_db.populate_yaml_bulk(nodes_collection, edges_collection,
+                                 nodes_file, edges_file,
+                                 batch_size=batch_size)
+
+
+def measure_files(populate, collections, nodes_file, edges_file,
+                  batch_size):
+    """
+    Load the topology from files; return the time (in seconds) and the peak
+    memory (in bytes). The memory is measured on a separate run.
+    """
+    for collection in collections:
+        collection.truncate()
+    gc.collect()
+    start = time.perf_counter()
+    populate(*collections, nodes_file, edges_file, batch_size)
+    elapsed = time.perf_counter() - start
+    for collection in collections:
+        collection.truncate()
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    populate(*collections, nodes_file, edges_file, batch_size)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_files(collections, nodes, edges, batch_size):
+    """
+    Write the topology to YAML and JSON lines files and load it.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = dict()
+        for ext in ('yaml', 'jsonl'):
+            files[ext] = []
+            for name, elems in (('nodes', nodes), ('edges', edges)):
+                filename = os.path.join(tmpdir, '%s.%s' % (name, ext))
+                with open(filename, 'w') as file:
+                    if ext == 'yaml':
+                        yaml.safe_dump([elem.to_doc() for elem in elems],
+                                       file)
+                    else:
+                        for doc in topo_model.iter_docs(elems):
+                            file.write(json.dumps(doc) + '\n')
+                files[ext].append(filename)
+        print()
+        print('%-12s %10s %14s' % ('files', 'time', 'peak'))
+        for name, populate, ext in (
+                ('yaml-full', populate_yaml_full, 'yaml'),
+                ('yaml-stream', populate_files, 'yaml'),
+                ('jsonl', populate_files, 'jsonl')):
+            elapsed, peak = measure_files(populate, collections,
+                                          *files[ext], batch_size)
+            print('%-12s %8.2f s %11.1f MB' % (name, elapsed, peak / 2 ** 20))
+
+
+def stand_in_collections(rtt):
+    """
+    Return the stand-in collections.
+    """
+    return StandInCollection(rtt), StandInCollection(rtt)
+
+
+def arango_collections(arango_url, arango_user, arango_password):
+    """
+    Create the benchmark database on ArangoDB and return the collections
+    and a function dropping the database.
+    """
+    from arango import ArangoClient
+    client = ArangoClient(hosts=arango_url)
+    sys_db = client.db('_system', username=arango_user,
+                       password=arango_password)
+    if not sys_db.has_database(BENCH_DATABASE):
+        sys_db.create_database(BENCH_DATABASE)
+    database = client.db(BENCH_DATABASE, username=arango_user,
+                         password=arango_password)
+    graph = database.create_graph('topology') \
+        if not database.has_graph('topology') else database.graph('topology')
+    if not graph.has_vertex_collection('nodes'):
+        graph.create_vertex_collection('nodes')
+    if not graph.has_edge_definition('edges'):
+        graph.create_edge_definition(
+            edge_collection='edges',
+            from_vertex_collections=['nodes'],
+            to_vertex_collections=['nodes'])
+    return ((graph.vertex_collection('nodes'),
+             graph.edge_collection('edges')),
+            lambda: sys_db.delete_database(BENCH_DATABASE))
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='ArangoDB populate benchmark')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE,
+                        help='Size of the grid (size x size routers)')
+    parser.add_argument('--batch-size', type=int,
+                        default=arango_db.BATCH_SIZE,
+                        help='Max number of documents per bulk import')
+    parser.add_argument('--rtt', type=float, default=DEFAULT_RTT,
+                        help='Round trip time of a request to the '
+                        'stand-in (in ms)')
+    parser.add_argument('--sample', type=int, default=DEFAULT_SAMPLE,
+                        help='Number of documents loaded per-item on the '
+                        'stand-in (0 to load the whole topology)')
+    parser.add_argument('--files', action='store_true',
+                        help='Also load the topology from YAML and JSON '
+                        'lines files')
+    parser.add_argument('--arango-url',
+                        help='ArangoDB URL; if not provided, the stand-in '
+                        'collections are used')
+    parser.add_argument('--arango-user', default='root',
+                        help='ArangoDB username')
+    parser.add_argument('--arango-password', default='12345678',
+                        help='ArangoDB password')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this script
+    """
+    args = parse_arguments()
+    logging.disable(logging.INFO)
+    nodes, edges = build_grid(args.size)
+    total = len(nodes) + len(edges)
+    print('%d nodes, %d edges' % (len(nodes), len(edges)))
+    drop = None
+    if args.arango_url is not None:
+        collections, drop = arango_collections(
+            args.arango_url, args.arango_user, args.arango_password)
+        sample = 0
+    else:
+        collections = stand_in_collections(args.rtt / 1000)
+        sample = args.sample
+    try:
+        print('%-10s %12s %12s' % ('', 'insert', 'update'))
+        # Per-item load, on a sample of the documents
+        if 0 < sample < total:
+            # The sample has the same ratio of nodes and edges
+            _nodes = nodes[:sample * len(nodes) // total]
+            _edges = edges[:sample - len(_nodes)]
+            elapsed = measure(populate_per_item, collections, _nodes,
+                              _edges, args.batch_size)
+            elapsed = [value * total / sample for value in elapsed]
+            name = 'per-item*'
+        else:
+            elapsed = measure(populate_per_item, collections, nodes, edges,
+                              args.batch_size)
+            name = 'per-item'
+        print('%-10s %10.2f s %10.2f s' % (name, *elapsed))
+        # Bulk load
+        elapsed = measure(populate_bulk, collections, nodes, edges,
+                          args.batch_size)
+        print('%-10s %10.2f s %10.2f s' % ('bulk', *elapsed))
+        if name == 'per-item*':
+            print('* projected from %d documents' % sample)
+        # Load from files
+        if args.files:
+            bench_files(collections, nodes, edges, args.batch_size)
+    finally:
+        if drop is not None:
+            drop()
+
+
+if __name__ == '__main__':
+    __main()
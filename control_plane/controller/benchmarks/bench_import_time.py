@@ -0,0 +1,144 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Import time benchmark
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Benchmark of the import time of the entry points of the controller, of
+the node manager and of the CLI.
+
+Each entry point is imported in a new interpreter with
+``python -X importtime``; the median cumulative import time of the entry
+point and the modules contributing most to it are reported. The optional
+subsystems (Kafka, NetworkX, ArangoDB, PyYAML, ...) are imported on first
+use and should not appear in the report.
+
+The budget enforced by the tests is configured through the
+IMPORT_TIME_BUDGET_MS environment variable (see tests/test_import_time.py).
+
+Usage::
+
+    python benchmarks/bench_import_time.py --repeat 10 --top 15
+"""
+
+# General imports
+import os
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+# Default entry points
+DEFAULT_MODULES = ['controller.controller_cli',
+                   'controller.nb_grpc_server.grpc_server',
+                   'node_manager.node_mgr',
+                   'apps.cli.cli']
+# Default number of repetitions
+DEFAULT_REPEAT = 5
+# Default number of modules reported for each entry point
+DEFAULT_TOP = 10
+# Folder containing the controller package
+BASE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+# Folders containing the packages, relative to the control_plane folder
+PACKAGE_DIRS = {
+    'controller': 'controller',
+    'node_manager': 'node-manager',
+    'apps': 'apps'
+}
+
+
+def import_time(module):
+    """
+    Import a module in a new interpreter, started in the folder of its
+    package, and return the cumulative import time (in microseconds) of
+    the module and of the modules imported by it.
+    """
+    package_dir = PACKAGE_DIRS.get(module.split('.')[0], 'controller')
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True,
+        cwd=os.path.join(BASE_PATH, '..', package_dir)).stderr
+    lines = list()
+    for line in output.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit():
+            # The nesting of the imports is given by the indentation
+            lines.append((len(name) - len(name.lstrip()), name.strip(),
+                          int(cumulative)))
+    # The modules imported by a module are listed before it, with a
+    # greater indentation
+    index = [name for _, name, _ in lines].index(module)
+    modules = {module: lines[index][2]}
+    for depth, name, cumulative in reversed(lines[:index]):
+        if depth <= lines[index][0]:
+            break
+        modules[name] = cumulative
+    return modules
+
+
+def bench_module(module, repeat, top):
+    """
+    Import a module several times and print the median import times.
+    """
+    runs = [import_time(module) for _ in range(repeat)]
+    medians = {name: statistics.median(run.get(name, 0) for run in runs)
+               for name in runs[0]}
+    print('%s: %.1f ms (median of %d runs, %d modules)'
+          % (module, medians[module] / 1000, repeat, len(medians)))
+    slowest = sorted((name for name in medians if name != module),
+                     key=medians.get, reverse=True)
+    for name in slowest[:top]:
+        print('    %-50s %8.1f ms' % (name, medians[name] / 1000))
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Import time benchmark')
+    parser.add_argument('--module', action='append', dest='modules',
+                        help='Module to import; can be repeated')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Number of imports of each module')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP,
+                        help='Number of modules reported for each entry '
+                        'point')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this script
+    """
+    args = parse_arguments()
+    for module in args.modules or DEFAULT_MODULES:
+        bench_module(module, args.repeat, args.top)
+
+
+if __name__ == '__main__':
+    __main()
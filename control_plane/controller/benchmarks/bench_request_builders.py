@@ -0,0 +1,422 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Request builders benchmark
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Benchmark of the conversion of the SRv6 entities of a bulk operation.
+
+For each SRv6 path (or behavior) of a northbound request, the controller
+converts the northbound message, builds the southbound request and the
+document stored to the database, and converts the documents returned by a
+"get" operation to the reply. The benchmark measures the CPU time per
+item of these steps with the entities of :mod:`controller.srv6_entities`
+and with the dict-based conversion used before them ("dicts"), kept here
+as a reference.
+
+Usage::
+
+    python benchmarks/bench_request_builders.py --items 10000 --repeat 5
+"""
+
+# General imports
+import gc
+import time
+from argparse import ArgumentParser
+
+# Proto dependencies
+import nb_commons_pb2
+import nb_srv6_manager_pb2
+import srv6_manager_pb2
+# Controller dependencies
+from controller.srv6_entities import SRv6Behavior, SRv6Path
+
+# Default number of items of a request
+DEFAULT_ITEMS = 10000
+# Default number of repetitions
+DEFAULT_REPEAT = 5
+
+# Northbound enums, as used by the dict-based conversion
+NB_ENCAP_MODES = {
+    nb_commons_pb2.ENCAP_MODE_UNSPEC: '',
+    nb_commons_pb2.INLINE: 'inline',
+    nb_commons_pb2.ENCAP: 'encap',
+    nb_commons_pb2.L2ENCAP: 'l2encap'
+}
+NB_FWD_ENGINES = {
+    nb_commons_pb2.FWD_ENGINE_UNSPEC: '',
+    nb_commons_pb2.LINUX: 'linux',
+    nb_commons_pb2.VPP: 'vpp'
+}
+NB_SRV6_ACTIONS = {
+    nb_commons_pb2.SRV6_ACTION_UNSPEC: '',
+    nb_commons_pb2.END: 'End',
+    nb_commons_pb2.END_DT6: 'End.DT6'
+}
+PY_TO_NB_ENCAP_MODE = {v: k for k, v in NB_ENCAP_MODES.items()}
+PY_TO_NB_FWD_ENGINE = {v: k for k, v in NB_FWD_ENGINES.items()}
+PY_TO_NB_SRV6_ACTION = {v: k for k, v in NB_SRV6_ACTIONS.items()}
+
+
+# ############################################################################
+# Dict-based conversion (reference)
+
+def path_to_dict(path):
+    """
+    Northbound SRv6 path -> dict.
+    """
+    encapmode = NB_ENCAP_MODES[path.encapmode]
+    fwd_engine = NB_FWD_ENGINES[path.fwd_engine]
+    return {
+        'grpc_address': (path.grpc_address
+                         if path.grpc_address != '' else None),
+        'grpc_port': path.grpc_port if path.grpc_port != -1 else None,
+        'destination': (path.destination
+                        if path.destination != '' else None),
+        'segments': list(path.segments) if len(path.segments) > 0 else None,
+        'device': path.device if path.device != '' else None,
+        'encapmode': encapmode if encapmode != '' else None,
+        'table': path.table if path.table != -1 else None,
+        'metric': path.metric if path.metric != -1 else None,
+        'bsid_addr': path.bsid_addr if path.bsid_addr != '' else None,
+        'fwd_engine': fwd_engine if fwd_engine != '' else None,
+        'key': path.key if path.key != '' else None
+    }
+
+
+def fill_path_from_dict(path, doc):
+    """
+    dict -> southbound SRv6 path.
+    """
+    path.destination = str(doc['destination'])
+    path.device = str(doc['device']) if doc['device'] is not None else ''
+    path.table = int(doc['table']) if doc['table'] is not None else -1
+    path.metric = int(doc['metric']) if doc['metric'] is not None else -1
+    path.bsid_addr = \
+        str(doc['bsid_addr']) if doc['bsid_addr'] is not None else ''
+    path.encapmode = \
+        str(doc['encapmode']) if doc['encapmode'] is not None else 'encap'
+    for segment in doc['segments'] or []:
+        srv6_segment = path.sr_path.add()
+        srv6_segment.segment = str(segment)
+
+
+def path_doc_from_dict(doc, grpc_address, grpc_port):
+    """
+    dict -> document of the database.
+    """
+    path = {
+        'grpc_address': grpc_address,
+        'grpc_port': grpc_port,
+        'destination': doc['destination'],
+        'segments': doc['segments'],
+        'device': doc['device'],
+        'encapmode': doc['encapmode'],
+        'table': doc['table'],
+        'metric': doc['metric'],
+        'bsid_addr': doc['bsid_addr'],
+        'fwd_engine': doc['fwd_engine']
+    }
+    if doc['key'] is not None:
+        path['_key'] = doc['key']
+    return path
+
+
+def fill_nb_path_from_doc(path, doc):
+    """
+    Document of the database -> northbound SRv6 path.
+    """
+    path.grpc_address = ''
+    if doc['grpc_address'] is not None:
+        path.grpc_address = doc['grpc_address']
+    path.grpc_port = -1
+    if doc['grpc_port'] is not None:
+        path.grpc_port = doc['grpc_port']
+    path.destination = ''
+    if doc['destination'] is not None:
+        path.destination = doc['destination']
+    if doc['segments'] is not None:
+        path.segments.extend(doc['segments'])
+    path.encapmode = nb_commons_pb2.ENCAP_MODE_UNSPEC
+    if doc['encapmode'] is not None:
+        path.encapmode = PY_TO_NB_ENCAP_MODE[doc['encapmode']]
+    path.device = ''
+    if doc['device'] is not None:
+        path.device = doc['device']
+    path.table = -1
+    if doc['table'] is not None:
+        path.table = doc['table']
+    path.metric = -1
+    if doc['metric'] is not None:
+        path.metric = doc['metric']
+    path.bsid_addr = ''
+    if doc['bsid_addr'] is not None:
+        path.bsid_addr = doc['bsid_addr']
+    path.fwd_engine = nb_commons_pb2.FWD_ENGINE_UNSPEC
+    if doc['fwd_engine'] is not None:
+        path.fwd_engine = PY_TO_NB_FWD_ENGINE[doc['fwd_engine']]
+    if '_key' in doc:
+        path.key = doc['_key']
+
+
+def behavior_to_dict(behavior):
+    """
+    Northbound SRv6 behavior -> dict.
+    """
+    action = NB_SRV6_ACTIONS[behavior.action]
+    fwd_engine = NB_FWD_ENGINES[behavior.fwd_engine]
+    return {
+        'grpc_address': (behavior.grpc_address
+                         if behavior.grpc_address != '' else None),
+        'grpc_port': (behavior.grpc_port
+                      if behavior.grpc_port != -1 else None),
+        'segment': behavior.segment if behavior.segment != '' else None,
+        'action': action if action != '' else None,
+        'device': behavior.device if behavior.device != '' else None,
+        'table': behavior.table if behavior.table != -1 else None,
+        'nexthop': behavior.nexthop if behavior.nexthop != '' else None,
+        'lookup_table': (behavior.lookup_table
+                         if behavior.lookup_table != -1 else None),
+        'interface': (behavior.interface
+                      if behavior.interface != '' else None),
+        'segments': (list(behavior.segments)
+                     if len(behavior.segments) > 0 else None),
+        'metric': behavior.metric if behavior.metric != -1 else None,
+        'fwd_engine': fwd_engine if fwd_engine != '' else None,
+        'key': behavior.key if behavior.key != '' else None
+    }
+
+
+def fill_behavior_from_dict(behavior, doc):
+    """
+    dict -> southbound SRv6 behavior.
+    """
+    behavior.segment = str(doc['segment'])
+    behavior.action = str(doc['action']) if doc['action'] is not None else ''
+    behavior.device = str(doc['device']) if doc['device'] is not None else ''
+    behavior.table = int(doc['table']) if doc['table'] is not None else -1
+    behavior.metric = int(doc['metric']) if doc['metric'] is not None else -1
+    behavior.nexthop = \
+        str(doc['nexthop']) if doc['nexthop'] is not None else ''
+    behavior.lookup_table = \
+        int(doc['lookup_table']) if doc['lookup_table'] is not None else -1
+    behavior.interface = \
+        str(doc['interface']) if doc['interface'] is not None else ''
+    for segment in doc['segments'] or []:
+        srv6_segment = behavior.segs.add()
+        srv6_segment.segment = str(segment)
+
+
+def behavior_doc_from_dict(doc, grpc_address, grpc_port):
+    """
+    dict -> document of the database.
+    """
+    behavior = {
+        'grpc_address': grpc_address,
+        'grpc_port': grpc_port,
+        'segment': doc['segment'],
+        'action': doc['action'],
+        'device': doc['device'],
+        'table': doc['table'],
+        'nexthop': doc['nexthop'],
+        'lookup_table': doc['lookup_table'],
+        'interface': doc['interface'],
+        'segments': doc['segments'],
+        'metric': doc['metric'],
+        'fwd_engine': doc['fwd_engine']
+    }
+    if doc['key'] is not None:
+        behavior['_key'] = doc['key']
+    return behavior
+
+
+# ############################################################################
+# Pipelines
+
+def dicts_paths(request, grpc_address, grpc_port):
+    """
+    Convert the paths of a northbound request with the dicts.
+    """
+    docs = [path_to_dict(path) for path in request.srv6_paths]
+    sb_request = srv6_manager_pb2.SRv6ManagerRequest()
+    paths = sb_request.srv6_path_request.paths
+    for doc in docs:
+        fill_path_from_dict(paths.add(), doc)
+    sb_request.SerializeToString()
+    return [path_doc_from_dict(doc, grpc_address, grpc_port) for doc in docs]
+
+
+def entities_paths(request, grpc_address, grpc_port):
+    """
+    Convert the paths of a northbound request with the entities.
+    """
+    entities = [SRv6Path.from_nb(path) for path in request.srv6_paths]
+    sb_request = srv6_manager_pb2.SRv6ManagerRequest()
+    paths = sb_request.srv6_path_request.paths
+    for entity in entities:
+        entity.fill_sb(paths.add())
+    sb_request.SerializeToString()
+    docs = list()
+    for entity in entities:
+        doc = entity.to_doc()
+        doc.update(grpc_address=grpc_address, grpc_port=grpc_port)
+        docs.append(doc)
+    return docs
+
+
+def dicts_behaviors(request, grpc_address, grpc_port):
+    """
+    Convert the behaviors of a northbound request with the dicts.
+    """
+    docs = [behavior_to_dict(behavior)
+            for behavior in request.srv6_behaviors]
+    sb_request = srv6_manager_pb2.SRv6ManagerRequest()
+    behaviors = sb_request.srv6_behavior_request.behaviors
+    for doc in docs:
+        fill_behavior_from_dict(behaviors.add(), doc)
+    sb_request.SerializeToString()
+    return [behavior_doc_from_dict(doc, grpc_address, grpc_port)
+            for doc in docs]
+
+
+def entities_behaviors(request, grpc_address, grpc_port):
+    """
+    Convert the behaviors of a northbound request with the entities.
+    """
+    entities = [SRv6Behavior.from_nb(behavior)
+                for behavior in request.srv6_behaviors]
+    sb_request = srv6_manager_pb2.SRv6ManagerRequest()
+    behaviors = sb_request.srv6_behavior_request.behaviors
+    for entity in entities:
+        entity.fill_sb(behaviors.add())
+    sb_request.SerializeToString()
+    docs = list()
+    for entity in entities:
+        doc = entity.to_doc()
+        doc.update(grpc_address=grpc_address, grpc_port=grpc_port)
+        docs.append(doc)
+    return docs
+
+
+def dicts_reply(docs):
+    """
+    Convert the paths returned by a "get" operation with the dicts.
+    """
+    reply = nb_srv6_manager_pb2.SRv6ManagerReply()
+    for doc in docs:
+        fill_nb_path_from_doc(reply.srv6_paths.add(), doc)
+    return reply.SerializeToString()
+
+
+def entities_reply(docs):
+    """
+    Convert the paths returned by a "get" operation with the entities.
+    """
+    reply = nb_srv6_manager_pb2.SRv6ManagerReply()
+    for doc in docs:
+        SRv6Path.from_doc(doc).fill_nb(reply.srv6_paths.add())
+    return reply.SerializeToString()
+
+
+def build_requests(items):
+    """
+    Create northbound requests carrying the paths and the behaviors.
+    """
+    paths = nb_srv6_manager_pb2.SRv6PathRequest()
+    behaviors = nb_srv6_manager_pb2.SRv6BehaviorRequest()
+    for i in range(items):
+        path = paths.srv6_paths.add(
+            operation='add', grpc_address='fcff:1::1', grpc_port=12345,
+            destination='fd00:%x::/64' % i, table=-1, metric=-1)
+        path.segments.extend(['fcff:2::1', 'fcff:3::1', 'fcff:4::1'])
+        behaviors.srv6_behaviors.add(
+            operation='add', grpc_address='fcff:1::1', grpc_port=12345,
+            segment='fcff:1::%x' % i, action=nb_commons_pb2.END_DT6,
+            table=-1, lookup_table=254, metric=-1)
+    return paths, behaviors
+
+
+def measure(dicts, entities, args, repeat):
+    """
+    Return the CPU time of the dict-based and of the entity-based
+    conversion (in seconds): the two conversions are run alternately, with
+    the garbage collector disabled (as timeit does), and the best run is
+    taken.
+    """
+    times = ([], [])
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for function, _times in zip((dicts, entities), times):
+                start = time.process_time()
+                function(*args)
+                _times.append(time.process_time() - start)
+                gc.collect()
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return min(times[0]), min(times[1])
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Request builders benchmark')
+    parser.add_argument('--items', type=int, default=DEFAULT_ITEMS,
+                        help='Number of items of a request')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Number of repetitions')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this script
+    """
+    args = parse_arguments()
+    paths, behaviors = build_requests(args.items)
+    docs = entities_paths(paths, 'fcff:1::1', 12345)
+    scenarios = [
+        ('paths (nb -> sb + doc)', dicts_paths, entities_paths,
+         (paths, 'fcff:1::1', 12345)),
+        ('behaviors (nb -> sb + doc)', dicts_behaviors, entities_behaviors,
+         (behaviors, 'fcff:1::1', 12345)),
+        ('paths (doc -> nb reply)', dicts_reply, entities_reply, (docs,))
+    ]
+    print('%d items, best of %d runs (CPU time per item)'
+          % (args.items, args.repeat))
+    print('%-28s %12s %12s %9s' % ('', 'dicts', 'entities', 'saved'))
+    for name, dicts, entities, _args in scenarios:
+        dicts_time, entities_time = [
+            value / args.items
+            for value in measure(dicts, entities, _args, args.repeat)]
+        print('%-28s %9.2f us %9.2f us %8.1f%%'
+              % (name, dicts_time * 1e6, entities_time * 1e6,
+                 (1 - entities_time / dicts_time) * 100))
+
+
+if __name__ == '__main__':
+    __main()
@@ -0,0 +1,340 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Southbound load generator
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Load generator for the southbound interface of the controller.
+
+The generator starts a fleet of fake node managers (see
+:mod:`controller.fake_nodes`) and provisions SRv6 entities on the fleet
+through the controller functions (srv6_utils and srv6_usid), at
+different concurrency levels. For each workload and concurrency level it
+reports the throughput (ops/sec), the p50/p99 latency and the number of
+failed operations. Workloads:
+
+- paths: add and remove a SRv6 path (handle_srv6_path);
+- behaviors: add and remove a SRv6 behavior (handle_srv6_behavior);
+- tunnels: create and destroy a bidirectional SRv6 tunnel;
+- usid: add a uSID policy over three nodes (handle_srv6_usid_policy).
+
+The persistency is not used: the database is not involved.
+
+Usage::
+
+    python benchmarks/bench_southbound_load.py --nodes 200 \\
+        --concurrency 1 --concurrency 16 --concurrency 64 --ops 2000
+"""
+
+# General imports
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent import futures
+
+# Controller dependencies
+from controller import fake_nodes, srv6_usid, srv6_utils, utils
+
+# Available workloads
+WORKLOADS = ('paths', 'behaviors', 'tunnels', 'usid')
+# Default concurrency levels
+DEFAULT_CONCURRENCY = [1, 8, 32]
+# Default number of operations for each workload and concurrency level
+DEFAULT_OPS = 500
+# Default number of fake nodes
+DEFAULT_NODES = 50
+# Default directory where the results are saved
+DEFAULT_RESULTS_DIR = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'results')
+
+
+class Workload:
+    """
+    Generate the operations of a workload. Each operation provisions a new
+    entity on one or more nodes of the fleet and removes it; the entities
+    are identified by a sequence number shared by all the workloads, so
+    that operations never collide.
+
+    :param name: The name of the workload (see WORKLOADS).
+    :type name: str
+    :param nodes_config: The nodes configuration of the fleet.
+    :type nodes_config: dict
+    :param reuse_channels: If True, the gRPC channels are created once
+                           for each node and shared by the operations;
+                           otherwise, a new channel is created for each
+                           operation (as the controller does).
+    :type reuse_channels: bool, optional
+    """
+
+    # Sequence number of the entities
+    _seq = itertools.count(1)
+
+    def __init__(self, name, nodes_config, reuse_channels=False):
+        if name not in WORKLOADS:
+            raise ValueError('Unknown workload: %s' % name)
+        self.name = name
+        self.nodes_config = nodes_config
+        self.nodes = nodes_config['nodes']
+        self.reuse_channels = reuse_channels
+        self._channels = dict()
+        self._lock = threading.Lock()
+
+    def _channel(self, node):
+        """
+        Return the shared channel to a node, or None if the channels are
+        not shared.
+        """
+        if not self.reuse_channels:
+            return None
+        with self._lock:
+            channel = self._channels.get(node['name'])
+            if channel is None:
+                channel = utils.get_grpc_session(node['grpc_ip'],
+                                                 node['grpc_port'])
+                self._channels[node['name']] = channel
+            return channel
+
+    def close(self):
+        """
+        Close the shared channels.
+        """
+        for channel in self._channels.values():
+            channel.close()
+        self._channels.clear()
+
+    def run_one(self):
+        """
+        Execute one operation.
+        """
+        seq = next(self._seq)
+        node = self.nodes[seq % len(self.nodes)]
+        destination = 'fd00:%x:%x::/64' % (seq >> 16, seq & 0xffff)
+        if self.name == 'paths':
+            for operation in ('add', 'del'):
+                srv6_utils.handle_srv6_path(
+                    operation=operation, grpc_address=node['grpc_ip'],
+                    grpc_port=node['grpc_port'], destination=destination,
+                    segments=['fcff:1::100', 'fcff:2::100'], update_db=False,
+                    channel=self._channel(node))
+        elif self.name == 'behaviors':
+            segment = 'fcff:%x:%x::100' % (seq >> 16, seq & 0xffff)
+            for operation in ('add', 'del'):
+                srv6_utils.handle_srv6_behavior(
+                    operation=operation, grpc_address=node['grpc_ip'],
+                    grpc_port=node['grpc_port'], segment=segment,
+                    action='End.DT6', lookup_table=254, device='lo',
+                    update_db=False, channel=self._channel(node))
+        elif self.name == 'tunnels':
+            node_r = self.nodes[(seq + 1) % len(self.nodes)]
+            dest_rl = 'fd01:%x:%x::/64' % (seq >> 16, seq & 0xffff)
+            srv6_utils.create_srv6_tunnel(
+                node_l_ip=node['grpc_ip'], node_l_port=node['grpc_port'],
+                node_r_ip=node_r['grpc_ip'], node_r_port=node_r['grpc_port'],
+                sidlist_lr=['fcff:2::100'], sidlist_rl=['fcff:1::100'],
+                dest_lr=destination, dest_rl=dest_rl, update_db=False,
+                node_l_channel=self._channel(node),
+                node_r_channel=self._channel(node_r))
+            srv6_utils.destroy_srv6_tunnel(
+                node_l_ip=node['grpc_ip'], node_l_port=node['grpc_port'],
+                node_r_ip=node_r['grpc_ip'], node_r_port=node_r['grpc_port'],
+                dest_lr=destination, dest_rl=dest_rl, update_db=False,
+                node_l_channel=self._channel(node),
+                node_r_channel=self._channel(node_r))
+        else:
+            # uSID policy over three consecutive nodes
+            names = [self.nodes[(seq + index) % len(self.nodes)]['name']
+                     for index in range(3)]
+            status = srv6_usid.handle_srv6_usid_policy(
+                operation='add', lr_destination=destination,
+                rl_destination='fd01:%x:%x::/64' % (seq >> 16, seq & 0xffff),
+                nodes_lr=names, persistency=False,
+                nodes_config=self.nodes_config)
+            if status != 0:
+                raise utils.InternalError
+
+
+def percentile(values, percent):
+    """
+    Return a percentile of a sorted list of values (nearest rank).
+    """
+    index = max(int(round(percent / 100.0 * len(values))) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def run_level(workload, concurrency, ops):
+    """
+    Run "ops" operations of a workload with "concurrency" parallel
+    workers.
+
+    :return: Dict containing the statistics.
+    :rtype: dict
+    """
+    latencies = list()
+    errors = [0]
+    lock = threading.Lock()
+
+    def run():
+        start = time.perf_counter()
+        try:
+            workload.run_one()
+            failed = False
+        except Exception:    # pylint: disable=broad-except
+            failed = True
+        latency = time.perf_counter() - start
+        with lock:
+            latencies.append(latency)
+            if failed:
+                errors[0] += 1
+
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(ops):
+            executor.submit(run)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'workload': workload.name,
+        'concurrency': concurrency,
+        'ops': ops,
+        'errors': errors[0],
+        'elapsed_s': elapsed,
+        'ops_per_sec': ops / elapsed if elapsed > 0 else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000
+    }
+
+
+def print_results(results):
+    """
+    Print the results.
+    """
+    print('%-10s %6s %7s %7s %10s %9s %9s' % (
+        'workload', 'conc', 'ops', 'errors', 'ops/sec', 'p50_ms', 'p99_ms'))
+    for result in results['levels']:
+        print('%-10s %6d %7d %7d %10.1f %9.3f %9.3f' % (
+            result['workload'], result['concurrency'], result['ops'],
+            result['errors'], result['ops_per_sec'], result['p50_ms'],
+            result['p99_ms']))
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Southbound load generator')
+    parser.add_argument('--workload', action='append', dest='workloads',
+                        choices=WORKLOADS,
+                        help='Workload to run; can be repeated (default: '
+                        'all)')
+    parser.add_argument('--concurrency', action='append', type=int,
+                        help='Concurrency level; can be repeated')
+    parser.add_argument('--ops', type=int, default=DEFAULT_OPS,
+                        help='Operations for each workload and level')
+    parser.add_argument('--nodes', type=int, default=DEFAULT_NODES,
+                        help='Number of fake nodes')
+    parser.add_argument('--base-port', type=int, default=0,
+                        help='Port of the first node (default: free ports)')
+    parser.add_argument('--nodes-config',
+                        help='Use an external fleet, described by this '
+                        'nodes configuration file (e.g. generated by '
+                        'controller.fake_nodes --nodes-config)')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Latency added to each RPC (in seconds)')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Max variation of the latency (in seconds)')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Probability of STATUS_INTERNAL_ERROR')
+    parser.add_argument('--reuse-channels', action='store_true',
+                        help='Share one gRPC channel for each node')
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR,
+                        help='Directory where the results are saved')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Do not save the results')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this script
+    """
+    args = parse_arguments()
+    # Silence the logs of the controller functions
+    logging.disable(logging.CRITICAL)
+    fleet = None
+    if args.nodes_config is not None:
+        # Use an external fleet
+        from pyaml import yaml
+        with open(args.nodes_config) as infile:
+            nodes_config = yaml.safe_load(infile)
+    else:
+        faults = fake_nodes.FaultInjector(latency=args.latency,
+                                          jitter=args.jitter,
+                                          error_rate=args.error_rate)
+        fleet = fake_nodes.FakeNodeFleet(
+            args.nodes, base_port=args.base_port, faults=faults).start()
+        nodes_config = fleet.nodes_config()
+    results = {
+        'benchmark': 'southbound_load',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'nodes': len(nodes_config['nodes']),
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'reuse_channels': args.reuse_channels,
+        'levels': list()
+    }
+    try:
+        for name in args.workloads or WORKLOADS:
+            workload = Workload(name, nodes_config, args.reuse_channels)
+            try:
+                for concurrency in args.concurrency or DEFAULT_CONCURRENCY:
+                    results['levels'].append(
+                        run_level(workload, concurrency, args.ops))
+            finally:
+                workload.close()
+    finally:
+        if fleet is not None:
+            fleet.stop()
+    print_results(results)
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        filename = os.path.join(args.results_dir, 'southbound_load_%s.json'
+                                % time.strftime('%Y%m%d-%H%M%S'))
+        with open(filename, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+        print('\nResults saved to %s' % filename)
+    sys.exit(0)
+
+
+if __name__ == '__main__':
+    __main()
@@ -0,0 +1,322 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Topology extraction benchmark
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Benchmark of the topology extraction pipeline.
+
+For each scenario (kind and size of a synthetic topology) a fake isisd
+(see :mod:`controller.fake_isisd`) is started on a local port and the
+following stages are timed separately:
+
+- fetch: retrieval of "show isis hostname" and "show isis database detail"
+  over telnet;
+- parse: parsing of the outputs;
+- build: construction of the nodes and edges from the parsed LSPs;
+- extraction: the whole connect_and_extract_topology_isis() call;
+- poll: a change-detection poll after a link flap (ISISTopologyWatcher);
+- dump_topo_yaml: conversion of the topology to the database format;
+- build_topo_graph: construction of the NetworkX graph (requires NetworkX);
+- arango_load: load of the topology on ArangoDB (only with --arango-url).
+
+The results are saved as a JSON file in the results directory, so that
+different runs can be compared with --compare.
+
+Usage::
+
+    python benchmarks/bench_topology_extraction.py \\
+        --scenario ring:64 --scenario fat-tree:8 --repeat 20
+"""
+
+# General imports
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+# Controller dependencies
+from controller import fake_isisd, ti_extraction
+
+# Default scenarios (topology:size)
+DEFAULT_SCENARIOS = ['ring:16', 'ring:128', 'grid:8', 'grid:16',
+                     'fat-tree:4', 'fat-tree:8']
+# Default number of repetitions of each stage
+DEFAULT_REPEAT = 10
+# Default directory where the results are saved
+DEFAULT_RESULTS_DIR = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'results')
+# Name of the ArangoDB collections used by the benchmark
+NODES_COLLECTION = 'nodes'
+EDGES_COLLECTION = 'edges'
+
+
+def timeit(func, repeat):
+    """
+    Call a function "repeat" times.
+
+    :return: Tuple containing the timings (in seconds) and the value
+             returned by the last call.
+    :rtype: tuple
+    """
+    timings = list()
+    result = None
+    for _ in range(repeat):
+        # Suppress the messages printed by the extraction functions
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def summarize(timings):
+    """
+    Compute the statistics of a list of timings (in milliseconds).
+    """
+    return {
+        'repeat': len(timings),
+        'min_ms': min(timings) * 1000,
+        'median_ms': statistics.median(timings) * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'max_ms': max(timings) * 1000
+    }
+
+
+def bench_scenario(topology, size, repeat, arango=None):
+    """
+    Run the benchmark on a synthetic topology.
+
+    :param topology: The kind of topology ('ring', 'grid' or 'fat-tree').
+    :type topology: str
+    :param size: The size of the topology.
+    :type size: int
+    :param repeat: Number of repetitions of each stage.
+    :type repeat: int
+    :param arango: ArangoDB parameters (url, user, password), or None to
+                   skip the ArangoDB load.
+    :type arango: tuple, optional
+    :return: Dict mapping the stages to their statistics.
+    :rtype: dict
+    """
+    # pylint: disable=too-many-locals
+    database = fake_isisd.FakeISISDatabase.from_topology(topology, size)
+    stages = dict()
+    with fake_isisd.FakeISISDServer(database, port=0) as server:
+        router, port = server.server_address[:2]
+        password = server.password
+        # Retrieve the outputs
+        timings, outputs = timeit(lambda: (
+            ti_extraction.isisd_command(router, port, password,
+                                        ['show isis hostname']),
+            ti_extraction.isisd_command(router, port, password,
+                                        ['show isis database detail'])
+        ), repeat)
+        stages['fetch'] = summarize(timings)
+        hostname_details, database_details = outputs
+        # Parse the outputs
+        timings, parsed = timeit(lambda: (
+            ti_extraction.parse_isis_hostnames(hostname_details),
+            ti_extraction.parse_isis_database(database_details)
+        ), repeat)
+        stages['parse'] = summarize(timings)
+        (system_id_to_hostname, hostname_to_system_id), lsps = parsed
+        # Build the topology
+        timings, _ = timeit(lambda: ti_extraction.build_topology_isis(
+            system_id_to_hostname, hostname_to_system_id, lsps), repeat)
+        stages['build'] = summarize(timings)
+        # Whole extraction
+        timings, topo = timeit(
+            lambda: ti_extraction.connect_and_extract_topology_isis(
+                [server.ip_port], password), repeat)
+        stages['extraction'] = summarize(timings)
+        nodes, edges, node_to_systemid = topo
+        # Change-detection poll after a link flap
+        watcher = ti_extraction.ISISTopologyWatcher([server.ip_port],
+                                                    password)
+        with contextlib.redirect_stdout(io.StringIO()):
+            watcher.poll()
+        link = next(iter(database.links))
+        flaps = iter(range(repeat))
+
+        def flap_and_poll():
+            database.set_link_state(*link, up=next(flaps) % 2 == 1)
+            return watcher.poll()
+        timings, _ = timeit(flap_and_poll, repeat)
+        stages['poll'] = summarize(timings)
+    # Convert the topology to the database format
+    timings, topo_yaml = timeit(lambda: ti_extraction.dump_topo_yaml(
+        nodes, edges, node_to_systemid), repeat)
+    stages['dump_topo_yaml'] = summarize(timings)
+    # Build the NetworkX graph
+    if 'networkx' in sys.modules:
+        timings, _ = timeit(
+            lambda: ti_extraction.build_topo_graph(nodes, edges), repeat)
+        stages['build_topo_graph'] = summarize(timings)
+    # Load the topology on ArangoDB
+    if arango is not None:
+        # ArangoDB dependencies
+        from controller import arangodb_utils
+        arango_url, arango_user, arango_password = arango
+        nodes_collection, edges_collection = arangodb_utils.initialize_db(
+            arango_url, arango_user, arango_password)
+        timings, _ = timeit(lambda: arangodb_utils.load_topo_on_arango(
+            arango_url, arango_user, arango_password,
+            topo_yaml[0], topo_yaml[1], nodes_collection, edges_collection),
+            repeat)
+        stages['arango_load'] = summarize(timings)
+    return {
+        'topology': topology,
+        'size': size,
+        'nodes': len(database.nodes),
+        'links': len(database.links),
+        'stages': stages
+    }
+
+
+def git_commit():
+    """
+    Return the current git commit, or None if it is not available.
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.realpath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results, results_dir):
+    """
+    Save the results as a JSON file in the results directory.
+
+    :return: The path of the file.
+    :rtype: str
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    filename = os.path.join(results_dir, 'topology_extraction_%s.json'
+                            % time.strftime('%Y%m%d-%H%M%S'))
+    with open(filename, 'w') as outfile:
+        json.dump(results, outfile, indent=2)
+    return filename
+
+
+def print_results(results, baseline=None):
+    """
+    Print the results. If a baseline is provided, print the ratio between
+    the median timings of the two runs.
+    """
+    baseline_stages = dict()
+    if baseline is not None:
+        for scenario in baseline['scenarios']:
+            for stage, stats in scenario['stages'].items():
+                baseline_stages[(scenario['topology'], scenario['size'],
+                                 stage)] = stats
+    print('%-10s %5s %6s %6s  %-17s %11s %11s %9s' % (
+        'topology', 'size', 'nodes', 'links', 'stage', 'median_ms',
+        'min_ms', 'vs_base'))
+    for scenario in results['scenarios']:
+        for stage, stats in scenario['stages'].items():
+            base = baseline_stages.get(
+                (scenario['topology'], scenario['size'], stage))
+            ratio = '%8.2fx' % (stats['median_ms'] / base['median_ms']) \
+                if base and base['median_ms'] > 0 else '%9s' % '-'
+            print('%-10s %5d %6d %6d  %-17s %11.3f %11.3f %s' % (
+                scenario['topology'], scenario['size'], scenario['nodes'],
+                scenario['links'], stage, stats['median_ms'],
+                stats['min_ms'], ratio))
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Topology extraction benchmark')
+    parser.add_argument('--scenario', action='append', dest='scenarios',
+                        help='Scenario to run, as topology:size (e.g. '
+                        'ring:64, grid:10, fat-tree:8); can be repeated')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='Number of repetitions of each stage')
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR,
+                        help='Directory where the results are saved')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Do not save the results')
+    parser.add_argument('--compare',
+                        help='Results file to compare with')
+    parser.add_argument('--arango-url',
+                        help='ArangoDB URL; if not provided, the ArangoDB '
+                        'load is not benchmarked')
+    parser.add_argument('--arango-user', default='root',
+                        help='ArangoDB username')
+    parser.add_argument('--arango-password', default='12345678',
+                        help='ArangoDB password')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this script
+    """
+    args = parse_arguments()
+    # Silence the logs of the extraction functions
+    logging.disable(logging.WARNING)
+    arango = None
+    if args.arango_url is not None:
+        arango = (args.arango_url, args.arango_user, args.arango_password)
+    results = {
+        'benchmark': 'topology_extraction',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scenarios': list()
+    }
+    for scenario in args.scenarios or DEFAULT_SCENARIOS:
+        topology, _, size = scenario.partition(':')
+        try:
+            results['scenarios'].append(
+                bench_scenario(topology, int(size), args.repeat, arango))
+        except ValueError as err:
+            print('Invalid scenario %s: %s' % (scenario, err))
+            sys.exit(-2)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as infile:
+            baseline = json.load(infile)
+    print_results(results, baseline)
+    if not args.no_save:
+        print('\nResults saved to %s'
+              % save_results(results, args.results_dir))
+
+
+if __name__ == '__main__':
+    __main()
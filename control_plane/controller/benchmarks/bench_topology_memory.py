@@ -0,0 +1,334 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Topology memory benchmark
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Memory used by the representation of a large topology.
+
+The benchmark extracts a synthetic topology from a fake IS-IS database
+(see :mod:`controller.fake_isisd`), then builds the topology, adds the IP
+addresses of the routers and a set of hosts, builds the documents loaded
+on ArangoDB and the gRPC snapshot sent to the clients. The memory
+allocated by Python (tracemalloc) is reported for the topology model of
+:mod:`controller.topo_model` and for the dict-based representation used
+before it ("dicts"), kept here as a reference:
+
+- retained: memory held by the topology after the enrichment;
+- peak: peak memory of the whole pipeline (the memory allocated by the
+  protobuf runtime is not traced).
+
+The enrichment from the YAML files (addresses and hosts) is also measured:
+the files are parsed one item at a time and the nodes are looked up in an
+index built once (see :func:`controller.arangodb_utils.add_hosts`), while
+before the files were loaded as a whole ("load").
+
+Usage::
+
+    python benchmarks/bench_topology_memory.py --size 100 --hosts 1000
+"""
+
+# General imports
+import gc
+import ipaddress
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+# pyaml dependencies
+from pyaml import yaml
+
+# Controller dependencies
+from controller import arangodb_utils, fake_isisd, ti_extraction, topo_model
+from controller.nb_grpc_server import topo_manager
+
+# Default size of the grid (size x size routers)
+DEFAULT_SIZE = 100
+# Default number of hosts
+DEFAULT_HOSTS = 1000
+
+
+# ############################################################################
+# Dict-based representation (reference)
+
+def dicts_pipeline(nodes, edges, node_to_systemid, addrs_config,
+                   hosts_config):
+    """
+    Build the topology as lists of dicts.
+    """
+    nodes = [{
+        '_key': node,
+        'type': 'router',
+        'ip_address': None,
+        'ext_reachability': node_to_systemid[node]
+    } for node in nodes]
+    edges = [{
+        '_key': '%s-dir1' % edge[2].replace('/', '-'),
+        '_from': 'nodes/%s' % edge[0],
+        '_to': 'nodes/%s' % edge[1],
+        'type': 'core'
+    } for edge in edges] + [{
+        '_key': '%s-dir2' % edge[2].replace('/', '-'),
+        '_from': 'nodes/%s' % edge[1],
+        '_to': 'nodes/%s' % edge[0],
+        'type': 'core'
+    } for edge in edges]
+    node_to_addr = {addr['node']: addr['ip_address'] for addr in addrs_config}
+    for node in nodes:
+        node['ip_address'] = node_to_addr[node['_key']]
+    for host in hosts_config:
+        nodes.append({
+            '_key': host['name'],
+            'type': 'host',
+            'ip_address': host['ip_address']
+        })
+        net = str(ipaddress.ip_network(host['ip_address'], strict=False))
+        edges.append({
+            '_key': '%s-dir1' % net.replace('/', '-'),
+            '_from': 'nodes/%s' % host['name'],
+            '_to': 'nodes/%s' % host['gw'],
+            'type': 'edge'
+        })
+        edges.append({
+            '_key': '%s-dir2' % net.replace('/', '-'),
+            '_from': 'nodes/%s' % host['gw'],
+            '_to': 'nodes/%s' % host['name'],
+            'type': 'edge'
+        })
+    return nodes, edges
+
+
+def dicts_snapshot(nodes, edges):
+    """
+    Build the gRPC snapshot from the dicts.
+    """
+    response = topo_manager.topology_manager_pb2.TopologyManagerReply()
+    for node in nodes:
+        _node = response.topology.nodes.add()
+        _node.id = node['_key']
+        if node.get('ext_reachability') is not None:
+            _node.ext_reachability = node['ext_reachability']
+        if node.get('ip_address') is not None:
+            _node.ip_address = node['ip_address']
+        _node.type = topo_manager.py_to_grpc_node_type[node['type']]
+    for edge in edges:
+        _edge = response.topology.links.add()
+        _edge.id = edge['_key']
+        _edge.source = edge['_from']
+        _edge.target = edge['_to']
+        _edge.type = topo_manager.py_to_grpc_link_type[edge['type']]
+    return response
+
+
+def dicts_docs(elems):
+    """
+    The dicts are the documents loaded on the database.
+    """
+    return iter(elems)
+
+
+# ############################################################################
+# Topology model
+
+def model_pipeline(nodes, edges, node_to_systemid, addrs_config,
+                   hosts_config):
+    """
+    Build the topology model.
+    """
+    nodes, edges = topo_model.build_topology(nodes, edges, node_to_systemid)
+    arangodb_utils.fill_ip_addresses_from_list(nodes, addrs_config)
+    arangodb_utils.add_hosts_from_list(nodes, edges, hosts_config)
+    return nodes, edges
+
+
+def model_snapshot(nodes, edges):
+    """
+    Build the gRPC snapshot from the topology model.
+    """
+    return topo_manager.snapshot_to_grpc(1, nodes, edges)
+
+
+def load_enrichment(nodes, edges, addrs_yaml, hosts_yaml):
+    """
+    Add the addresses and the hosts, loading the YAML files as a whole.
+    """
+    with open(addrs_yaml, 'r') as infile:
+        addrs_config = yaml.safe_load(infile.read())
+    arangodb_utils.fill_ip_addresses_from_list(nodes, addrs_config)
+    with open(hosts_yaml, 'r') as infile:
+        hosts_config = yaml.safe_load(infile.read())
+    arangodb_utils.add_hosts_from_list(nodes, edges, hosts_config)
+
+
+def stream_enrichment(nodes, edges, addrs_yaml, hosts_yaml):
+    """
+    Add the addresses and the hosts, streaming the YAML files.
+    """
+    nodes_index = arangodb_utils.index_nodes(nodes)
+    arangodb_utils.fill_ip_addresses(nodes, addrs_yaml, nodes_index)
+    arangodb_utils.add_hosts(nodes, edges, hosts_yaml, nodes_index)
+
+
+# ############################################################################
+
+def extract(size, hosts):
+    """
+    Extract a grid topology from a fake IS-IS database and generate the
+    addresses and the hosts configuration.
+    """
+    database = fake_isisd.FakeISISDatabase.from_topology('grid', size)
+    system_id_to_hostname, hostname_to_system_id = \
+        ti_extraction.parse_isis_hostnames(
+            database.execute('show isis hostname'))
+    lsps = ti_extraction.parse_isis_database(
+        database.execute('show isis database detail'))
+    nodes, edges, node_to_systemid = ti_extraction.build_topology_isis(
+        system_id_to_hostname, hostname_to_system_id, lsps)
+    routers = sorted(nodes)
+    addrs_config = [{'node': node, 'ip_address': 'fcff:%x::1' % i}
+                    for i, node in enumerate(routers, 1)]
+    hosts_config = [{'name': 'h%d' % i,
+                     'ip_address': 'fd00:%x::2/64' % i,
+                     'gw': routers[i % len(routers)]}
+                    for i in range(hosts)]
+    return (nodes, edges, node_to_systemid), addrs_config, hosts_config
+
+
+def run(pipeline, snapshot, docs, topology, addrs_config, hosts_config):
+    """
+    Build the topology, the gRPC snapshot and the documents.
+    """
+    # pylint: disable=too-many-arguments
+    nodes, edges = pipeline(*topology, addrs_config, hosts_config)
+    snapshot(nodes, edges)
+    for _ in docs(nodes):
+        pass
+    for _ in docs(edges):
+        pass
+
+
+def measure(pipeline, snapshot, docs, topology, addrs_config, hosts_config):
+    """
+    Run a pipeline and return the retained memory, the peak memory (in
+    bytes) and the time (in seconds). The time is measured on a separate
+    run, without tracing the memory.
+    """
+    # pylint: disable=too-many-arguments
+    gc.collect()
+    start = time.process_time()
+    run(pipeline, snapshot, docs, topology, addrs_config, hosts_config)
+    elapsed = time.process_time() - start
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    nodes, edges = pipeline(*topology, addrs_config, hosts_config)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - base
+    snapshot(nodes, edges)
+    for _ in docs(nodes):
+        pass
+    for _ in docs(edges):
+        pass
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return retained, peak, elapsed
+
+
+def measure_enrichment(enrichment, topology, addrs_yaml, hosts_yaml):
+    """
+    Run the enrichment from the YAML files and return the peak memory (in
+    bytes) and the time (in seconds).
+    """
+    nodes, edges = topo_model.build_topology(*topology)
+    gc.collect()
+    start = time.process_time()
+    enrichment(nodes, edges, addrs_yaml, hosts_yaml)
+    elapsed = time.process_time() - start
+    nodes, edges = topo_model.build_topology(*topology)
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    enrichment(nodes, edges, addrs_yaml, hosts_yaml)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Topology memory benchmark')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE,
+                        help='Size of the grid (size x size routers)')
+    parser.add_argument('--hosts', type=int, default=DEFAULT_HOSTS,
+                        help='Number of hosts')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this script
+    """
+    args = parse_arguments()
+    logging.disable(logging.INFO)
+    topology, addrs_config, hosts_config = extract(args.size, args.hosts)
+    print('%d routers, %d links, %d hosts'
+          % (len(topology[0]), len(topology[1]), len(hosts_config)))
+    print('%-8s %14s %14s %10s' % ('', 'retained', 'peak', 'time'))
+    results = dict()
+    for name, pipeline, snapshot, docs in (
+            ('dicts', dicts_pipeline, dicts_snapshot, dicts_docs),
+            ('model', model_pipeline, model_snapshot,
+             topo_model.iter_docs)):
+        results[name] = measure(pipeline, snapshot, docs, topology,
+                                addrs_config, hosts_config)
+        retained, peak, elapsed = results[name]
+        print('%-8s %11.1f MB %11.1f MB %7.0f ms'
+              % (name, retained / 2 ** 20, peak / 2 ** 20, elapsed * 1000))
+    print('retained memory saved: %.1f%%'
+          % ((1 - results['model'][0] / results['dicts'][0]) * 100))
+    # Enrichment from the YAML files
+    with tempfile.TemporaryDirectory() as tmpdir:
+        addrs_yaml = os.path.join(tmpdir, 'addrs.yaml')
+        hosts_yaml = os.path.join(tmpdir, 'hosts.yaml')
+        with open(addrs_yaml, 'w') as outfile:
+            yaml.safe_dump(addrs_config, outfile)
+        with open(hosts_yaml, 'w') as outfile:
+            yaml.safe_dump(hosts_config, outfile)
+        print()
+        print('%-8s %14s %10s' % ('yaml', 'peak', 'time'))
+        for name, enrichment in (('load', load_enrichment),
+                                 ('stream', stream_enrichment)):
+            peak, elapsed = measure_enrichment(enrichment, topology,
+                                               addrs_yaml, hosts_yaml)
+            print('%-8s %11.1f MB %7.0f ms'
+                  % (name, peak / 2 ** 20, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    __main()
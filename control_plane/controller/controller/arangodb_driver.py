@@ -31,8 +31,8 @@ ArangoDB driver
 # pylint: disable=too-many-arguments
 
 
-# python-arango dependencies
-from arango import ArangoClient
+# Controller dependencies
+from controller import metrics, tracing
 
 
 class NodesConfigNotLoadedError(Exception):
@@ -41,6 +41,8 @@ class NodesConfigNotLoadedError(Exception):
     """
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def connect_arango(url):
     """
     Initialize the ArangoDB client.
@@ -50,9 +52,14 @@ def connect_arango(url):
     :return: ArangoDB client
     :rtype: arango.client.ArangoClient
     """
+    # python-arango takes a long time to load, so it is imported when the
+    # first client is created
+    from arango import ArangoClient
     return ArangoClient(hosts=url)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def connect_db(client, db_name, username, password):
     """
     Connect to a Arango database.
@@ -70,6 +77,8 @@ def connect_db(client, db_name, username, password):
     return client.db(db_name, username=username, password=password)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def connect_srv6_usid_db(client, username, password):
     """
     Connect to "srv6_usid" database.
@@ -88,6 +97,8 @@ def connect_srv6_usid_db(client, username, password):
                       username=username, password=password)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_db(client, arango_username, arango_password, db_name, force=False):
     """
     Initialize "srv6_usid" database.
@@ -135,6 +146,8 @@ def init_db(client, arango_username, arango_password, db_name, force=False):
     return is_success
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_usid_policies_collection(client, arango_username, arango_password,
                                   force=False):
     """
@@ -181,6 +194,8 @@ def init_usid_policies_collection(client, arango_username, arango_password,
     return usid_policies
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_srv6_paths_collection(client, arango_username, arango_password,
                                force=False):
     """
@@ -227,6 +242,8 @@ def init_srv6_paths_collection(client, arango_username, arango_password,
     return srv6_paths
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_srv6_behaviors_collection(client, arango_username, arango_password,
                                    force=False):
     """
@@ -273,6 +290,8 @@ def init_srv6_behaviors_collection(client, arango_username, arango_password,
     return srv6_behaviors
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_srv6_tunnels_collection(client, arango_username, arango_password,
                                  force=False):
     """
@@ -319,6 +338,8 @@ def init_srv6_tunnels_collection(client, arango_username, arango_password,
     return srv6_tunnels
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_srv6_policies_collection(client, arango_username, arango_password,
                                   force=False):
     """
@@ -365,6 +386,8 @@ def init_srv6_policies_collection(client, arango_username, arango_password,
     return srv6_policies
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def init_nodes_config_collection(client, arango_username, arango_password,
                                  force=False):
     """
@@ -411,6 +434,8 @@ def init_nodes_config_collection(client, arango_username, arango_password,
     return nodes_config
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def insert_usid_policy(database, lr_dst, rl_dst, lr_nodes, rl_nodes,
                        table=None, metric=None, l_grpc_ip=None,
                        l_grpc_port=None, l_fwd_engine=None,
@@ -492,6 +517,8 @@ def insert_usid_policy(database, lr_dst, rl_dst, lr_nodes, rl_nodes,
     return usid_policies.insert(document=policy, silent=True)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def find_usid_policy(database, key=None, lr_dst=None,
                      rl_dst=None, lr_nodes=None, rl_nodes=None,
                      table=None, metric=None):
@@ -544,6 +571,8 @@ def find_usid_policy(database, key=None, lr_dst=None,
     return usid_policies.find(filters=policy)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def update_usid_policy(database, key=None, lr_dst=None, rl_dst=None,
                        lr_nodes=None, rl_nodes=None, table=None, metric=None):
     """
@@ -576,6 +605,8 @@ def update_usid_policy(database, key=None, lr_dst=None, rl_dst=None,
     raise NotImplementedError
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def delete_usid_policy(database, key, lr_dst=None,
                        rl_dst=None, lr_nodes=None, rl_nodes=None,
                        table=None, metric=None, ignore_missing=False):
@@ -635,6 +666,8 @@ def delete_usid_policy(database, key, lr_dst=None,
                                 ignore_missing=ignore_missing)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def insert_nodes_config(database, nodes):
     """
     Load nodes configuration on a database.
@@ -661,6 +694,8 @@ def insert_nodes_config(database, nodes):
     return nodes_config.insert(document=nodes, silent=True)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def get_nodes_config(database):
     """
     Get the nodes configuration saved to a database.
@@ -688,6 +723,34 @@ def get_nodes_config(database):
     return nodes
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
+def insert_documents(database, collection, documents):
+    """
+    Insert multiple documents into a collection of a Arango database, in a
+    single request (e.g. the documents returned by
+    :meth:`controller.srv6_entities.SRv6Path.to_doc`).
+
+    :param database: Database where the documents must be saved.
+    :type database: arango.database.StandardDatabase
+    :param collection: The name of the collection (e.g. "srv6_paths").
+    :type collection: str
+    :param documents: The documents.
+    :type documents: list
+    :return: For each document, True if the document has been inserted or
+             False if the insertion failed.
+    :rtype: list
+    """
+    # Get the collection
+    _collection = database.collection(name=collection)
+    # Insert the documents; the documents that cannot be inserted are
+    # reported as exceptions in the results
+    results = _collection.insert_many(documents=documents)
+    return [not isinstance(result, Exception) for result in results]
+
+
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def insert_srv6_path(database, grpc_address, grpc_port, destination,
                      segments=None, device=None, encapmode=None,
                      table=None, metric=None, bsid_addr=None,
@@ -754,6 +817,8 @@ def insert_srv6_path(database, grpc_address, grpc_port, destination,
     return srv6_paths.insert(document=path, silent=True)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def find_srv6_path(database, key=None, grpc_address=None, grpc_port=None,
                    destination=None, segments=None, device=None,
                    encapmode=None, table=None, metric=None,
@@ -824,6 +889,8 @@ def find_srv6_path(database, key=None, grpc_address=None, grpc_port=None,
     return srv6_paths.find(filters=path)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def update_srv6_path(database, key=None, grpc_address=None, grpc_port=None,
                      destination=None, segments=None, device=None,
                      encapmode=None, table=None, metric=None,
@@ -867,6 +934,8 @@ def update_srv6_path(database, key=None, grpc_address=None, grpc_port=None,
     raise NotImplementedError
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def delete_srv6_path(database, key, grpc_address=None, grpc_port=None,
                      destination=None, segments=None, device=None,
                      encapmode=None, table=None, metric=None,
@@ -946,6 +1015,8 @@ def delete_srv6_path(database, key, grpc_address=None, grpc_port=None,
     return srv6_paths.delete(document=path, ignore_missing=ignore_missing)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def find_and_delete_srv6_path(database, key=None, grpc_address=None,
                               grpc_port=None, destination=None,
                               segments=None, device=None,
@@ -1031,6 +1102,8 @@ def find_and_delete_srv6_path(database, key=None, grpc_address=None,
         srv6_paths.delete(document=path, ignore_missing=ignore_missing)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def insert_srv6_behavior(database, grpc_address, grpc_port, segment,
                          action=None, device=None, table=None, nexthop=None,
                          lookup_table=None, interface=None, segments=None,
@@ -1100,6 +1173,8 @@ def insert_srv6_behavior(database, grpc_address, grpc_port, segment,
     return srv6_behaviors.insert(document=behavior, silent=True)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def find_srv6_behavior(database, key=None, grpc_address=None, grpc_port=None,
                        segment=None, action=None, device=None, table=None,
                        nexthop=None, lookup_table=None, interface=None,
@@ -1179,6 +1254,8 @@ def find_srv6_behavior(database, key=None, grpc_address=None, grpc_port=None,
     return srv6_behaviors.find(filters=behavior)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def update_srv6_behavior(database, key=None, grpc_address=None, grpc_port=None,
                          segment=None, action=None, device=None, table=None,
                          nexthop=None, lookup_table=None, interface=None,
@@ -1226,6 +1303,8 @@ def update_srv6_behavior(database, key=None, grpc_address=None, grpc_port=None,
     raise NotImplementedError
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def delete_srv6_behavior(database, key, grpc_address=None, grpc_port=None,
                          segment=None, action=None, device=None, table=None,
                          nexthop=None, lookup_table=None, interface=None,
@@ -1315,6 +1394,8 @@ def delete_srv6_behavior(database, key, grpc_address=None, grpc_port=None,
                                  ignore_missing=ignore_missing)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def insert_srv6_tunnel(database, l_grpc_address, l_grpc_port, r_grpc_address,
                        r_grpc_port, sidlist_lr=None, sidlist_rl=None,
                        dest_lr=None, dest_rl=None, localseg_lr=None,
@@ -1394,6 +1475,8 @@ def insert_srv6_tunnel(database, l_grpc_address, l_grpc_port, r_grpc_address,
     return srv6_tunnels.insert(document=tunnel, silent=True)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def find_srv6_tunnel(database, key=None, l_grpc_address=None,
                      l_grpc_port=None, r_grpc_address=None, r_grpc_port=None,
                      sidlist_lr=None, sidlist_rl=None,
@@ -1484,6 +1567,8 @@ def find_srv6_tunnel(database, key=None, l_grpc_address=None,
     return srv6_tunnels.find(filters=tunnel)
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def update_srv6_tunnel(database, key=None, l_grpc_address=None,
                        l_grpc_port=None, r_grpc_address=None, r_grpc_port=None,
                        sidlist_lr=None, sidlist_rl=None, dest_lr=None,
@@ -1541,6 +1626,8 @@ def update_srv6_tunnel(database, key=None, l_grpc_address=None,
     raise NotImplementedError
 
 
+@tracing.traced()
+@metrics.timed(metrics.ARANGO_QUERY_DURATION)
 def delete_srv6_tunnel(database, key, l_grpc_address=None, l_grpc_port=None,
                        r_grpc_address=None, r_grpc_port=None, sidlist_lr=None,
                        sidlist_rl=None, dest_lr=None, dest_rl=None,
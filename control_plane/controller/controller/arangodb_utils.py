@@ -31,15 +31,22 @@ ArangoDB utilities
 # General imports
 import ipaddress
 import logging
+import os
 import time
 
-from pyaml import yaml
-
 # Import topology extraction utility functions
-from controller.ti_extraction import (connect_and_extract_topology_isis,
-                                      dump_topo_yaml)
-# DB update modules
-from db_update import arango_db
+from controller import topo_model
+from controller.ti_extraction import (ISISTopologyWatcher,
+                                      connect_and_extract_topology_isis)
+
+# pyaml and the DB update modules (db_update) take a long time to load, so
+# they are imported by the functions that use them
+
+# Configuration parameters
+#
+# Max number of documents sent to ArangoDB in a single request when the
+# topology is loaded
+ARANGO_BATCH_SIZE = int(os.getenv('ARANGO_BATCH_SIZE', '10000'))
 
 # Global variables definition
 #
@@ -58,6 +65,7 @@ def save_yaml_dump(obj, filename):
     """
     Export an object to a YAML file
     """
+    from pyaml import yaml
     # Save file
     with open(filename, 'w') as outfile:
         yaml.dump(obj, outfile)
@@ -67,134 +75,199 @@ def load_yaml_dump(filename):
     """
     Load a YAML file and return a dict representation
     """
-    # Load YAML file
+    from pyaml import yaml
+    # Load YAML file (with the LibYAML loader, if available)
     with open(filename, 'r') as infile:
-        return yaml.safe_load(infile)
+        return yaml.load(infile,
+                         Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+def save_dump(docs, filename):
+    """
+    Export a sequence of documents to a JSON lines file (extension .jsonl
+    or .ndjson, one document per line) or to a YAML file containing a list
+    (see :func:`db_update.arango_db.save_documents`).
+    """
+    from db_update import arango_db
+    arango_db.save_documents(docs, filename)
 
 
-# TODO reuse fill_ip_addresses_from_list
-def fill_ip_addresses(nodes, addresses_yaml):
+def iter_dump(filename):
     """
-    Add addresses to a nodes dict
+    Iterate over the items of a JSON lines file (extension .jsonl or
+    .ndjson) or of a YAML file containing a list. The items are parsed one
+    at a time, so the memory used does not depend on the size of the file
+    (see :func:`db_update.arango_db.iter_documents`).
+
+    :param filename: The path of the file.
+    :type filename: str
+    :return: Iterator over the items (nothing if the file is empty).
+    :rtype: iterator
+    :raises ValueError: If the YAML file does not contain a list.
+    """
+    from db_update import arango_db
+    return arango_db.iter_documents(filename)
+
+
+def index_nodes(nodes):
+    """
+    Build an index of the nodes of a topology by name.
+
+    :param nodes: The nodes (see
+                  :class:`controller.topo_model.TopologyNode`).
+    :type nodes: list
+    :return: Dict mapping the names to the nodes.
+    :rtype: dict
+    """
+    return {node.key: node for node in nodes}
+
+
+def fill_ip_addresses(nodes, addresses_yaml, nodes_index=None):
+    """
+    Add addresses to the nodes of a topology (see
+    :func:`fill_ip_addresses_from_list`), reading them from a YAML file
+    or from a JSON lines file (see :func:`iter_dump`)
     """
     # Read IP addresses information from a YAML file and
     # add addresses to the nodes
-    logger.info('*** Filling nodes YAML file with IP addresses')
-    # Open hosts file
-    with open(addresses_yaml, 'r') as infile:
-        addresses = yaml.safe_load(infile.read())
-    # Parse addresses
-    node_to_addr = dict()
-    for addr in addresses:
-        node_to_addr[addr['node']] = addr['ip_address']
-    # Fill addresses
-    for node in nodes:
-        # Update the dict
-        node['ip_address'] = node_to_addr[node['_key']]
-    logger.info('*** Nodes YAML updated\n')
-    # Return the updated nodes list
-    return nodes
+    return fill_ip_addresses_from_list(
+        nodes=nodes,
+        addrs_config=iter_dump(addresses_yaml),
+        nodes_index=nodes_index
+    )
+
+
+def add_host(nodes, edges, host):
+    """
+    Add a host and the links to its gateway to a topology (see
+    :mod:`controller.topo_model`).
+
+    :param nodes: The nodes of the topology (updated in place).
+    :type nodes: list
+    :param edges: The edges of the topology (updated in place).
+    :type edges: list
+    :param host: The host, as a dict containing the fields "name",
+                 "ip_address" and "gw".
+    :type host: dict
+    :return: The node representing the host.
+    :rtype: class: `controller.topo_model.TopologyNode`
+    """
+    # Add host
+    node = topo_model.TopologyNode(
+        key=host['name'],
+        _type='host',
+        ip_address=host['ip_address']
+    )
+    nodes.append(node)
+    # Get the subnet
+    net = str(ipaddress.ip_network(host['ip_address'], strict=False))
+    # Add edge (host to router)
+    edges.append(topo_model.TopologyEdge(
+        key=topo_model.edge_key(net, 1),
+        source=host['name'],
+        target=host['gw'],
+        _type='edge'
+    ))
+    # Add edge (router to host)
+    # This is required because we work with
+    # unidirectional edges
+    edges.append(topo_model.TopologyEdge(
+        key=topo_model.edge_key(net, 2),
+        source=host['gw'],
+        target=host['name'],
+        _type='edge'
+    ))
+    return node
 
 
-def add_hosts(nodes, edges, hosts_yaml):    # TODO reuse add_hosts_from_list
+def add_hosts(nodes, edges, hosts_yaml, nodes_index=None):
     """
-    Add hosts to a topology
+    Add hosts to a topology (see :func:`add_hosts_from_list`), reading
+    them from a YAML file or from a JSON lines file (see :func:`iter_dump`)
     """
     # Read hosts information from a YAML file and
     # add hosts to the nodes and edges lists
-    logger.info('*** Adding hosts to the topology')
-    # Open hosts file
-    with open(hosts_yaml, 'r') as infile:
-        hosts = yaml.safe_load(infile.read())
-    # Add hosts and links
-    for host in hosts:
-        # Add host
-        nodes.append({
-            '_key': host['name'],
-            'type': 'host',
-            'ip_address': host['ip_address']
-        })
-        # Get the subnet
-        net = str(ipaddress.ip_network(host['ip_address'], strict=False))
-        # Add edge (host to router)
-        # Character '/' is not accepted in key strign in arango, using
-        # '-' instead
-        edges.append({
-            '_key': '%s-dir1' % net.replace('/', '-'),
-            '_from': 'nodes/%s' % host['name'],
-            '_to': 'nodes/%s' % host['gw'],
-            'type': 'edge'
-        })
-        # Add edge (router to host)
-        # This is required because we work with
-        # unidirectional edges
-        edges.append({
-            '_key': '%s-dir2' % net.replace('/', '-'),
-            '_to': 'nodes/%s' % host['gw'],
-            '_from': 'nodes/%s' % host['name'],
-            'type': 'edge'
-        })
-    logger.info('*** Nodes YAML updated\n')
-    logger.info('*** Edges YAML updated\n')
-    # Return the updated nodes and edges lists
-    return nodes, edges
+    return add_hosts_from_list(
+        nodes=nodes,
+        edges=edges,
+        hosts_config=iter_dump(hosts_yaml),
+        nodes_index=nodes_index
+    )
 
 
-def fill_ip_addresses_from_list(nodes, addrs_config):
+def fill_ip_addresses_from_list(nodes, addrs_config, nodes_index=None):
     """
-    Add addresses to a nodes dict
+    Add addresses to the nodes of a topology (see
+    :class:`controller.topo_model.TopologyNode`). The nodes are looked up
+    by name in an index, so the time is linear in the number of nodes and
+    addresses.
+
+    :param nodes: The nodes (updated in place).
+    :type nodes: list
+    :param addrs_config: The addresses, as dicts containing the fields
+                         "node" and "ip_address" (any iterable, e.g. the
+                         iterator returned by :func:`iter_dump`).
+    :type addrs_config: iterable
+    :param nodes_index: Index of the nodes by name (see
+                        :func:`index_nodes`), built from the nodes if it is
+                        not provided.
+    :type nodes_index: dict, optional
+    :return: The nodes.
+    :rtype: list
     """
-    # Read IP addresses information from a YAML file and
-    # add addresses to the nodes
     logger.info('*** Filling nodes YAML file with IP addresses')
-    # Parse addresses
-    node_to_addr = dict()
-    for addr in addrs_config:
-        node_to_addr[addr['node']] = addr['ip_address']
+    if nodes_index is None:
+        nodes_index = index_nodes(nodes)
     # Fill addresses
-    for node in nodes:
-        # Update the dict
-        node['ip_address'] = node_to_addr[node['_key']]
+    for addr in addrs_config:
+        node = nodes_index.get(addr['node'])
+        if node is None:
+            logger.warning('Address %s: node %s not found in the topology',
+                           addr['ip_address'], addr['node'])
+            continue
+        # Update the node
+        node.ip_address = addr['ip_address']
     logger.info('*** Nodes YAML updated\n')
     # Return the updated nodes list
     return nodes
 
 
-def add_hosts_from_list(nodes, edges, hosts_config):
+def add_hosts_from_list(nodes, edges, hosts_config, nodes_index=None):
     """
-    Add hosts to a topology
+    Add hosts to a topology (see :mod:`controller.topo_model`). The
+    gateways are looked up by name in an index, so the time is linear in
+    the number of nodes and hosts. Hosts whose gateway is not in the
+    topology (or whose name is already used) are skipped.
+
+    :param nodes: The nodes (updated in place).
+    :type nodes: list
+    :param edges: The edges (updated in place).
+    :type edges: list
+    :param hosts_config: The hosts, as dicts containing the fields "name",
+                         "ip_address" and "gw" (any iterable, e.g. the
+                         iterator returned by :func:`iter_dump`).
+    :type hosts_config: iterable
+    :param nodes_index: Index of the nodes by name (see
+                        :func:`index_nodes`), built from the nodes if it is
+                        not provided; the hosts are added to the index.
+    :type nodes_index: dict, optional
+    :return: Tuple containing the nodes and the edges.
+    :rtype: tuple
     """
-    # Read hosts information from a YAML file and
-    # add hosts to the nodes and edges lists
     logger.info('*** Adding hosts to the topology')
+    if nodes_index is None:
+        nodes_index = index_nodes(nodes)
     # Add hosts and links
     for host in hosts_config:
-        # Add host
-        nodes.append({
-            '_key': host['name'],
-            'type': 'host',
-            'ip_address': host['ip_address']
-        })
-        # Get the subnet
-        net = str(ipaddress.ip_network(host['ip_address'], strict=False))
-        # Add edge (host to router)
-        # Character '/' is not accepted in key strign in arango, using
-        # '-' instead
-        edges.append({
-            '_key': '%s-dir1' % net.replace('/', '-'),
-            '_from': 'nodes/%s' % host['name'],
-            '_to': 'nodes/%s' % host['gw'],
-            'type': 'edge'
-        })
-        # Add edge (router to host)
-        # This is required because we work with
-        # unidirectional edges
-        edges.append({
-            '_key': '%s-dir2' % net.replace('/', '-'),
-            '_to': 'nodes/%s' % host['gw'],
-            '_from': 'nodes/%s' % host['name'],
-            'type': 'edge'
-        })
+        if host['name'] in nodes_index:
+            logger.warning('Host %s: name already used, skipping',
+                           host['name'])
+            continue
+        if host['gw'] not in nodes_index:
+            logger.warning('Host %s: gateway %s not found in the topology, '
+                           'skipping', host['name'], host['gw'])
+            continue
+        nodes_index[host['name']] = add_host(nodes, edges, host)
     logger.info('*** Nodes YAML updated\n')
     logger.info('*** Edges YAML updated\n')
     # Return the updated nodes and edges lists
@@ -208,6 +281,7 @@ def initialize_db(arango_url, arango_user, arango_password, verbose=False):
     #
     # pylint: disable=unused-argument
     #
+    from db_update import arango_db
     # Wrapper function
     return arango_db.initialize_db(
         arango_url=arango_url,
@@ -238,45 +312,53 @@ def extract_topo_from_isis(isis_nodes, isisd_pwd,
     if nodes is None or edges is None or node_to_systemid is None:
         logger.error('Cannot extract topology')
         return
-    # Export the topology in YAML format
-    nodes, edges = dump_topo_yaml(
+    # Build the topology
+    nodes, edges = topo_model.build_topology(
         nodes=nodes,
         edges=edges,
         node_to_systemid=node_to_systemid
     )
+    # Index of the nodes by name, shared by the enrichment steps
+    nodes_index = index_nodes(nodes)
     # Add IP addresses information
     if addrs_yaml is not None:
-        fill_ip_addresses(nodes, addrs_yaml)
+        fill_ip_addresses(nodes, addrs_yaml, nodes_index)
     # Add hosts information
     if hosts_yaml is not None:
         # add_hosts(nodes, edges, hosts_yaml)
-        add_hosts(nodes, edges, hosts_yaml)
+        add_hosts(nodes, edges, hosts_yaml, nodes_index)
     # Save nodes YAML file
     if nodes_yaml is not None:
-        save_yaml_dump(nodes, nodes_yaml)
+        save_dump(topo_model.iter_docs(nodes), nodes_yaml)
     # Save edges YAML file
     if edges_yaml is not None:
-        save_yaml_dump(edges, edges_yaml)
+        save_dump(topo_model.iter_docs(edges), edges_yaml)
 
 
 def load_topo_on_arango(arango_url, user, password,
                         nodes, edges,
                         nodes_collection, edges_collection,
-                        verbose=False):
+                        verbose=False, batch_size=ARANGO_BATCH_SIZE):
     """
-    Load a network topology on a database
+    Load a network topology on a database. The nodes and the edges are
+    lists of :class:`controller.topo_model.TopologyNode` and
+    :class:`controller.topo_model.TopologyEdge` (or lists of documents);
+    the documents are built one at a time, while they are loaded, and
+    inserted (or updated) with a bulk import every batch_size documents.
     """
     #
     # Current Arango arguments are not used,
     # so we can skip the check
     # pylint: disable=unused-argument, too-many-arguments
     #
+    from db_update import arango_db
     # Load the topology on Arango DB
-    arango_db.populate2(
+    arango_db.populate_bulk(
         nodes=nodes_collection,
         edges=edges_collection,
-        nodes_dict=nodes,
-        edges_dict=edges
+        nodes_dict=topo_model.iter_docs(nodes),
+        edges_dict=topo_model.iter_docs(edges),
+        batch_size=batch_size
     )
 
 
@@ -302,6 +384,7 @@ def extract_topo_from_isis_and_load_on_arango(isis_nodes, isisd_pwd,
     # Initialize database
     if arango_url is not None and arango_user is not None and \
             arango_password is not None:
+        from db_update import arango_db
         nodes_collection, edges_collection = arango_db.initialize_db(
             arango_url=arango_url,
             arango_user=arango_user,
@@ -318,30 +401,30 @@ def extract_topo_from_isis_and_load_on_arango(isis_nodes, isisd_pwd,
             logger.error('Cannot extract topology')
         else:
             logger.info('Topology extracted')
-            # Export the topology in YAML format
-            # This function returns a representation of nodes and
-            # edges ready to get uploaded on ArangoDB.
-            # Optionally, the nodes and the edges are exported in
-            # YAML format, if 'nodes_yaml' and 'edges_yaml' variables
-            # are not None
-            nodes, edges = dump_topo_yaml(
+            # Build the topology
+            # This function returns the nodes and the edges (see
+            # controller.topo_model), which are enriched, uploaded on
+            # ArangoDB and exported without copying them
+            nodes, edges = topo_model.build_topology(
                 nodes=nodes,
                 edges=edges,
                 node_to_systemid=node_to_systemid
             )
+            # Index of the nodes by name, shared by the enrichment steps
+            nodes_index = index_nodes(nodes)
             # Add IP addresses information
             if addrs_yaml is not None:
-                fill_ip_addresses(nodes, addrs_yaml)
+                fill_ip_addresses(nodes, addrs_yaml, nodes_index)
             # Add hosts information
             if hosts_yaml is not None:
                 # add_hosts(nodes, edges, hosts_yaml)
-                add_hosts(nodes, edges, hosts_yaml)
+                add_hosts(nodes, edges, hosts_yaml, nodes_index)
             # Save nodes YAML file
             if nodes_yaml is not None:
-                save_yaml_dump(nodes, nodes_yaml)
+                save_dump(topo_model.iter_docs(nodes), nodes_yaml)
             # Save edges YAML file
             if edges_yaml is not None:
-                save_yaml_dump(edges, edges_yaml)
+                save_dump(topo_model.iter_docs(edges), edges_yaml)
             # Load the topology on Arango DB
             if arango_url is not None and \
                     arango_user is not None and arango_password is not None:
@@ -367,10 +450,17 @@ def extract_topo_from_isis_and_load_on_arango_stream(isis_nodes, isisd_pwd,
                                                      edges_collection=None,
                                                      addrs_config=None,
                                                      hosts_config=None,
-                                                     period=0, verbose=False):
+                                                     period=0, verbose=False,
+                                                     change_detection=False):
     """
     Extract the network topology from a set of nodes running ISIS protocol
-    and upload it on a database
+    and upload it on a database.
+
+    If change_detection is True, every 'period' seconds only the LSP
+    summary is retrieved from the nodes; the topology is extracted and
+    uploaded on the database only when the link-state database changes
+    (see :class:`controller.ti_extraction.ISISTopologyWatcher`), while the
+    last topology is yielded again for the periods without changes.
     """
     #
     # pylint: disable=too-many-arguments, too-many-locals
@@ -378,35 +468,47 @@ def extract_topo_from_isis_and_load_on_arango_stream(isis_nodes, isisd_pwd,
     # Param isis_nodes: list of ip-port
     # (e.g. [2000::1-2608,2000::2-2608])
     #
+    # Watcher used to detect the changes of the topology
+    watcher = None
+    if change_detection:
+        watcher = ISISTopologyWatcher(isis_nodes, isisd_pwd, verbose=verbose)
+    # Last topology loaded on the database
+    last_topology = None, None
+    #
     # Topology Information Extraction
     while True:
         # Connect to a node and extract the topology
-        nodes, edges, node_to_systemid = connect_and_extract_topology_isis(
-            ips_ports=isis_nodes,
-            isisd_pwd=isisd_pwd,
-            verbose=verbose
-        )
+        if watcher is not None:
+            changed, nodes, edges, node_to_systemid = watcher.poll()
+        else:
+            changed = True
+            nodes, edges, node_to_systemid = \
+                connect_and_extract_topology_isis(
+                    ips_ports=isis_nodes,
+                    isisd_pwd=isisd_pwd,
+                    verbose=verbose
+                )
         if nodes is None or edges is None or node_to_systemid is None:
             logger.error('Cannot extract topology')
-        else:
+        elif changed:
             logger.info('Topology extracted')
-            # Export the topology in YAML format
-            # This function returns a representation of nodes and
-            # edges ready to get uploaded on ArangoDB.
-            # Optionally, the nodes and the edges are exported in
-            # YAML format, if 'nodes_yaml' and 'edges_yaml' variables
-            # are not None
-            nodes, edges = dump_topo_yaml(
+            # Build the topology
+            # This function returns the nodes and the edges (see
+            # controller.topo_model), which are enriched, uploaded on
+            # ArangoDB and exported without copying them
+            nodes, edges = topo_model.build_topology(
                 nodes=nodes,
                 edges=edges,
                 node_to_systemid=node_to_systemid
             )
+            # Index of the nodes by name, shared by the enrichment steps
+            nodes_index = index_nodes(nodes)
             # Add IP addresses information
             if addrs_config is not None:
-                fill_ip_addresses_from_list(nodes, addrs_config)
+                fill_ip_addresses_from_list(nodes, addrs_config, nodes_index)
             # Add hosts information
             if hosts_config is not None:
-                add_hosts_from_list(nodes, edges, hosts_config)
+                add_hosts_from_list(nodes, edges, hosts_config, nodes_index)
             # Load the topology on Arango DB
             if nodes_collection is not None and edges_collection is not None:
                 load_topo_on_arango(
@@ -419,6 +521,10 @@ def extract_topo_from_isis_and_load_on_arango_stream(isis_nodes, isisd_pwd,
                     edges_collection=edges_collection,
                     verbose=verbose
                 )
+            last_topology = nodes, edges
+        else:
+            # The topology has not changed
+            nodes, edges = last_topology
         if nodes is None or edges is None:
             # TODO use a more specific error
             raise TopologyExtractionException('Cannot extract topology')
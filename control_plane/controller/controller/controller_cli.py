@@ -31,20 +31,16 @@ Entry point for controller.
 # General imports
 import logging
 import os
-import requests
 import sys
 from argparse import ArgumentParser
 from pathlib import Path
 
 # python-dotenv dependencies
 from dotenv import load_dotenv
-from pkg_resources import resource_filename
 
-# Controller dependencies
-from controller import arangodb_driver
-from controller.init_db import init_db
-from controller.init_db import init_db_collections
-from controller.nb_grpc_server import grpc_server
+# The dependencies of the controller (gRPC server, ArangoDB driver, ...)
+# are imported by __main() and connect_db(), in order to keep the import
+# of this module (e.g. to print the help) fast
 
 
 # Logger reference
@@ -54,7 +50,8 @@ logger = logging.getLogger(__name__)
 logging.getLogger('urllib3').setLevel(logging.WARNING)
 
 # Default path to the .env file
-DEFAULT_ENV_FILE_PATH = resource_filename(__name__, '../config/controller.env')
+DEFAULT_ENV_FILE_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), '../config/controller.env')
 # Default value for debug mode
 DEFAULT_DEBUG = False
 
@@ -66,6 +63,7 @@ def connect_db():
     :return: ArangoDB client
     :rtype: arango.client.ArangoClient
     """
+    from controller import arangodb_driver
     # Get the ArangoDB URL
     arango_url = os.getenv('ARANGO_URL')
     # Initialize and return the ArangoDB client
@@ -214,6 +212,10 @@ def __main():
         sys.exit(-2)
     # Import dependencies
     config.import_dependencies()
+    import requests
+    from controller.init_db import init_db
+    from controller.init_db import init_db_collections
+    from controller.nb_grpc_server import grpc_server
     # Print configuration
     config.print_config()
     # Setup persistency
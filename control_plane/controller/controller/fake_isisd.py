@@ -0,0 +1,452 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Fake isisd VTY
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Stand-in for the isisd daemon of FRRouting.
+
+This module generates synthetic IS-IS link-state databases for ring, grid
+and fat-tree topologies of configurable size and serves them on a telnet
+VTY, answering the commands used by :mod:`controller.ti_extraction`:
+
+- show isis hostname
+- show isis database
+- show isis database detail [<LSP ID>]
+
+The output mimics the format of FRRouting, so the topology extraction can
+be tested and benchmarked without real routers. Links can be brought up
+and down at runtime to exercise the change detection.
+
+Usage::
+
+    python -m controller.fake_isisd --topology grid --size 10 --port 2608
+"""
+
+# General imports
+import logging
+import socketserver
+import sys
+import threading
+import zlib
+from argparse import ArgumentParser
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+# Default address and port of the VTY
+DEFAULT_ADDRESS = '127.0.0.1'
+DEFAULT_PORT = 2608
+# Default password of the VTY
+DEFAULT_PASSWORD = 'zebra'
+# Metric of the links
+DEFAULT_METRIC = 10
+# Supported topologies
+TOPOLOGIES = ('ring', 'grid', 'fat-tree')
+
+
+def ring_topology(size):
+    """
+    Generate a ring of "size" routers.
+
+    :return: Tuple containing the list of the routers and the list of the
+             links (as tuples of routers).
+    :rtype: tuple
+    """
+    nodes = ['r%d' % index for index in range(1, size + 1)]
+    links = [(nodes[index], nodes[(index + 1) % size])
+             for index in range(size if size > 2 else size - 1)]
+    return nodes, links
+
+
+def grid_topology(size):
+    """
+    Generate a grid of "size" x "size" routers.
+
+    :return: Tuple containing the list of the routers and the list of the
+             links (as tuples of routers).
+    :rtype: tuple
+    """
+    nodes = ['r%d' % index for index in range(1, size * size + 1)]
+    links = list()
+    for row in range(size):
+        for col in range(size):
+            node = nodes[row * size + col]
+            if col + 1 < size:
+                links.append((node, nodes[row * size + col + 1]))
+            if row + 1 < size:
+                links.append((node, nodes[(row + 1) * size + col]))
+    return nodes, links
+
+
+def fat_tree_topology(size):
+    """
+    Generate a fat-tree with "size" pods (k-ary fat-tree). Each pod has
+    k/2 aggregation and k/2 edge routers, connected by a full mesh; the
+    (k/2)^2 core routers are connected to one aggregation router of each
+    pod.
+
+    :return: Tuple containing the list of the routers and the list of the
+             links (as tuples of routers).
+    :rtype: tuple
+    """
+    if size < 2 or size % 2:
+        raise ValueError('The size of a fat-tree must be an even number')
+    half = size // 2
+    cores = ['core%d' % index for index in range(1, half * half + 1)]
+    aggs = ['agg%d' % index for index in range(1, size * half + 1)]
+    edges = ['edge%d' % index for index in range(1, size * half + 1)]
+    links = list()
+    for pod in range(size):
+        for agg_index in range(half):
+            agg = aggs[pod * half + agg_index]
+            for core_index in range(half):
+                links.append((cores[agg_index * half + core_index], agg))
+            for edge_index in range(half):
+                links.append((agg, edges[pod * half + edge_index]))
+    return cores + aggs + edges, links
+
+
+# Topology generators, indexed by name
+TOPOLOGY_GENERATORS = {
+    'ring': ring_topology,
+    'grid': grid_topology,
+    'fat-tree': fat_tree_topology
+}
+
+
+def generate_topology(topology, size):
+    """
+    Generate a topology.
+
+    :param topology: The kind of topology ('ring', 'grid' or 'fat-tree').
+    :type topology: str
+    :param size: The size of the topology (number of routers for a ring,
+                 side for a grid, number of pods for a fat-tree).
+    :type size: int
+    :return: Tuple containing the list of the routers and the list of the
+             links.
+    :rtype: tuple
+    :raises ValueError: Unknown topology or invalid size.
+    """
+    generator = TOPOLOGY_GENERATORS.get(topology)
+    if generator is None:
+        raise ValueError('Unknown topology: %s' % topology)
+    return generator(size)
+
+
+class FakeISISDatabase:
+    """
+    Synthetic IS-IS level-2 link-state database. Each router originates
+    one LSP advertising its hostname, its neighbors (Extended
+    Reachability) and one IPv6 prefix for each link.
+
+    :param nodes: The routers.
+    :type nodes: list
+    :param links: The links, as tuples of routers.
+    :type links: list
+    :param local_node: The router running the fake isisd (its LSP is marked
+                       with '*'). Default: the first router.
+    :type local_node: str, optional
+    """
+
+    def __init__(self, nodes, links, local_node=None):
+        self.nodes = list(nodes)
+        self.local_node = local_node if local_node is not None \
+            else self.nodes[0]
+        # System ID of the routers
+        self.system_ids = {
+            node: '0000.%04d.%04d' % divmod(index + 1, 10000)
+            for index, node in enumerate(self.nodes)}
+        # IPv6 prefix of the links, indexed by link
+        self.links = {
+            tuple(link): 'fcf0:0:%x::/64' % (index + 1)
+            for index, link in enumerate(links)}
+        # Links that are down
+        self.down_links = set()
+        # Neighbors of each router
+        self._neighbors = {node: list() for node in self.nodes}
+        for node1, node2 in self.links:
+            self._neighbors[node1].append((node2, (node1, node2)))
+            self._neighbors[node2].append((node1, (node1, node2)))
+        # Sequence number of the LSPs
+        self.seq_nums = {node: 1 for node in self.nodes}
+        # Rendered LSPs
+        self._cache = dict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_topology(cls, topology, size):
+        """
+        Create a database for a generated topology (see
+        :func:`generate_topology`).
+        """
+        return cls(*generate_topology(topology, size))
+
+    @staticmethod
+    def lsp_id(node):
+        """
+        Return the LSP ID of the LSP originated by a router.
+        """
+        return '%s.00-00' % node
+
+    def _render(self, node):
+        """
+        Return the summary line and the details of the LSP originated by a
+        router.
+        """
+        details = ['    Protocols Supported: IPv6',
+                   '    Area Address: 49.0001',
+                   '    Hostname: %s' % node]
+        for neigh, link in self._neighbors[node]:
+            if link in self.down_links:
+                continue
+            details.append('    Extended Reachability: %s.00 (Metric: %d)'
+                           % (self.system_ids[neigh], DEFAULT_METRIC))
+        for neigh, link in self._neighbors[node]:
+            if link in self.down_links:
+                continue
+            details.append('    IPv6 Reachability: %s (Metric: %d)'
+                           % (self.links[link], DEFAULT_METRIC))
+        details = '\n'.join(details)
+        entry = '%-21s %s %6d  0x%08x  0x%04x %8d    0/0/0' % (
+            self.lsp_id(node), '*' if node == self.local_node else ' ',
+            27 + len(details) // 2, self.seq_nums[node],
+            zlib.crc32(details.encode('ascii')) & 0xffff, 1200)
+        return entry, details
+
+    def _get_lsp(self, node):
+        lsp = self._cache.get(node)
+        if lsp is None:
+            lsp = self._render(node)
+            self._cache[node] = lsp
+        return lsp
+
+    def set_link_state(self, node1, node2, up):
+        """
+        Bring a link up or down. The routers connected by the link
+        originate a new version of their LSPs.
+
+        :raises KeyError: Unknown link.
+        """
+        link = (node1, node2) if (node1, node2) in self.links \
+            else (node2, node1)
+        if link not in self.links:
+            raise KeyError('Unknown link %s-%s' % (node1, node2))
+        with self._lock:
+            if up:
+                self.down_links.discard(link)
+            else:
+                self.down_links.add(link)
+            for node in link:
+                self.seq_nums[node] += 1
+                self._cache.pop(node, None)
+
+    def show_hostname(self):
+        """
+        Output of the "show isis hostname" command.
+        """
+        lines = ['Level  System ID      Dynamic Hostname']
+        for node in self.nodes:
+            lines.append('2      %s %s' % (self.system_ids[node], node))
+        return '\n'.join(lines)
+
+    def show_database(self, detail=False, lsp_id=None):
+        """
+        Output of the "show isis database [detail] [<LSP ID>]" command.
+        """
+        nodes = self.nodes
+        if lsp_id is not None:
+            nodes = [node for node in self.nodes
+                     if self.lsp_id(node) == lsp_id]
+        lines = ['Area 1:',
+                 'IS-IS Level-2 link-state database:',
+                 'LSP ID                  PduLen  SeqNumber   Chksum  '
+                 'Holdtime  ATT/P/OL']
+        with self._lock:
+            for node in nodes:
+                entry, details = self._get_lsp(node)
+                lines.append(entry)
+                if detail:
+                    lines.append(details)
+                    lines.append('')
+        lines.append('    %d LSPs' % len(nodes))
+        lines.append('')
+        return '\n'.join(lines)
+
+    def execute(self, command):
+        """
+        Execute a VTY command and return its output.
+        """
+        args = command.split()
+        if args[:3] == ['show', 'isis', 'hostname']:
+            return self.show_hostname()
+        if args[:3] == ['show', 'isis', 'database']:
+            detail = len(args) > 3 and args[3] == 'detail'
+            lsp_id = args[4] if detail and len(args) > 4 else None
+            return self.show_database(detail=detail, lsp_id=lsp_id)
+        if args[:2] == ['terminal', 'length']:
+            return ''
+        return '% Unknown command: ' + command
+
+
+class _VTYHandler(socketserver.StreamRequestHandler):
+    """
+    Handler of a VTY session.
+    """
+
+    def _send(self, text):
+        self.wfile.write(text.replace('\n', '\r\n').encode('ascii'))
+
+    def _readline(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        return line.decode('ascii', errors='ignore').strip()
+
+    def handle(self):
+        server = self.server
+        prompt = '%s> ' % server.database.local_node
+        self._send('\nHello, this is FRRouting (fake isisd).\n\n')
+        if server.password:
+            self._send('User Access Verification\n\nPassword: ')
+            if self._readline() != server.password:
+                self._send('% Bad passwords, too many failures!\n')
+                return
+        self._send('\n' + prompt)
+        while True:
+            command = self._readline()
+            if command is None or command in ('q', 'quit', 'exit'):
+                return
+            if command:
+                self._send(server.database.execute(command) + '\n')
+            self._send(prompt)
+
+
+class FakeISISDServer(socketserver.ThreadingTCPServer):
+    """
+    Telnet VTY serving a :class:`FakeISISDatabase`.
+
+    :param database: The database.
+    :type database: FakeISISDatabase
+    :param address: The address of the VTY.
+    :type address: str, optional
+    :param port: The port of the VTY (0 to choose a free port).
+    :type port: int, optional
+    :param password: The password of the VTY (None to disable the
+                     authentication).
+    :type password: str, optional
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, database, address=DEFAULT_ADDRESS, port=DEFAULT_PORT,
+                 password=DEFAULT_PASSWORD):
+        super().__init__((address, port), _VTYHandler)
+        self.database = database
+        self.password = password
+        self._thread = None
+
+    @property
+    def ip_port(self):
+        """
+        The address of the VTY, in the "ip-port" format accepted by
+        :func:`controller.ti_extraction.connect_and_extract_topology_isis`.
+        """
+        return '%s-%s' % self.server_address[:2]
+
+    def start(self):
+        """
+        Serve the VTY in a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        name='fake-isisd', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the VTY.
+        """
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Fake isisd VTY serving a synthetic '
+                            'IS-IS link-state database')
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='ring',
+                        help='Kind of topology')
+    parser.add_argument('--size', type=int, default=10,
+                        help='Size of the topology (number of routers for '
+                        'a ring, side for a grid, pods for a fat-tree)')
+    parser.add_argument('--address', default=DEFAULT_ADDRESS,
+                        help='Address of the VTY')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='Port of the VTY')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD,
+                        help='Password of the VTY')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this module
+    """
+    args = parse_arguments()
+    try:
+        database = FakeISISDatabase.from_topology(args.topology, args.size)
+    except ValueError as err:
+        logger.critical(err)
+        sys.exit(-2)
+    server = FakeISISDServer(database, address=args.address, port=args.port,
+                             password=args.password)
+    logger.info('Serving %s topology (%d routers, %d links) on %s',
+                args.topology, len(database.nodes), len(database.links),
+                server.ip_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    __main()
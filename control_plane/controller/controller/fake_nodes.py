@@ -0,0 +1,705 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Fake node managers
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Fleet of fake node managers for load testing.
+
+A fake node exposes the same gRPC services as the node manager
+(SRv6Manager and SRv6PM), but keeps its state (SRv6 paths, behaviors,
+policies and SRv6-PM experiments) in memory instead of configuring the
+Linux kernel or VPP. The replies follow the node manager semantics (e.g.
+STATUS_FILE_EXISTS when a path is created twice).
+
+Latency and errors can be injected to emulate slow or faulty nodes. A
+fleet of fake nodes can be hosted in the calling process, each node
+listening on a different port or address, or in multiple processes:
+
+    python -m controller.fake_nodes --nodes 200 --processes 4 \\
+        --base-port 50000 --nodes-config /tmp/nodes.yml
+"""
+
+# General imports
+import logging
+import multiprocessing
+import random
+import signal
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from concurrent import futures
+from ipaddress import IPv6Address
+
+# gRPC dependencies
+import grpc
+
+# Proto dependencies
+import commons_pb2
+import srv6_manager_pb2
+import srv6_manager_pb2_grpc
+import srv6pmCommons_pb2
+import srv6pmReflector_pb2
+import srv6pmSender_pb2
+import srv6pmService_pb2_grpc
+
+# Controller dependencies
+from controller import srv6_reconciler
+
+# Optional imports:
+#     pyaml         - only required to export the nodes configuration
+try:
+    from pyaml import yaml
+except ImportError:
+    yaml = None
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+# Default address of the fake nodes
+DEFAULT_ADDRESS = '127.0.0.1'
+# Default number of workers of the thread pool shared by the nodes hosted
+# in a process
+DEFAULT_MAX_WORKERS = 64
+# Locator and uDT SID of the fake nodes (used to build the uSIDs)
+DEFAULT_LOCATOR = 'fcbb:bb00::'
+DEFAULT_UDT = 'fcbb:bb00:f00d::'
+# Forwarding engines (see srv6_manager.proto)
+FWD_ENGINE_LINUX = srv6_manager_pb2.FwdEngine.Value('LINUX')
+
+
+class FaultInjector:
+    """
+    Latency and error injection for the fake nodes.
+
+    :param latency: Mean latency added to each RPC (in seconds).
+    :type latency: float, optional
+    :param jitter: Max random variation of the latency (in seconds).
+    :type jitter: float, optional
+    :param error_rate: Probability that an RPC returns
+                       STATUS_INTERNAL_ERROR.
+    :type error_rate: float, optional
+    :param unavailable_rate: Probability that an RPC fails with the gRPC
+                             status UNAVAILABLE.
+    :type unavailable_rate: float, optional
+    :param seed: Seed of the random number generator.
+    :type seed: int, optional
+    """
+
+    def __init__(self, latency=0, jitter=0, error_rate=0,
+                 unavailable_rate=0, seed=None):
+        # pylint: disable=too-many-arguments
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.unavailable_rate = unavailable_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def inject(self, context):
+        """
+        Apply the injected latency and errors to an RPC.
+
+        :return: True if the RPC must return STATUS_INTERNAL_ERROR.
+        :rtype: bool
+        """
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter,
+                                                        self.jitter)
+            unavailable = self._random.random() < self.unavailable_rate
+            error = self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if unavailable:
+            context.abort(grpc.StatusCode.UNAVAILABLE,
+                          'Injected fault: node unavailable')
+        return error
+
+
+class FakeNodeState:
+    """
+    In-memory state of a fake node.
+    """
+
+    def __init__(self):
+        # SRv6 paths, indexed by (destination, table)
+        self.paths = dict()
+        # SRv6 behaviors, indexed by (segment, table)
+        self.behaviors = dict()
+        # SRv6 policies (VPP only), indexed by BSID address
+        self.policies = dict()
+        # Running experiments, indexed by SID list
+        self.senders = dict()
+        self.reflectors = dict()
+        # SRv6-PM configuration
+        self.pm_configured = False
+        # Number of RPCs served
+        self.rpcs = 0
+        self.lock = threading.Lock()
+
+
+def _apply(entities, operation, key, entity):
+    """
+    Apply an operation to a dict of entities, following the node manager
+    semantics.
+
+    :return: Tuple containing the status code and the list of the
+             entities returned by a "get" operation.
+    :rtype: tuple
+    """
+    if operation == 'add':
+        if key in entities:
+            return commons_pb2.STATUS_FILE_EXISTS, []
+        entities[key] = entity
+        return commons_pb2.STATUS_SUCCESS, []
+    if operation == 'get':
+        if isinstance(key, tuple) and key[0] == '':
+            # An empty destination (or segment) matches all the entities of
+            # the table (any table if the table is -1)
+            return commons_pb2.STATUS_SUCCESS, [
+                value for (_, table), value in entities.items()
+                if key[1] == -1 or table == key[1]]
+        if key not in entities:
+            return commons_pb2.STATUS_NO_SUCH_PROCESS, []
+        return commons_pb2.STATUS_SUCCESS, [entities[key]]
+    if operation == 'change':
+        if key not in entities:
+            return commons_pb2.STATUS_NO_SUCH_PROCESS, []
+        entities[key] = entity
+        return commons_pb2.STATUS_SUCCESS, []
+    if operation == 'del':
+        if entities.pop(key, None) is None:
+            return commons_pb2.STATUS_NO_SUCH_PROCESS, []
+        return commons_pb2.STATUS_SUCCESS, []
+    return commons_pb2.STATUS_OPERATION_NOT_SUPPORTED, []
+
+
+class FakeSRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
+    """
+    Fake SRv6Manager service.
+
+    :param state: The state of the node.
+    :type state: FakeNodeState
+    :param faults: Latency and errors to inject.
+    :type faults: FaultInjector, optional
+    """
+
+    def __init__(self, state, faults=None):
+        self.state = state
+        self.faults = faults if faults is not None else FaultInjector()
+
+    def execute(self, operation, request, context):
+        """
+        Apply the entities carried in a request to the state of the node.
+        """
+        reply = srv6_manager_pb2.SRv6ManagerReply(
+            status=commons_pb2.STATUS_SUCCESS)
+        if self.faults.inject(context):
+            reply.status = commons_pb2.STATUS_INTERNAL_ERROR
+            return reply
+        state = self.state
+        with state.lock:
+            state.rpcs += 1
+            if request.HasField('srv6_path_request'):
+                reply.applied = 0
+                for path in request.srv6_path_request.paths:
+                    status, paths = _apply(
+                        state.paths, operation,
+                        (path.destination, path.table), path)
+                    reply.paths.extend(paths)
+                    if status != commons_pb2.STATUS_SUCCESS:
+                        reply.status = status
+                        return reply
+                    # Number of paths applied before an error
+                    reply.applied += 1
+            if request.HasField('srv6_policy_request'):
+                if request.srv6_policy_request.fwd_engine == \
+                        FWD_ENGINE_LINUX:
+                    # Linux does not support SRv6 policies
+                    reply.status = commons_pb2.STATUS_OPERATION_NOT_SUPPORTED
+                    return reply
+                for policy in request.srv6_policy_request.policies:
+                    status, policies = _apply(
+                        state.policies, operation, policy.bsid_addr, policy)
+                    reply.policies.extend(policies)
+                    if status != commons_pb2.STATUS_SUCCESS:
+                        reply.status = status
+                        return reply
+            if request.HasField('srv6_behavior_request'):
+                reply.applied = 0
+                for behavior in request.srv6_behavior_request.behaviors:
+                    status, behaviors = _apply(
+                        state.behaviors, operation,
+                        (behavior.segment, behavior.table), behavior)
+                    reply.behaviors.extend(behaviors)
+                    if status != commons_pb2.STATUS_SUCCESS:
+                        reply.status = status
+                        return reply
+                    # Number of behaviors applied before an error
+                    reply.applied += 1
+        return reply
+
+    def Create(self, request, context):
+        # pylint: disable=invalid-name
+        """RPC used to create a SRv6 entity"""
+        return self.execute('add', request, context)
+
+    def Get(self, request, context):
+        # pylint: disable=invalid-name
+        """RPC used to get a SRv6 entity"""
+        return self.execute('get', request, context)
+
+    def Update(self, request, context):
+        # pylint: disable=invalid-name
+        """RPC used to change a SRv6 entity"""
+        return self.execute('change', request, context)
+
+    def Remove(self, request, context):
+        # pylint: disable=invalid-name
+        """RPC used to remove a SRv6 entity"""
+        return self.execute('del', request, context)
+
+    def GetFingerprint(self, request, context):
+        # pylint: disable=invalid-name
+        """RPC used to get the fingerprint of the SRv6 entities"""
+        reply = srv6_manager_pb2.SRv6FingerprintReply(
+            status=commons_pb2.STATUS_SUCCESS)
+        if self.faults.inject(context):
+            reply.status = commons_pb2.STATUS_INTERNAL_ERROR
+            return reply
+        state = self.state
+        with state.lock:
+            state.rpcs += 1
+            entities = [
+                (srv6_reconciler.PATH, srv6_reconciler.canonical_path(
+                    srv6_reconciler.grpc_path_to_dict(path)))
+                for path in state.paths.values()] + [
+                (srv6_reconciler.BEHAVIOR,
+                 srv6_reconciler.canonical_behavior(
+                     srv6_reconciler.grpc_behavior_to_dict(behavior)))
+                for behavior in state.behaviors.values()]
+        reply.fingerprint = srv6_reconciler.fingerprint(entities)
+        reply.paths = len(state.paths)
+        reply.behaviors = len(state.behaviors)
+        return reply
+
+
+class FakeSRv6PM(srv6pmService_pb2_grpc.SRv6PMServicer):
+    """
+    Fake SRv6PM service. Experiments generate synthetic counters, with no
+    packet loss.
+
+    :param state: The state of the node.
+    :type state: FakeNodeState
+    :param faults: Latency and errors to inject.
+    :type faults: FaultInjector, optional
+    """
+
+    def __init__(self, state, faults=None):
+        self.state = state
+        self.faults = faults if faults is not None else FaultInjector()
+
+    def _status(self, context, check_configured=True):
+        """
+        Common checks: injected faults and node configuration.
+        """
+        if self.faults.inject(context):
+            return commons_pb2.STATUS_INTERNAL_ERROR
+        with self.state.lock:
+            self.state.rpcs += 1
+            if check_configured and not self.state.pm_configured:
+                return commons_pb2.STATUS_NOT_CONFIGURED
+        return commons_pb2.STATUS_SUCCESS
+
+    def setConfiguration(self, request, context):
+        # pylint: disable=invalid-name
+        """Configure the node"""
+        status = self._status(context, check_configured=False)
+        if status == commons_pb2.STATUS_SUCCESS:
+            with self.state.lock:
+                if self.state.pm_configured:
+                    status = commons_pb2.STATUS_ALREADY_CONFIGURED
+                self.state.pm_configured = True
+        return srv6pmCommons_pb2.SetConfigurationReply(status=status)
+
+    def resetConfiguration(self, request, context):
+        # pylint: disable=invalid-name
+        """Reset the configuration of the node"""
+        status = self._status(context)
+        if status == commons_pb2.STATUS_SUCCESS:
+            with self.state.lock:
+                self.state.pm_configured = False
+                self.state.senders.clear()
+                self.state.reflectors.clear()
+        return srv6pmCommons_pb2.SetConfigurationReply(status=status)
+
+    def startExperimentSender(self, request, context):
+        # pylint: disable=invalid-name
+        """Start an experiment as sender"""
+        status = self._status(context)
+        if status == commons_pb2.STATUS_SUCCESS:
+            with self.state.lock:
+                self.state.senders[request.sdlist] = {
+                    'meas_id': request.measure_id,
+                    'start': time.time()
+                }
+        return srv6pmSender_pb2.StartExperimentSenderReply(status=status)
+
+    def stopExperimentSender(self, request, context):
+        # pylint: disable=invalid-name
+        """Stop an experiment running on sender"""
+        status = self._status(context)
+        if status == commons_pb2.STATUS_SUCCESS:
+            with self.state.lock:
+                if self.state.senders.pop(request.sdlist, None) is None:
+                    status = commons_pb2.STATUS_NO_SUCH_PROCESS
+        return srv6pmCommons_pb2.StopExperimentReply(status=status)
+
+    def startExperimentReflector(self, request, context):
+        # pylint: disable=invalid-name
+        """Start an experiment as reflector"""
+        status = self._status(context)
+        if status == commons_pb2.STATUS_SUCCESS:
+            with self.state.lock:
+                self.state.reflectors[request.sdlist] = {
+                    'meas_id': request.measure_id
+                }
+        return srv6pmReflector_pb2.StartExperimentReflectorReply(
+            status=status)
+
+    def stopExperimentReflector(self, request, context):
+        # pylint: disable=invalid-name
+        """Stop an experiment on the reflector"""
+        status = self._status(context)
+        if status == commons_pb2.STATUS_SUCCESS:
+            with self.state.lock:
+                if self.state.reflectors.pop(request.sdlist, None) is None:
+                    status = commons_pb2.STATUS_NO_SUCH_PROCESS
+        return srv6pmCommons_pb2.StopExperimentReply(status=status)
+
+    def retriveExperimentResults(self, request, context):
+        # pylint: disable=invalid-name
+        """Retrieve results from the sender"""
+        response = srv6pmCommons_pb2.ExperimentDataResponse(
+            status=self._status(context))
+        if response.status != commons_pb2.STATUS_SUCCESS:
+            return response
+        with self.state.lock:
+            experiment = self.state.senders.get(request.sdlist)
+        if experiment is None:
+            response.status = commons_pb2.STATUS_INTERNAL_ERROR
+            return response
+        # One color interval per second, 1000 packets per interval
+        interval = int(time.time() - experiment['start'])
+        data = response.measurement_data.add()    # pylint: disable=no-member
+        data.meas_id = experiment['meas_id']
+        data.interval = interval
+        data.timestamp = str(time.time())
+        data.fwColor = interval % 2
+        data.rvColor = interval % 2
+        data.ssSeqNum = data.rfSeqNum = interval
+        data.ssTxCounter = data.rfRxCounter = 1000
+        data.rfTxCounter = data.ssRxCounter = 1000
+        return response
+
+
+class FakeNode:
+    """
+    A fake node manager, serving the SRv6Manager and SRv6PM services on a
+    gRPC server.
+
+    :param name: The name of the node.
+    :type name: str
+    :param address: The address of the gRPC server.
+    :type address: str, optional
+    :param port: The port of the gRPC server (0 to choose a free port).
+    :type port: int, optional
+    :param faults: Latency and errors to inject.
+    :type faults: FaultInjector, optional
+    :param executor: Thread pool serving the RPCs, possibly shared by
+                     multiple nodes.
+    :type executor: concurrent.futures.ThreadPoolExecutor, optional
+    """
+
+    def __init__(self, name, address=DEFAULT_ADDRESS, port=0, faults=None,
+                 executor=None):
+        # pylint: disable=too-many-arguments
+        self.name = name
+        self.address = address
+        self.state = FakeNodeState()
+        self.faults = faults if faults is not None else FaultInjector()
+        if executor is None:
+            executor = futures.ThreadPoolExecutor(
+                max_workers=DEFAULT_MAX_WORKERS)
+        self.server = grpc.server(executor)
+        srv6_manager_pb2_grpc.add_SRv6ManagerServicer_to_server(
+            FakeSRv6Manager(self.state, self.faults), self.server)
+        srv6pmService_pb2_grpc.add_SRv6PMServicer_to_server(
+            FakeSRv6PM(self.state, self.faults), self.server)
+        if ':' in address:
+            server_addr = '[%s]:%s' % (address, port)
+        else:
+            server_addr = '%s:%s' % (address, port)
+        self.port = self.server.add_insecure_port(server_addr)
+        if self.port == 0:
+            raise OSError('Cannot bind %s' % server_addr)
+
+    def start(self):
+        """
+        Start the gRPC server.
+        """
+        self.server.start()
+        return self
+
+    def stop(self, grace=None):
+        """
+        Stop the gRPC server.
+        """
+        self.server.stop(grace)
+
+
+def node_config(name, index, address, port, locator=DEFAULT_LOCATOR,
+                udt=DEFAULT_UDT):
+    """
+    Return the configuration of a fake node, in the format used by the
+    nodes configuration (see :mod:`controller.srv6_usid`). The uN SID of
+    the node is derived from its index.
+    """
+    # pylint: disable=too-many-arguments
+    return {
+        'name': name,
+        'grpc_ip': address,
+        'grpc_port': port,
+        'uN': str(IPv6Address(int(IPv6Address(locator)) |
+                              ((index + 1) << 80))),
+        'uDT': udt,
+        'fwd_engine': 'linux'
+    }
+
+
+class FakeNodeFleet:
+    """
+    Fleet of fake nodes hosted in the calling process. Nodes listen on
+    consecutive ports of the same address or, if a list of addresses is
+    provided, on the same port of different addresses (e.g. 127.0.0.1,
+    127.0.0.2, ... on Linux).
+
+    :param num_nodes: Number of nodes.
+    :type num_nodes: int
+    :param address: The address of the nodes.
+    :type address: str, optional
+    :param base_port: Port of the first node (0 to choose free ports).
+    :type base_port: int, optional
+    :param addresses: One address for each node. If provided, all the
+                      nodes listen on "base_port".
+    :type addresses: list, optional
+    :param faults: Latency and errors to inject.
+    :type faults: FaultInjector, optional
+    :param max_workers: Size of the thread pool shared by the nodes.
+    :type max_workers: int, optional
+    :param first_index: Index of the first node (used to name the nodes).
+    :type first_index: int, optional
+    """
+
+    def __init__(self, num_nodes, address=DEFAULT_ADDRESS, base_port=0,
+                 addresses=None, faults=None, max_workers=DEFAULT_MAX_WORKERS,
+                 first_index=0):
+        # pylint: disable=too-many-arguments
+        self.faults = faults if faults is not None else FaultInjector()
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self.nodes = list()
+        for index in range(first_index, first_index + num_nodes):
+            if addresses is not None:
+                node_address = addresses[index - first_index]
+                port = base_port
+            else:
+                node_address = address
+                port = base_port + index - first_index if base_port else 0
+            self.nodes.append(FakeNode(
+                name='node%d' % (index + 1), address=node_address,
+                port=port, faults=self.faults, executor=self.executor))
+        self.first_index = first_index
+
+    def start(self):
+        """
+        Start all the nodes.
+        """
+        for node in self.nodes:
+            node.start()
+        return self
+
+    def stop(self):
+        """
+        Stop all the nodes.
+        """
+        for node in self.nodes:
+            node.stop()
+        self.executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def nodes_config(self):
+        """
+        Return the nodes configuration of the fleet (see
+        :func:`node_config`), usable for the uSID policies.
+        """
+        return {
+            'nodes': [node_config(node.name, index, node.address, node.port)
+                      for index, node in enumerate(self.nodes,
+                                                   self.first_index)]
+        }
+
+    def rpcs(self):
+        """
+        Return the total number of RPCs served by the fleet.
+        """
+        return sum(node.state.rpcs for node in self.nodes)
+
+
+def _serve_fleet(num_nodes, first_index, address, base_port, fault_params,
+                 max_workers, ready):
+    """
+    Host a slice of a fleet in a child process.
+    """
+    # pylint: disable=too-many-arguments
+    fleet = FakeNodeFleet(num_nodes, address=address, base_port=base_port,
+                          faults=FaultInjector(**fault_params),
+                          max_workers=max_workers,
+                          first_index=first_index).start()
+    ready.set()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    fleet.stop()
+
+
+def start_fleet_processes(num_nodes, processes, base_port,
+                          address=DEFAULT_ADDRESS, fault_params=None,
+                          max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Host a fleet of fake nodes in multiple processes, each one serving a
+    range of consecutive ports. "fault_params" contains the arguments of
+    the :class:`FaultInjector` of each process.
+
+    :return: Tuple containing the list of the processes and the nodes
+             configuration of the fleet.
+    :rtype: tuple
+    """
+    # pylint: disable=too-many-arguments
+    if not base_port:
+        raise ValueError('A base port is required for a multi-process '
+                         'fleet')
+    workers = list()
+    nodes = list()
+    per_process = -(-num_nodes // processes)
+    for first_index in range(0, num_nodes, per_process):
+        count = min(per_process, num_nodes - first_index)
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(
+            target=_serve_fleet, daemon=True,
+            args=(count, first_index, address, base_port + first_index,
+                  fault_params or dict(), max_workers, ready))
+        process.start()
+        ready.wait()
+        workers.append(process)
+        for index in range(first_index, first_index + count):
+            nodes.append(node_config('node%d' % (index + 1), index, address,
+                                     base_port + index))
+    return workers, {'nodes': nodes}
+
+
+def parse_arguments():
+    """
+    Command-line arguments parser
+    """
+    parser = ArgumentParser(description='Fleet of fake node managers')
+    parser.add_argument('--nodes', type=int, default=10,
+                        help='Number of nodes')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Number of processes hosting the nodes')
+    parser.add_argument('--address', default=DEFAULT_ADDRESS,
+                        help='Address of the nodes')
+    parser.add_argument('--base-port', type=int, default=50000,
+                        help='Port of the first node')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Latency added to each RPC (in seconds)')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Max variation of the latency (in seconds)')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Probability of STATUS_INTERNAL_ERROR')
+    parser.add_argument('--unavailable-rate', type=float, default=0,
+                        help='Probability of gRPC UNAVAILABLE errors')
+    parser.add_argument('--max-workers', type=int,
+                        default=DEFAULT_MAX_WORKERS,
+                        help='Threads serving the RPCs in each process')
+    parser.add_argument('--nodes-config',
+                        help='Export the nodes configuration to a YAML file')
+    return parser.parse_args()
+
+
+def __main():
+    """
+    Entry point for this module
+    """
+    args = parse_arguments()
+    fault_params = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'unavailable_rate': args.unavailable_rate
+    }
+    workers, nodes_config = start_fleet_processes(
+        num_nodes=args.nodes, processes=args.processes,
+        base_port=args.base_port, address=args.address,
+        fault_params=fault_params, max_workers=args.max_workers)
+    logger.info('%d fake nodes listening on %s, ports %d-%d', args.nodes,
+                args.address, args.base_port, args.base_port + args.nodes - 1)
+    if args.nodes_config is not None:
+        if yaml is None:
+            logger.critical('pyaml library is required to export the nodes '
+                            'configuration')
+            sys.exit(-2)
+        with open(args.nodes_config, 'w') as outfile:
+            yaml.dump(nodes_config, outfile)
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == '__main__':
+    __main()
@@ -0,0 +1,484 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Kafka utils
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Kafka utilities.
+
+This module provides a long-lived Kafka producer shared by the SRv6-PM
+publishers and an in-process fake broker which can replace a Kafka cluster
+in the tests.
+"""
+
+# General imports
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+# Controller dependencies
+from controller import metrics
+
+# Configuration parameters
+#
+# Time (in ms) the producer waits for other records before sending a batch
+KAFKA_LINGER_MS = int(os.getenv('KAFKA_LINGER_MS', '5'))
+# Max size (in bytes) of a batch of records sent to a partition
+KAFKA_BATCH_SIZE = int(os.getenv('KAFKA_BATCH_SIZE', '16384'))
+# Compression codec (none, gzip, snappy, lz4 or zstd)
+KAFKA_COMPRESSION_TYPE = os.getenv('KAFKA_COMPRESSION_TYPE', 'lz4')
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+
+# Kafka dependencies
+#
+# kafka-python takes a long time to load and it is not required by the fake
+# broker, so it is imported by import_kafka() when the first producer is
+# created
+KafkaProducer = None
+kafka_codec = None
+_kafka_imported = False
+
+
+class KafkaError(Exception):
+    """
+    Error raised by the fake broker; replaced by the KafkaError of
+    kafka-python when the library is imported.
+    """
+
+
+def import_kafka():
+    """
+    Import kafka-python, if it is not already imported.
+
+    :return: True if kafka-python is available, False otherwise.
+    :rtype: bool
+    """
+    # pylint: disable=global-statement,invalid-name,redefined-outer-name
+    global KafkaProducer, kafka_codec, KafkaError, _kafka_imported
+    if not _kafka_imported:
+        try:
+            from kafka import KafkaProducer
+            from kafka import codec as kafka_codec
+            from kafka.errors import KafkaError
+        except ImportError:
+            # kafka-python is not installed; only the fake broker can be
+            # used
+            pass
+        _kafka_imported = True
+    return KafkaProducer is not None
+
+
+# Metadata of a record delivered to the fake broker
+RecordMetadata = namedtuple('RecordMetadata', ['topic', 'partition',
+                                               'offset'])
+
+
+def json_serializer(value):
+    """
+    Default serializer for the records published to Kafka.
+    """
+    return json.dumps(value).encode('ascii')
+
+
+def get_compression_type(compression_type):
+    """
+    Return the compression codec to be used by the producer. If the library
+    required by the codec is not installed, fall back to gzip, which is
+    always available.
+
+    :param compression_type: Compression codec (none, gzip, snappy, lz4 or
+                             zstd).
+    :type compression_type: str
+    :return: The compression codec or None if compression is disabled.
+    :rtype: str
+    :raises ValueError: Unknown compression codec.
+    """
+    if compression_type is None or \
+            compression_type.lower() in ('', 'none'):
+        # Compression disabled
+        return None
+    compression_type = compression_type.lower()
+    # Functions used to check if the codecs are available
+    codecs = {
+        'gzip': 'has_gzip',
+        'snappy': 'has_snappy',
+        'lz4': 'has_lz4',
+        'zstd': 'has_zstd'
+    }
+    if compression_type not in codecs:
+        raise ValueError('Unknown compression type: %s' % compression_type)
+    if kafka_codec is not None and \
+            not getattr(kafka_codec, codecs[compression_type])():
+        logger.warning('Libraries for %s compression codec not found, '
+                       'falling back to gzip', compression_type)
+        return 'gzip'
+    return compression_type
+
+
+class KafkaPublisher:
+    """
+    A long-lived Kafka producer.
+
+    The underlying KafkaProducer is created on first use and shared by all
+    the calls to :meth:`send`. Records are sent asynchronously and grouped
+    in batches (see "linger_ms" and "batch_size"); delivery errors are
+    reported through callbacks. :meth:`close` flushes the pending records.
+    If kafka-python is not installed, the publisher is disabled and the
+    records are dropped.
+
+    :param bootstrap_servers: Kafka servers ("host:port" strings).
+    :type bootstrap_servers: list
+    :param value_serializer: Function used to convert a record to bytes
+                             (default: JSON).
+    :type value_serializer: function, optional
+    :param linger_ms: Time (in ms) to wait for other records before sending
+                      a batch.
+    :type linger_ms: int, optional
+    :param batch_size: Max size (in bytes) of a batch.
+    :type batch_size: int, optional
+    :param compression_type: Compression codec (none, gzip, snappy, lz4 or
+                             zstd).
+    :type compression_type: str, optional
+    :param producer: Producer to be used instead of a KafkaProducer (e.g. a
+                     :class:`FakeKafkaProducer`).
+    :type producer: object, optional
+    """
+
+    def __init__(self, bootstrap_servers, value_serializer=json_serializer,
+                 linger_ms=KAFKA_LINGER_MS, batch_size=KAFKA_BATCH_SIZE,
+                 compression_type=KAFKA_COMPRESSION_TYPE, producer=None):
+        # pylint: disable=too-many-arguments
+        self.bootstrap_servers = bootstrap_servers
+        self.value_serializer = value_serializer
+        self.linger_ms = linger_ms
+        self.batch_size = batch_size
+        self.compression_type = compression_type
+        self._producer = producer
+        self._lock = threading.Lock()
+        # Counters
+        self.sent = 0
+        self.delivered = 0
+        self.failed = 0
+        # kafka-python is checked once, when the publisher is created
+        self.enabled = producer is not None or import_kafka()
+        if not self.enabled:
+            logger.error('kafka-python not found: the records will not be '
+                         'published to Kafka')
+
+    def _get_producer(self):
+        """
+        Return the producer, creating it if it does not exist.
+        """
+        if self._producer is not None:
+            return self._producer
+        with self._lock:
+            if self._producer is None:
+                if not import_kafka():
+                    raise ImportError('kafka-python not found')
+                self._producer = KafkaProducer(
+                    bootstrap_servers=self.bootstrap_servers,
+                    security_protocol='PLAINTEXT',
+                    value_serializer=self.value_serializer,
+                    linger_ms=self.linger_ms,
+                    batch_size=self.batch_size,
+                    compression_type=get_compression_type(
+                        self.compression_type)
+                )
+        return self._producer
+
+    def _on_delivery(self, topic, start, record_metadata):
+        """
+        Callback invoked when a record has been delivered.
+        """
+        # pylint: disable=unused-argument
+        self.delivered += 1
+        if metrics.ENABLE_METRICS:
+            metrics.KAFKA_PUBLISH_DURATION.labels(topic).observe(
+                time.perf_counter() - start)
+
+    def _on_error(self, topic, exc):
+        """
+        Callback invoked when a record cannot be delivered.
+        """
+        self.failed += 1
+        if metrics.ENABLE_METRICS:
+            metrics.KAFKA_PUBLISH_ERRORS.labels(topic).inc()
+        logger.error('Cannot publish data to Kafka topic %s: %s', topic, exc)
+
+    def send(self, topic, value, headers=None):
+        """
+        Publish a record asynchronously.
+
+        :param topic: The Kafka topic.
+        :type topic: str
+        :param value: The record.
+        :type value: object
+        :param headers: Kafka headers, as a list of (str, bytes) tuples.
+        :type headers: list, optional
+        :return: A future resolved when the record is delivered, or None if
+                 the record cannot be queued.
+        """
+        if not self.enabled:
+            self.failed += 1
+            return None
+        start = time.perf_counter()
+        try:
+            if headers:
+                future = self._get_producer().send(
+                    topic=topic, value=value, headers=headers)
+            else:
+                future = self._get_producer().send(topic=topic, value=value)
+        except KafkaError as err:
+            logger.error('Cannot publish data to Kafka: %s', err)
+            self.failed += 1
+            if metrics.ENABLE_METRICS:
+                metrics.KAFKA_PUBLISH_ERRORS.labels(topic).inc()
+            return None
+        self.sent += 1
+        future.add_callback(self._on_delivery, topic, start)
+        future.add_errback(self._on_error, topic)
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Wait until all the pending records are delivered.
+        """
+        if self._producer is not None:
+            self._producer.flush(timeout=timeout)
+
+    def close(self, timeout=None):
+        """
+        Flush the pending records and close the producer.
+        """
+        with self._lock:
+            if self._producer is not None:
+                try:
+                    self._producer.flush(timeout=timeout)
+                finally:
+                    self._producer.close(timeout=timeout)
+                    self._producer = None
+
+
+# Publishers shared by the module-level publish functions, indexed by
+# Kafka servers
+_publishers = dict()
+_publishers_lock = threading.Lock()
+
+
+def get_publisher(bootstrap_servers, value_serializer=json_serializer):
+    """
+    Return the shared publisher for the given Kafka servers and serializer,
+    creating it if it does not exist. Shared publishers are closed at exit.
+
+    :param bootstrap_servers: Kafka servers ("host:port" strings).
+    :type bootstrap_servers: list
+    :param value_serializer: Function used to convert a record to bytes
+                             (default: JSON). If None, records must be
+                             already serialized.
+    :type value_serializer: function, optional
+    :return: The publisher.
+    :rtype: KafkaPublisher
+    """
+    if isinstance(bootstrap_servers, str):
+        bootstrap_servers = bootstrap_servers.split(',')
+    key = (tuple(bootstrap_servers), value_serializer)
+    with _publishers_lock:
+        if key not in _publishers:
+            _publishers[key] = KafkaPublisher(
+                bootstrap_servers=list(bootstrap_servers),
+                value_serializer=value_serializer)
+        return _publishers[key]
+
+
+@atexit.register
+def close_publishers():
+    """
+    Flush and close all the shared publishers.
+    """
+    with _publishers_lock:
+        for publisher in _publishers.values():
+            publisher.close()
+        _publishers.clear()
+
+
+class FakeKafkaBroker:
+    """
+    In-process stand-in for a Kafka cluster. Records delivered by a
+    :class:`FakeKafkaProducer` are stored in memory, by topic.
+
+    :param fail_topics: Topics for which the delivery of records fails.
+    :type fail_topics: list, optional
+    """
+
+    def __init__(self, fail_topics=None):
+        self.topics = defaultdict(list)
+        self.headers = defaultdict(list)
+        self.fail_topics = set(fail_topics or [])
+        self._lock = threading.Lock()
+
+    def append(self, topic, value, headers=None):
+        """
+        Store a record and return its metadata.
+        """
+        if topic in self.fail_topics:
+            raise KafkaError('Delivery failed for topic %s' % topic)
+        with self._lock:
+            self.topics[topic].append(value)
+            self.headers[topic].append(headers or [])
+            return RecordMetadata(topic=topic, partition=0,
+                                  offset=len(self.topics[topic]) - 1)
+
+    def messages(self, topic):
+        """
+        Return the records stored for a topic.
+        """
+        with self._lock:
+            return list(self.topics[topic])
+
+
+class _FakeFuture:
+    """
+    Minimal implementation of the future returned by KafkaProducer.send().
+    """
+
+    def __init__(self):
+        self.is_done = False
+        self.value = None
+        self.exception = None
+        self._callbacks = list()
+        self._errbacks = list()
+
+    def add_callback(self, func, *args):
+        """
+        Register a function called with the record metadata on success.
+        """
+        self._callbacks.append((func, args))
+        if self.is_done and self.exception is None:
+            func(*args, self.value)
+        return self
+
+    def add_errback(self, func, *args):
+        """
+        Register a function called with the exception on failure.
+        """
+        self._errbacks.append((func, args))
+        if self.is_done and self.exception is not None:
+            func(*args, self.exception)
+        return self
+
+    def success(self, value):
+        """
+        Resolve the future.
+        """
+        self.is_done = True
+        self.value = value
+        for func, args in self._callbacks:
+            func(*args, value)
+
+    def failure(self, exception):
+        """
+        Fail the future.
+        """
+        self.is_done = True
+        self.exception = exception
+        for func, args in self._errbacks:
+            func(*args, exception)
+
+    def get(self, timeout=None):
+        """
+        Return the record metadata or raise the delivery error.
+        """
+        # pylint: disable=unused-argument
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class FakeKafkaProducer:
+    """
+    Subset of the KafkaProducer API backed by a :class:`FakeKafkaBroker`.
+    Records are buffered and delivered to the broker when the producer is
+    flushed or closed, or when "batch_size" records are pending.
+
+    :param broker: The broker.
+    :type broker: FakeKafkaBroker
+    :param value_serializer: Function used to convert a record to bytes.
+    :type value_serializer: function, optional
+    :param batch_size: Number of pending records triggering a flush.
+    :type batch_size: int, optional
+    """
+
+    def __init__(self, broker, value_serializer=None, batch_size=100):
+        self.broker = broker
+        self.value_serializer = value_serializer
+        self.batch_size = batch_size
+        self.closed = False
+        self._pending = list()
+        self._lock = threading.Lock()
+
+    def send(self, topic, value=None, headers=None):
+        """
+        Buffer a record.
+        """
+        if self.closed:
+            raise KafkaError('Producer is closed')
+        if self.value_serializer is not None:
+            value = self.value_serializer(value)
+        future = _FakeFuture()
+        with self._lock:
+            self._pending.append((topic, value, headers, future))
+            must_flush = len(self._pending) >= self.batch_size
+        if must_flush:
+            self.flush()
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Deliver the pending records to the broker.
+        """
+        # pylint: disable=unused-argument
+        with self._lock:
+            pending, self._pending = self._pending, list()
+        for topic, value, headers, future in pending:
+            try:
+                future.success(self.broker.append(topic, value, headers))
+            except KafkaError as err:
+                future.failure(err)
+
+    def close(self, timeout=None):
+        """
+        Flush the pending records and close the producer.
+        """
+        self.flush(timeout=timeout)
+        self.closed = True
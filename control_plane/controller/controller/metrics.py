@@ -0,0 +1,135 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Controller metrics
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Metrics of the controller, exposed in the Prometheus text format.
+
+The metrics are disabled by default; they are enabled by setting
+ENABLE_METRICS and served over HTTP on METRICS_IP/METRICS_PORT by
+:func:`start_http_server`. The implementation of the metrics is shared
+with the node manager (see :mod:`telemetry.metrics`); this module defines
+the metrics of the controller and applies the configuration.
+
+The following metrics are collected:
+
+- controller_nb_rpc_duration_seconds{method}: latency of the northbound
+  RPCs;
+- controller_nb_rpc_in_flight{method}: northbound RPCs in progress;
+- controller_nb_rpc_errors_total{method}: northbound RPCs raising an
+  exception;
+- controller_sb_rpc_duration_seconds{node, method}: latency of the
+  southbound RPCs sent to the nodes;
+- controller_arango_query_duration_seconds{function}: latency of the
+  :mod:`controller.arangodb_driver` functions;
+- controller_kafka_publish_duration_seconds{topic}: time elapsed from the
+  publication of a record to its delivery;
+- controller_kafka_publish_errors_total{topic}: records not delivered.
+"""
+
+# General imports
+import os
+
+# Telemetry dependencies
+import telemetry.metrics
+from telemetry.metrics import Counter, Gauge, Histogram
+
+# Configuration parameters
+#
+# Define whether to collect the metrics or not
+ENABLE_METRICS = os.getenv('ENABLE_METRICS', 'False').lower() == 'true'
+# IP address of the HTTP server exposing the metrics
+METRICS_IP = os.getenv('METRICS_IP', '::')
+# Port of the HTTP server exposing the metrics
+METRICS_PORT = int(os.getenv('METRICS_PORT', '8000'))
+
+# Apply the configuration to the instrumentation
+telemetry.metrics.ENABLE_METRICS = ENABLE_METRICS
+
+# Decorator recording the execution time of a function in a histogram
+timed = telemetry.metrics.timed
+
+
+# Metrics of the controller
+#
+# Northbound RPCs
+NB_RPC_DURATION = Histogram(
+    'controller_nb_rpc_duration_seconds',
+    'Latency of the northbound RPCs', ['method'])
+NB_RPC_IN_FLIGHT = Gauge(
+    'controller_nb_rpc_in_flight',
+    'Northbound RPCs in progress', ['method'])
+NB_RPC_ERRORS = Counter(
+    'controller_nb_rpc_errors_total',
+    'Northbound RPCs raising an exception', ['method'])
+# Southbound RPCs
+SB_RPC_DURATION = Histogram(
+    'controller_sb_rpc_duration_seconds',
+    'Latency of the southbound RPCs', ['node', 'method'])
+# ArangoDB queries
+ARANGO_QUERY_DURATION = Histogram(
+    'controller_arango_query_duration_seconds',
+    'Latency of the ArangoDB driver functions', ['function'])
+# Kafka
+KAFKA_PUBLISH_DURATION = Histogram(
+    'controller_kafka_publish_duration_seconds',
+    'Time elapsed from the publication of a record to its delivery',
+    ['topic'])
+KAFKA_PUBLISH_ERRORS = Counter(
+    'controller_kafka_publish_errors_total',
+    'Records not delivered to Kafka', ['topic'])
+
+
+class ServerMetricsInterceptor(telemetry.metrics.ServerMetricsInterceptor):
+    """
+    Server interceptor recording latency, in-flight count and errors of
+    the northbound RPCs.
+    """
+
+    def __init__(self):
+        super().__init__(NB_RPC_DURATION, NB_RPC_IN_FLIGHT, NB_RPC_ERRORS)
+
+
+def intercept_channel(channel, node):
+    """
+    Return a channel recording the latency of the southbound RPCs sent to
+    a node, or the channel itself if the metrics are disabled.
+    """
+    return telemetry.metrics.intercept_channel(channel, SB_RPC_DURATION,
+                                               node)
+
+
+def start_http_server(port=METRICS_PORT, address=METRICS_IP):
+    """
+    Start a HTTP server exposing the metrics in a daemon thread.
+
+    :param port: The port of the HTTP server (0 to choose a free port).
+    :type port: int, optional
+    :param address: The address of the HTTP server.
+    :type address: str, optional
+    :return: The HTTP server.
+    :rtype: http.server.HTTPServer
+    """
+    return telemetry.metrics.start_http_server(port, address)
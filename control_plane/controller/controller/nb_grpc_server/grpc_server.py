@@ -34,6 +34,7 @@ Northbound API for the SRv6 controller implementing different functionalities:
 """
 
 # General imports
+import functools
 import logging
 import os
 import time
@@ -46,6 +47,7 @@ import nb_srv6_manager_pb2_grpc
 import topology_manager_pb2_grpc
 import srv6pm_manager_pb2_grpc
 # Controller dependencies
+from controller import arangodb_driver, metrics, srv6_reconciler, tracing
 from controller import utils
 from controller.nb_grpc_server.srv6_manager import SRv6Manager
 from controller.nb_grpc_server.topo_manager import TopologyManager
@@ -114,7 +116,17 @@ def start_server(grpc_ip=DEFAULT_GRPC_IP,
         logger.fatal('Invalid gRPC address: %s', grpc_ip)
         raise utils.InvalidArgumentError
     # Create the server and add the handlers
-    grpc_server = grpc.server(futures.ThreadPoolExecutor())
+    interceptors = list()
+    if metrics.ENABLE_METRICS:
+        # Record the metrics of the RPCs and expose them over HTTP
+        interceptors.append(metrics.ServerMetricsInterceptor())
+        metrics.start_http_server()
+    if tracing.ENABLE_TRACING or tracing.ENABLE_PROFILING:
+        # Record the traces of the RPCs and run the profiler requested by
+        # the callers
+        interceptors.append(tracing.ServerTracingInterceptor())
+    grpc_server = grpc.server(futures.ThreadPoolExecutor(),
+                              interceptors=interceptors)
     # Add SRv6 Manager
     nb_srv6_manager_pb2_grpc.add_SRv6ManagerServicer_to_server(
         SRv6Manager(db_client=db_client), grpc_server)
@@ -124,6 +136,23 @@ def start_server(grpc_ip=DEFAULT_GRPC_IP,
     # Add SRv6-PM Manager
     srv6pm_manager_pb2_grpc.add_SRv6PMManagerServicer_to_server(
         SRv6PMManager(db_client=db_client), grpc_server)
+    # Start the reconciler of the SRv6 entities stored in the database
+    if srv6_reconciler.ENABLE_RECONCILER:
+        if db_client is None:
+            logger.warning('The reconciler requires the persistency: '
+                           'set ENABLE_PERSISTENCY to enable it')
+        else:
+            db_conn = arangodb_driver.connect_db(
+                client=db_client,
+                db_name='srv6',
+                username=os.getenv('ARANGO_USER'),
+                password=os.getenv('ARANGO_PASSWORD')
+            )
+            srv6_reconciler.Reconciler(
+                intent_loader=functools.partial(
+                    srv6_reconciler.load_intents, db_conn),
+                node_loader=srv6_reconciler.load_nodes
+            ).start()
     # If secure we need to create a secure endpoint
     if secure:
         # Read key and certificate
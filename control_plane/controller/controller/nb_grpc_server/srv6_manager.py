@@ -31,24 +31,48 @@ control plane functionalities to setup SRv6 entities.
 """
 
 # General imports
+import collections
+import contextvars
 import logging
 import os
+import queue
+import threading
+from concurrent import futures
 from contextlib import contextmanager
 from enum import Enum
+# gRPC dependencies
+import grpc
 # Proto dependencies
+import commons_pb2
 import nb_commons_pb2
 import nb_srv6_manager_pb2
 import nb_srv6_manager_pb2_grpc
+import srv6_manager_pb2
+import srv6_manager_pb2_grpc
 # Controller dependencies
 from controller import arangodb_driver
 from controller import srv6_utils, srv6_usid, utils
 from controller.nb_grpc_server import utils as nb_utils
+from controller.srv6_entities import (SRv6Behavior, SRv6BidiTunnel,
+                                      SRv6MicroSIDPolicy, SRv6Path,
+                                      SRv6UniTunnel)
+from controller.srv6_pm_scheduler import ChannelPool
 
 
 # Logger reference
 logging.basicConfig(level=logging.NOTSET)
 logger = logging.getLogger(__name__)
 
+# Max number of nodes handled concurrently by the northbound requests
+# carrying multiple SRv6 paths, behaviors or tunnels
+NB_MAX_WORKERS = int(os.getenv('NB_MAX_WORKERS', '16'))
+# Max number of operations of a StreamSRv6Operations stream in flight
+# (received and not yet streamed back)
+NB_STREAM_WINDOW = int(os.getenv('NB_STREAM_WINDOW', '1024'))
+# Max number of SRv6 paths (or behaviors) of a stream sent to a node in a
+# single southbound request
+NB_STREAM_BATCH_SIZE = int(os.getenv('NB_STREAM_BATCH_SIZE', '100'))
+
 
 # ############################################################################
 # SRv6 Action
@@ -200,6 +224,10 @@ def srv6_mgr_error_handling():
         response.status = nb_commons_pb2.STATUS_BAD_REQUEST
         logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[response.status])
         return response
+    except utils.InvalidArgumentError:
+        response.status = nb_commons_pb2.STATUS_BAD_REQUEST
+        logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[response.status])
+        return response
     except utils.NoSuchDevicecException:
         response.status = nb_commons_pb2.STATUS_NO_SUCH_DEVICE
         logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[response.status])
@@ -210,18 +238,537 @@ def srv6_mgr_error_handling():
         return response
 
 
+def srv6_path_to_dict(srv6_path):
+    """
+    Convert a SRv6 path of a northbound request to a dict containing the
+    arguments of :func:`controller.srv6_utils.handle_srv6_path` (None for
+    the fields not specified).
+
+    :param srv6_path: The SRv6 path.
+    :type srv6_path: class: `nb_srv6_manager_pb2.SRv6Path`
+    :return: The SRv6 path.
+    :rtype: dict
+    """
+    return SRv6Path.from_nb(srv6_path).to_dict()
+
+
+def srv6_behavior_to_dict(srv6_behavior):
+    """
+    Convert a SRv6 behavior of a northbound request to a dict containing
+    the arguments of :func:`controller.srv6_utils.handle_srv6_behavior`
+    (None for the fields not specified).
+
+    :param srv6_behavior: The SRv6 behavior.
+    :type srv6_behavior: class: `nb_srv6_manager_pb2.SRv6Behavior`
+    :return: The SRv6 behavior.
+    :rtype: dict
+    """
+    return SRv6Behavior.from_nb(srv6_behavior).to_dict()
+
+
+def add_srv6_paths_to_reply(reply, srv6_paths):
+    """
+    Add SRv6 paths to a reply message.
+
+    :param reply: The reply message.
+    :type reply: class: `nb_srv6_manager_pb2.SRv6ManagerReply` or
+                 class: `nb_srv6_manager_pb2.SRv6OperationResult`
+    :param srv6_paths: The SRv6 paths, as dicts (documents of the database)
+                       or as southbound messages (paths returned by a
+                       node).
+    :type srv6_paths: list
+    """
+    for path in srv6_paths:
+        if isinstance(path, dict):
+            path = SRv6Path.from_doc(path)
+        else:
+            path = SRv6Path.from_sb(path)
+        path.fill_nb(reply.srv6_paths.add())
+
+
+def add_srv6_behaviors_to_reply(reply, srv6_behaviors):
+    """
+    Add SRv6 behaviors to a reply message.
+
+    :param reply: The reply message.
+    :type reply: class: `nb_srv6_manager_pb2.SRv6ManagerReply` or
+                 class: `nb_srv6_manager_pb2.SRv6OperationResult`
+    :param srv6_behaviors: The SRv6 behaviors, as dicts (documents of the
+                           database) or as southbound messages (behaviors
+                           returned by a node).
+    :type srv6_behaviors: list
+    """
+    for behavior in srv6_behaviors:
+        if isinstance(behavior, dict):
+            behavior = SRv6Behavior.from_doc(behavior)
+        else:
+            behavior = SRv6Behavior.from_sb(behavior)
+        behavior.fill_nb(reply.srv6_behaviors.add())
+
+
+def add_srv6_unitunnels_to_reply(reply, srv6_tunnels):
+    """
+    Add unidirectional SRv6 tunnels to a reply message.
+
+    :param reply: The reply message.
+    :type reply: class: `nb_srv6_manager_pb2.SRv6ManagerReply` or
+                 class: `nb_srv6_manager_pb2.SRv6OperationResult`
+    :param srv6_tunnels: The unidirectional SRv6 tunnels, as dicts.
+    :type srv6_tunnels: list
+    """
+    for tunnel in srv6_tunnels:
+        SRv6UniTunnel.from_doc(tunnel).fill_nb(reply.srv6_unitunnels.add())
+
+
+def add_srv6_biditunnels_to_reply(reply, srv6_tunnels):
+    """
+    Add bidirectional SRv6 tunnels to a reply message.
+
+    :param reply: The reply message.
+    :type reply: class: `nb_srv6_manager_pb2.SRv6ManagerReply` or
+                 class: `nb_srv6_manager_pb2.SRv6OperationResult`
+    :param srv6_tunnels: The bidirectional SRv6 tunnels, as dicts.
+    :type srv6_tunnels: list
+    """
+    for tunnel in srv6_tunnels:
+        SRv6BidiTunnel.from_doc(tunnel).fill_nb(
+            reply.srv6_biditunnels.add())
+
+
+# ############################################################################
+# Streams of SRv6 operations
+
+# Entities carried by the operations of a StreamSRv6Operations stream
+SRV6_PATH = 'srv6_path'
+SRV6_BEHAVIOR = 'srv6_behavior'
+SRV6_UNITUNNEL = 'srv6_unitunnel'
+SRV6_BIDITUNNEL = 'srv6_biditunnel'
+SRV6_MICRO_SID = 'srv6_micro_sid'
+
+# Functions adding the entities retrieved by a "get" operation to a reply
+ADD_TO_REPLY = {
+    SRV6_PATH: add_srv6_paths_to_reply,
+    SRV6_BEHAVIOR: add_srv6_behaviors_to_reply,
+    SRV6_UNITUNNEL: add_srv6_unitunnels_to_reply,
+    SRV6_BIDITUNNEL: add_srv6_biditunnels_to_reply
+}
+
+# Entities that can be sent to a node in a single southbound request:
+# class representing the entity, name of the southbound request and of its
+# entities, collection storing the entity
+BATCHABLE = {
+    SRV6_PATH: (SRv6Path, 'srv6_path_request', 'paths', 'srv6_paths'),
+    SRV6_BEHAVIOR: (SRv6Behavior, 'srv6_behavior_request', 'behaviors',
+                    'srv6_behaviors')
+}
+
+# Southbound RPCs used for each operation
+SB_RPCS = {
+    'add': 'Create',
+    'change': 'Update',
+    'del': 'Remove'
+}
+
+
+def get_operation_node(kind, entity):
+    """
+    Return the gRPC address and port of the node targeted by an entity of a
+    StreamSRv6Operations stream (('', -1) if the entity involves multiple
+    nodes).
+
+    :param kind: The kind of the entity (e.g. "srv6_path").
+    :type kind: str
+    :param entity: The entity.
+    :return: A tuple (address, port).
+    :rtype: tuple
+    """
+    if kind in (SRV6_PATH, SRV6_BEHAVIOR):
+        return entity.grpc_address, entity.grpc_port
+    if kind == SRV6_UNITUNNEL:
+        return entity.ingress_ip, entity.ingress_port
+    if kind == SRV6_BIDITUNNEL:
+        return entity.node_l_ip, entity.node_l_port
+    # uSID policies
+    return '', -1
+
+
+def get_batch_key(kind, operation, entity):
+    """
+    Return the key used to group the operations of a stream in a single
+    southbound request, or None if the operation must be performed alone.
+    Only the "add", "change" and "del" operations of Linux SRv6 paths and
+    behaviors without a key can be grouped; when the persistency is
+    enabled, only the "add" operations can be grouped.
+
+    :param kind: The kind of the entity (e.g. "srv6_path").
+    :type kind: str
+    :param operation: The operation (e.g. "add").
+    :type operation: str
+    :param entity: The entity.
+    :type entity: class: `controller.srv6_entities.SRv6Path` or
+                  class: `controller.srv6_entities.SRv6Behavior`
+    :return: A tuple (kind, operation), or None.
+    :rtype: tuple
+    """
+    # pylint: disable=too-many-return-statements
+    if kind not in BATCHABLE:
+        return None
+    if operation not in SB_RPCS:
+        return None
+    # The database must be searched for the entities with a key
+    if entity.key is not None:
+        return None
+    # The node must be specified
+    if entity.grpc_address is None or entity.grpc_port is None:
+        return None
+    # VPP requires a SRv6 policy for each path
+    if entity.fwd_engine not in (None, 'linux'):
+        return None
+    # The "change" and "del" operations must search the database
+    if os.getenv('ENABLE_PERSISTENCY') in ['true', 'True'] and \
+            operation != 'add':
+        return None
+    # Check the mandatory fields
+    if kind == SRV6_PATH:
+        if entity.destination is None:
+            return None
+        if operation == 'add' and entity.segments is None:
+            return None
+    if kind == SRV6_BEHAVIOR:
+        if entity.segment is None:
+            return None
+        if operation == 'add' and entity.action is None:
+            return None
+    return kind, operation
+
+
+class SRv6OperationStream:
+    """
+    A StreamSRv6Operations stream.
+
+    The operations are read by a dedicated thread and queued by target
+    node. The operations of a node are performed in order, while up to
+    "max_workers" nodes are handled concurrently by the executor of the
+    SRv6 Manager. Consecutive SRv6 paths (or behaviors) with the same
+    operation are sent to the node in a single southbound request, up to
+    "batch_size" entities. At most "window" operations are in flight: when
+    the window is full, the stream stops reading the operations until the
+    client consumes the results.
+
+    :param manager: The SRv6 Manager.
+    :type manager: class: `SRv6Manager`
+    :param operations: The operations.
+    :type operations: iterator
+    :param window: Max number of operations in flight (default:
+                   NB_STREAM_WINDOW).
+    :type window: int, optional
+    :param batch_size: Max number of entities sent in a single southbound
+                       request (default: NB_STREAM_BATCH_SIZE).
+    :type batch_size: int, optional
+    """
+
+    # Marks the end of the results
+    _END = object()
+
+    def __init__(self, manager, operations, window=NB_STREAM_WINDOW,
+                 batch_size=NB_STREAM_BATCH_SIZE):
+        self.manager = manager
+        self.operations = operations
+        self.batch_size = max(batch_size, 1)
+        # Operations in flight
+        self._window = threading.Semaphore(max(window, 1))
+        # Results of the operations
+        self._results = queue.Queue()
+        # Operations of each node, waiting to be performed
+        self._queues = dict()
+        # Nodes with a task in the executor
+        self._scheduled = set()
+        # Number of operations read and not yet completed
+        self._pending = 0
+        self._reading = True
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        # Context in which the nodes are handled
+        self._context = None
+
+    def cancel(self):
+        """
+        Stop the stream.
+        """
+        self._cancelled.set()
+        # Wake up the reader and the consumer of the results
+        self._window.release()
+        self._results.put(self._END)
+
+    def _complete(self, results):
+        """
+        Queue the results of some operations.
+        """
+        for result in results:
+            self._results.put(result)
+        with self._lock:
+            self._pending -= len(results)
+            done = not self._reading and self._pending == 0
+        if done:
+            self._results.put(self._END)
+
+    def _read(self):
+        """
+        Read the operations of the stream.
+        """
+        try:
+            for operation in self.operations:
+                # Wait for a free slot in the window
+                self._window.acquire()
+                if self._cancelled.is_set():
+                    break
+                self._dispatch(operation)
+        except Exception:     # pylint: disable=broad-except
+            # e.g. the RPC has been cancelled
+            if not self._cancelled.is_set():
+                logger.exception('Error reading the SRv6 operations')
+        finally:
+            with self._lock:
+                self._reading = False
+                done = self._pending == 0
+            if done:
+                self._results.put(self._END)
+
+    def _dispatch(self, operation):
+        """
+        Queue an operation to its node.
+        """
+        with self._lock:
+            self._pending += 1
+        kind = operation.WhichOneof('entity')
+        if kind is None:
+            # The operation does not carry any entity
+            self._complete([self.manager.execute_operation(operation, None)])
+            return
+        entity = getattr(operation, kind)
+        node = get_operation_node(kind, entity)
+        # The entities that can be grouped are validated once, here, and
+        # sent to the node as they are
+        item, batch_key = None, None
+        if kind in BATCHABLE:
+            try:
+                item = BATCHABLE[kind][0].from_nb(entity)
+            except utils.InvalidArgumentError:
+                # The operation is performed alone, to report the error
+                pass
+            else:
+                batch_key = get_batch_key(kind, entity.operation, item)
+        with self._lock:
+            self._queues.setdefault(node, collections.deque()).append(
+                (operation, batch_key, item))
+            if node in self._scheduled:
+                # The operation will be performed by the task of the node
+                return
+            self._scheduled.add(node)
+        self._schedule(node)
+
+    def _schedule(self, node):
+        """
+        Schedule a task handling the operations of a node.
+        """
+        self.manager.get_executor().submit(self._context.copy().run,
+                                           self._run_node, node)
+
+    def _run_node(self, node):
+        """
+        Perform the next operations of a node.
+        """
+        with self._lock:
+            operations = self._queues[node]
+            # Group the consecutive operations with the same batch key
+            operation, batch_key, item = operations.popleft()
+            batch = [(operation, item)]
+            while batch_key is not None and operations and \
+                    len(batch) < self.batch_size and \
+                    operations[0][1] == batch_key:
+                _operation, _, _item = operations.popleft()
+                batch.append((_operation, _item))
+        requeued = list()
+        if self._cancelled.is_set():
+            results = list()
+        elif batch_key is None:
+            results = [self.manager.execute_operation(
+                operation, self.manager.get_channel(*node))]
+        else:
+            try:
+                results, requeued = self._execute_batch(batch_key, batch,
+                                                        node)
+            except Exception:     # pylint: disable=broad-except
+                logger.exception('Error performing the SRv6 operations')
+                results = [nb_srv6_manager_pb2.SRv6OperationResult(
+                    id=operation.id,
+                    status=nb_commons_pb2.STATUS_INTERNAL_ERROR)
+                    for operation, _ in batch]
+        with self._lock:
+            # The operations not performed are put back in front of the
+            # queue
+            operations.extendleft((operation, batch_key, item)
+                                  for operation, item in reversed(requeued))
+            reschedule = len(operations) > 0 and \
+                not self._cancelled.is_set()
+            if not reschedule:
+                self._scheduled.discard(node)
+        self._complete(results)
+        if reschedule:
+            self._schedule(node)
+
+    def _execute_batch(self, batch_key, batch, node):
+        """
+        Perform a batch of operations in a single southbound request. If
+        the node fails an entity, the entities before it are reported as
+        successful, the entity failed gets the error and the entities
+        after it are returned to be performed again.
+
+        :param batch_key: The batch key (see :func:`get_batch_key`).
+        :type batch_key: tuple
+        :param batch: The operations, as (operation, entity) tuples; the
+                      entities have been validated by the stream.
+        :type batch: list
+        :param node: The gRPC address and port of the node.
+        :type node: tuple
+        :return: A tuple containing the results and the operations not
+                 performed.
+        :rtype: tuple
+        """
+        kind, operation = batch_key
+        _, request_name, entities_name, collection = BATCHABLE[kind]
+        # Create request message
+        request = srv6_manager_pb2.SRv6ManagerRequest()
+        entities_request = getattr(request, request_name)
+        entities_request.fwd_engine = srv6_utils.FwdEngine.LINUX.value
+        entities = getattr(entities_request, entities_name)
+        for _, entity in batch:
+            entity.fill_sb(entities.add())
+        channel = self.manager.get_channel(*node)
+        try:
+            # Get the reference of the stub
+            stub = srv6_manager_pb2_grpc.SRv6ManagerStub(channel)
+            # Perform the operations and get the status code
+            reply = getattr(stub, SB_RPCS[operation])(request)
+            status = reply.status
+            # Number of entities applied before an error
+            applied = len(batch) if status == commons_pb2.STATUS_SUCCESS \
+                else reply.applied
+        except grpc.RpcError as err:
+            # An error occurred during the gRPC operation: the status
+            # applies to all the entities
+            status = srv6_utils.parse_grpc_error(err)
+            return [nb_srv6_manager_pb2.SRv6OperationResult(
+                id=_operation.id,
+                status=nb_utils.sb_status_to_nb_status[status])
+                for _operation, _ in batch], list()
+        results = [nb_srv6_manager_pb2.SRv6OperationResult(
+            id=_operation.id, status=nb_commons_pb2.STATUS_SUCCESS)
+            for _operation, _ in batch[:applied]]
+        # If the persistency is enabled, store the entities added to the
+        # database
+        if operation == 'add' and applied > 0 and \
+                os.getenv('ENABLE_PERSISTENCY') in ['true', 'True']:
+            grpc_address, grpc_port = utils.grpc_chan_to_addr_port(channel)
+            docs = list()
+            for _, entity in batch[:applied]:
+                doc = entity.to_doc()
+                doc.update(grpc_address=grpc_address, grpc_port=grpc_port)
+                docs.append(doc)
+            try:
+                stored = arangodb_driver.insert_documents(
+                    database=self.manager.db_conn,
+                    collection=collection,
+                    documents=docs
+                )
+            except Exception:     # pylint: disable=broad-except
+                logger.exception('Cannot store the entities to the '
+                                 'database')
+                stored = [False] * len(docs)
+            for result, _stored in zip(results, stored):
+                if not _stored:
+                    logger.error('Cannot store the entity of operation %s '
+                                 'to the database', result.id)
+                    result.status = nb_commons_pb2.STATUS_INTERNAL_ERROR
+        if applied < len(batch):
+            # The entity failed gets the error
+            results.append(nb_srv6_manager_pb2.SRv6OperationResult(
+                id=batch[applied][0].id,
+                status=nb_utils.sb_status_to_nb_status[status]))
+        return results, batch[applied + 1:]
+
+    def results(self):
+        """
+        Generator yielding the results of the operations, as soon as the
+        operations complete (not necessarily in the order of the stream).
+        """
+        # The nodes are handled in a copy of the current context, so that
+        # the southbound RPCs are recorded in the trace of the stream
+        self._context = contextvars.copy_context()
+        reader = threading.Thread(target=self._context.copy().run,
+                                  args=(self._read,),
+                                  name='nb-srv6-stream-reader', daemon=True)
+        reader.start()
+        try:
+            while True:
+                result = self._results.get()
+                if result is self._END:
+                    break
+                # Free a slot in the window
+                self._window.release()
+                yield result
+        finally:
+            self.cancel()
+
+
 class SRv6Manager(nb_srv6_manager_pb2_grpc.SRv6ManagerServicer):
     """
     gRPC request handler.
     """
 
-    def __init__(self, db_client=None):
+    def __init__(self, db_client=None, max_workers=NB_MAX_WORKERS,
+                 channel_pool=None, stream_window=NB_STREAM_WINDOW,
+                 stream_batch_size=NB_STREAM_BATCH_SIZE):
         """
         SRv6 Manager init method.
 
         :param db_client: ArangoDB client.
         :type db_client: class: `arango.client.ArangoClient`
+        :param max_workers: Max number of nodes handled concurrently
+                            (default: NB_MAX_WORKERS).
+        :type max_workers: int, optional
+        :param channel_pool: Pool of the channels to the nodes.
+        :type channel_pool: controller.srv6_pm_scheduler.ChannelPool,
+                            optional
+        :param stream_window: Max number of operations of a stream in
+                              flight (default: NB_STREAM_WINDOW).
+        :type stream_window: int, optional
+        :param stream_batch_size: Max number of SRv6 paths (or behaviors)
+                                  of a stream sent in a single southbound
+                                  request (default: NB_STREAM_BATCH_SIZE).
+        :type stream_batch_size: int, optional
         """
+        # pylint: disable=too-many-arguments
+        #
+        # Settings of the StreamSRv6Operations streams
+        self.stream_window = stream_window
+        self.stream_batch_size = stream_batch_size
+        # Handlers of the entities carried by the operations of a stream
+        self._handlers = {
+            SRV6_PATH: self._handle_srv6_path,
+            SRV6_BEHAVIOR: self._handle_srv6_behavior,
+            SRV6_UNITUNNEL: self._handle_srv6_unitunnel,
+            SRV6_BIDITUNNEL: self._handle_srv6_biditunnel,
+            SRV6_MICRO_SID: self._handle_srv6_micro_sid
+        }
+        # Channels to the nodes, kept open and shared by all the requests
+        self.channel_pool = \
+            channel_pool if channel_pool is not None else ChannelPool()
+        # Threads used to handle the nodes of a request, created on first
+        # use and shared by all the requests
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
         # Establish a connection to the "srv6" database
         # We will keep the connection open forever
         self.db_conn = None
@@ -233,592 +780,409 @@ class SRv6Manager(nb_srv6_manager_pb2_grpc.SRv6ManagerServicer):
                 password=os.getenv('ARANGO_PASSWORD')
             )
 
+    def get_channel(self, address, port):
+        """
+        Return the gRPC channel to a node, or None if the address or the
+        port of the node are not specified.
+        """
+        if address == '' or port == -1:
+            return None
+        return self.channel_pool.get(address, port)
+
+    def get_executor(self):
+        """
+        Return the executor used to handle the nodes concurrently.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='nb-srv6-manager')
+            return self._executor
+
+    @staticmethod
+    def execute_item(handler, item, channel):
+        """
+        Perform the operation carried by an item.
+
+        :param handler: Function performing the operation, given the item
+                        and the channel to the node, and returning the
+                        entities retrieved, if any.
+        :type handler: function
+        :param item: The item.
+        :param channel: The gRPC channel to the node.
+        :type channel: class: `grpc._channel.Channel`
+        :return: A tuple (status, entities).
+        :rtype: tuple
+        """
+        entities = None
+        # The "with" block is used to avoid duplicating the error handling
+        # code
+        with srv6_mgr_error_handling() as response:
+            entities = handler(item, channel)
+        return response.status, entities
+
+    def _execute_items(self, items, get_node, handler):
+        """
+        Perform the operations carried by the items of a request. The items
+        are grouped by target node: the items of a node are executed in
+        order, on a channel shared by them, while up to "max_workers" nodes
+        are handled concurrently.
+
+        :param items: The items of the request.
+        :type items: list
+        :param get_node: Function returning the gRPC address and port of the
+                         node targeted by an item.
+        :type get_node: function
+        :param handler: Function performing the operation of an item, given
+                        the item and the channel to the node, and returning
+                        the entities retrieved, if any.
+        :type handler: function
+        :return: A tuple (status, entities) for each item, in the order of
+                 the request.
+        :rtype: list
+        """
+        # Group the items by node, preserving their order
+        groups = dict()
+        for index, item in enumerate(items):
+            groups.setdefault(get_node(item), list()).append(index)
+        # Results of the items
+        results = [None] * len(items)
+
+        def execute_group(node, indexes):
+            # The channel is shared by all the items of the node
+            channel = self.get_channel(*node)
+            for index in indexes:
+                results[index] = self.execute_item(handler, items[index],
+                                                   channel)
+
+        if len(groups) <= 1:
+            # A single node, no need of other threads
+            for node, indexes in groups.items():
+                execute_group(node, indexes)
+            return results
+        # Each node is handled in a copy of the current context, so that
+        # the southbound RPCs are recorded in the trace of the request
+        executor = self.get_executor()
+        pending = [executor.submit(contextvars.copy_context().run,
+                                   execute_group, node, indexes)
+                   for node, indexes in groups.items()]
+        futures.wait(pending)
+        # Raise the unexpected exceptions, if any
+        for future in pending:
+            future.result()
+        return results
+
+    @staticmethod
+    def _build_reply(results):
+        """
+        Create the reply to a request from the results of its items. The
+        status of the reply is the status of the first item failed, if any.
+
+        :param results: A tuple (status, entities) for each item.
+        :type results: list
+        :return: A tuple containing the reply and the list of the entities
+                 retrieved by the items.
+        :rtype: tuple
+        """
+        # Create reply message
+        response = nb_srv6_manager_pb2.SRv6ManagerReply()
+        response.status = nb_commons_pb2.STATUS_SUCCESS
+        entities = list()
+        for status, _entities in results:
+            # Set the status of the item
+            response.item_status.append(status)
+            if response.status == nb_commons_pb2.STATUS_SUCCESS:
+                response.status = status
+            # Collect the entities retrieved by the item
+            if _entities is not None:
+                entities.extend(_entities)
+        return response, entities
+
     def HandleSRv6MicroSIDPolicy(self, request, context):
         """
         Handle a SRv6 uSID policy.
         """
-        # Extract "nodes_lr" from gRPC request
-        nodes_lr = None
-        if request.nodes_lr is not None:
-            nodes_lr = list(request.nodes_lr)
-        # Extract "nodes_rl" from gRPC request
-        nodes_rl = None
-        if request.nodes_rl is not None:
-            nodes_rl = list(request.nodes_rl)
-        # Handle SRv6 uSID policy
-        res = srv6_usid.handle_srv6_usid_policy(
-            operation=request.operation,
-            lr_destination=request.lr_destination,
-            rl_destination=request.rl_destination,
-            nodes_lr=nodes_lr,
-            nodes_rl=nodes_rl,
-            table=request.table,
-            metric=request.metric,
-            _id=request._id,
-            l_grpc_ip=request.l_grpc_ip,
-            l_grpc_port=request.l_grpc_port,
-            l_fwd_engine=grpc_to_py_fwd_engine[request.l_fwd_engine],
-            r_grpc_ip=request.r_grpc_ip,
-            r_grpc_port=request.r_grpc_port,
-            r_fwd_engine=grpc_to_py_fwd_engine[request.r_fwd_engine],
-            decap_sid=request.decap_sid,
-            locator=request.locator,
-            db_conn=self.db_conn
+        # Perform the operations (the uSID policies involve multiple nodes,
+        # so they are not grouped by node)
+        results = self._execute_items(
+            items=request.srv6_micro_sids,
+            get_node=lambda micro_sid: ('', -1),
+            handler=self._handle_srv6_micro_sid
         )
-        if res is not None:  # TODO replace status code with exceptions
-            logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
-        # Create reply message
-        response = nb_srv6_manager_pb2.SRv6ManagerReply()
-        # Set status code
-        response.status = nb_utils.sb_status_to_nb_status[res]
+        # Create reply message, with the status of each uSID policy
+        response, _ = self._build_reply(results)
         # Done, return the reply
         return response
 
+    def _handle_srv6_micro_sid(self, micro_sid, channel):
+        """
+        Handle a SRv6 uSID policy of a northbound request.
+
+        :param micro_sid: The uSID policy.
+        :type micro_sid: class: `nb_srv6_manager_pb2.SRv6MicroSID`
+        :param channel: Not used (the uSID policies involve multiple
+                        nodes).
+        :type channel: class: `grpc._channel.Channel`
+        """
+        # pylint: disable=unused-argument
+        #
+        # Handle SRv6 uSID policy
+        res = srv6_usid.handle_srv6_usid_policy(
+            operation=micro_sid.operation,
+            db_conn=self.db_conn,
+            **SRv6MicroSIDPolicy.from_nb(micro_sid).to_dict()
+        )
+        if res is None:
+            # Invalid arguments
+            raise utils.BadRequestException
+        # Raise an exception if an error occurred
+        utils.raise_exception_on_error(res)
+
+    def _handle_srv6_path(self, srv6_path, channel):
+        """
+        Handle a SRv6 path of a northbound request.
+
+        :param srv6_path: The SRv6 path.
+        :type srv6_path: class: `nb_srv6_manager_pb2.SRv6Path`
+        :param channel: The gRPC channel to the node (None if the node is
+                        not specified).
+        :type channel: class: `grpc._channel.Channel`
+        :return: The SRv6 paths retrieved by a "get" operation.
+        :rtype: list
+        """
+        # Handle SRv6 path
+        return srv6_utils.handle_srv6_path(
+            operation=srv6_path.operation,
+            db_conn=self.db_conn,
+            channel=channel,
+            **srv6_path_to_dict(srv6_path)
+        )
+
     def HandleSRv6Path(self, request, context):
         """
         Handle a SRv6 path.
         """
-        # Iterate on the SRv6 paths
-        srv6_paths = None
-        for srv6_path in request.srv6_paths:
-            # Perform the operation
-            #
-            # The "with" block is used to avoid duplicating the error handling
-            # code
-            with srv6_mgr_error_handling() as response:
-                # Extract the encap mode
-                encapmode = grpc_to_py_encap_mode[srv6_path.encapmode]
-                # Extract the forwarding engine
-                fwd_engine = grpc_to_py_fwd_engine[srv6_path.fwd_engine]
-                if fwd_engine == 'FWD_ENGINE_UNSPEC':
-                    fwd_engine = ''
-                # Handle SRv6 path
-                srv6_paths = srv6_utils.handle_srv6_path(
-                    operation=srv6_path.operation,
-                    grpc_address=(srv6_path.grpc_address
-                                  if srv6_path.grpc_address != '' else None),
-                    grpc_port=(srv6_path.grpc_port
-                               if srv6_path.grpc_port != -1 else None),
-                    destination=(srv6_path.destination
-                                 if srv6_path.destination != '' else None),
-                    segments=(list(srv6_path.segments)
-                              if len(srv6_path.segments) > 0 else None),
-                    device=(srv6_path.device
-                            if srv6_path.device != '' else None),
-                    encapmode=encapmode if encapmode != '' else None,
-                    table=srv6_path.table if srv6_path.table != -1 else None,
-                    metric=(srv6_path.metric
-                            if srv6_path.metric != -1 else None),
-                    bsid_addr=(srv6_path.bsid_addr
-                               if srv6_path.bsid_addr != '' else None),
-                    fwd_engine=fwd_engine if fwd_engine != '' else None,
-                    key=srv6_path.key if srv6_path.key != '' else None,
-                    db_conn=self.db_conn
-                )
-        # If an error occurred, return immediately
-        if response.status != nb_commons_pb2.STATUS_SUCCESS:
-            return response
+        # Perform the operations, grouped by node
+        results = self._execute_items(
+            items=request.srv6_paths,
+            get_node=lambda srv6_path: (srv6_path.grpc_address,
+                                        srv6_path.grpc_port),
+            handler=self._handle_srv6_path
+        )
+        # Create reply message, with the status of each SRv6 path
+        response, srv6_paths = self._build_reply(results)
         # Add the SRv6 paths to the response message
-        if srv6_paths is not None:
-            for path in srv6_paths:
-                # Create a new path
-                _srv6_path = response.srv6_paths.add()
-                # Set gRPC address
-                _srv6_path.grpc_address = ''
-                if path['grpc_address'] is not None:
-                    _srv6_path.grpc_address = path['grpc_address']
-                # Set gRPC port
-                _srv6_path.grpc_port = ''
-                if path['grpc_port'] is not None:
-                    _srv6_path.grpc_port = path['grpc_port']
-                # Set destination
-                _srv6_path.destination = ''
-                if path['destination'] is not None:
-                    _srv6_path.destination = path['destination']
-                # Set segment list
-                if path['segments'] is not None:
-                    _srv6_path.segments.extend(path['segments'])
-                # Set encap mode (e.g. "encap" or "inline")
-                _srv6_path.encapmode = EncapMode.UNSPEC.value
-                if path['encapmode'] is not None:
-                    _srv6_path.encapmode = \
-                        py_to_grpc_encap_mode[path['encapmode']]
-                # Set device
-                _srv6_path.device = ''
-                if path['device'] is not None:
-                    _srv6_path.device = path['device']
-                # Set table ID
-                _srv6_path.table = -1
-                if path['table'] is not None:
-                    _srv6_path.table = path['table']
-                # Set the metric
-                _srv6_path.metric = -1
-                if path['metric'] is not None:
-                    _srv6_path.metric = path['metric']
-                # Set BSID address (required by VPP)
-                _srv6_path.bsid_addr = ''
-                if path['bsid_addr'] is not None:
-                    _srv6_path.bsid_addr = path['bsid_addr']
-                # Set forwarding engine
-                _srv6_path.fwd_engine = FwdEngine.UNSPEC.value
-                if path['fwd_engine'] is not None:
-                    _srv6_path.fwd_engine = \
-                        py_to_grpc_fwd_engine[path['fwd_engine']]
-                # Set key
-                if '_key' in path:
-                    _srv6_path.key = path['_key']
+        add_srv6_paths_to_reply(response, srv6_paths)
         # Done, return the reply
         return response
 
+    def _handle_srv6_behavior(self, srv6_behavior, channel):
+        """
+        Handle a SRv6 behavior of a northbound request.
+
+        :param srv6_behavior: The SRv6 behavior.
+        :type srv6_behavior: class: `nb_srv6_manager_pb2.SRv6Behavior`
+        :param channel: The gRPC channel to the node (None if the node is
+                        not specified).
+        :type channel: class: `grpc._channel.Channel`
+        :return: The SRv6 behaviors retrieved by a "get" operation.
+        :rtype: list
+        """
+        # Handle the behavior
+        return srv6_utils.handle_srv6_behavior(
+            operation=srv6_behavior.operation,
+            db_conn=self.db_conn,
+            channel=channel,
+            **srv6_behavior_to_dict(srv6_behavior)
+        )
+
     def HandleSRv6Behavior(self, request, context):
         """
         Handle a SRv6 behavior.
         """
-        # Iterate on the SRv6 behaviors
-        srv6_behaviors = None
-        for srv6_behavior in request.srv6_behaviors:
-            # Perform the operation
-            #
-            # The "with" block is used to avoid duplicating the error handling
-            # code
-            with srv6_mgr_error_handling() as response:
-                # Extract the SRv6 action
-                action = grpc_to_py_srv6_action[srv6_behavior.action]
-                # Extract the forwarding engine
-                fwd_engine = grpc_to_py_fwd_engine[srv6_behavior.fwd_engine]
-                if fwd_engine == 'FWD_ENGINE_UNSPEC':
-                    fwd_engine = ''
-                # Handle the behavior
-                srv6_behaviors = srv6_utils.handle_srv6_behavior(
-                    operation=srv6_behavior.operation,
-                    grpc_address=(srv6_behavior.grpc_address
-                                  if srv6_behavior.grpc_address != ''
-                                  else None),
-                    grpc_port=(srv6_behavior.grpc_port
-                               if srv6_behavior.grpc_port != -1 else None),
-                    segment=(srv6_behavior.segment
-                             if srv6_behavior.segment != '' else None),
-                    action=action if action != '' else None,
-                    device=(srv6_behavior.device
-                            if srv6_behavior.device != '' else None),
-                    table=(srv6_behavior.table
-                           if srv6_behavior.table != -1 else None),
-                    nexthop=(srv6_behavior.nexthop
-                             if srv6_behavior.nexthop != '' else None),
-                    lookup_table=(srv6_behavior.lookup_table
-                                  if srv6_behavior.lookup_table != -1
-                                  else None),
-                    interface=(srv6_behavior.interface
-                               if srv6_behavior.interface != '' else None),
-                    segments=(list(srv6_behavior.segments)
-                              if len(srv6_behavior.segments) > 0 else None),
-                    metric=(srv6_behavior.metric
-                            if srv6_behavior.metric != -1 else None),
-                    fwd_engine=fwd_engine if fwd_engine != '' else None,
-                    key=(srv6_behavior.key
-                         if srv6_behavior.key != '' else None),
-                    db_conn=self.db_conn
-                )
-        # If an error occurred, return immediately
-        if response.status != nb_commons_pb2.STATUS_SUCCESS:
-            return response
+        # Perform the operations, grouped by node
+        results = self._execute_items(
+            items=request.srv6_behaviors,
+            get_node=lambda srv6_behavior: (srv6_behavior.grpc_address,
+                                            srv6_behavior.grpc_port),
+            handler=self._handle_srv6_behavior
+        )
+        # Create reply message, with the status of each SRv6 behavior
+        response, srv6_behaviors = self._build_reply(results)
         # Add the SRv6 behaviors to the response message
-        if srv6_behaviors is not None:
-            for behavior in srv6_behaviors:
-                # Create a new behavior
-                _srv6_behavior = response.srv6_behaviors.add()
-                # Set gRPC address
-                _srv6_behavior.grpc_address = ''
-                if behavior['grpc_address'] is not None:
-                    _srv6_behavior.grpc_address = behavior['grpc_address']
-                # Set gRPC port
-                _srv6_behavior.grpc_port = ''
-                if behavior['grpc_port'] is not None:
-                    _srv6_behavior.grpc_port = behavior['grpc_port']
-                # Set segment
-                _srv6_behavior.segment = ''
-                if behavior['segment'] is not None:
-                    _srv6_behavior.segment = behavior['segment']
-                # Set SRv6 action (e.g. "End.DT6" or "End.DX4")
-                _srv6_behavior.action = SRv6Action.UNSPEC.value
-                if behavior['action'] is not None:
-                    _srv6_behavior.action = \
-                        py_to_grpc_srv6_action[behavior['action']]
-                # Set nexthop (required by "End.X", "End.DX4" and
-                # "End.DX6")
-                _srv6_behavior.nexthop = ''
-                if behavior['nexthop'] is not None:
-                    _srv6_behavior.nexthop = behavior['nexthop']
-                # Set lookup table (required by "End.T", "End.DT4" and
-                # "End.DT6")
-                _srv6_behavior.lookup_table = -1
-                if behavior['lookup_table'] is not None:
-                    _srv6_behavior.lookup_table = behavior['lookup_table']
-                # Set interface (required by "End.DX2")
-                _srv6_behavior.interface = ''
-                if behavior['interface'] is not None:
-                    _srv6_behavior.interface = behavior['interface']
-                # Set segment list (required by "End.B6" and "End.B6.Encaps")
-                if behavior['segments'] is not None:
-                    _srv6_behavior.segments.extend(behavior['segments'])
-                # Set device
-                _srv6_behavior.device = ''
-                if behavior['device'] is not None:
-                    _srv6_behavior.device = behavior['device']
-                # Set table ID
-                _srv6_behavior.table = -1
-                if behavior['table'] is not None:
-                    _srv6_behavior.table = behavior['table']
-                # Set metric
-                _srv6_behavior.metric = -1
-                if behavior['metric'] is not None:
-                    _srv6_behavior.metric = behavior['metric']
-                # Set forwarding engine (e.g. "Linux" or "VPP")
-                _srv6_behavior.fwd_engine = FwdEngine.UNSPEC.value
-                if behavior['fwd_engine'] is not None:
-                    _srv6_behavior.fwd_engine = \
-                        py_to_grpc_fwd_engine[behavior['fwd_engine']]
-                # Set the key of the behavior
-                if '_key' in behavior:
-                    _srv6_behavior.key = behavior['_key']
+        add_srv6_behaviors_to_reply(response, srv6_behaviors)
         # Done, return the reply
         return response
 
+    def _handle_srv6_unitunnel(self, srv6_tunnel, channel):
+        """
+        Handle a unidirectional SRv6 tunnel of a northbound request.
+
+        :param srv6_tunnel: The tunnel.
+        :type srv6_tunnel: class: `nb_srv6_manager_pb2.SRv6UniTunnel`
+        :param channel: The gRPC channel to the ingress node (None if the
+                        node is not specified).
+        :type channel: class: `grpc._channel.Channel`
+        :return: The tunnels retrieved by a "get" operation.
+        :rtype: list
+        """
+        # Get the gRPC channel to the egress node
+        egress_channel = self.get_channel(srv6_tunnel.egress_ip,
+                                          srv6_tunnel.egress_port)
+        # Validate the tunnel
+        tunnel = SRv6UniTunnel.from_nb(srv6_tunnel).to_dict()
+        # Handle the tunnel
+        if srv6_tunnel.operation == 'add':
+            srv6_utils.create_uni_srv6_tunnel(
+                db_conn=self.db_conn,
+                ingress_channel=channel,
+                egress_channel=egress_channel,
+                **tunnel
+            )
+        elif srv6_tunnel.operation == 'del':
+            # The segments are not required to remove a tunnel
+            del tunnel['segments']
+            srv6_utils.destroy_uni_srv6_tunnel(
+                db_conn=self.db_conn,
+                ingress_channel=channel,
+                egress_channel=egress_channel,
+                **tunnel
+            )
+        elif srv6_tunnel.operation == 'get':
+            return srv6_utils.get_uni_srv6_tunnel(
+                db_conn=self.db_conn,
+                **tunnel
+            )
+        else:
+            logger.error('Invalid operation %s', srv6_tunnel.operation)
+            raise utils.OperationNotSupportedException
+        return None
+
     def HandleSRv6UniTunnel(self, request, context):
         """
         Handle a SRv6 unidirectional tunnel.
         """
-        # Create reply message
-        response = nb_srv6_manager_pb2.SRv6ManagerReply()
-        # Perform the operation
-        srv6_tunnels = None
-        for srv6_tunnel in request.srv6_unitunnels:
-            # The "with" block is used to avoid duplicating the error handling
-            # code
-            with srv6_mgr_error_handling() as response:
-                srv6_tunnels = None
-                # Extract the forwarding engine
-                fwd_engine = grpc_to_py_fwd_engine[srv6_tunnel.fwd_engine]
-                if fwd_engine == 'FWD_ENGINE_UNSPEC':
-                    fwd_engine = ''
-                # Handle the tunnel
-                if srv6_tunnel.operation == 'add':
-                    srv6_utils.create_uni_srv6_tunnel(
-                        ingress_ip=(srv6_tunnel.ingress_ip
-                                    if srv6_tunnel.ingress_ip != ''
-                                    else None),
-                        ingress_port=(srv6_tunnel.ingress_port
-                                      if srv6_tunnel.ingress_port != -1
-                                      else None),
-                        egress_ip=(srv6_tunnel.egress_ip
-                                   if srv6_tunnel.egress_ip != '' else None),
-                        egress_port=(srv6_tunnel.egress_port
-                                     if srv6_tunnel.egress_port != -1
-                                     else None),
-                        destination=(srv6_tunnel.destination
-                                     if srv6_tunnel.destination != ''
-                                     else None),
-                        segments=(list(srv6_tunnel.segments)
-                                  if len(srv6_tunnel.segments) > 0 else None),
-                        localseg=(srv6_tunnel.localseg
-                                  if srv6_tunnel.localseg != '' else None),
-                        bsid_addr=(srv6_tunnel.bsid_addr
-                                   if srv6_tunnel.bsid_addr != '' else None),
-                        fwd_engine=fwd_engine if fwd_engine != '' else None,
-                        key=(srv6_tunnel.key
-                             if srv6_tunnel.key != '' else None),
-                        db_conn=self.db_conn
-                    )
-                elif srv6_tunnel.operation == 'del':
-                    srv6_utils.destroy_uni_srv6_tunnel(
-                        ingress_ip=(srv6_tunnel.ingress_ip
-                                    if srv6_tunnel.ingress_ip != ''
-                                    else None),
-                        ingress_port=(srv6_tunnel.ingress_port
-                                      if srv6_tunnel.ingress_port != -1
-                                      else None),
-                        egress_ip=(srv6_tunnel.egress_ip
-                                   if srv6_tunnel.egress_ip != '' else None),
-                        egress_port=(srv6_tunnel.egress_port
-                                     if srv6_tunnel.egress_port != -1
-                                     else None),
-                        destination=(srv6_tunnel.destination
-                                     if srv6_tunnel.destination != ''
-                                     else None),
-                        localseg=(srv6_tunnel.localseg
-                                  if srv6_tunnel.localseg != '' else None),
-                        bsid_addr=(srv6_tunnel.bsid_addr
-                                   if srv6_tunnel.bsid_addr != '' else None),
-                        fwd_engine=fwd_engine if fwd_engine != '' else None,
-                        key=(srv6_tunnel.key
-                             if srv6_tunnel.key != '' else None),
-                        db_conn=self.db_conn
-                    )
-                elif srv6_tunnel.operation == 'get':
-                    srv6_tunnels = srv6_utils.get_uni_srv6_tunnel(
-                        ingress_ip=(srv6_tunnel.ingress_ip
-                                    if srv6_tunnel.ingress_ip != ''
-                                    else None),
-                        ingress_port=(srv6_tunnel.ingress_port
-                                      if srv6_tunnel.ingress_port != -1
-                                      else None),
-                        egress_ip=(srv6_tunnel.egress_ip
-                                   if srv6_tunnel.egress_ip != '' else None),
-                        egress_port=(srv6_tunnel.egress_port
-                                     if srv6_tunnel.egress_port != -1
-                                     else None),
-                        destination=(srv6_tunnel.destination
-                                     if srv6_tunnel.destination != ''
-                                     else None),
-                        segments=(list(srv6_tunnel.segments)
-                                  if len(srv6_tunnel.segments) > 0 else None),
-                        localseg=(srv6_tunnel.localseg
-                                  if srv6_tunnel.localseg != '' else None),
-                        bsid_addr=(srv6_tunnel.bsid_addr
-                                   if srv6_tunnel.bsid_addr != '' else None),
-                        fwd_engine=fwd_engine if fwd_engine != '' else None,
-                        key=(srv6_tunnel.key
-                             if srv6_tunnel.key != '' else None),
-                        db_conn=self.db_conn
-                    )
-                else:
-                    logger.error('Invalid operation %s', srv6_tunnel.operation)
-                    # Set status code
-                    response.status = \
-                        nb_commons_pb2.STATUS_OPERATION_NOT_SUPPORTED
-                    return response
-        # If an error occurred, return immediately
-        if response.status != nb_commons_pb2.STATUS_SUCCESS:
-            return response
+        # Perform the operations, grouped by ingress node
+        results = self._execute_items(
+            items=request.srv6_unitunnels,
+            get_node=lambda srv6_tunnel: (srv6_tunnel.ingress_ip,
+                                          srv6_tunnel.ingress_port),
+            handler=self._handle_srv6_unitunnel
+        )
+        # Create reply message, with the status of each tunnel
+        response, srv6_tunnels = self._build_reply(results)
         # Add the SRv6 behaviors to the response message
-        if srv6_tunnels is not None:
-            for tunnel in srv6_tunnels:
-                # Create a new tunnel
-                _srv6_unitunnel = response.srv6_unitunnels.add()
-                # Set the gRPC address of the ingress node
-                _srv6_unitunnel.ingress_ip = ''
-                if tunnel['l_grpc_address'] is not None:
-                    _srv6_unitunnel.ingress_ip = tunnel['l_grpc_address']
-                # Set the gRPC port of the ingress node
-                _srv6_unitunnel.ingress_port = -1
-                if tunnel['l_grpc_port'] is not None:
-                    _srv6_unitunnel.ingress_port = tunnel['l_grpc_port']
-                # Set the gRPC address of the egress node
-                _srv6_unitunnel.egress_ip = ''
-                if tunnel['r_grpc_address'] is not None:
-                    _srv6_unitunnel.egress_ip = tunnel['r_grpc_address']
-                # Set the gRPC port of the egress node
-                _srv6_unitunnel.egress_port = -1
-                if tunnel['r_grpc_port'] is not None:
-                    _srv6_unitunnel.egress_port = tunnel['r_grpc_port']
-                # Set the destination
-                _srv6_unitunnel.destination = ''
-                if tunnel['dest_lr'] is not None:
-                    _srv6_unitunnel.destination = tunnel['dest_lr']
-                # Set the segment list
-                if tunnel['sidlist_lr'] is not None:
-                    _srv6_unitunnel.segments.extend(tunnel['sidlist_lr'])
-                # Set local segment for the decap operation
-                _srv6_unitunnel.localseg = ''
-                if tunnel['localseg_lr'] is not None:
-                    _srv6_unitunnel.localseg = tunnel['localseg_lr']
-                # Set the BSID address (required by "VPP")
-                _srv6_unitunnel.bsid_addr = ''
-                if tunnel['bsid_addr'] is not None:
-                    _srv6_unitunnel.bsid_addr = tunnel['bsid_addr']
-                # Set the forwrding engine (e.g. "Linux" or "VPP")
-                _srv6_unitunnel.fwd_engine = FwdEngine.UNSPEC.value
-                if tunnel['fwd_engine'] is not None:
-                    _srv6_unitunnel.fwd_engine = \
-                        py_to_grpc_fwd_engine[tunnel['fwd_engine']]
-                # Set the key of the tunnel
-                if '_key' in tunnel:
-                    _srv6_unitunnel.key = tunnel['_key']
+        add_srv6_unitunnels_to_reply(response, srv6_tunnels)
         # Done, return the reply
         return response
 
+    def _handle_srv6_biditunnel(self, srv6_tunnel, channel):
+        """
+        Handle a bidirectional SRv6 tunnel of a northbound request.
+
+        :param srv6_tunnel: The tunnel.
+        :type srv6_tunnel: class: `nb_srv6_manager_pb2.SRv6BidiTunnel`
+        :param channel: The gRPC channel to the left node (None if the
+                        node is not specified).
+        :type channel: class: `grpc._channel.Channel`
+        :return: The tunnels retrieved by a "get" operation.
+        :rtype: list
+        """
+        # Get the gRPC channel to the right node
+        node_r_channel = self.get_channel(srv6_tunnel.node_r_ip,
+                                          srv6_tunnel.node_r_port)
+        # Validate the tunnel
+        tunnel = SRv6BidiTunnel.from_nb(srv6_tunnel).to_dict()
+        # Handle the tunnel
+        if srv6_tunnel.operation == 'add':
+            srv6_utils.create_srv6_tunnel(
+                db_conn=self.db_conn,
+                node_l_channel=channel,
+                node_r_channel=node_r_channel,
+                **tunnel
+            )
+        elif srv6_tunnel.operation == 'del':
+            # The segment lists are not required to remove a tunnel
+            del tunnel['sidlist_lr']
+            del tunnel['sidlist_rl']
+            srv6_utils.destroy_srv6_tunnel(
+                db_conn=self.db_conn,
+                node_l_channel=channel,
+                node_r_channel=node_r_channel,
+                **tunnel
+            )
+        elif srv6_tunnel.operation == 'get':
+            return srv6_utils.get_srv6_tunnel(
+                db_conn=self.db_conn,
+                **tunnel
+            )
+        else:
+            logger.error('Invalid operation %s', srv6_tunnel.operation)
+            raise utils.OperationNotSupportedException
+        return None
+
     def HandleSRv6BidiTunnel(self, request, context):
         """
         Handle SRv6 bidirectional tunnel.
         """
-        # Create reply message
-        response = nb_srv6_manager_pb2.SRv6ManagerReply()
-        # Perform the operation
-        srv6_tunnels = None
-        for srv6_tunnel in request.srv6_biditunnels:
-            # The "with" block is used to avoid duplicating the error handling
-            # code
-            with srv6_mgr_error_handling() as response:
-                srv6_tunnels = None
-                # Extract the forwarding engine
-                fwd_engine = grpc_to_py_fwd_engine[srv6_tunnel.fwd_engine]
-                if fwd_engine == 'FWD_ENGINE_UNSPEC':
-                    fwd_engine = ''
-                # Handle the tunnel
-                if srv6_tunnel.operation == 'add':
-                    srv6_utils.create_srv6_tunnel(
-                        node_l_ip=(srv6_tunnel.node_l_ip
-                                   if srv6_tunnel.node_l_ip != '' else None),
-                        node_l_port=(srv6_tunnel.node_l_port
-                                     if srv6_tunnel.node_l_port != -1
-                                     else None),
-                        node_r_ip=(srv6_tunnel.node_r_ip
-                                   if srv6_tunnel.node_r_ip != ''
-                                   else None),
-                        node_r_port=(srv6_tunnel.node_r_port
-                                     if srv6_tunnel.node_r_port != -1
-                                     else None),
-                        sidlist_lr=(list(srv6_tunnel.sidlist_lr)
-                                    if len(srv6_tunnel.sidlist_lr) > 0
-                                    else None),
-                        sidlist_rl=(list(srv6_tunnel.sidlist_rl)
-                                    if len(srv6_tunnel.sidlist_rl) > 0
-                                    else None),
-                        dest_lr=(srv6_tunnel.dest_lr
-                                 if srv6_tunnel.dest_lr != '' else None),
-                        dest_rl=(srv6_tunnel.dest_rl
-                                 if srv6_tunnel.dest_rl != '' else None),
-                        localseg_lr=(srv6_tunnel.localseg_lr
-                                     if srv6_tunnel.localseg_lr != ''
-                                     else None),
-                        localseg_rl=(srv6_tunnel.localseg_rl
-                                     if srv6_tunnel.localseg_rl != ''
-                                     else None),
-                        bsid_addr=(srv6_tunnel.bsid_addr
-                                   if srv6_tunnel.bsid_addr != '' else None),
-                        fwd_engine=fwd_engine if fwd_engine != '' else None,
-                        key=(srv6_tunnel.key
-                             if srv6_tunnel.key != '' else None),
-                        db_conn=self.db_conn
-                    )
-                elif srv6_tunnel.operation == 'del':
-                    srv6_utils.destroy_srv6_tunnel(
-                        node_l_ip=(srv6_tunnel.node_l_ip
-                                   if srv6_tunnel.node_l_ip != '' else None),
-                        node_l_port=(srv6_tunnel.node_l_port
-                                     if srv6_tunnel.node_l_port != -1
-                                     else None),
-                        node_r_ip=(srv6_tunnel.node_r_ip
-                                   if srv6_tunnel.node_r_ip != ''
-                                   else None),
-                        node_r_port=(srv6_tunnel.node_r_port
-                                     if srv6_tunnel.node_r_port != -1
-                                     else None),
-                        dest_lr=(srv6_tunnel.dest_lr
-                                 if srv6_tunnel.dest_lr != '' else None),
-                        dest_rl=(srv6_tunnel.dest_rl
-                                 if srv6_tunnel.dest_rl != '' else None),
-                        localseg_lr=(srv6_tunnel.localseg_lr
-                                     if srv6_tunnel.localseg_lr != ''
-                                     else None),
-                        localseg_rl=(srv6_tunnel.localseg_rl
-                                     if srv6_tunnel.localseg_rl != ''
-                                     else None),
-                        bsid_addr=(srv6_tunnel.bsid_addr
-                                   if srv6_tunnel.bsid_addr != '' else None),
-                        fwd_engine=fwd_engine if fwd_engine != '' else None,
-                        key=(srv6_tunnel.key
-                             if srv6_tunnel.key != '' else None),
-                        db_conn=self.db_conn
-                    )
-                elif srv6_tunnel.operation == 'get':
-                    srv6_tunnels = srv6_utils.get_srv6_tunnel(
-                        node_l_ip=(srv6_tunnel.node_l_ip
-                                   if srv6_tunnel.node_l_ip != '' else None),
-                        node_l_port=(srv6_tunnel.node_l_port
-                                     if srv6_tunnel.node_l_port != -1
-                                     else None),
-                        node_r_ip=(srv6_tunnel.node_r_ip
-                                   if srv6_tunnel.node_r_ip != ''
-                                   else None),
-                        node_r_port=(srv6_tunnel.node_r_port
-                                     if srv6_tunnel.node_r_port != -1
-                                     else None),
-                        sidlist_lr=(list(srv6_tunnel.sidlist_lr)
-                                    if len(srv6_tunnel.sidlist_lr) > 0
-                                    else None),
-                        sidlist_rl=(list(srv6_tunnel.sidlist_rl)
-                                    if len(srv6_tunnel.sidlist_rl) > 0
-                                    else None),
-                        dest_lr=(srv6_tunnel.dest_lr
-                                 if srv6_tunnel.dest_lr != '' else None),
-                        dest_rl=(srv6_tunnel.dest_rl
-                                 if srv6_tunnel.dest_rl != '' else None),
-                        localseg_lr=(srv6_tunnel.localseg_lr
-                                     if srv6_tunnel.localseg_lr != ''
-                                     else None),
-                        localseg_rl=(srv6_tunnel.localseg_rl
-                                     if srv6_tunnel.localseg_rl != ''
-                                     else None),
-                        bsid_addr=(srv6_tunnel.bsid_addr
-                                   if srv6_tunnel.bsid_addr != '' else None),
-                        fwd_engine=fwd_engine if fwd_engine != '' else None,
-                        key=(srv6_tunnel.key
-                             if srv6_tunnel.key != '' else None),
-                        db_conn=self.db_conn
-                    )
-                else:
-                    logger.error('Invalid operation %s', srv6_tunnel.operation)
-                    # Set status code
-                    response.status = \
-                        nb_commons_pb2.STATUS_OPERATION_NOT_SUPPORTED
-                    return response
-        # If an error occurred, return immediately
-        if response.status != nb_commons_pb2.STATUS_SUCCESS:
-            return response
+        # Perform the operations, grouped by left node
+        results = self._execute_items(
+            items=request.srv6_biditunnels,
+            get_node=lambda srv6_tunnel: (srv6_tunnel.node_l_ip,
+                                          srv6_tunnel.node_l_port),
+            handler=self._handle_srv6_biditunnel
+        )
+        # Create reply message, with the status of each tunnel
+        response, srv6_tunnels = self._build_reply(results)
         # Add the SRv6 behaviors to the response message
-        if srv6_tunnels is not None:
-            for tunnel in srv6_tunnels:
-                # Create a new tunnel
-                _srv6_biditunnel = response.srv6_biditunnels.add()
-                # Set gRPC address of the left node
-                _srv6_biditunnel.node_l_ip = ''
-                if tunnel['l_grpc_address'] is not None:
-                    _srv6_biditunnel.node_l_ip = tunnel['l_grpc_address']
-                # Set gRPC port of the left node
-                _srv6_biditunnel.node_l_port = -1
-                if tunnel['l_grpc_port'] is not None:
-                    _srv6_biditunnel.node_l_port = tunnel['l_grpc_port']
-                # Set gRPC address of the right node
-                _srv6_biditunnel.node_r_ip = ''
-                if tunnel['node_r_ip'] is not None:
-                    _srv6_biditunnel.node_r_ip = tunnel['node_r_ip']
-                # Set gRPC port of the right node
-                _srv6_biditunnel.node_r_port = -1
-                if tunnel['node_r_port'] is not None:
-                    _srv6_biditunnel.node_r_port = tunnel['node_r_port']
-                # Set the destination for the tunnel right-to-left
-                _srv6_biditunnel.dest_lr = ''
-                if tunnel['dest_lr'] is not None:
-                    _srv6_biditunnel.dest_lr = tunnel['dest_lr']
-                # Set the destination for the tunnel right-to-left
-                _srv6_biditunnel.dest_rl = ''
-                if tunnel['dest_rl'] is not None:
-                    _srv6_biditunnel.dest_rl = tunnel['dest_rl']
-                # Set the segment list for the tunnel left-to-right
-                if tunnel['sidlist_lr'] is not None:
-                    _srv6_biditunnel.sidlist_lr.extend(tunnel['sidlist_lr'])
-                # Set the segment list for the tunnel right-to-left
-                if tunnel['sidlist_rl'] is not None:
-                    _srv6_biditunnel.sidlist_rl.extend(tunnel['sidlist_rl'])
-                # Set the local segment for the tunnel left-to-right
-                _srv6_biditunnel.localseg_lr = ''
-                if tunnel['localseg_lr'] is not None:
-                    _srv6_biditunnel.localseg_lr = tunnel['localseg_lr']
-                # Set the local segment for the tunnel right-to-left
-                _srv6_biditunnel.localseg_rl = ''
-                if tunnel['localseg_rl'] is not None:
-                    _srv6_biditunnel.localseg_rl = tunnel['localseg_rl']
-                # Set the BSID address (required by "VPP")
-                _srv6_biditunnel.bsid_addr = ''
-                if tunnel['bsid_addr'] is not None:
-                    _srv6_biditunnel.bsid_addr = tunnel['bsid_addr']
-                # Set the key of the tunnel
-                if '_key' in tunnel:
-                    _srv6_biditunnel.key = tunnel['_key']
-                # Set the forwarding engine (e.g. "Linux" or "VPP")
-                _srv6_biditunnel.fwd_engine = FwdEngine.UNSPEC.value
-                if tunnel['fwd_engine'] is not None:
-                    _srv6_biditunnel.fwd_engine = py_to_grpc_fwd_engine[tunnel['fwd_engine']]
+        add_srv6_biditunnels_to_reply(response, srv6_tunnels)
         # Done, return the reply
         return response
+
+    def execute_operation(self, operation, channel):
+        """
+        Perform an operation of a StreamSRv6Operations stream.
+
+        :param operation: The operation.
+        :type operation: class: `nb_srv6_manager_pb2.SRv6Operation`
+        :param channel: The gRPC channel to the node.
+        :type channel: class: `grpc._channel.Channel`
+        :return: The result of the operation.
+        :rtype: class: `nb_srv6_manager_pb2.SRv6OperationResult`
+        """
+        result = nb_srv6_manager_pb2.SRv6OperationResult(id=operation.id)
+        kind = operation.WhichOneof('entity')
+        if kind is None:
+            # The operation does not carry any entity
+            result.status = nb_commons_pb2.STATUS_BAD_REQUEST
+            return result
+        try:
+            result.status, entities = self.execute_item(
+                self._handlers[kind], getattr(operation, kind), channel)
+        except Exception:     # pylint: disable=broad-except
+            # A failed operation must not break the stream
+            logger.exception('Operation %s failed', operation.id)
+            result.status = nb_commons_pb2.STATUS_INTERNAL_ERROR
+            return result
+        # Add the entities retrieved by a "get" operation to the result
+        if entities is not None and kind in ADD_TO_REPLY:
+            ADD_TO_REPLY[kind](result, entities)
+        return result
+
+    def StreamSRv6Operations(self, request_iterator, context):
+        """
+        Handle a stream of SRv6 operations (paths, behaviors, tunnels and
+        uSID policies). The result of each operation is streamed back as
+        soon as the operation completes.
+        """
+        stream = SRv6OperationStream(
+            manager=self,
+            operations=request_iterator,
+            window=self.stream_window,
+            batch_size=self.stream_batch_size
+        )
+        # Stop the stream when the RPC is cancelled
+        if context is not None:
+            context.add_callback(stream.cancel)
+        return stream.results()
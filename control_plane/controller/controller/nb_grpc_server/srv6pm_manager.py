@@ -35,11 +35,12 @@ import logging
 import os
 from enum import Enum
 # Proto dependencies
+import commons_pb2
 import nb_commons_pb2
 import srv6pm_manager_pb2
 import srv6pm_manager_pb2_grpc
 # Controller dependencies
-from controller import srv6_pm, utils
+from controller import srv6_pm, srv6_pm_scheduler, utils
 from controller import arangodb_driver
 
 
@@ -47,6 +48,12 @@ from controller import arangodb_driver
 logging.basicConfig(level=logging.NOTSET)
 logger = logging.getLogger(__name__)
 
+# Configuration parameters
+#
+# Controller-side polling of the experiment results
+ENABLE_PM_SCHEDULER = os.getenv('ENABLE_PM_SCHEDULER', 'false')
+ENABLE_PM_SCHEDULER = ENABLE_PM_SCHEDULER.lower() == 'true'
+
 
 # ############################################################################
 # Peformance Measurement driver (PMDriver)
@@ -208,13 +215,27 @@ class SRv6PMManager(srv6pm_manager_pb2_grpc.SRv6PMManagerServicer):
     gRPC request handler.
     """
 
-    def __init__(self, db_client=None):
+    def __init__(self, db_client=None, scheduler=None):
         """
         SRv6-PM Manager init method.
 
         :param db_client: ArangoDB client.
         :type db_client: class: `arango.client.ArangoClient`
+        :param scheduler: Scheduler used to poll the results of the running
+                          experiments. If not provided, a scheduler is
+                          created when ENABLE_PM_SCHEDULER is set.
+        :type scheduler: class: `controller.srv6_pm_scheduler.PMScheduler`
         """
+        # Channels to the sender and reflector nodes, kept open and shared
+        # by all the requests
+        if scheduler is None and ENABLE_PM_SCHEDULER:
+            scheduler = srv6_pm_scheduler.PMScheduler()
+            scheduler.start()
+        self.scheduler = scheduler
+        if scheduler is not None:
+            self.channel_pool = scheduler.channel_pool
+        else:
+            self.channel_pool = srv6_pm_scheduler.ChannelPool()
         # Establish a connection to the "srv6pm" database
         # We will keep the connection open forever
         self.db_conn = None
@@ -226,35 +247,43 @@ class SRv6PMManager(srv6pm_manager_pb2_grpc.SRv6PMManagerServicer):
                 password=os.getenv('ARANGO_PASSWORD')
             )
 
+    def _get_channels(self, request):
+        """
+        Return the gRPC channels to the sender and to the reflector.
+        """
+        return (
+            self.channel_pool.get(request.sender.address,
+                                  request.sender.port),
+            self.channel_pool.get(request.reflector.address,
+                                  request.reflector.port)
+        )
+
     def SetConfiguration(self, request, context):
         """
         Configure sender and reflector nodes for running an experiment.
         """
-        # pylint: disable=invalid-name, unused-argument, no-self-use
+        # pylint: disable=invalid-name, unused-argument
         #
-        # Establish a gRPC connection to the sender and to the reflector
-        with utils.get_grpc_session(request.sender.address,
-                                    request.sender.port) as sender_channel, \
-            utils.get_grpc_session(request.reflector.address,
-                                   request.reflector.port) as refl_channel:
-            # Send the set configuration request
-            logger.debug('Trying to set the experiment configuration')
-            res = srv6_pm.set_configuration(
-                sender_channel=sender_channel,
-                reflector_channel=refl_channel,
-                send_udp_port=request.send_udp_port,
-                refl_udp_port=request.refl_udp_port,
-                interval_duration=request.color_options.interval_duration,
-                delay_margin=request.color_options.delay_margin,
-                number_of_color=request.color_options.number_of_color,
-                pm_driver=request.pm_driver
-            )
-            logger.debug('Configuration installed successfully')
-            # TODO set_configuration should return an exception in case of
-            # error
-            logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
+        # Get the gRPC channels to the sender and to the reflector
+        sender_channel, refl_channel = self._get_channels(request)
+        # Send the set configuration request
+        logger.debug('Trying to set the experiment configuration')
+        res = srv6_pm.set_configuration(
+            sender_channel=sender_channel,
+            reflector_channel=refl_channel,
+            send_udp_port=request.send_udp_port,
+            refl_udp_port=request.refl_udp_port,
+            interval_duration=request.color_options.interval_duration,
+            delay_margin=request.color_options.delay_margin,
+            number_of_color=request.color_options.number_of_color,
+            pm_driver=request.pm_driver
+        )
+        logger.debug('Configuration installed successfully')
+        # TODO set_configuration should return an exception in case of
+        # error
+        logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
         # Done, create a reply
-        return srv6pm_manager_pb2_grpc.SRv6PMManagerReply(
+        return srv6pm_manager_pb2.SRv6PMManagerReply(
             status=nb_commons_pb2.STATUS_SUCCESS
         )
 
@@ -262,25 +291,22 @@ class SRv6PMManager(srv6pm_manager_pb2_grpc.SRv6PMManagerServicer):
         """
         Clear node configuration.
         """
-        # pylint: disable=invalid-name, unused-argument, no-self-use
+        # pylint: disable=invalid-name, unused-argument
         #
-        # Establish a gRPC connection to the sender and to the reflector
-        with utils.get_grpc_session(request.sender.address,
-                                    request.sender.port) as sender_channel, \
-                utils.get_grpc_session(request.reflector.address,
-                                       request.reflector.port) as refl_channel:
-            # Send the reset configuration request
-            logger.debug('Trying to reset the experiment configuration')
-            res = srv6_pm.reset_configuration(
-                sender_channel=sender_channel,
-                reflector_channel=refl_channel
-            )
-            logger.debug('Configuration reset successfully')
-            # TODO reset_configuration should return an exception in case of
-            # error
-            logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
+        # Get the gRPC channels to the sender and to the reflector
+        sender_channel, refl_channel = self._get_channels(request)
+        # Send the reset configuration request
+        logger.debug('Trying to reset the experiment configuration')
+        res = srv6_pm.reset_configuration(
+            sender_channel=sender_channel,
+            reflector_channel=refl_channel
+        )
+        logger.debug('Configuration reset successfully')
+        # TODO reset_configuration should return an exception in case of
+        # error
+        logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
         # Done, create a reply
-        return srv6pm_manager_pb2_grpc.SRv6PMManagerReply(
+        return srv6pm_manager_pb2.SRv6PMManagerReply(
             status=nb_commons_pb2.STATUS_SUCCESS
         )
 
@@ -288,47 +314,56 @@ class SRv6PMManager(srv6pm_manager_pb2_grpc.SRv6PMManagerServicer):
         """
         Start an experiment.
         """
-        # pylint: disable=invalid-name, unused-argument, no-self-use
+        # pylint: disable=invalid-name, unused-argument
         #
-        # Establish a gRPC connection to the sender and to the reflector
-        with utils.get_grpc_session(request.sender.address,
-                                    request.sender.port) as sender_channel, \
-                utils.get_grpc_session(request.reflector.address,
-                                       request.reflector.port) as refl_channel:
-            # Trying to start the experiment
-            logger.debug('Trying to start the experiment')
-            res = srv6_pm.start_experiment(
-                sender_channel=sender_channel,
-                reflector_channel=refl_channel,
-                send_refl_dest=request.send_refl_dest,
-                refl_send_dest=request.refl_send_dest,
-                send_refl_sidlist=list(
-                    request.send_refl_sidlist),
-                refl_send_sidlist=list(
-                    request.refl_send_sidlist),
-                measurement_protocol=grpc_to_py_measurement_protocol(
-                    request.measurement_protocol),
-                measurement_type=grpc_to_py_measurement_type(
-                    request.measurement_type),
-                authentication_mode=grpc_to_py_authentication_mode(
-                    request.authentication_mode),
-                authentication_key=request.authentication_key,
-                timestamp_format=grpc_to_py_timestamp_format(
-                    request.timestamp_format),
-                delay_measurement_mode=grpc_to_py_delay_measurement_mode(
-                    request.delay_measurement_mode),
-                padding_mbz=request.padding_mbz,
-                loss_measurement_mode=grpc_to_py_loss_measurement_mode(
-                    request.loss_measurement_mode),
+        # Get the gRPC channels to the sender and to the reflector
+        sender_channel, refl_channel = self._get_channels(request)
+        # Trying to start the experiment
+        logger.debug('Trying to start the experiment')
+        res = srv6_pm.start_experiment(
+            sender_channel=sender_channel,
+            reflector_channel=refl_channel,
+            send_refl_dest=request.send_refl_dest,
+            refl_send_dest=request.refl_send_dest,
+            send_refl_sidlist=list(
+                request.send_refl_sidlist),
+            refl_send_sidlist=list(
+                request.refl_send_sidlist),
+            measurement_protocol=grpc_to_py_measurement_protocol[
+                request.measurement_protocol],
+            measurement_type=grpc_to_py_measurement_type[
+                request.measurement_type],
+            authentication_mode=grpc_to_py_authentication_mode[
+                request.authentication_mode],
+            authentication_key=request.authentication_key,
+            timestamp_format=grpc_to_py_timestamp_format[
+                request.timestamp_format],
+            delay_measurement_mode=grpc_to_py_delay_measurement_mode[
+                request.delay_measurement_mode],
+            padding_mbz=request.padding_mbz,
+            loss_measurement_mode=grpc_to_py_loss_measurement_mode[
+                request.loss_measurement_mode],
+            measure_id=request.measure_id,
+            send_refl_localseg=request.send_refl_localseg,
+            refl_send_localseg=request.refl_send_localseg,
+            force=request.force)
+        logger.debug('Experiment started successfully')
+        # TODO start_experiment should return an exception in case of error
+        logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
+        # Poll the results of the experiment periodically
+        if self.scheduler is not None and \
+                res == commons_pb2.STATUS_SUCCESS:
+            self.scheduler.register(
                 measure_id=request.measure_id,
-                send_refl_localseg=request.send_refl_localseg,
-                refl_send_localseg=request.refl_send_localseg,
-                force=request.force)
-            logger.debug('Experiment started successfully')
-            # TODO start_experiment should return an exception in case of error
-            logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
+                sender_address=request.sender.address,
+                sender_port=request.sender.port,
+                reflector_address=request.reflector.address,
+                reflector_port=request.reflector.port,
+                send_refl_sidlist=list(request.send_refl_sidlist),
+                refl_send_sidlist=list(request.refl_send_sidlist)
+            )
         # Done, create a reply
-        return srv6pm_manager_pb2_grpc.SRv6PMManagerReply(
+        return srv6pm_manager_pb2.SRv6PMManagerReply(
             status=nb_commons_pb2.STATUS_SUCCESS
         )
 
@@ -336,56 +371,76 @@ class SRv6PMManager(srv6pm_manager_pb2_grpc.SRv6PMManagerServicer):
         """
         Get the results of a running experiment.
         """
-        # pylint: disable=invalid-name, unused-argument, no-self-use
+        # pylint: disable=invalid-name, unused-argument
         #
-        # Establish a gRPC connection to the sender and to the reflector
-        with utils.get_grpc_session(request.sender.address,
-                                    request.sender.port) as sender_channel, \
-                utils.get_grpc_session(request.reflector.address,
-                                       request.reflector.port) as refl_channel:
+        if self.scheduler is not None and \
+                self.scheduler.get_session(request.measure_id) is not None:
+            # The experiment is polled by the scheduler, return the stored
+            # results
+            logger.debug('Returning the results collected by the scheduler')
+            results = self.scheduler.get_results(request.measure_id)
+        else:
+            # Get the gRPC channels to the sender and to the reflector
+            sender_channel, refl_channel = self._get_channels(request)
             # Trying to collect the experiment results
             logger.debug('Trying to collect the experiment results')
-            print(srv6_pm.get_experiment_results(
+            results = srv6_pm.get_experiment_results(
                 sender_channel=sender_channel,
                 reflector_channel=refl_channel,
                 send_refl_sidlist=list(request.send_refl_sidlist),
                 refl_send_sidlist=list(request.refl_send_sidlist)
-            ))
+            )
             logger.debug('Results retrieved successfully')
-            # TODO get_experiment_results should return an exception in case of error
-            # TODO get_experiment_results should return the results instead of printing them
+            # TODO get_experiment_results should return an exception in
+            # case of error
         # Done, create a reply
-        return srv6pm_manager_pb2_grpc.SRv6PMManagerReply(
+        response = srv6pm_manager_pb2.SRv6PMManagerReply(
             status=nb_commons_pb2.STATUS_SUCCESS
         )
+        for result in results or []:
+            data = response.measurement_data.add()
+            data.meas_id = result['measure_id']
+            data.interval = result['interval']
+            data.timestamp = result['timestamp']
+            data.fwColor = result['fw_color']
+            data.rvColor = result['rv_color']
+            data.ssSeqNum = result['sender_seq_num']
+            data.rfSeqNum = result['reflector_seq_num']
+            data.ssTxCounter = result['sender_tx_counter']
+            data.ssRxCounter = result['sender_rx_counter']
+            data.rfTxCounter = result['reflector_tx_counter']
+            data.rfRxCounter = result['reflector_rx_counter']
+        return response
 
     def StopExperiment(self, request, context):
         """
         Stop a running experiment.
         """
-        # pylint: disable=invalid-name, unused-argument, no-self-use
+        # pylint: disable=invalid-name, unused-argument
         #
-        # Establish a gRPC connection to the sender and to the reflector
-        with utils.get_grpc_session(request.sender.address,
-                                    request.sender.port) as sender_channel, \
-                utils.get_grpc_session(request.reflector.address,
-                                       request.reflector.port) as refl_channel:
-            # Trying to stop the experiment
-            logger.debug('Trying to stop the experiment')
-            res = srv6_pm.stop_experiment(
-                sender_channel=sender_channel,
-                reflector_channel=refl_channel,
-                send_refl_dest=request.send_refl_dest,
-                refl_send_dest=request.refl_send_dest,
-                send_refl_sidlist=list(request.send_refl_sidlist),
-                refl_send_sidlist=list(request.refl_send_sidlist),
-                send_refl_localseg=request.send_refl_localseg,
-                refl_send_localseg=request.refl_send_localseg
-            )
-            logger.debug('Experiment stopped successfully')
-            # TODO stop_experiment should return an exception in case of error
-            logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
+        # Get the gRPC channels to the sender and to the reflector
+        sender_channel, refl_channel = self._get_channels(request)
+        # Stop polling the results of the experiment
+        if self.scheduler is not None:
+            self.scheduler.unregister(request.measure_id)
+        # Trying to stop the experiment
+        logger.debug('Trying to stop the experiment')
+        res = srv6_pm.stop_experiment(
+            sender_channel=sender_channel,
+            reflector_channel=refl_channel,
+            send_refl_dest=request.send_refl_dest,
+            refl_send_dest=request.refl_send_dest,
+            send_refl_sidlist=list(request.send_refl_sidlist),
+            refl_send_sidlist=list(request.refl_send_sidlist),
+            send_refl_localseg=request.send_refl_localseg,
+            refl_send_localseg=request.refl_send_localseg
+        )
+        logger.debug('Experiment stopped successfully')
+        # TODO stop_experiment should return an exception in case of error
+        logger.debug('%s\n\n', utils.STATUS_CODE_TO_DESC[res])
+        # Free the data of the loss and delay computation
+        srv6_pm.remove_pm_analytics_session(request.measure_id)
         # Done, create a reply
-        return srv6pm_manager_pb2_grpc.SRv6PMManagerReply(
+        return srv6pm_manager_pb2.SRv6PMManagerReply(
             status=nb_commons_pb2.STATUS_SUCCESS
         )
@@ -31,9 +31,14 @@ control plane functionalities to extract and manage the network topology.
 """
 
 # General imports
+import functools
+import hashlib
+import json
 import logging
 import os
 from enum import Enum
+# gRPC dependencies
+import grpc
 # Proto dependencies
 import nb_commons_pb2
 import topology_manager_pb2
@@ -41,14 +46,23 @@ import topology_manager_pb2_grpc
 # Controller dependencies
 from controller import arangodb_utils
 from controller import arangodb_driver
+from controller import topo_model
+from controller import topo_service
 from controller import topo_utils
 from controller.ti_extraction import connect_and_extract_topology_isis
-from controller.ti_extraction import dump_topo_yaml
 
 # Logger reference
 logging.basicConfig(level=logging.NOTSET)
 logger = logging.getLogger(__name__)
 
+# Configuration parameters
+#
+# Extract the topology only when the IS-IS link-state database changes
+ENABLE_TOPOLOGY_CHANGE_DETECTION = os.getenv(
+    'ENABLE_TOPOLOGY_CHANGE_DETECTION', 'false')
+ENABLE_TOPOLOGY_CHANGE_DETECTION = \
+    ENABLE_TOPOLOGY_CHANGE_DETECTION.lower() == 'true'
+
 
 ''' TODO remove if not used
 # Dict used to convert the python representation of node type to gRPC
@@ -170,8 +184,8 @@ def extract_topology_isis(nodes, password, addrs_config=None,
                     (default: False).
     :type verbose: bool, optional
     :return: Tuple containing two items. The first element is the list of
-             nodes and the second item is the list of edges. Both nodes and
-             edges representation are suitable for exporting to a YAML file.
+             nodes and the second item is the list of edges (see
+             :mod:`controller.topo_model`).
     :rtype: tuple
     """
     # Try to establish a connection to a node in the nodes list and extract
@@ -187,24 +201,127 @@ def extract_topology_isis(nodes, password, addrs_config=None,
     if nodes is None or edges is None or node_to_systemid is None:
         logger.error('Cannot extract topology')
         raise TopoManagerException('Cannot extract topology')
-    # Convert the extracted topology (i.e. nodes and edges) to a intermediate
-    # representation suitable for exporting to a YAML file
-    nodes, edges = dump_topo_yaml(
+    # Build the topology from the extracted nodes and edges
+    nodes, edges = topo_model.build_topology(
         nodes=nodes,
         edges=edges,
         node_to_systemid=node_to_systemid
     )
+    # Index of the nodes by name, shared by the enrichment steps
+    nodes_index = arangodb_utils.index_nodes(nodes)
     # Add IP addresses information
     if addrs_config is not None:
-        arangodb_utils.fill_ip_addresses_from_list(nodes, addrs_config)
+        arangodb_utils.fill_ip_addresses_from_list(nodes, addrs_config,
+                                                   nodes_index)
     # Add hosts information
     if hosts_config is not None:
-        arangodb_utils.add_hosts_from_list(nodes, edges, hosts_config)
-    # Return a representation of nodes and edges suitable for export in YAML
-    # format
+        arangodb_utils.add_hosts_from_list(nodes, edges, hosts_config,
+                                           nodes_index)
+    # Return the nodes and the edges
     return nodes, edges
 
 
+def fill_grpc_node(_node, node):
+    """
+    Fill a gRPC Node message from a node (see
+    :class:`controller.topo_model.TopologyNode`).
+    """
+    # Fill "key" field
+    _node.id = node.key
+    # Fill "ext_reachability" field
+    if node.ext_reachability is not None:
+        _node.ext_reachability = node.ext_reachability
+    # Fill "ip_address" field
+    if node.ip_address is not None:
+        _node.ip_address = node.ip_address
+    # Set node type (e.g. "ROUTER" or "HOST")
+    _node.type = py_to_grpc_node_type[node.type]
+
+
+def fill_grpc_link(_edge, edge):
+    """
+    Fill a gRPC Link message from an edge (see
+    :class:`controller.topo_model.TopologyEdge`).
+    """
+    # Fill "key" field
+    _edge.id = edge.key
+    # Fill "from" field
+    _edge.source = edge.source_id
+    # Fill "to" field
+    _edge.target = edge.target_id
+    # Set edge type (e.g. "CORE" or "EDGE")
+    _edge.type = py_to_grpc_link_type[edge.type]
+
+
+def snapshot_to_grpc(seq, nodes, edges, epoch=None):
+    """
+    Build a SNAPSHOT update for the ExtractAndLoadTopology stream.
+    """
+    response = topology_manager_pb2.TopologyManagerReply(
+        status=nb_commons_pb2.STATUS_SUCCESS,
+        seq=seq,
+        epoch=epoch,
+        update_type=topology_manager_pb2.SNAPSHOT
+    )
+    for node in nodes:
+        fill_grpc_node(response.topology.nodes.add(), node)
+    for edge in edges:
+        fill_grpc_link(response.topology.links.add(), edge)
+    return response
+
+
+def delta_to_grpc(seq, delta, epoch=None):
+    """
+    Build a DELTA update for the ExtractAndLoadTopology stream.
+    """
+    response = topology_manager_pb2.TopologyManagerReply(
+        status=nb_commons_pb2.STATUS_SUCCESS,
+        seq=seq,
+        epoch=epoch,
+        update_type=topology_manager_pb2.DELTA
+    )
+    for node in delta.added_nodes:
+        fill_grpc_node(response.delta.added_nodes.add(), node)
+    for node in delta.changed_nodes:
+        fill_grpc_node(response.delta.changed_nodes.add(), node)
+    response.delta.removed_nodes.extend(delta.removed_nodes)
+    for edge in delta.added_edges:
+        fill_grpc_link(response.delta.added_links.add(), edge)
+    for edge in delta.changed_edges:
+        fill_grpc_link(response.delta.changed_links.add(), edge)
+    response.delta.removed_links.extend(delta.removed_edges)
+    return response
+
+
+def topology_feed_key(request, nodes, addrs_config=None, hosts_config=None):
+    """
+    Return the key of the topology feed serving an ExtractAndLoadTopology
+    request. The streams share the same feed only if they extract the
+    topology with the same parameters; the password is hashed, so that it
+    is not kept in clear in the key.
+
+    :param request: The ExtractAndLoadTopology request.
+    :type request: topology_manager_pb2.TopologyManagerRequest
+    :param nodes: The IS-IS nodes, as "ip-port" strings.
+    :type nodes: list
+    :param addrs_config: The addresses configuration.
+    :type addrs_config: list, optional
+    :param hosts_config: The hosts configuration.
+    :type hosts_config: list, optional
+    :return: The key of the feed.
+    :rtype: tuple
+    """
+    return (
+        request.protocol,
+        tuple(sorted(nodes)),
+        hashlib.sha256(request.password.encode()).hexdigest(),
+        json.dumps(addrs_config, sort_keys=True),
+        json.dumps(hosts_config, sort_keys=True),
+        request.period,
+        request.verbose
+    )
+
+
 class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
     """
     gRPC request handler.
@@ -217,9 +334,17 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
         :param db_client: ArangoDB client.
         :type db_client: class: `arango.client.ArangoClient`
         """
+        # Topology service shared by the ExtractAndLoadTopology streams;
+        # it runs a single extraction loop for each routing domain
+        self.topology_service = topo_service.TopologyService(
+            snapshot_encoder=snapshot_to_grpc,
+            delta_encoder=delta_to_grpc
+        )
         # Establish a connection to the "topology" database
         # We will keep the connection open forever
         self.db_conn = None
+        self.nodes_collection = None
+        self.edges_collection = None
         if db_client is not None:
             self.db_conn = arangodb_driver.connect_db(
                 client=db_client,
@@ -280,30 +405,10 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
                 verbose=request.verbose)
             # Add the nodes to the response message
             for node in nodes:
-                # Add a new node to the response message
-                _node = response.topology.nodes.add()
-                # Fill "key" field
-                _node.id = node['_key']
-                # Fill "ext_reachability" field
-                if 'ext_reachability' in node:
-                    _node.ext_reachability = node['ext_reachability']
-                # Fill "ip_address" field
-                if 'ip_address' in node:
-                    _node.ip_address = node['ip_address']
-                # Set node type (e.g. "ROUTER" or "HOST")
-                _node.type = py_to_grpc_node_type[node['type']]
+                fill_grpc_node(response.topology.nodes.add(), node)
             # Add the edges to the response message
             for edge in edges:
-                # Add a new edge to the response message
-                _edge = response.topology.links.add()
-                # Fill "key" field
-                _edge.id = edge['_key']
-                # Fill "from" field
-                _edge.source = edge['_from']
-                # Fill "to" field
-                _edge.target = edge['_to']
-                # Set edge type (e.g. "CORE" or "EDGE")
-                _edge.type = py_to_grpc_link_type[edge['type']]
+                fill_grpc_link(response.topology.links.add(), edge)
             # Set status code
             response.status = nb_commons_pb2.STATUS_SUCCESS
             # Send the reply
@@ -332,21 +437,21 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
         # Extract the nodes from the gRPC request
         nodes = list()
         for node in request.topology.nodes:
-            nodes.append({
-                '_key': node.id,
-                'ext_reachability': node.ext_reachability,
-                'ip_address': node.ip_address,
-                'type': grpc_to_py_node_type(node.type)
-            })
+            nodes.append(topo_model.TopologyNode(
+                key=node.id,
+                _type=grpc_to_py_node_type[node.type],
+                ip_address=node.ip_address or None,
+                ext_reachability=node.ext_reachability or None
+            ))
         # Extract the edges from the gRPC request
         edges = list()
         for edge in request.topology.links:
-            edges.append({
-                '_key': edge.id,
-                '_from': edge.source,
-                '_to': edge.target,
-                'type': grpc_to_py_link_type(edge.type)
-            })
+            edges.append(topo_model.TopologyEdge(
+                key=edge.id,
+                source=topo_model.node_key(edge.source),
+                target=topo_model.node_key(edge.target),
+                _type=grpc_to_py_link_type[edge.type]
+            ))
         # Load nodes and edges on ArangoDB
         arangodb_utils.load_topo_on_arango(
             arango_url=None,  # FIXME: unused argument, to be fixed
@@ -376,8 +481,6 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
             yield topology_manager_pb2.TopologyManagerReply(
                 status=nb_commons_pb2.STATUS_PERSISTENCY_NOT_ENABLED)
             return
-        # Create the reply message
-        response = topology_manager_pb2.TopologyManagerReply()
         #
         # Extract the parameters from the gRPC request
         #
@@ -415,9 +518,15 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
         if request.protocol == RoutingProtocol.ISIS.value:
             # ISIS protocol
             #
-            # Extract the topology and load it on the Arango database
-            try:
-                for nodes, edges in arangodb_utils.extract_topo_from_isis_and_load_on_arango_stream(
+            # Subscribe to the topology updates. The extraction loop (and
+            # the load on the Arango database) is shared by all the streams
+            # extracting the topology from the same nodes with the same
+            # parameters (see "topology_feed_key()").
+            subscription = self.topology_service.subscribe(
+                key=topology_feed_key(request, nodes, addrs_config,
+                                      hosts_config),
+                stream_factory=functools.partial(
+                    arangodb_utils.extract_topo_from_isis_and_load_on_arango_stream,
                     isis_nodes=nodes,
                     isisd_pwd=request.password,
                     nodes_collection=self.nodes_collection,
@@ -425,49 +534,45 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
                     addrs_config=addrs_config,
                     hosts_config=hosts_config,
                     period=request.period,
-                    verbose=request.verbose
-                ):
-                    # Set the nodes
-                    for node in nodes:
-                        # Add a new node to the response message
-                        _node = response.topology.nodes.add()
-                        # Fill "key" field
-                        _node.id = node['_key']
-                        # Fill "ext_reachability" field
-                        if node.get('ext_reachability') is not None:
-                            _node.ext_reachability = node['ext_reachability']
-                        # Fill "ip_address" field
-                        if node.get('ip_address') is not None:
-                            _node.ip_address = node['ip_address']
-                        # Set node type (e.g. "ROUTER" or "HOST")
-                        _node.type = py_to_grpc_node_type[node['type']]
-                    # Set the edges
-                    for edge in edges:
-                        # Add the edges to the response message
-                        _edge = response.topology.links.add()
-                        # Fill "key" field
-                        _edge.id = edge['_key']
-                        # Fill "from" field
-                        _edge.source = edge['_from']
-                        # Fill "to" field
-                        _edge.target = edge['_to']
-                        # Set edge type (e.g. "CORE" or "EDGE")
-                        _edge.type = py_to_grpc_link_type[edge['type']]
-                    # Set status code
-                    response.status = nb_commons_pb2.STATUS_SUCCESS
-                    # Send the reply
+                    verbose=request.verbose,
+                    change_detection=ENABLE_TOPOLOGY_CHANGE_DETECTION
+                ),
+                resume_from_seq=request.resume_from_seq,
+                resume_epoch=request.resume_epoch
+            )
+            # Unsubscribe when the client goes away
+            if context is not None:
+                context.add_callback(subscription.close)
+            try:
+                # Send a snapshot on the first update (or if the subscriber
+                # is too far behind), then only the deltas; nothing is sent
+                # if the topology has not changed
+                for response in subscription:
                     yield response
-            except arangodb_utils.TopologyExtractionException as err:
+            finally:
+                subscription.close()
+            if subscription.dropped:
+                # The subscriber was too slow and has been dropped; it can
+                # subscribe again with "resume_from_seq" and "resume_epoch"
+                logger.warning('Topology subscriber dropped')
+                if context is not None:
+                    context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                                  'Topology subscriber too slow: subscribe '
+                                  'again with resume_from_seq and '
+                                  'resume_epoch (epoch %s)'
+                                  % subscription.epoch)
+            elif subscription.error is not None:
                 # Something went wrong in topology extraction
-                logger.error('Error in topology extraction: %s', str(err))
-                response.status = nb_commons_pb2.STATUS_INTERNAL_ERROR
-                return response
+                logger.error('Error in topology extraction: %s',
+                             str(subscription.error))
+                yield topology_manager_pb2.TopologyManagerReply(
+                    status=nb_commons_pb2.STATUS_INTERNAL_ERROR)
         else:
             # Unknown or unsupported routing protocol
             logger.error('Unknown/Unsupported routing protocol: %s',
                          grpc_to_py_routing_protocol[request.protocol])
-            response.status = nb_commons_pb2.STATUS_OPERATION_NOT_SUPPORTED
-            return response
+            yield topology_manager_pb2.TopologyManagerReply(
+                status=nb_commons_pb2.STATUS_OPERATION_NOT_SUPPORTED)
 
     def PushNodesConfig(self, request, context):
         """
@@ -476,6 +581,12 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
              locator part of the SID;
         -    usid_id_bits: an integer representing the number of bits in the
              MicroSID identifier part of the SID;
+        -    locators: a list of locators using a uSID format different from
+             the default one, represented as dicts containing the
+             following fields:
+             -    locator: the locator prefix (e.g. fcbb:bbbb:cc00::);
+             -    locator_bits: number of bits in the locator part;
+             -    usid_id_bits: number of bits in the uSID identifier part;
         -    nodes: a list of nodes represented as dicts containing the
              following fields:
              -    name: name of the node;
@@ -491,8 +602,17 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
         nodes_config = {
             'locator_bits': request.nodes_config.locator_bits,
             'usid_id_bits': request.nodes_config.usid_id_bits,
+            'locators': [],
             'nodes': []
         }
+        # Iterate on the locators
+        for locator in request.nodes_config.locators:
+            # Append the locator to the locators list
+            nodes_config['locators'].append({
+                'locator': locator.locator,
+                'locator_bits': locator.locator_bits,
+                'usid_id_bits': locator.usid_id_bits
+            })
         # Iterate on the nodes
         for node in request.nodes_config.nodes:
             # Append the node to the nodes list
@@ -518,6 +638,12 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
              locator part of the SID;
         -    usid_id_bits: an integer representing the number of bits in the
              MicroSID identifier part of the SID;
+        -    locators: a list of locators using a uSID format different from
+             the default one, represented as dicts containing the
+             following fields:
+             -    locator: the locator prefix (e.g. fcbb:bbbb:cc00::);
+             -    locator_bits: number of bits in the locator part;
+             -    usid_id_bits: number of bits in the uSID identifier part;
         -    nodes: a list of nodes represented as dicts containing the
              following fields:
              -    name: name of the node;
@@ -538,6 +664,16 @@ class TopologyManager(topology_manager_pb2_grpc.TopologyManagerServicer):
             response.nodes_config.locator_bits = nodes_config['locator_bits']
             # Set uSID ID bits
             response.nodes_config.usid_id_bits = nodes_config['usid_id_bits']
+            # Iterate on the locators
+            for locator in nodes_config.get('locators', []):
+                # Create a new locator
+                _locator = response.nodes_config.locators.add()
+                # Fill "locator" field
+                _locator.locator = locator['locator']
+                # Fill "locator_bits" field
+                _locator.locator_bits = locator['locator_bits']
+                # Fill "usid_id_bits" field
+                _locator.usid_id_bits = locator['usid_id_bits']
             # Iterate on the nodes
             for node in nodes_config['nodes']:
                 # Create a new node
@@ -0,0 +1,938 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SRv6 entities
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Typed representation of the SRv6 entities (paths, behaviors, tunnels and
+uSID policies).
+
+An entity is validated once, when it is created: the strings and the
+integers are normalized (None for the fields not specified) and the
+forwarding engine and the encap mode are checked. The entity is then
+converted directly to the messages of the northbound and southbound APIs
+and to the documents of the database, through tables computed when the
+module is loaded, without converting the fields again:
+
+* from_nb / fill_nb: northbound messages (nb_srv6_manager_pb2);
+* from_sb / fill_sb: southbound messages (srv6_manager_pb2);
+* from_doc / to_doc: documents of the database (arangodb_driver);
+* to_dict: arguments of the functions of :mod:`controller.srv6_utils`.
+"""
+
+# General imports
+import logging
+
+# Proto dependencies
+import nb_commons_pb2
+import srv6_manager_pb2
+# Controller dependencies
+from controller import utils
+
+# Logger reference
+logger = logging.getLogger(__name__)
+
+# Forwarding engines, as southbound values
+SB_FWD_ENGINES = {
+    'linux': srv6_manager_pb2.FwdEngine.Value('LINUX'),
+    'vpp': srv6_manager_pb2.FwdEngine.Value('VPP'),
+    'p4': srv6_manager_pb2.FwdEngine.Value('P4')
+}
+# Forwarding engine used when it is not specified
+DEFAULT_FWD_ENGINE = 'linux'
+
+# Encap modes ("encap.red" is used by the uSID policies)
+ENCAP_MODES = {'encap', 'inline', 'l2encap', 'encap.red'}
+# Encap mode used when it is not specified
+DEFAULT_ENCAP_MODE = 'encap'
+
+# Northbound values of the forwarding engines
+NB_TO_PY_FWD_ENGINE = {
+    nb_commons_pb2.FwdEngine.Value('FWD_ENGINE_UNSPEC'): None,
+    nb_commons_pb2.FwdEngine.Value('LINUX'): 'linux',
+    nb_commons_pb2.FwdEngine.Value('VPP'): 'vpp'
+}
+PY_TO_NB_FWD_ENGINE = {v: k for k, v in NB_TO_PY_FWD_ENGINE.items()}
+
+# Northbound values of the encap modes
+NB_TO_PY_ENCAP_MODE = {
+    nb_commons_pb2.EncapMode.Value('ENCAP_MODE_UNSPEC'): None,
+    nb_commons_pb2.EncapMode.Value('INLINE'): 'inline',
+    nb_commons_pb2.EncapMode.Value('ENCAP'): 'encap',
+    nb_commons_pb2.EncapMode.Value('L2ENCAP'): 'l2encap'
+}
+PY_TO_NB_ENCAP_MODE = {v: k for k, v in NB_TO_PY_ENCAP_MODE.items()}
+# "encap.red" is reported as "encap" to the northbound clients
+PY_TO_NB_ENCAP_MODE['encap.red'] = PY_TO_NB_ENCAP_MODE['encap']
+
+# Northbound values of the SRv6 actions
+NB_TO_PY_SRV6_ACTION = {
+    nb_commons_pb2.SRv6Action.Value('SRV6_ACTION_UNSPEC'): None,
+    nb_commons_pb2.SRv6Action.Value('END'): 'End',
+    nb_commons_pb2.SRv6Action.Value('END_X'): 'End.X',
+    nb_commons_pb2.SRv6Action.Value('END_T'): 'End.T',
+    nb_commons_pb2.SRv6Action.Value('END_DX4'): 'End.DX4',
+    nb_commons_pb2.SRv6Action.Value('END_DX6'): 'End.DX6',
+    nb_commons_pb2.SRv6Action.Value('END_DX2'): 'End.DX2',
+    nb_commons_pb2.SRv6Action.Value('END_DT4'): 'End.DT4',
+    nb_commons_pb2.SRv6Action.Value('END_DT6'): 'End.DT6',
+    nb_commons_pb2.SRv6Action.Value('END_B6'): 'End.B6',
+    nb_commons_pb2.SRv6Action.Value('END_B6_ENCAPS'): 'End.B6.Encaps'
+}
+PY_TO_NB_SRV6_ACTION = {v: k for k, v in NB_TO_PY_SRV6_ACTION.items()}
+
+# Northbound values not specified
+NB_UNSPEC = 0
+
+
+def _str(value):
+    """
+    Return a string, or None if the value is not specified.
+    """
+    if value is None or value == '':
+        return None
+    return str(value)
+
+
+def _int(value, name):
+    """
+    Return an integer, or None if the value is not specified (None, empty
+    string or -1).
+    """
+    if value is None or value == '' or value == -1:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.error('Invalid %s: %s', name, value)
+        raise utils.InvalidArgumentError
+
+
+def _list(value):
+    """
+    Return a list of strings, or None if the list is not specified or
+    empty.
+    """
+    if not value:
+        return None
+    return [str(item) for item in value]
+
+
+def _fwd_engine(value):
+    """
+    Return a forwarding engine, or None if it is not specified.
+    """
+    if value is None or value == '':
+        return None
+    if value not in SB_FWD_ENGINES:
+        logger.error('Invalid forwarding engine: %s', value)
+        raise utils.InvalidArgumentError
+    return value
+
+
+def _encapmode(value):
+    """
+    Return an encap mode, or None if it is not specified.
+    """
+    if value is None or value == '':
+        return None
+    if value not in ENCAP_MODES:
+        logger.error('Invalid encap mode: %s', value)
+        raise utils.InvalidArgumentError
+    return value
+
+
+def _nb_enum(table, value, name):
+    """
+    Convert the northbound value of an enum.
+    """
+    try:
+        return table[value]
+    except KeyError:
+        logger.error('Invalid %s: %s', name, value)
+        raise utils.InvalidArgumentError
+
+
+class SRv6Entity:
+    """
+    Base class of the SRv6 entities. The fields of an entity are listed in
+    "FIELDS", in the order of the arguments of its constructor.
+    """
+
+    __slots__ = ()
+
+    FIELDS = ()
+
+    def to_dict(self):
+        """
+        Return the fields of the entity as a dict (e.g. the arguments of
+        :func:`controller.srv6_utils.handle_srv6_path`).
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self.FIELDS
+            if getattr(self, name) is not None))
+
+
+class SRv6Path(SRv6Entity):
+    """
+    A SRv6 path.
+
+    :param grpc_address: The IP address of the node.
+    :type grpc_address: str, optional
+    :param grpc_port: The port of the gRPC server running on the node.
+    :type grpc_port: int, optional
+    :param destination: The destination prefix of the path.
+    :type destination: str, optional
+    :param segments: The SID list.
+    :type segments: list, optional
+    :param device: Device of the SRv6 route.
+    :type device: str, optional
+    :param encapmode: The encap mode (e.g. "encap" or "inline").
+    :type encapmode: str, optional
+    :param table: Routing table containing the SRv6 route.
+    :type table: int, optional
+    :param metric: Metric of the SRv6 route.
+    :type metric: int, optional
+    :param bsid_addr: The Binding SID (required by VPP).
+    :type bsid_addr: str, optional
+    :param fwd_engine: The forwarding engine (e.g. "linux" or "vpp").
+    :type fwd_engine: str, optional
+    :param key: The key of the path in the database.
+    :type key: str, optional
+    :raises controller.utils.InvalidArgumentError: If a field is not valid.
+    """
+
+    __slots__ = ('grpc_address', 'grpc_port', 'destination', 'segments',
+                 'device', 'encapmode', 'table', 'metric', 'bsid_addr',
+                 'fwd_engine', 'key')
+
+    FIELDS = __slots__
+
+    def __init__(self, grpc_address=None, grpc_port=None, destination=None,
+                 segments=None, device=None, encapmode=None, table=None,
+                 metric=None, bsid_addr=None, fwd_engine=None, key=None):
+        # pylint: disable=too-many-arguments
+        self.grpc_address = _str(grpc_address)
+        self.grpc_port = _int(grpc_port, 'gRPC port')
+        self.destination = _str(destination)
+        self.segments = _list(segments)
+        self.device = _str(device)
+        self.encapmode = _encapmode(encapmode)
+        self.table = _int(table, 'table')
+        self.metric = _int(metric, 'metric')
+        self.bsid_addr = _str(bsid_addr)
+        self.fwd_engine = _fwd_engine(fwd_engine)
+        self.key = _str(key)
+
+    @property
+    def sb_fwd_engine(self):
+        """
+        The southbound value of the forwarding engine (Linux if it is not
+        specified).
+        """
+        return SB_FWD_ENGINES[self.fwd_engine or DEFAULT_FWD_ENGINE]
+
+    @classmethod
+    def from_nb(cls, path):
+        """
+        Create a SRv6 path from a northbound message.
+
+        :param path: The SRv6 path.
+        :type path: class: `nb_srv6_manager_pb2.SRv6Path`
+        :rtype: class: `SRv6Path`
+        """
+        # The fields of the message are already typed: only the enums are
+        # converted, without validating the other fields again
+        self = cls.__new__(cls)
+        self.grpc_address = path.grpc_address or None
+        self.grpc_port = path.grpc_port if path.grpc_port != -1 else None
+        self.destination = path.destination or None
+        self.segments = list(path.segments) or None
+        self.device = path.device or None
+        self.encapmode = _nb_enum(NB_TO_PY_ENCAP_MODE, path.encapmode,
+                                  'encap mode')
+        self.table = path.table if path.table != -1 else None
+        self.metric = path.metric if path.metric != -1 else None
+        self.bsid_addr = path.bsid_addr or None
+        self.fwd_engine = _nb_enum(NB_TO_PY_FWD_ENGINE, path.fwd_engine,
+                                   'forwarding engine')
+        self.key = path.key or None
+        return self
+
+    @classmethod
+    def from_sb(cls, path):
+        """
+        Create a SRv6 path from a southbound message (e.g. a path returned
+        by a node).
+
+        :param path: The SRv6 path.
+        :type path: class: `srv6_manager_pb2.SRv6Path`
+        :rtype: class: `SRv6Path`
+        """
+        return cls(
+            destination=path.destination,
+            segments=[segment.segment for segment in path.sr_path],
+            device=path.device,
+            encapmode=path.encapmode,
+            table=path.table,
+            metric=path.metric,
+            bsid_addr=path.bsid_addr
+        )
+
+    @classmethod
+    def from_doc(cls, doc):
+        """
+        Create a SRv6 path from a document of the "srv6_paths" collection
+        (or a dict with the same fields).
+
+        :param doc: The SRv6 path.
+        :type doc: dict
+        :rtype: class: `SRv6Path`
+        """
+        # The documents are written by "to_doc", from a validated entity
+        self = cls.__new__(cls)
+        get = doc.get
+        self.grpc_address = get('grpc_address')
+        self.grpc_port = get('grpc_port')
+        self.destination = get('destination')
+        self.segments = get('segments')
+        self.device = get('device')
+        self.encapmode = get('encapmode')
+        self.table = get('table')
+        self.metric = get('metric')
+        self.bsid_addr = get('bsid_addr')
+        self.fwd_engine = get('fwd_engine')
+        self.key = get('_key')
+        return self
+
+    def fill_sb(self, path):
+        """
+        Fill a southbound SRv6 path. The encap mode defaults to "encap",
+        the device, the table and the metric are chosen by the node.
+
+        :param path: The SRv6 path to fill (an empty message, the strings
+                     not specified are left to their default).
+        :type path: class: `srv6_manager_pb2.SRv6Path`
+        """
+        if self.destination is not None:
+            path.destination = self.destination
+        if self.device is not None:
+            path.device = self.device
+        path.table = self.table if self.table is not None else -1
+        path.metric = self.metric if self.metric is not None else -1
+        if self.bsid_addr is not None:
+            path.bsid_addr = self.bsid_addr
+        path.encapmode = self.encapmode or DEFAULT_ENCAP_MODE
+        if self.segments is not None:
+            add_segment = path.sr_path.add
+            for segment in self.segments:
+                add_segment().segment = segment
+
+    def fill_nb(self, path):
+        """
+        Fill a northbound SRv6 path.
+
+        :param path: The SRv6 path to fill (an empty message, the fields
+                     not specified are left to their default).
+        :type path: class: `nb_srv6_manager_pb2.SRv6Path`
+        """
+        if self.grpc_address is not None:
+            path.grpc_address = self.grpc_address
+        path.grpc_port = self.grpc_port if self.grpc_port is not None else -1
+        if self.destination is not None:
+            path.destination = self.destination
+        if self.segments is not None:
+            path.segments.extend(self.segments)
+        if self.device is not None:
+            path.device = self.device
+        if self.encapmode is not None:
+            path.encapmode = PY_TO_NB_ENCAP_MODE[self.encapmode]
+        path.table = self.table if self.table is not None else -1
+        path.metric = self.metric if self.metric is not None else -1
+        if self.bsid_addr is not None:
+            path.bsid_addr = self.bsid_addr
+        if self.fwd_engine is not None:
+            path.fwd_engine = PY_TO_NB_FWD_ENGINE[self.fwd_engine]
+        if self.key is not None:
+            path.key = self.key
+
+    def to_doc(self):
+        """
+        Return the document of the "srv6_paths" collection representing the
+        path.
+
+        :rtype: dict
+        """
+        doc = {
+            'grpc_address': self.grpc_address,
+            'grpc_port': self.grpc_port,
+            'destination': self.destination,
+            'segments': self.segments,
+            'device': self.device,
+            'encapmode': self.encapmode,
+            'table': self.table,
+            'metric': self.metric,
+            'bsid_addr': self.bsid_addr,
+            'fwd_engine': self.fwd_engine
+        }
+        if self.key is not None:
+            doc['_key'] = self.key
+        return doc
+
+
+class SRv6Behavior(SRv6Entity):
+    """
+    A SRv6 behavior.
+
+    :param grpc_address: The IP address of the node.
+    :type grpc_address: str, optional
+    :param grpc_port: The port of the gRPC server running on the node.
+    :type grpc_port: int, optional
+    :param segment: The local segment of the behavior.
+    :type segment: str, optional
+    :param action: The SRv6 action (e.g. "End" or "End.DT6").
+    :type action: str, optional
+    :param device: Device of the SRv6 route.
+    :type device: str, optional
+    :param table: Routing table containing the SRv6 route.
+    :type table: int, optional
+    :param nexthop: The nexthop of the cross-connect actions (e.g.
+                    "End.DX4").
+    :type nexthop: str, optional
+    :param lookup_table: The lookup table of the decap actions (e.g.
+                         "End.DT6").
+    :type lookup_table: int, optional
+    :param interface: The outgoing interface of the "End.DX2" action.
+    :type interface: str, optional
+    :param segments: The SID list of the binding SID actions (e.g.
+                     "End.B6").
+    :type segments: list, optional
+    :param metric: Metric of the SRv6 route.
+    :type metric: int, optional
+    :param fwd_engine: The forwarding engine (e.g. "linux" or "vpp").
+    :type fwd_engine: str, optional
+    :param key: The key of the behavior in the database.
+    :type key: str, optional
+    :raises controller.utils.InvalidArgumentError: If a field is not valid.
+    """
+
+    __slots__ = ('grpc_address', 'grpc_port', 'segment', 'action', 'device',
+                 'table', 'nexthop', 'lookup_table', 'interface', 'segments',
+                 'metric', 'fwd_engine', 'key')
+
+    FIELDS = __slots__
+
+    def __init__(self, grpc_address=None, grpc_port=None, segment=None,
+                 action=None, device=None, table=None, nexthop=None,
+                 lookup_table=None, interface=None, segments=None,
+                 metric=None, fwd_engine=None, key=None):
+        # pylint: disable=too-many-arguments
+        self.grpc_address = _str(grpc_address)
+        self.grpc_port = _int(grpc_port, 'gRPC port')
+        self.segment = _str(segment)
+        self.action = _str(action)
+        self.device = _str(device)
+        self.table = _int(table, 'table')
+        self.nexthop = _str(nexthop)
+        self.lookup_table = _int(lookup_table, 'lookup table')
+        self.interface = _str(interface)
+        self.segments = _list(segments)
+        self.metric = _int(metric, 'metric')
+        self.fwd_engine = _fwd_engine(fwd_engine)
+        self.key = _str(key)
+
+    @property
+    def sb_fwd_engine(self):
+        """
+        The southbound value of the forwarding engine (Linux if it is not
+        specified).
+        """
+        return SB_FWD_ENGINES[self.fwd_engine or DEFAULT_FWD_ENGINE]
+
+    @classmethod
+    def from_nb(cls, behavior):
+        """
+        Create a SRv6 behavior from a northbound message.
+
+        :param behavior: The SRv6 behavior.
+        :type behavior: class: `nb_srv6_manager_pb2.SRv6Behavior`
+        :rtype: class: `SRv6Behavior`
+        """
+        # The fields of the message are already typed: only the enums are
+        # converted, without validating the other fields again
+        self = cls.__new__(cls)
+        self.grpc_address = behavior.grpc_address or None
+        self.grpc_port = \
+            behavior.grpc_port if behavior.grpc_port != -1 else None
+        self.segment = behavior.segment or None
+        self.action = _nb_enum(NB_TO_PY_SRV6_ACTION, behavior.action,
+                               'SRv6 action')
+        self.device = behavior.device or None
+        self.table = behavior.table if behavior.table != -1 else None
+        self.nexthop = behavior.nexthop or None
+        self.lookup_table = \
+            behavior.lookup_table if behavior.lookup_table != -1 else None
+        self.interface = behavior.interface or None
+        self.segments = list(behavior.segments) or None
+        self.metric = behavior.metric if behavior.metric != -1 else None
+        self.fwd_engine = _nb_enum(NB_TO_PY_FWD_ENGINE, behavior.fwd_engine,
+                                   'forwarding engine')
+        self.key = behavior.key or None
+        return self
+
+    @classmethod
+    def from_sb(cls, behavior):
+        """
+        Create a SRv6 behavior from a southbound message (e.g. a behavior
+        returned by a node).
+
+        :param behavior: The SRv6 behavior.
+        :type behavior: class: `srv6_manager_pb2.SRv6Behavior`
+        :rtype: class: `SRv6Behavior`
+        """
+        return cls(
+            segment=behavior.segment,
+            action=behavior.action,
+            device=behavior.device,
+            table=behavior.table,
+            nexthop=behavior.nexthop,
+            lookup_table=behavior.lookup_table,
+            interface=behavior.interface,
+            segments=[segment.segment for segment in behavior.segs],
+            metric=behavior.metric
+        )
+
+    @classmethod
+    def from_doc(cls, doc):
+        """
+        Create a SRv6 behavior from a document of the "srv6_behaviors"
+        collection (or a dict with the same fields).
+
+        :param doc: The SRv6 behavior.
+        :type doc: dict
+        :rtype: class: `SRv6Behavior`
+        """
+        # The documents are written by "to_doc", from a validated entity
+        self = cls.__new__(cls)
+        get = doc.get
+        self.grpc_address = get('grpc_address')
+        self.grpc_port = get('grpc_port')
+        self.segment = get('segment')
+        self.action = get('action')
+        self.device = get('device')
+        self.table = get('table')
+        self.nexthop = get('nexthop')
+        self.lookup_table = get('lookup_table')
+        self.interface = get('interface')
+        self.segments = get('segments')
+        self.metric = get('metric')
+        self.fwd_engine = get('fwd_engine')
+        self.key = get('_key')
+        return self
+
+    def fill_sb(self, behavior):
+        """
+        Fill a southbound SRv6 behavior.
+
+        :param behavior: The SRv6 behavior to fill (an empty message, the
+                         strings not specified are left to their default).
+        :type behavior: class: `srv6_manager_pb2.SRv6Behavior`
+        """
+        if self.segment is not None:
+            behavior.segment = self.segment
+        if self.action is not None:
+            behavior.action = self.action
+        if self.device is not None:
+            behavior.device = self.device
+        behavior.table = self.table if self.table is not None else -1
+        behavior.metric = self.metric if self.metric is not None else -1
+        if self.nexthop is not None:
+            behavior.nexthop = self.nexthop
+        behavior.lookup_table = \
+            self.lookup_table if self.lookup_table is not None else -1
+        if self.interface is not None:
+            behavior.interface = self.interface
+        if self.segments is not None:
+            add_segment = behavior.segs.add
+            for segment in self.segments:
+                add_segment().segment = segment
+
+    def fill_nb(self, behavior):
+        """
+        Fill a northbound SRv6 behavior.
+
+        :param behavior: The SRv6 behavior to fill (an empty message, the
+                         fields not specified are left to their default).
+        :type behavior: class: `nb_srv6_manager_pb2.SRv6Behavior`
+        """
+        if self.grpc_address is not None:
+            behavior.grpc_address = self.grpc_address
+        behavior.grpc_port = \
+            self.grpc_port if self.grpc_port is not None else -1
+        if self.segment is not None:
+            behavior.segment = self.segment
+        if self.action is not None:
+            behavior.action = PY_TO_NB_SRV6_ACTION[self.action]
+        if self.device is not None:
+            behavior.device = self.device
+        behavior.table = self.table if self.table is not None else -1
+        if self.nexthop is not None:
+            behavior.nexthop = self.nexthop
+        behavior.lookup_table = \
+            self.lookup_table if self.lookup_table is not None else -1
+        if self.interface is not None:
+            behavior.interface = self.interface
+        if self.segments is not None:
+            behavior.segments.extend(self.segments)
+        behavior.metric = self.metric if self.metric is not None else -1
+        if self.fwd_engine is not None:
+            behavior.fwd_engine = PY_TO_NB_FWD_ENGINE[self.fwd_engine]
+        if self.key is not None:
+            behavior.key = self.key
+
+    def to_doc(self):
+        """
+        Return the document of the "srv6_behaviors" collection representing
+        the behavior.
+
+        :rtype: dict
+        """
+        doc = {
+            'grpc_address': self.grpc_address,
+            'grpc_port': self.grpc_port,
+            'segment': self.segment,
+            'action': self.action,
+            'device': self.device,
+            'table': self.table,
+            'nexthop': self.nexthop,
+            'lookup_table': self.lookup_table,
+            'interface': self.interface,
+            'segments': self.segments,
+            'metric': self.metric,
+            'fwd_engine': self.fwd_engine
+        }
+        if self.key is not None:
+            doc['_key'] = self.key
+        return doc
+
+
+class SRv6UniTunnel(SRv6Entity):
+    """
+    A unidirectional SRv6 tunnel, from an ingress node to an egress node.
+    The fields are the arguments of
+    :func:`controller.srv6_utils.create_uni_srv6_tunnel`.
+
+    :raises controller.utils.InvalidArgumentError: If a field is not valid.
+    """
+
+    __slots__ = ('ingress_ip', 'ingress_port', 'egress_ip', 'egress_port',
+                 'destination', 'segments', 'localseg', 'bsid_addr',
+                 'fwd_engine', 'key')
+
+    FIELDS = __slots__
+
+    def __init__(self, ingress_ip=None, ingress_port=None, egress_ip=None,
+                 egress_port=None, destination=None, segments=None,
+                 localseg=None, bsid_addr=None, fwd_engine=None, key=None):
+        # pylint: disable=too-many-arguments
+        self.ingress_ip = _str(ingress_ip)
+        self.ingress_port = _int(ingress_port, 'gRPC port')
+        self.egress_ip = _str(egress_ip)
+        self.egress_port = _int(egress_port, 'gRPC port')
+        self.destination = _str(destination)
+        self.segments = _list(segments)
+        self.localseg = _str(localseg)
+        self.bsid_addr = _str(bsid_addr)
+        self.fwd_engine = _fwd_engine(fwd_engine)
+        self.key = _str(key)
+
+    @classmethod
+    def from_nb(cls, tunnel):
+        """
+        Create a tunnel from a northbound message.
+
+        :param tunnel: The tunnel.
+        :type tunnel: class: `nb_srv6_manager_pb2.SRv6UniTunnel`
+        :rtype: class: `SRv6UniTunnel`
+        """
+        return cls(
+            ingress_ip=tunnel.ingress_ip,
+            ingress_port=tunnel.ingress_port,
+            egress_ip=tunnel.egress_ip,
+            egress_port=tunnel.egress_port,
+            destination=tunnel.destination,
+            segments=tunnel.segments,
+            localseg=tunnel.localseg,
+            bsid_addr=tunnel.bsid_addr,
+            fwd_engine=_nb_enum(NB_TO_PY_FWD_ENGINE, tunnel.fwd_engine,
+                                'forwarding engine'),
+            key=tunnel.key
+        )
+
+    @classmethod
+    def from_doc(cls, doc):
+        """
+        Create a tunnel from a document of the "srv6_tunnels" collection.
+
+        :param doc: The tunnel.
+        :type doc: dict
+        :rtype: class: `SRv6UniTunnel`
+        """
+        return cls(
+            ingress_ip=doc.get('l_grpc_address'),
+            ingress_port=doc.get('l_grpc_port'),
+            egress_ip=doc.get('r_grpc_address'),
+            egress_port=doc.get('r_grpc_port'),
+            destination=doc.get('dest_lr'),
+            segments=doc.get('sidlist_lr'),
+            localseg=doc.get('localseg_lr'),
+            bsid_addr=doc.get('bsid_addr'),
+            fwd_engine=doc.get('fwd_engine'),
+            key=doc.get('_key')
+        )
+
+    def fill_nb(self, tunnel):
+        """
+        Fill a northbound tunnel.
+
+        :param tunnel: The tunnel to fill.
+        :type tunnel: class: `nb_srv6_manager_pb2.SRv6UniTunnel`
+        """
+        tunnel.ingress_ip = self.ingress_ip or ''
+        tunnel.ingress_port = \
+            self.ingress_port if self.ingress_port is not None else -1
+        tunnel.egress_ip = self.egress_ip or ''
+        tunnel.egress_port = \
+            self.egress_port if self.egress_port is not None else -1
+        tunnel.destination = self.destination or ''
+        if self.segments is not None:
+            tunnel.segments.extend(self.segments)
+        tunnel.localseg = self.localseg or ''
+        tunnel.bsid_addr = self.bsid_addr or ''
+        tunnel.fwd_engine = PY_TO_NB_FWD_ENGINE.get(self.fwd_engine, NB_UNSPEC)
+        tunnel.key = self.key or ''
+
+
+class SRv6BidiTunnel(SRv6Entity):
+    """
+    A bidirectional SRv6 tunnel, between a left node and a right node.
+    The fields are the arguments of
+    :func:`controller.srv6_utils.create_srv6_tunnel`.
+
+    :raises controller.utils.InvalidArgumentError: If a field is not valid.
+    """
+
+    __slots__ = ('node_l_ip', 'node_l_port', 'node_r_ip', 'node_r_port',
+                 'sidlist_lr', 'sidlist_rl', 'dest_lr', 'dest_rl',
+                 'localseg_lr', 'localseg_rl', 'bsid_addr', 'fwd_engine',
+                 'key')
+
+    FIELDS = __slots__
+
+    def __init__(self, node_l_ip=None, node_l_port=None, node_r_ip=None,
+                 node_r_port=None, sidlist_lr=None, sidlist_rl=None,
+                 dest_lr=None, dest_rl=None, localseg_lr=None,
+                 localseg_rl=None, bsid_addr=None, fwd_engine=None,
+                 key=None):
+        # pylint: disable=too-many-arguments
+        self.node_l_ip = _str(node_l_ip)
+        self.node_l_port = _int(node_l_port, 'gRPC port')
+        self.node_r_ip = _str(node_r_ip)
+        self.node_r_port = _int(node_r_port, 'gRPC port')
+        self.sidlist_lr = _list(sidlist_lr)
+        self.sidlist_rl = _list(sidlist_rl)
+        self.dest_lr = _str(dest_lr)
+        self.dest_rl = _str(dest_rl)
+        self.localseg_lr = _str(localseg_lr)
+        self.localseg_rl = _str(localseg_rl)
+        self.bsid_addr = _str(bsid_addr)
+        self.fwd_engine = _fwd_engine(fwd_engine)
+        self.key = _str(key)
+
+    @classmethod
+    def from_nb(cls, tunnel):
+        """
+        Create a tunnel from a northbound message.
+
+        :param tunnel: The tunnel.
+        :type tunnel: class: `nb_srv6_manager_pb2.SRv6BidiTunnel`
+        :rtype: class: `SRv6BidiTunnel`
+        """
+        return cls(
+            node_l_ip=tunnel.node_l_ip,
+            node_l_port=tunnel.node_l_port,
+            node_r_ip=tunnel.node_r_ip,
+            node_r_port=tunnel.node_r_port,
+            sidlist_lr=tunnel.sidlist_lr,
+            sidlist_rl=tunnel.sidlist_rl,
+            dest_lr=tunnel.dest_lr,
+            dest_rl=tunnel.dest_rl,
+            localseg_lr=tunnel.localseg_lr,
+            localseg_rl=tunnel.localseg_rl,
+            bsid_addr=tunnel.bsid_addr,
+            fwd_engine=_nb_enum(NB_TO_PY_FWD_ENGINE, tunnel.fwd_engine,
+                                'forwarding engine'),
+            key=tunnel.key
+        )
+
+    @classmethod
+    def from_doc(cls, doc):
+        """
+        Create a tunnel from a document of the "srv6_tunnels" collection.
+
+        :param doc: The tunnel.
+        :type doc: dict
+        :rtype: class: `SRv6BidiTunnel`
+        """
+        return cls(
+            node_l_ip=doc.get('l_grpc_address'),
+            node_l_port=doc.get('l_grpc_port'),
+            node_r_ip=doc.get('r_grpc_address'),
+            node_r_port=doc.get('r_grpc_port'),
+            sidlist_lr=doc.get('sidlist_lr'),
+            sidlist_rl=doc.get('sidlist_rl'),
+            dest_lr=doc.get('dest_lr'),
+            dest_rl=doc.get('dest_rl'),
+            localseg_lr=doc.get('localseg_lr'),
+            localseg_rl=doc.get('localseg_rl'),
+            bsid_addr=doc.get('bsid_addr'),
+            fwd_engine=doc.get('fwd_engine'),
+            key=doc.get('_key')
+        )
+
+    def fill_nb(self, tunnel):
+        """
+        Fill a northbound tunnel.
+
+        :param tunnel: The tunnel to fill.
+        :type tunnel: class: `nb_srv6_manager_pb2.SRv6BidiTunnel`
+        """
+        tunnel.node_l_ip = self.node_l_ip or ''
+        tunnel.node_l_port = \
+            self.node_l_port if self.node_l_port is not None else -1
+        tunnel.node_r_ip = self.node_r_ip or ''
+        tunnel.node_r_port = \
+            self.node_r_port if self.node_r_port is not None else -1
+        if self.sidlist_lr is not None:
+            tunnel.sidlist_lr.extend(self.sidlist_lr)
+        if self.sidlist_rl is not None:
+            tunnel.sidlist_rl.extend(self.sidlist_rl)
+        tunnel.dest_lr = self.dest_lr or ''
+        tunnel.dest_rl = self.dest_rl or ''
+        tunnel.localseg_lr = self.localseg_lr or ''
+        tunnel.localseg_rl = self.localseg_rl or ''
+        tunnel.bsid_addr = self.bsid_addr or ''
+        tunnel.fwd_engine = PY_TO_NB_FWD_ENGINE.get(self.fwd_engine, NB_UNSPEC)
+        tunnel.key = self.key or ''
+
+
+class SRv6MicroSIDPolicy(SRv6Entity):
+    """
+    A SRv6 uSID policy. The fields are the arguments of
+    :func:`controller.srv6_usid.handle_srv6_usid_policy`; the nodes are
+    lists of node names.
+
+    The values of the northbound messages are kept as they are (e.g. an
+    empty string for the locator), since the defaults are handled by the
+    uSID functions.
+    """
+
+    __slots__ = ('lr_destination', 'rl_destination', 'nodes_lr', 'nodes_rl',
+                 'table', 'metric', '_id', 'l_grpc_ip', 'l_grpc_port',
+                 'l_fwd_engine', 'r_grpc_ip', 'r_grpc_port', 'r_fwd_engine',
+                 'decap_sid', 'locator')
+
+    FIELDS = __slots__
+
+    def __init__(self, lr_destination=None, rl_destination=None,
+                 nodes_lr=None, nodes_rl=None, table=-1, metric=-1,
+                 _id=None, l_grpc_ip=None, l_grpc_port=None,
+                 l_fwd_engine=None, r_grpc_ip=None, r_grpc_port=None,
+                 r_fwd_engine=None, decap_sid=None, locator=None):
+        # pylint: disable=too-many-arguments,too-many-locals
+        self.lr_destination = lr_destination
+        self.rl_destination = rl_destination
+        self.nodes_lr = _list(nodes_lr)
+        self.nodes_rl = _list(nodes_rl)
+        self.table = table
+        self.metric = metric
+        self._id = _id
+        self.l_grpc_ip = l_grpc_ip
+        self.l_grpc_port = l_grpc_port
+        self.l_fwd_engine = l_fwd_engine
+        self.r_grpc_ip = r_grpc_ip
+        self.r_grpc_port = r_grpc_port
+        self.r_fwd_engine = r_fwd_engine
+        self.decap_sid = decap_sid
+        self.locator = locator
+
+    @staticmethod
+    def parse_nodes(nodes):
+        """
+        Convert a comma-separated list of node names to a list, or None if
+        there are no nodes.
+        """
+        return [node.strip() for node in nodes.split(',')
+                if node.strip() != ''] or None
+
+    @classmethod
+    def from_nb(cls, micro_sid):
+        """
+        Create a uSID policy from a northbound message.
+
+        :param micro_sid: The uSID policy.
+        :type micro_sid: class: `nb_srv6_manager_pb2.SRv6MicroSID`
+        :rtype: class: `SRv6MicroSIDPolicy`
+        """
+        return cls(
+            lr_destination=micro_sid.lr_destination,
+            rl_destination=micro_sid.rl_destination,
+            nodes_lr=cls.parse_nodes(micro_sid.nodes_lr),
+            nodes_rl=cls.parse_nodes(micro_sid.nodes_rl),
+            table=micro_sid.table,
+            metric=micro_sid.metric,
+            _id=micro_sid._id,
+            l_grpc_ip=micro_sid.l_grpc_ip,
+            l_grpc_port=micro_sid.l_grpc_port,
+            l_fwd_engine=_nb_enum(NB_TO_PY_FWD_ENGINE,
+                                  micro_sid.l_fwd_engine,
+                                  'forwarding engine') or '',
+            r_grpc_ip=micro_sid.r_grpc_ip,
+            r_grpc_port=micro_sid.r_grpc_port,
+            r_fwd_engine=_nb_enum(NB_TO_PY_FWD_ENGINE,
+                                  micro_sid.r_fwd_engine,
+                                  'forwarding engine') or '',
+            decap_sid=micro_sid.decap_sid,
+            locator=micro_sid.locator
+        )
@@ -31,7 +31,7 @@ This module implements control-plane functionalities for SRv6 PM
 # pylint: disable=too-many-lines
 
 # General imports
-import json
+import importlib.util
 import logging
 import os
 import sys
@@ -50,7 +50,7 @@ import srv6pmService_pb2_grpc
 import srv6pmServiceController_pb2
 import srv6pmServiceController_pb2_grpc
 # Controller dependencies
-from controller import srv6_utils, utils
+from controller import kafka_utils, srv6_pm_serializers, srv6_utils, utils
 
 # Configuration parameters
 #
@@ -62,18 +62,40 @@ ENABLE_GRPC_SERVER = os.getenv('ENABLE_GRPC_SERVER', 'false')
 ENABLE_GRPC_SERVER = ENABLE_GRPC_SERVER.lower() == 'true'
 # Kafka server
 KAFKA_SERVERS = os.getenv('KAFKA_SERVERS', 'kafka:9092')
+# Wire format of the records published to Kafka (json, protobuf or struct)
+KAFKA_PM_SERIALIZER = os.getenv('KAFKA_PM_SERIALIZER', 'json')
+# Loss and delay computation
+ENABLE_PM_ANALYTICS = os.getenv('ENABLE_PM_ANALYTICS', 'false')
+ENABLE_PM_ANALYTICS = ENABLE_PM_ANALYTICS.lower() == 'true'
+# Number of color intervals used to compute the window statistics
+PM_ANALYTICS_WINDOW = int(os.getenv('PM_ANALYTICS_WINDOW', '256'))
+# Size (in bits) of the packet counters
+PM_COUNTER_BITS = int(os.getenv('PM_COUNTER_BITS', '64'))
+# Free-running packet counters: the counters of an interval are computed
+# as the difference between two consecutive records
+PM_CUMULATIVE_COUNTERS = os.getenv('PM_CUMULATIVE_COUNTERS', 'false')
+PM_CUMULATIVE_COUNTERS = PM_CUMULATIVE_COUNTERS.lower() == 'true'
 
 # Kafka depedencies
-try:
-    if ENABLE_KAFKA_INTEGRATION:
-        from kafka import KafkaProducer
-        from kafka.errors import KafkaError
-except ImportError:
+#
+# kafka-python is only checked here: it is imported when the first record is
+# published (see kafka_utils.import_kafka())
+if ENABLE_KAFKA_INTEGRATION and importlib.util.find_spec('kafka') is None:
     print('ENABLE_KAFKA_INTEGRATION is set in the configuration.')
     print('kafka-python is required to run')
     print('kafka-python not found.')
     sys.exit(-2)
 
+# Analytics depedencies
+#
+# numpy is only checked here: the analytics module is imported when the
+# computation engine is created (see get_pm_analytics())
+if ENABLE_PM_ANALYTICS and importlib.util.find_spec('numpy') is None:
+    print('ENABLE_PM_ANALYTICS is set in the configuration.')
+    print('numpy is required to run')
+    print('numpy not found.')
+    sys.exit(-2)
+
 
 # Global variables definition
 #
@@ -104,6 +126,8 @@ DEFAULT_SERVER_KEY = 'server_cert.pem'
 TOPIC_TWAMP = 'twamp'
 # Topic for iperf data
 TOPIC_IPERF = 'iperf'
+# Topic for the metrics computed from the TWAMP data
+TOPIC_TWAMP_METRICS = 'twamp_metrics'
 
 # Kafka servers
 if KAFKA_SERVERS is not None:
@@ -113,87 +137,126 @@ if KAFKA_SERVERS is not None:
 def publish_to_kafka(bootstrap_servers, topic, measure_id, interval,
                      timestamp, fw_color, rv_color, sender_seq_num,
                      reflector_seq_num, sender_tx_counter, sender_rx_counter,
-                     reflector_tx_counter, reflector_rx_counter):
+                     reflector_tx_counter, reflector_rx_counter,
+                     publisher=None, serializer=None):
     """
-    Publish the measurement data to Kafka
+    Publish the measurement data to Kafka.
+
+    The record is sent asynchronously through a long-lived producer. If
+    'publisher' is not provided, the producer shared by all the callers
+    using the same Kafka servers is used. The record is encoded with
+    'serializer' (default: the format set by KAFKA_PM_SERIALIZER).
     """
     #
     # pylint: disable=too-many-arguments, too-many-locals
     #
-    producer = None
-    result = None
-    try:
-        # Create an istance of Kafka producer
-        producer = KafkaProducer(
-            bootstrap_servers=bootstrap_servers,
-            security_protocol='PLAINTEXT',
-            value_serializer=lambda m: json.dumps(m).encode('ascii')
-        )
-        # Publish measurement data to the provided topic
-        result = producer.send(
-            topic=topic,
-            value={'measure_id': measure_id, 'interval': interval,
-                   'timestamp': timestamp, 'fw_color': fw_color,
-                   'rv_color': rv_color, 'sender_seq_num': sender_seq_num,
-                   'reflector_seq_num': reflector_seq_num,
-                   'sender_tx_counter': sender_tx_counter,
-                   'sender_rx_counter': sender_rx_counter,
-                   'reflector_tx_counter': reflector_tx_counter,
-                   'reflector_rx_counter': reflector_rx_counter}
-        )
-    except KafkaError as err:
-        logger.error('Cannot publish data to Kafka: %s', err)
-    finally:
-        # Close the producer
-        if producer is not None:
-            producer.close()
-    # Return result
-    return result
+    if publisher is None:
+        publisher = kafka_utils.get_publisher(bootstrap_servers,
+                                              value_serializer=None)
+    if serializer is None:
+        serializer = srv6_pm_serializers.get_serializer(KAFKA_PM_SERIALIZER)
+    # Encode the record
+    value = serializer.serialize_twamp({
+        'measure_id': measure_id, 'interval': interval,
+        'timestamp': timestamp, 'fw_color': fw_color,
+        'rv_color': rv_color, 'sender_seq_num': sender_seq_num,
+        'reflector_seq_num': reflector_seq_num,
+        'sender_tx_counter': sender_tx_counter,
+        'sender_rx_counter': sender_rx_counter,
+        'reflector_tx_counter': reflector_tx_counter,
+        'reflector_rx_counter': reflector_rx_counter
+    })
+    # Publish measurement data to the provided topic
+    return publisher.send(topic=topic, value=value,
+                          headers=serializer.headers())
 
 
 def publish_iperf_data_to_kafka(bootstrap_servers, topic, _from, measure_id,
                                 generator_id, interval, transfer,
                                 transfer_dim, bitrate, bitrate_dim,
-                                retr, cwnd, cwnd_dim):
+                                retr, cwnd, cwnd_dim, publisher=None,
+                                serializer=None):
     """
-    Publish IPERF data to Kafka
+    Publish IPERF data to Kafka.
+
+    The record is sent asynchronously through a long-lived producer. If
+    'publisher' is not provided, the producer shared by all the callers
+    using the same Kafka servers is used. The record is encoded with
+    'serializer' (default: the format set by KAFKA_PM_SERIALIZER).
     """
     #
     # pylint: disable=too-many-arguments
     #
-    producer = None
-    result = None
-    try:
-        # Create an istance of Kafka producer
-        producer = KafkaProducer(
-            bootstrap_servers=bootstrap_servers,
-            security_protocol='PLAINTEXT',
-            value_serializer=lambda m: json.dumps(m).encode('ascii')
-        )
-        # Publish measurement data to the provided topic
-        result = producer.send(
-            topic=topic,
-            value={'from': _from,
-                   'measure_id': measure_id,
-                   'generator_id': generator_id,
-                   'interval': interval,
-                   'transfer': transfer,
-                   'transfer_dim': transfer_dim,
-                   'bitrate': bitrate,
-                   'bitrate_dim': bitrate_dim,
-                   'retr': retr,
-                   'cwnd': cwnd,
-                   'cwnd_dim': cwnd_dim
-                   }
+    if publisher is None:
+        publisher = kafka_utils.get_publisher(bootstrap_servers,
+                                              value_serializer=None)
+    if serializer is None:
+        serializer = srv6_pm_serializers.get_serializer(KAFKA_PM_SERIALIZER)
+    # Encode the record
+    value = serializer.serialize_iperf({
+        'from': _from,
+        'measure_id': measure_id,
+        'generator_id': generator_id,
+        'interval': interval,
+        'transfer': transfer,
+        'transfer_dim': transfer_dim,
+        'bitrate': bitrate,
+        'bitrate_dim': bitrate_dim,
+        'retr': retr,
+        'cwnd': cwnd,
+        'cwnd_dim': cwnd_dim
+    })
+    # Publish measurement data to the provided topic
+    return publisher.send(topic=topic, value=value,
+                          headers=serializer.headers())
+
+
+def publish_metrics_to_kafka(bootstrap_servers, topic, metrics,
+                             publisher=None):
+    """
+    Publish the metrics computed from the measurement data (loss, loss
+    ratio, delay percentiles) to Kafka. Metrics are encoded as JSON.
+    """
+    if publisher is None:
+        publisher = kafka_utils.get_publisher(bootstrap_servers,
+                                              value_serializer=None)
+    return publisher.send(topic=topic,
+                          value=kafka_utils.json_serializer(metrics))
+
+
+# Loss and delay computation engine shared by the module-level functions
+_pm_analytics = None
+
+
+def get_pm_analytics():
+    """
+    Return the loss and delay computation engine, creating it if it does
+    not exist. Return None if the computation is disabled
+    (ENABLE_PM_ANALYTICS).
+    """
+    global _pm_analytics    # pylint: disable=global-statement
+    if not ENABLE_PM_ANALYTICS:
+        return None
+    if _pm_analytics is None:
+        from controller import srv6_pm_analytics
+        _pm_analytics = srv6_pm_analytics.PMAnalytics(
+            window=PM_ANALYTICS_WINDOW,
+            counter_bits=PM_COUNTER_BITS,
+            cumulative=PM_CUMULATIVE_COUNTERS
         )
-    except KafkaError as err:
-        logger.error('Cannot publish data to Kafka: %s', err)
-    finally:
-        # Close the producer
-        if producer is not None:
-            producer.close()
-    # Return result
-    return result
+    return _pm_analytics
+
+
+def remove_pm_analytics_session(measure_id):
+    """
+    Free the data kept by the loss and delay computation engine for a
+    measurement session (e.g. when the experiment is stopped).
+
+    :param measure_id: The measure ID of the experiment.
+    :type measure_id: int
+    """
+    if _pm_analytics is not None:
+        _pm_analytics.remove_session(measure_id)
 
 
 def start_experiment_sender(channel, sidlist, rev_sidlist,
@@ -976,6 +1039,15 @@ def get_experiment_results(sender_channel, reflector_channel,
                 reflector_tx_counter=reflector_tx_counter,
                 reflector_rx_counter=reflector_rx_counter
             )
+        # Compute loss and delay and publish them to Kafka
+        analytics = get_pm_analytics()
+        if analytics is not None:
+            for metrics in analytics.process(results):
+                publish_metrics_to_kafka(
+                    bootstrap_servers=kafka_servers,
+                    topic=TOPIC_TWAMP_METRICS,
+                    metrics=metrics
+                )
     # Return the results
     return results
 
@@ -1051,8 +1123,27 @@ if ENABLE_GRPC_SERVER:
         Private class implementing methods exposed by the gRPC server
         """
 
-        def __init__(self, kafka_servers=KAFKA_SERVERS):
+        def __init__(self, kafka_servers=KAFKA_SERVERS, publisher=None,
+                     serializer=KAFKA_PM_SERIALIZER):
             self.kafka_servers = kafka_servers
+            # Serializer used for the records published to Kafka
+            self.serializer = srv6_pm_serializers.get_serializer(serializer)
+            # Long-lived Kafka producer, shared by all the RPCs; records
+            # are encoded by the serializer before being sent
+            self.publisher = publisher
+            if self.publisher is None and ENABLE_KAFKA_INTEGRATION:
+                self.publisher = kafka_utils.KafkaPublisher(
+                    bootstrap_servers=kafka_servers,
+                    value_serializer=None)
+            # Loss and delay computation engine
+            self.analytics = get_pm_analytics()
+
+        def close(self):
+            """
+            Flush the pending Kafka records and close the producer.
+            """
+            if self.publisher is not None:
+                self.publisher.close()
 
         def SendMeasurementData(self, request, context):
             """
@@ -1061,6 +1152,8 @@ if ENABLE_GRPC_SERVER:
             # pylint: disable=too-many-locals
             #
             logger.debug('Measurement data received: %s', request)
+            # Records used to compute the loss and delay metrics
+            records = list()
             # Extract data from the request
             for data in request.measurement_data:
                 measure_id = data.meas_id
@@ -1089,7 +1182,27 @@ if ENABLE_GRPC_SERVER:
                         sender_tx_counter=sender_tx_counter,
                         sender_rx_counter=sender_rx_counter,
                         reflector_tx_counter=reflector_tx_counter,
-                        reflector_rx_counter=reflector_rx_counter
+                        reflector_rx_counter=reflector_rx_counter,
+                        publisher=self.publisher,
+                        serializer=self.serializer
+                    )
+                records.append({
+                    'measure_id': measure_id,
+                    'interval': interval,
+                    'timestamp': timestamp,
+                    'sender_tx_counter': sender_tx_counter,
+                    'sender_rx_counter': sender_rx_counter,
+                    'reflector_tx_counter': reflector_tx_counter,
+                    'reflector_rx_counter': reflector_rx_counter
+                })
+            # Compute loss and delay and publish them alongside the raw data
+            if self.analytics is not None and ENABLE_KAFKA_INTEGRATION:
+                for metrics in self.analytics.process(records):
+                    publish_metrics_to_kafka(
+                        bootstrap_servers=self.kafka_servers,
+                        topic=TOPIC_TWAMP_METRICS,
+                        metrics=metrics,
+                        publisher=self.publisher
                     )
             status = commons_pb2.StatusCode.Value('STATUS_SUCCESS')
             return srv6pmServiceController_pb2.SendMeasurementDataResponse(
@@ -1140,6 +1253,8 @@ if ENABLE_GRPC_SERVER:
                         retr=retr,
                         cwnd=cwnd,
                         cwnd_dim=cwnd_dim,
+                        publisher=self.publisher,
+                        serializer=self.serializer
                     )
             status = commons_pb2.StatusCode.Value('STATUS_SUCCESS')
             return srv6pmServiceController_pb2.SendIperfDataResponse(
@@ -1176,9 +1291,9 @@ if ENABLE_GRPC_SERVER:
         #
         # Create the server and add the handler
         grpc_server = grpc.server(futures.ThreadPoolExecutor())
+        service = _SRv6PMService()
         (srv6pmServiceController_pb2_grpc
-         .add_SRv6PMControllerServicer_to_server(_SRv6PMService(),
-                                                 grpc_server))
+         .add_SRv6PMControllerServicer_to_server(service, grpc_server))
         # If secure mode is enabled, we need to create a secure endpoint
         if secure:
             # Read key and certificate
@@ -1203,5 +1318,10 @@ if ENABLE_GRPC_SERVER:
         # Start the loop for gRPC
         logger.info('Listening gRPC')
         grpc_server.start()
-        while True:
-            time.sleep(5)
+        try:
+            while True:
+                time.sleep(5)
+        finally:
+            # Stop the server and flush the pending Kafka records
+            grpc_server.stop(None)
+            service.close()
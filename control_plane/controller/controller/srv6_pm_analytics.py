@@ -0,0 +1,321 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Loss and delay computation for SRv6-PM
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Streaming analytics for SRv6-PM.
+
+The measurement records received from the nodes only carry raw counters
+(e.g. 'sender_tx_counter' and 'reflector_rx_counter' for the forward path).
+This module keeps the last records of each measurement session in a ring
+buffer of NumPy arrays and computes, for each color interval, the packet
+loss and the loss ratio of both the forward and the reverse path, plus
+window statistics (loss ratio and delay percentiles).
+"""
+
+# General imports
+import logging
+import threading
+
+# NumPy dependencies
+import numpy as np
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+# Default number of color intervals kept for each session
+DEFAULT_WINDOW = 256
+# Default size (in bits) of the packet counters
+DEFAULT_COUNTER_BITS = 64
+# Default delay percentiles
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+# Index of the counters in the counters matrix
+SENDER_TX = 0
+REFLECTOR_RX = 1
+REFLECTOR_TX = 2
+SENDER_RX = 3
+
+
+def counters_diff(minuend, subtrahend, counter_bits=DEFAULT_COUNTER_BITS):
+    """
+    Compute the difference between two arrays of counters, taking into
+    account the wrap-around of the counters. The result is signed: a small
+    negative difference (e.g. caused by packets reordered across two color
+    intervals) is preserved, while a large negative difference is the
+    result of a counter wrap-around.
+
+    :param minuend: Array of counters (uint64)
+    :type minuend: numpy.ndarray
+    :param subtrahend: Array of counters (uint64)
+    :type subtrahend: numpy.ndarray
+    :param counter_bits: Size (in bits) of the counters
+    :type counter_bits: int
+    :return: The differences (int64)
+    :rtype: numpy.ndarray
+    """
+    # uint64 arithmetic wraps modulo 2^64
+    diff = minuend - subtrahend
+    if counter_bits >= 64:
+        # Two's complement interpretation
+        return diff.view(np.int64)
+    modulus = 1 << counter_bits
+    diff = (diff & np.uint64(modulus - 1)).astype(np.int64)
+    return np.where(diff >= modulus // 2, diff - modulus, diff)
+
+
+class SessionBuffer:
+    """
+    Ring buffer holding the last color intervals of a measurement session.
+
+    :param capacity: Max number of intervals
+    :type capacity: int
+    """
+
+    def __init__(self, capacity=DEFAULT_WINDOW):
+        self.capacity = capacity
+        # Interval number
+        self.intervals = np.zeros(capacity, dtype=np.int64)
+        # Per-interval packet counters (see SENDER_TX, REFLECTOR_RX, ...)
+        self.counters = np.zeros((capacity, 4), dtype=np.uint64)
+        # Delay (NaN if not available)
+        self.delays = np.full(capacity, np.nan)
+        # Index of the oldest interval and number of intervals
+        self.start = 0
+        self.size = 0
+        # Last raw counters received, used for cumulative counters
+        self.last_counters = None
+
+    def append(self, intervals, counters, delays):
+        """
+        Append a batch of intervals to the buffer. If the batch is larger
+        than the buffer, only the last intervals are kept.
+        """
+        count = len(intervals)
+        if count >= self.capacity:
+            intervals = intervals[-self.capacity:]
+            counters = counters[-self.capacity:]
+            delays = delays[-self.capacity:]
+            count = self.capacity
+        indexes = (self.start + self.size + np.arange(count)) % self.capacity
+        self.intervals[indexes] = intervals
+        self.counters[indexes] = counters
+        self.delays[indexes] = delays
+        overflow = max(self.size + count - self.capacity, 0)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def ordered_indexes(self):
+        """
+        Return the indexes of the intervals, from the oldest to the newest.
+        """
+        return (self.start + np.arange(self.size)) % self.capacity
+
+
+class PMAnalytics:
+    """
+    Loss and delay computation engine. Records are grouped by measurement
+    session ('measure_id') and processed in batches; all the computations
+    on a batch are vectorized.
+
+    :param window: Number of intervals kept for each session and used to
+                   compute the window statistics
+    :type window: int
+    :param counter_bits: Size (in bits) of the packet counters
+    :type counter_bits: int
+    :param cumulative: If True, the counters are free-running and the
+                       per-interval counters are computed as the difference
+                       between two consecutive records; otherwise, the
+                       counters already refer to a single color interval.
+    :type cumulative: bool
+    :param percentiles: Delay percentiles to compute
+    :type percentiles: tuple
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW,
+                 counter_bits=DEFAULT_COUNTER_BITS, cumulative=False,
+                 percentiles=DEFAULT_PERCENTILES):
+        self.window = window
+        self.counter_bits = counter_bits
+        self.cumulative = cumulative
+        self.percentiles = percentiles
+        self._sessions = dict()
+        self._lock = threading.Lock()
+
+    def _get_session(self, measure_id):
+        session = self._sessions.get(measure_id)
+        if session is None:
+            session = SessionBuffer(capacity=self.window)
+            self._sessions[measure_id] = session
+        return session
+
+    def remove_session(self, measure_id):
+        """
+        Forget a measurement session.
+        """
+        with self._lock:
+            self._sessions.pop(measure_id, None)
+
+    def process(self, records):
+        """
+        Compute the derived metrics for a batch of records.
+
+        :param records: Measurement records, as dicts with the keys
+                        'measure_id', 'interval', 'timestamp',
+                        'sender_tx_counter', 'reflector_rx_counter',
+                        'reflector_tx_counter', 'sender_rx_counter' and,
+                        optionally, 'delay'.
+        :type records: list
+        :return: A list of dicts (one for each record, in the same order)
+                 containing the keys 'measure_id', 'interval', 'timestamp',
+                 'fw_loss', 'fw_loss_ratio', 'rv_loss', 'rv_loss_ratio'
+                 and the statistics of the session window (see
+                 :meth:`get_session_metrics`).
+        :rtype: list
+        """
+        # Group the records by session, preserving their order
+        groups = dict()
+        for index, record in enumerate(records):
+            groups.setdefault(record['measure_id'], list()).append(index)
+        results = [None] * len(records)
+        with self._lock:
+            for measure_id, indexes in groups.items():
+                session = self._get_session(measure_id)
+                group = [records[index] for index in indexes]
+                metrics = self._process_session(session, group)
+                for index, metric in zip(indexes, metrics):
+                    results[index] = metric
+        return results
+
+    def _process_session(self, session, records):
+        """
+        Process a batch of records belonging to the same session.
+        """
+        count = len(records)
+        intervals = np.fromiter((record['interval'] for record in records),
+                                dtype=np.int64, count=count)
+        counters = np.array(
+            [(record['sender_tx_counter'], record['reflector_rx_counter'],
+              record['reflector_tx_counter'], record['sender_rx_counter'])
+             for record in records], dtype=np.uint64).reshape(count, 4)
+        delays = np.fromiter(
+            (record.get('delay', np.nan) for record in records),
+            dtype=np.float64, count=count)
+        if self.cumulative:
+            # Per-interval counters are the difference between consecutive
+            # records; the first record of a session is a reference
+            previous = np.empty_like(counters)
+            previous[1:] = counters[:-1]
+            previous[0] = session.last_counters \
+                if session.last_counters is not None else counters[0]
+            session.last_counters = counters[-1].copy()
+            # A negative difference means that the counters were reset
+            counters = np.maximum(
+                counters_diff(counters, previous, self.counter_bits),
+                0).astype(np.uint64)
+        # Per-interval loss
+        fw_loss = counters_diff(counters[:, SENDER_TX],
+                                counters[:, REFLECTOR_RX], self.counter_bits)
+        rv_loss = counters_diff(counters[:, REFLECTOR_TX],
+                                counters[:, SENDER_RX], self.counter_bits)
+        fw_ratio = self._ratio(fw_loss, counters[:, SENDER_TX])
+        rv_ratio = self._ratio(rv_loss, counters[:, REFLECTOR_TX])
+        # Update the ring buffer and compute the window statistics
+        session.append(intervals, counters, delays)
+        window = self._window_metrics(session)
+        # Build the results
+        results = list()
+        for index, record in enumerate(records):
+            metrics = {
+                'measure_id': record['measure_id'],
+                'interval': record['interval'],
+                'timestamp': record.get('timestamp'),
+                'fw_loss': int(fw_loss[index]),
+                'fw_loss_ratio': float(fw_ratio[index]),
+                'rv_loss': int(rv_loss[index]),
+                'rv_loss_ratio': float(rv_ratio[index])
+            }
+            metrics.update(window)
+            results.append(metrics)
+        return results
+
+    @staticmethod
+    def _ratio(loss, sent):
+        """
+        Compute the loss ratio (0 if no packets were sent).
+        """
+        sent = sent.astype(np.float64)
+        return np.divide(loss, sent, out=np.zeros_like(sent),
+                         where=sent > 0)
+
+    def _window_metrics(self, session):
+        """
+        Compute the statistics over the intervals stored in a session.
+        """
+        indexes = session.ordered_indexes()
+        counters = session.counters[indexes]
+        fw_loss = counters_diff(counters[:, SENDER_TX],
+                                counters[:, REFLECTOR_RX], self.counter_bits)
+        rv_loss = counters_diff(counters[:, REFLECTOR_TX],
+                                counters[:, SENDER_RX], self.counter_bits)
+        fw_sent = counters[:, SENDER_TX].sum(dtype=np.float64)
+        rv_sent = counters[:, REFLECTOR_TX].sum(dtype=np.float64)
+        metrics = {
+            'window_intervals': int(session.size),
+            'window_fw_loss_ratio':
+                float(fw_loss.sum() / fw_sent) if fw_sent > 0 else 0.0,
+            'window_rv_loss_ratio':
+                float(rv_loss.sum() / rv_sent) if rv_sent > 0 else 0.0
+        }
+        # Delay percentiles, if the records carry the delay
+        delays = session.delays[indexes]
+        delays = delays[~np.isnan(delays)]
+        if len(delays) > 0:
+            for percentile, value in zip(
+                    self.percentiles,
+                    np.percentile(delays, self.percentiles)):
+                metrics['delay_p%s' % percentile] = float(value)
+        return metrics
+
+    def get_session_metrics(self, measure_id):
+        """
+        Return the statistics of the window of a measurement session.
+
+        :param measure_id: The measurement session
+        :type measure_id: int
+        :return: A dict with the keys 'window_intervals',
+                 'window_fw_loss_ratio', 'window_rv_loss_ratio' and, if
+                 the records carry the delay, 'delay_pXX' for each
+                 percentile. None if the session is unknown.
+        :rtype: dict
+        """
+        with self._lock:
+            session = self._sessions.get(measure_id)
+            if session is None:
+                return None
+            return self._window_metrics(session)
@@ -0,0 +1,471 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Scheduler for SRv6-PM experiments
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Controller-side scheduler for SRv6-PM experiments.
+
+The scheduler keeps a registry of the running experiments (indexed by
+measure_id) and periodically retrieves the results of all of them. The
+results of the active sessions are retrieved concurrently by a pool of
+threads; the polling time of each session is randomized ("jitter") to
+spread the load on the nodes. The gRPC channels to the sender and
+reflector nodes are kept open and shared by all the sessions involving the
+same node. Retrieved results are stored in memory and can be queried by
+measure_id.
+"""
+
+# General imports
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent import futures
+
+# gRPC dependencies
+import grpc
+
+# Controller dependencies
+from controller import srv6_pm, utils
+
+# Configuration parameters
+#
+# Interval (in seconds) between two polls of the same session
+PM_POLL_INTERVAL = float(os.getenv('PM_POLL_INTERVAL', '10'))
+# Max random variation of the polling interval, as a fraction of the
+# interval (e.g. 0.1 means +/- 10%)
+PM_POLL_JITTER = float(os.getenv('PM_POLL_JITTER', '0.1'))
+# Number of threads used to poll the sessions
+PM_POLL_WORKERS = int(os.getenv('PM_POLL_WORKERS', '16'))
+# Max number of results (color intervals) stored for each session
+PM_MAX_RESULTS = int(os.getenv('PM_MAX_RESULTS', '1024'))
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+
+
+class ChannelPool:
+    """
+    Pool of gRPC channels, indexed by address and port of the node. Channels
+    are created on first use and kept open until :meth:`close` is called.
+
+    :param secure: Whether to enable or not gRPC secure mode.
+    :type secure: bool, optional
+    :param certificate: Filename of the certificate (required in secure
+                        mode).
+    :type certificate: str, optional
+    :param channel_factory: Function used to create the channels (default:
+                            :func:`controller.utils.get_grpc_session`).
+    :type channel_factory: function, optional
+    """
+
+    def __init__(self, secure=False, certificate=None, channel_factory=None):
+        self.secure = secure
+        self.certificate = certificate
+        if channel_factory is None:
+            channel_factory = utils.get_grpc_session
+        self.channel_factory = channel_factory
+        self._channels = dict()
+        self._lock = threading.Lock()
+
+    def get(self, address, port):
+        """
+        Return the channel to a node, creating it if it does not exist.
+
+        :param address: The IP address of the node.
+        :type address: str
+        :param port: The port of the gRPC server running on the node.
+        :type port: int
+        :return: The gRPC channel.
+        :rtype: class: `grpc._channel.Channel`
+        :raises controller.utils.InvalidArgumentError: The channel cannot
+                                                       be created.
+        """
+        key = (address, port)
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                channel = self.channel_factory(address, port,
+                                               secure=self.secure,
+                                               certificate=self.certificate)
+                if channel is None:
+                    raise utils.InvalidArgumentError(
+                        'Cannot create a gRPC channel to %s:%s'
+                        % (address, port))
+                self._channels[key] = channel
+            return channel
+
+    def __len__(self):
+        with self._lock:
+            return len(self._channels)
+
+    def close(self):
+        """
+        Close all the channels.
+        """
+        with self._lock:
+            channels, self._channels = self._channels, dict()
+        for channel in channels.values():
+            channel.close()
+
+
+class ResultStore:
+    """
+    In-memory store of the results of the SRv6-PM experiments. Results are
+    indexed by measure_id and, for each session, by color interval: a
+    result retrieved more than once is stored only once. Only the last
+    "max_results" intervals of each session are kept.
+
+    :param max_results: Max number of results stored for each session.
+    :type max_results: int, optional
+    """
+
+    def __init__(self, max_results=PM_MAX_RESULTS):
+        self.max_results = max_results
+        self._results = dict()
+        self._lock = threading.Lock()
+
+    def add(self, measure_id, results):
+        """
+        Store the results of a session.
+
+        :param measure_id: The measure ID of the session.
+        :type measure_id: int
+        :param results: The results, as returned by
+                        :func:`controller.srv6_pm.get_experiment_results`.
+        :type results: list
+        :return: Number of new results.
+        :rtype: int
+        """
+        added = 0
+        with self._lock:
+            session = self._results.setdefault(measure_id, OrderedDict())
+            for result in results:
+                interval = result['interval']
+                if interval not in session:
+                    added += 1
+                else:
+                    session.move_to_end(interval)
+                session[interval] = result
+            while len(session) > self.max_results:
+                session.popitem(last=False)
+        return added
+
+    def get(self, measure_id, since_interval=None):
+        """
+        Return the results of a session.
+
+        :param measure_id: The measure ID of the session.
+        :type measure_id: int
+        :param since_interval: If provided, return only the results of the
+                               intervals following this one.
+        :type since_interval: int, optional
+        :return: The results, from the oldest to the newest, or an empty
+                 list if the session is unknown.
+        :rtype: list
+        """
+        with self._lock:
+            results = list(self._results.get(measure_id, dict()).values())
+        if since_interval is not None:
+            results = [result for result in results
+                       if result['interval'] > since_interval]
+        return results
+
+    def remove(self, measure_id):
+        """
+        Remove the results of a session.
+        """
+        with self._lock:
+            self._results.pop(measure_id, None)
+
+    def measure_ids(self):
+        """
+        Return the measure IDs of the stored sessions.
+        """
+        with self._lock:
+            return list(self._results)
+
+
+class PMSession:
+    """
+    An experiment registered to the scheduler.
+    """
+
+    # pylint: disable=too-few-public-methods, too-many-instance-attributes
+
+    def __init__(self, measure_id, sender, reflector, send_refl_sidlist,
+                 refl_send_sidlist):
+        # pylint: disable=too-many-arguments
+        self.measure_id = measure_id
+        # (address, port) tuples
+        self.sender = sender
+        self.reflector = reflector
+        self.send_refl_sidlist = list(send_refl_sidlist)
+        self.refl_send_sidlist = list(refl_send_sidlist)
+        # Time of the next poll
+        self.next_poll = 0
+        # Time of the last successful poll
+        self.last_poll = None
+        # Number of consecutive failed polls
+        self.errors = 0
+
+
+class PMScheduler:
+    """
+    Scheduler for SRv6-PM experiments.
+
+    Experiments are added with :meth:`register` and removed with
+    :meth:`unregister`. Once :meth:`start` is called, a background thread
+    polls the results of the registered sessions every "poll_interval"
+    seconds (+/- "jitter"); the sessions due at the same time are polled
+    concurrently. Results are stored in a :class:`ResultStore`.
+
+    :param poll_interval: Interval (in seconds) between two polls of the
+                          same session.
+    :type poll_interval: float, optional
+    :param jitter: Max random variation of the polling interval, as a
+                   fraction of the interval.
+    :type jitter: float, optional
+    :param max_workers: Number of threads used to poll the sessions.
+    :type max_workers: int, optional
+    :param channel_pool: Pool of the channels to the nodes.
+    :type channel_pool: ChannelPool, optional
+    :param store: Store for the results.
+    :type store: ResultStore, optional
+    :param poll_func: Function used to retrieve the results of a session
+                      (default: :func:`controller.srv6_pm.
+                      get_experiment_results`).
+    :type poll_func: function, optional
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, poll_interval=PM_POLL_INTERVAL, jitter=PM_POLL_JITTER,
+                 max_workers=PM_POLL_WORKERS, channel_pool=None, store=None,
+                 poll_func=None):
+        # pylint: disable=too-many-arguments
+        self.poll_interval = poll_interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.channel_pool = \
+            channel_pool if channel_pool is not None else ChannelPool()
+        self.store = store if store is not None else ResultStore()
+        self.poll_func = \
+            poll_func if poll_func is not None \
+            else srv6_pm.get_experiment_results
+        self._sessions = dict()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        # Event used to wake up the polling thread when a session is added
+        self._wakeup_event = threading.Event()
+
+    def _next_delay(self):
+        """
+        Return the time to wait before the next poll of a session.
+        """
+        return self.poll_interval * \
+            (1 + random.uniform(-self.jitter, self.jitter))
+
+    def register(self, measure_id, sender_address, sender_port,
+                 reflector_address, reflector_port, send_refl_sidlist,
+                 refl_send_sidlist):
+        """
+        Register an experiment. If an experiment with the same measure_id
+        is already registered, it is replaced. The first poll is scheduled
+        at a random time within a polling interval.
+
+        :param measure_id: The measure ID of the experiment.
+        :type measure_id: int
+        :param sender_address: The IP address of the sender.
+        :type sender_address: str
+        :param sender_port: The port of the gRPC server on the sender.
+        :type sender_port: int
+        :param reflector_address: The IP address of the reflector.
+        :type reflector_address: str
+        :param reflector_port: The port of the gRPC server on the reflector.
+        :type reflector_port: int
+        :param send_refl_sidlist: The SID list used for the path
+                                  sender->reflector.
+        :type send_refl_sidlist: list
+        :param refl_send_sidlist: The SID list used for the path
+                                  reflector->sender.
+        :type refl_send_sidlist: list
+        """
+        # pylint: disable=too-many-arguments
+        session = PMSession(
+            measure_id=measure_id,
+            sender=(sender_address, sender_port),
+            reflector=(reflector_address, reflector_port),
+            send_refl_sidlist=send_refl_sidlist,
+            refl_send_sidlist=refl_send_sidlist
+        )
+        session.next_poll = time.monotonic() + \
+            random.uniform(0, self.poll_interval)
+        with self._lock:
+            self._sessions[measure_id] = session
+        logger.debug('Registered experiment %s', measure_id)
+        self._wakeup_event.set()
+
+    def unregister(self, measure_id, remove_results=False):
+        """
+        Unregister an experiment.
+
+        :param measure_id: The measure ID of the experiment.
+        :type measure_id: int
+        :param remove_results: If True, the stored results of the
+                               experiment are removed.
+        :type remove_results: bool, optional
+        """
+        with self._lock:
+            self._sessions.pop(measure_id, None)
+        if remove_results:
+            self.store.remove(measure_id)
+        logger.debug('Unregistered experiment %s', measure_id)
+
+    def get_session(self, measure_id):
+        """
+        Return a registered experiment, or None if it does not exist.
+        """
+        with self._lock:
+            return self._sessions.get(measure_id)
+
+    def get_results(self, measure_id, since_interval=None):
+        """
+        Return the stored results of an experiment (see
+        :meth:`ResultStore.get`).
+        """
+        return self.store.get(measure_id, since_interval=since_interval)
+
+    def _poll_session(self, session):
+        """
+        Retrieve and store the results of a session.
+        """
+        sender_channel = self.channel_pool.get(*session.sender)
+        reflector_channel = self.channel_pool.get(*session.reflector)
+        results = self.poll_func(
+            sender_channel=sender_channel,
+            reflector_channel=reflector_channel,
+            send_refl_sidlist=session.send_refl_sidlist,
+            refl_send_sidlist=session.refl_send_sidlist
+        )
+        if results:
+            return self.store.add(session.measure_id, results)
+        return 0
+
+    def poll(self, now=None):
+        """
+        Poll all the sessions due at the given time, concurrently, and wait
+        for the results.
+
+        :param now: Current time (default: time.monotonic()).
+        :type now: float, optional
+        :return: Number of sessions polled.
+        :rtype: int
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            due = [session for session in self._sessions.values()
+                   if session.next_poll <= now]
+        if not due:
+            return 0
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=self.max_workers)
+        pending = {self._executor.submit(self._poll_session, session): session
+                   for session in due}
+        for future in futures.as_completed(pending):
+            session = pending[future]
+            session.next_poll = now + self._next_delay()
+            try:
+                future.result()
+            except (grpc.RpcError, utils.InvalidArgumentError) as err:
+                session.errors += 1
+                logger.error('Cannot retrieve the results of experiment '
+                             '%s: %s', session.measure_id, err)
+            except Exception:    # pylint: disable=broad-except
+                # Unexpected errors (e.g. invalid results) must not stop
+                # the polling of the other sessions
+                session.errors += 1
+                logger.exception('Unexpected error while polling '
+                                 'experiment %s', session.measure_id)
+            else:
+                session.errors = 0
+                session.last_poll = time.time()
+        return len(due)
+
+    def _run(self):
+        """
+        Polling loop.
+        """
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception:    # pylint: disable=broad-except
+                # Keep the polling thread alive
+                logger.exception('Unexpected error in the polling loop')
+            # Sleep until the next session is due (or a session is added)
+            with self._lock:
+                next_poll = min((session.next_poll
+                                 for session in self._sessions.values()),
+                                default=None)
+            timeout = self.poll_interval if next_poll is None \
+                else max(next_poll - time.monotonic(), 0)
+            self._wakeup_event.wait(timeout)
+            self._wakeup_event.clear()
+
+    def start(self):
+        """
+        Start the polling thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='srv6-pm-scheduler',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the polling thread and close the channels.
+        """
+        self._stop_event.set()
+        self._wakeup_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.channel_pool.close()
@@ -0,0 +1,367 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Serializers for SRv6-PM data
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Serializers for the TWAMP and iperf records published to Kafka.
+
+Three wire formats are supported:
+
+- json: the original format, a JSON object with verbose field names;
+- protobuf: the MeasurementData and IperfData messages already used on the
+  gRPC interface between the nodes and the controller;
+- struct: a packed binary format with fixed-size fields.
+
+The binary formats are versioned. The name and the schema version of the
+format are carried in the Kafka header "schema" (e.g. b'struct/2'), so
+consumers can select the right decoder.
+"""
+
+# General imports
+import json
+import struct
+
+# SRv6PM dependencies
+import srv6pmCommons_pb2
+import srv6pmServiceController_pb2
+
+# Name of the Kafka header carrying format and schema version
+SCHEMA_HEADER = 'schema'
+
+
+class SchemaError(Exception):
+    """
+    Unknown serialization format or unsupported schema version.
+    """
+
+
+class PMSerializer:
+    """
+    Base class for the SRv6-PM serializers. A serializer converts TWAMP
+    and iperf records (represented as dicts, with the same fields used by
+    the JSON format) to bytes and back.
+    """
+
+    # Name of the format
+    name = None
+    # Version of the schema
+    schema_version = None
+
+    def headers(self):
+        """
+        Kafka headers identifying the format of the records.
+
+        :return: List of (str, bytes) tuples.
+        :rtype: list
+        """
+        return [(SCHEMA_HEADER, ('%s/%s' % (self.name, self.schema_version))
+                 .encode('ascii'))]
+
+    def serialize_twamp(self, record):
+        """
+        Convert a TWAMP record to bytes.
+        """
+        raise NotImplementedError
+
+    def deserialize_twamp(self, data):
+        """
+        Convert bytes to a TWAMP record.
+        """
+        raise NotImplementedError
+
+    def serialize_iperf(self, record):
+        """
+        Convert an iperf record to bytes.
+        """
+        raise NotImplementedError
+
+    def deserialize_iperf(self, data):
+        """
+        Convert bytes to an iperf record.
+        """
+        raise NotImplementedError
+
+
+class JSONSerializer(PMSerializer):
+    """
+    JSON serializer. This is the original format; records carry no schema
+    header, so existing consumers keep working.
+    """
+
+    name = 'json'
+    schema_version = 0
+
+    def headers(self):
+        return None
+
+    def serialize_twamp(self, record):
+        return json.dumps(record).encode('ascii')
+
+    def deserialize_twamp(self, data):
+        return json.loads(data)
+
+    def serialize_iperf(self, record):
+        return json.dumps(record).encode('ascii')
+
+    def deserialize_iperf(self, data):
+        return json.loads(data)
+
+
+class ProtobufSerializer(PMSerializer):
+    """
+    Protobuf serializer. TWAMP records are encoded as
+    srv6pmCommons.MeasurementData messages and iperf records as
+    srv6pmServiceController.IperfData messages.
+    """
+
+    name = 'protobuf'
+    schema_version = 1
+
+    def serialize_twamp(self, record):
+        return srv6pmCommons_pb2.MeasurementData(
+            meas_id=record['measure_id'],
+            interval=record['interval'],
+            timestamp=record['timestamp'],
+            fwColor=record['fw_color'],
+            rvColor=record['rv_color'],
+            ssSeqNum=record['sender_seq_num'],
+            rfSeqNum=record['reflector_seq_num'],
+            ssTxCounter=record['sender_tx_counter'],
+            ssRxCounter=record['sender_rx_counter'],
+            rfTxCounter=record['reflector_tx_counter'],
+            rfRxCounter=record['reflector_rx_counter']
+        ).SerializeToString()
+
+    def deserialize_twamp(self, data):
+        data = srv6pmCommons_pb2.MeasurementData.FromString(data)
+        return {
+            'measure_id': data.meas_id,
+            'interval': data.interval,
+            'timestamp': data.timestamp,
+            'fw_color': data.fwColor,
+            'rv_color': data.rvColor,
+            'sender_seq_num': data.ssSeqNum,
+            'reflector_seq_num': data.rfSeqNum,
+            'sender_tx_counter': data.ssTxCounter,
+            'sender_rx_counter': data.ssRxCounter,
+            'reflector_tx_counter': data.rfTxCounter,
+            'reflector_rx_counter': data.rfRxCounter
+        }
+
+    def serialize_iperf(self, record):
+        data = srv6pmServiceController_pb2.IperfData(
+            measure_id=record['measure_id'],
+            generator_id=record['generator_id']
+        )
+        # '_from' is a protected name, so it cannot be passed as keyword
+        setattr(data, '_from', record['from'])
+        data.interval.val = record['interval']
+        data.transfer.val = record['transfer']
+        data.transfer.dim = record['transfer_dim']
+        data.bitrate.val = record['bitrate']
+        data.bitrate.dim = record['bitrate_dim']
+        data.retr.val = record['retr']
+        data.cwnd.val = record['cwnd']
+        data.cwnd.dim = record['cwnd_dim']
+        return data.SerializeToString()
+
+    def deserialize_iperf(self, data):
+        data = srv6pmServiceController_pb2.IperfData.FromString(data)
+        return {
+            'from': getattr(data, '_from'),
+            'measure_id': data.measure_id,
+            'generator_id': data.generator_id,
+            'interval': data.interval.val,
+            'transfer': data.transfer.val,
+            'transfer_dim': data.transfer.dim,
+            'bitrate': data.bitrate.val,
+            'bitrate_dim': data.bitrate.dim,
+            'retr': data.retr.val,
+            'cwnd': data.cwnd.val,
+            'cwnd_dim': data.cwnd.dim
+        }
+
+
+class StructSerializer(PMSerializer):
+    """
+    Packed binary serializer. Numeric fields are packed in network byte
+    order with fixed sizes; strings are encoded in UTF-8 and prefixed by
+    their length in bytes (uint16). Schema 1 used a 1 byte length.
+
+    TWAMP records (schema 2)::
+
+        measure_id (uint32), interval (uint32),
+        fw_color (uint8), rv_color (uint8),
+        sender_seq_num, reflector_seq_num (uint64),
+        sender_tx_counter, sender_rx_counter (uint64),
+        reflector_tx_counter, reflector_rx_counter (uint64),
+        timestamp (string)
+
+    Iperf records (schema 2)::
+
+        measure_id (uint32), generator_id (uint32), retr (uint32),
+        transfer, bitrate, cwnd (float32),
+        from, interval, transfer_dim, bitrate_dim, cwnd_dim (string)
+    """
+
+    name = 'struct'
+    schema_version = 2
+
+    # Fixed-size part of the records
+    _twamp = struct.Struct('!IIBBQQQQQQ')
+    _iperf = struct.Struct('!IIIfff')
+    # Length of the strings
+    _length = struct.Struct('!H')
+
+    @classmethod
+    def _pack_strings(cls, *strings):
+        data = bytearray()
+        for string in strings:
+            string = string.encode('utf-8')
+            data += cls._length.pack(len(string))
+            data += string
+        return bytes(data)
+
+    @classmethod
+    def _unpack_strings(cls, data, offset, count):
+        strings = list()
+        for _ in range(count):
+            length, = cls._length.unpack_from(data, offset)
+            offset += cls._length.size
+            strings.append(data[offset:offset + length].decode('utf-8'))
+            offset += length
+        return strings
+
+    def serialize_twamp(self, record):
+        return self._twamp.pack(
+            record['measure_id'], record['interval'],
+            record['fw_color'], record['rv_color'],
+            record['sender_seq_num'], record['reflector_seq_num'],
+            record['sender_tx_counter'], record['sender_rx_counter'],
+            record['reflector_tx_counter'], record['reflector_rx_counter']
+        ) + self._pack_strings(record['timestamp'])
+
+    def deserialize_twamp(self, data):
+        (measure_id, interval, fw_color, rv_color, sender_seq_num,
+         reflector_seq_num, sender_tx_counter, sender_rx_counter,
+         reflector_tx_counter, reflector_rx_counter) = \
+            self._twamp.unpack_from(data)
+        timestamp, = self._unpack_strings(data, self._twamp.size, 1)
+        return {
+            'measure_id': measure_id,
+            'interval': interval,
+            'timestamp': timestamp,
+            'fw_color': fw_color,
+            'rv_color': rv_color,
+            'sender_seq_num': sender_seq_num,
+            'reflector_seq_num': reflector_seq_num,
+            'sender_tx_counter': sender_tx_counter,
+            'sender_rx_counter': sender_rx_counter,
+            'reflector_tx_counter': reflector_tx_counter,
+            'reflector_rx_counter': reflector_rx_counter
+        }
+
+    def serialize_iperf(self, record):
+        return self._iperf.pack(
+            record['measure_id'], record['generator_id'], record['retr'],
+            record['transfer'], record['bitrate'], record['cwnd']
+        ) + self._pack_strings(
+            record['from'], record['interval'], record['transfer_dim'],
+            record['bitrate_dim'], record['cwnd_dim'])
+
+    def deserialize_iperf(self, data):
+        (measure_id, generator_id, retr, transfer, bitrate, cwnd) = \
+            self._iperf.unpack_from(data)
+        _from, interval, transfer_dim, bitrate_dim, cwnd_dim = \
+            self._unpack_strings(data, self._iperf.size, 5)
+        return {
+            'from': _from,
+            'measure_id': measure_id,
+            'generator_id': generator_id,
+            'interval': interval,
+            'transfer': transfer,
+            'transfer_dim': transfer_dim,
+            'bitrate': bitrate,
+            'bitrate_dim': bitrate_dim,
+            'retr': retr,
+            'cwnd': cwnd,
+            'cwnd_dim': cwnd_dim
+        }
+
+
+# Available serializers, indexed by format name
+SERIALIZERS = {
+    JSONSerializer.name: JSONSerializer(),
+    ProtobufSerializer.name: ProtobufSerializer(),
+    StructSerializer.name: StructSerializer()
+}
+
+
+def register_serializer(serializer):
+    """
+    Register a new serializer.
+
+    :param serializer: The serializer.
+    :type serializer: PMSerializer
+    """
+    SERIALIZERS[serializer.name] = serializer
+
+
+def get_serializer(name):
+    """
+    Return the serializer for a format.
+
+    :param name: Name of the format (e.g. 'json', 'protobuf' or 'struct').
+    :type name: str
+    :return: The serializer.
+    :rtype: PMSerializer
+    :raises SchemaError: Unknown format.
+    """
+    serializer = SERIALIZERS.get(name.lower())
+    if serializer is None:
+        raise SchemaError('Unknown serialization format: %s' % name)
+    return serializer
+
+
+def get_serializer_from_headers(headers):
+    """
+    Return the serializer for a record received from Kafka, using the
+    "schema" header. Records without the header use the JSON format.
+
+    :param headers: Kafka headers, as a list of (str, bytes) tuples.
+    :type headers: list
+    :return: The serializer.
+    :rtype: PMSerializer
+    :raises SchemaError: Unknown format or unsupported schema version.
+    """
+    for key, value in headers or []:
+        if key == SCHEMA_HEADER:
+            name, _, version = value.decode('ascii').partition('/')
+            serializer = get_serializer(name)
+            if str(serializer.schema_version) != version:
+                raise SchemaError('Unsupported schema version %s for %s '
+                                  'format' % (version, name))
+            return serializer
+    return SERIALIZERS[JSONSerializer.name]
@@ -0,0 +1,809 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Reconciliation of the SRv6 entities between ArangoDB and the nodes
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Reconciler of the SRv6 entities stored in ArangoDB with the state of the
+nodes.
+
+When the persistency is enabled, the "srv6_paths", "srv6_behaviors" and
+"usid_policies" collections record the intended configuration of the
+nodes (the uSID policies are expanded into the SRv6 paths configured on
+their endpoints). The reconciler periodically retrieves the SRv6 entities
+configured on each node (one "get" RPC per node), compares them to the
+intended ones and pushes the missing or different entities to the node,
+batched in a few RPCs. If pruning is enabled, the SRv6 entities
+configured on a node that are not in the database are removed.
+
+Entities are compared through a hash of their canonical form: addresses
+and prefixes are normalized, unspecified values (e.g. table -1) are
+replaced by the values chosen by the node and only the fields specified
+in the database are compared. Nodes are reconciled concurrently by a
+pool of threads and the corrections pushed to the nodes are
+rate-limited.
+
+Node managers keeping a snapshot of the applied entities return its
+fingerprint (GetFingerprint RPC), computed as :func:`fingerprint`: if it
+matches the fingerprint of the entities in the database, the node is in
+sync and its entities are neither retrieved nor pushed again (unless
+pruning is enabled, because the snapshot does not include the entities
+created by others).
+"""
+
+# General imports
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent import futures
+from ipaddress import ip_address, ip_network
+
+# gRPC dependencies
+import grpc
+
+# Proto dependencies
+import commons_pb2
+import srv6_manager_pb2
+import srv6_manager_pb2_grpc
+
+# Controller dependencies
+from controller import arangodb_driver, srv6_usid, srv6_utils, topo_utils
+from controller import tracing, utils
+from controller.srv6_pm_scheduler import ChannelPool
+
+# Configuration parameters
+#
+# Define whether to start the reconciler with the northbound gRPC server
+ENABLE_RECONCILER = os.getenv('ENABLE_RECONCILER', 'false')
+ENABLE_RECONCILER = ENABLE_RECONCILER.lower() == 'true'
+# Interval (in seconds) between two reconciliations
+RECONCILE_INTERVAL = float(os.getenv('RECONCILE_INTERVAL', '60'))
+# Max random variation of the interval, as a fraction of the interval
+RECONCILE_JITTER = float(os.getenv('RECONCILE_JITTER', '0.1'))
+# Max number of nodes reconciled concurrently
+RECONCILE_WORKERS = int(os.getenv('RECONCILE_WORKERS', '8'))
+# Max number of entities pushed to the nodes per second (0 means no limit)
+RECONCILE_RATE = float(os.getenv('RECONCILE_RATE', '100'))
+# Max number of entities carried by a single RPC
+RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE', '100'))
+# Define whether to remove the SRv6 entities that are not in the database
+RECONCILE_PRUNE = os.getenv('RECONCILE_PRUNE', 'false')
+RECONCILE_PRUNE = RECONCILE_PRUNE.lower() == 'true'
+# Define whether to only report the drift, without correcting it
+RECONCILE_DRY_RUN = os.getenv('RECONCILE_DRY_RUN', 'false')
+RECONCILE_DRY_RUN = RECONCILE_DRY_RUN.lower() == 'true'
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+
+# Main routing table, used by the nodes when the table is not specified
+RT_TABLE_MAIN = 254
+
+# Entity types
+PATH = 'path'
+BEHAVIOR = 'behavior'
+# Fields identifying an entity on a node
+KEY_FIELDS = {
+    PATH: ('destination', 'table'),
+    BEHAVIOR: ('segment', 'table')
+}
+# Fields compared when they are specified in the database
+COMPARED_FIELDS = {
+    PATH: ('segments', 'encapmode', 'device', 'metric'),
+    BEHAVIOR: ('action', 'nexthop', 'lookup_table', 'interface', 'segments',
+               'device', 'metric')
+}
+# Operations used to correct the drift
+ADD = 'add'
+CHANGE = 'change'
+DEL = 'del'
+
+
+def _canonical_prefix(prefix):
+    """
+    Return the canonical form of an IP address or prefix (e.g. fd00::1
+    becomes fd00::1/128).
+    """
+    if prefix is None or prefix == '':
+        return None
+    try:
+        return str(ip_network(prefix, strict=False))
+    except ValueError:
+        return str(prefix)
+
+
+def _canonical_address(address):
+    """
+    Return the canonical form of an IP address.
+    """
+    if address is None or address == '':
+        return None
+    try:
+        return str(ip_address(address))
+    except ValueError:
+        return str(address)
+
+
+def _canonical_table(table):
+    """
+    Return the canonical form of a table ID (-1 stands for the main table).
+    """
+    if table is None or table == '' or int(table) in [-1, 0]:
+        return RT_TABLE_MAIN
+    return int(table)
+
+
+def _canonical_int(value):
+    """
+    Return the canonical form of an optional integer (None if the value is
+    not specified).
+    """
+    if value is None or value == '' or int(value) == -1:
+        return None
+    return int(value)
+
+
+def _canonical_str(value):
+    """
+    Return the canonical form of an optional string (None if the value is
+    not specified).
+    """
+    if value is None or value == '':
+        return None
+    return str(value)
+
+
+def _canonical_segments(segments):
+    """
+    Return the canonical form of a SID list.
+    """
+    if not segments:
+        return None
+    return [_canonical_address(segment) for segment in segments]
+
+
+def _canonical_encapmode(encapmode):
+    """
+    Return the canonical form of an encap mode. The nodes use the "encap"
+    mode when the encap mode is not specified, and report the "encap.red"
+    routes as "encap" routes.
+    """
+    if encapmode is None or encapmode in ['', 'encap.red']:
+        return 'encap'
+    return str(encapmode)
+
+
+def canonical_path(path):
+    """
+    Return the canonical form of a SRv6 path.
+
+    :param path: The SRv6 path, in the format of the documents of the
+                 "srv6_paths" collection.
+    :type path: dict
+    :return: The canonical form of the path.
+    :rtype: dict
+    """
+    return {
+        'destination': _canonical_prefix(path.get('destination')),
+        'table': _canonical_table(path.get('table')),
+        'segments': _canonical_segments(path.get('segments')),
+        'encapmode': _canonical_encapmode(path.get('encapmode')),
+        'device': _canonical_str(path.get('device')),
+        'metric': _canonical_int(path.get('metric'))
+    }
+
+
+def canonical_behavior(behavior):
+    """
+    Return the canonical form of a SRv6 behavior.
+
+    :param behavior: The SRv6 behavior, in the format of the documents of
+                     the "srv6_behaviors" collection.
+    :type behavior: dict
+    :return: The canonical form of the behavior.
+    :rtype: dict
+    """
+    return {
+        'segment': _canonical_prefix(behavior.get('segment')),
+        'table': _canonical_table(behavior.get('table')),
+        'action': _canonical_str(behavior.get('action')),
+        'nexthop': _canonical_address(behavior.get('nexthop')),
+        'lookup_table': _canonical_int(behavior.get('lookup_table')),
+        'interface': _canonical_str(behavior.get('interface')),
+        'segments': _canonical_segments(behavior.get('segments')),
+        'device': _canonical_str(behavior.get('device')),
+        'metric': _canonical_int(behavior.get('metric'))
+    }
+
+
+# Functions returning the canonical form of each entity type
+CANONICAL_FORMS = {
+    PATH: canonical_path,
+    BEHAVIOR: canonical_behavior
+}
+
+
+def entity_digest(canonical, fields):
+    """
+    Return the hash of the given fields of the canonical form of an entity.
+
+    :param canonical: The canonical form of the entity.
+    :type canonical: dict
+    :param fields: The fields to be hashed.
+    :type fields: tuple
+    :return: The hash, as an hex string.
+    :rtype: str
+    """
+    data = json.dumps([[field, canonical[field]] for field in fields],
+                      separators=(',', ':'))
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def fingerprint(entities):
+    """
+    Return the fingerprint of a set of entities, computed in the same way
+    by the node manager (see node_manager.state_store.fingerprint).
+
+    :param entities: The entities, as (kind, canonical form) tuples.
+    :type entities: list
+    :return: The fingerprint, as an hex string.
+    :rtype: str
+    """
+    digests = sorted(
+        hashlib.sha1(json.dumps([kind, canonical], sort_keys=True,
+                                separators=(',', ':')).encode()).hexdigest()
+        for kind, canonical in entities)
+    return hashlib.sha256('\n'.join(digests).encode()).hexdigest()
+
+
+def grpc_path_to_dict(path):
+    """
+    Convert a SRv6 path returned by a node to a dict.
+    """
+    return {
+        'destination': path.destination,
+        'segments': [segment.segment for segment in path.sr_path],
+        'device': path.device,
+        'encapmode': path.encapmode,
+        'table': path.table,
+        'metric': path.metric
+    }
+
+
+def grpc_behavior_to_dict(behavior):
+    """
+    Convert a SRv6 behavior returned by a node to a dict.
+    """
+    return {
+        'segment': behavior.segment,
+        'action': behavior.action,
+        'nexthop': behavior.nexthop,
+        'lookup_table': behavior.lookup_table,
+        'interface': behavior.interface,
+        'segments': [segment.segment for segment in behavior.segs],
+        'device': behavior.device,
+        'table': behavior.table,
+        'metric': behavior.metric
+    }
+
+
+class Intent:
+    """
+    A SRv6 entity recorded in the database.
+
+    :param kind: The entity type (PATH or BEHAVIOR).
+    :type kind: str
+    :param doc: The entity, in the format of the documents of the
+                "srv6_paths" or "srv6_behaviors" collection.
+    :type doc: dict
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, kind, doc):
+        self.kind = kind
+        self.doc = doc
+        self.canonical = CANONICAL_FORMS[kind](doc)
+        self.key = (kind,) + tuple(self.canonical[field]
+                                   for field in KEY_FIELDS[kind])
+        # Only the fields specified in the database are compared
+        self.fields = tuple(field for field in COMPARED_FIELDS[kind]
+                            if self.canonical[field] is not None)
+        self.digest = entity_digest(self.canonical, self.fields)
+
+    def matches(self, canonical):
+        """
+        Check if an entity configured on a node matches the intent.
+
+        :param canonical: The canonical form of the entity configured on
+                          the node.
+        :type canonical: dict
+        :return: True if the entity matches the intent.
+        :rtype: bool
+        """
+        return entity_digest(canonical, self.fields) == self.digest
+
+
+def load_intents(db_conn, nodes_config=None):
+    """
+    Load the SRv6 paths, the SRv6 behaviors and the uSID policies stored in
+    a database. The uSID policies are expanded into the SRv6 paths
+    configured on their endpoints.
+
+    :param db_conn: Database where the entities are stored.
+    :type db_conn: arango.database.StandardDatabase
+    :param nodes_config: Nodes configuration, used to expand the uSID
+                         policies (default: loaded from the database).
+    :type nodes_config: dict, optional
+    :return: The entities, as (kind, document) tuples.
+    :rtype: list
+    """
+    intents = list()
+    for path in arangodb_driver.find_srv6_path(database=db_conn):
+        intents.append((PATH, path))
+    for behavior in arangodb_driver.find_srv6_behavior(database=db_conn):
+        intents.append((BEHAVIOR, behavior))
+    policies = list(arangodb_driver.find_usid_policy(database=db_conn))
+    if policies and nodes_config is None:
+        nodes_config = topo_utils.get_nodes_config()
+    for policy in policies:
+        try:
+            paths = srv6_usid.usid_policy_to_paths(policy, nodes_config)
+        except srv6_utils.SRv6Exception:
+            logger.error('Cannot expand the uSID policy %s',
+                         policy.get('_key'))
+            continue
+        intents += [(PATH, path) for path in paths]
+    return intents
+
+
+def load_nodes(nodes_config=None):
+    """
+    Load the nodes known from the nodes configuration.
+
+    :param nodes_config: Nodes configuration (default: loaded from the
+                         database).
+    :type nodes_config: dict, optional
+    :return: The nodes, as (address, port, forwarding engine) tuples.
+    :rtype: list
+    """
+    if nodes_config is None:
+        try:
+            nodes_config = topo_utils.get_nodes_config()
+        except arangodb_driver.NodesConfigNotLoadedError:
+            # No nodes configuration: only the nodes having entities in
+            # the database are reconciled
+            logger.debug('Nodes configuration not loaded')
+            return list()
+    return [(node['grpc_ip'], node['grpc_port'],
+             node.get('fwd_engine') or 'linux')
+            for node in nodes_config['nodes']]
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the number of entities pushed to the nodes per
+    second. A request larger than the bucket is allowed and delays the
+    following ones.
+
+    :param rate: Max number of entities per second (0 means no limit).
+    :type rate: float
+    :param burst: Size of the bucket (default: rate).
+    :type burst: float, optional
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """
+        Wait until the given number of entities can be pushed.
+
+        :param amount: Number of entities.
+        :type amount: int, optional
+        :return: Time waited (in seconds).
+        :rtype: float
+        """
+        if self.rate <= 0:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            delay = max(-self._tokens / self.rate, 0)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class NodeReport:
+    """
+    Result of the reconciliation of a node.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, address, port):
+        self.address = address
+        self.port = port
+        # Number of entities in the database
+        self.intents = 0
+        # Number of corrections, by operation
+        self.corrections = {ADD: 0, CHANGE: 0, DEL: 0}
+        # True if the fingerprint returned by the node matched the
+        # database (i.e. the state of the node was not retrieved)
+        self.fingerprint_match = False
+        # Error raised during the reconciliation, if any
+        self.error = None
+
+    @property
+    def in_sync(self):
+        """
+        True if the node did not need any correction.
+        """
+        return self.error is None and not any(self.corrections.values())
+
+
+class Reconciler:
+    """
+    Reconciler of the SRv6 entities stored in the database with the state
+    of the nodes.
+
+    :meth:`reconcile_once` reconciles all the nodes once; once
+    :meth:`start` is called, a background thread reconciles the nodes
+    every "interval" seconds (+/- "jitter").
+
+    :param intent_loader: Function returning the SRv6 entities stored in
+                          the database, as (kind, document) tuples (see
+                          :func:`load_intents`).
+    :type intent_loader: function
+    :param interval: Interval (in seconds) between two reconciliations.
+    :type interval: float, optional
+    :param jitter: Max random variation of the interval, as a fraction of
+                   the interval.
+    :type jitter: float, optional
+    :param max_workers: Max number of nodes reconciled concurrently.
+    :type max_workers: int, optional
+    :param rate: Max number of entities pushed to the nodes per second (0
+                 means no limit).
+    :type rate: float, optional
+    :param batch_size: Max number of entities carried by a single RPC.
+    :type batch_size: int, optional
+    :param prune: If True, the SRv6 entities configured on the nodes that
+                  are not in the database are removed.
+    :type prune: bool, optional
+    :param dry_run: If True, the drift is reported but not corrected.
+    :type dry_run: bool, optional
+    :param channel_pool: Pool of the channels to the nodes.
+    :type channel_pool: controller.srv6_pm_scheduler.ChannelPool, optional
+    :param node_loader: Function returning the known nodes, as (address,
+                        port, forwarding engine) tuples (see
+                        :func:`load_nodes`). If prune is True, these nodes
+                        are reconciled even if they have no entities in the
+                        database.
+    :type node_loader: function, optional
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, intent_loader, interval=RECONCILE_INTERVAL,
+                 jitter=RECONCILE_JITTER, max_workers=RECONCILE_WORKERS,
+                 rate=RECONCILE_RATE, batch_size=RECONCILE_BATCH_SIZE,
+                 prune=RECONCILE_PRUNE, dry_run=RECONCILE_DRY_RUN,
+                 channel_pool=None, node_loader=None):
+        # pylint: disable=too-many-arguments
+        self.intent_loader = intent_loader
+        self.node_loader = node_loader
+        self.interval = interval
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate)
+        self.batch_size = batch_size
+        self.prune = prune
+        self.dry_run = dry_run
+        self.channel_pool = \
+            channel_pool if channel_pool is not None else ChannelPool()
+        # Report of the last reconciliation
+        self.last_reports = list()
+        self._executor = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def group_intents(intents):
+        """
+        Group the SRv6 entities by node and forwarding engine. Entities
+        with the same key (e.g. a SRv6 path stored in the database and
+        implementing a uSID policy) are reconciled once.
+
+        :param intents: The entities, as (kind, document) tuples.
+        :type intents: list
+        :return: Dict mapping (address, port, fwd_engine) to a dict of the
+                 Intent objects indexed by key.
+        :rtype: dict
+        """
+        nodes = dict()
+        for kind, doc in intents:
+            node = (doc['grpc_address'], doc['grpc_port'],
+                    doc.get('fwd_engine') or 'linux')
+            intent = Intent(kind, doc)
+            nodes.setdefault(node, dict())[intent.key] = intent
+        return nodes
+
+    def diff(self, intents, paths, behaviors):
+        """
+        Compute the corrections required to align the state of a node to
+        the database.
+
+        :param intents: The Intent objects of the node, indexed by key.
+        :type intents: dict
+        :param paths: The SRv6 paths configured on the node.
+        :type paths: list
+        :param behaviors: The SRv6 behaviors configured on the node.
+        :type behaviors: list
+        :return: List of (operation, kind, entity) tuples, where "entity" is
+                 the Intent object for "add" and "change" and the entity
+                 returned by the node for "del".
+        :rtype: list
+        """
+        corrections = list()
+        state = dict()
+        for kind, entities, to_dict in (
+                (PATH, paths, grpc_path_to_dict),
+                (BEHAVIOR, behaviors, grpc_behavior_to_dict)):
+            for entity in entities:
+                canonical = CANONICAL_FORMS[kind](to_dict(entity))
+                key = (kind,) + tuple(canonical[field]
+                                      for field in KEY_FIELDS[kind])
+                state[key] = (canonical, entity)
+        for key, intent in intents.items():
+            if key not in state:
+                corrections.append((ADD, intent.kind, intent))
+            elif not intent.matches(state[key][0]):
+                corrections.append((CHANGE, intent.kind, intent))
+        if self.prune:
+            for key, (_, entity) in state.items():
+                if key not in intents:
+                    corrections.append((DEL, key[0], entity))
+        return corrections
+
+    @staticmethod
+    def get_node_fingerprint(stub, fwd_engine):
+        """
+        Retrieve the fingerprint of the SRv6 entities applied by a node.
+
+        :return: The fingerprint, or None if the node does not keep a
+                 snapshot of the entities or cannot verify it.
+        :rtype: str
+        """
+        request = srv6_manager_pb2.SRv6FingerprintRequest(
+            fwd_engine=srv6_utils.py_to_grpc_fwd_engine[fwd_engine],
+            verify=True)
+        try:
+            response = stub.GetFingerprint(request)
+        except grpc.RpcError as err:
+            if err.code() == grpc.StatusCode.UNIMPLEMENTED:
+                # Node manager not supporting the snapshots
+                return None
+            raise
+        if response.status != commons_pb2.STATUS_SUCCESS:
+            return None
+        return response.fingerprint or None
+
+    @staticmethod
+    def get_node_state(stub, fwd_engine):
+        """
+        Retrieve all the SRv6 paths and behaviors configured on a node.
+
+        :return: Tuple containing the list of the paths and the list of the
+                 behaviors.
+        :rtype: tuple
+        :raises Exception: The node returned an error (see
+                           :func:`controller.utils.raise_exception_on_error`).
+        """
+        request = srv6_manager_pb2.SRv6ManagerRequest()
+        # An empty destination (or segment) and table -1 match all the
+        # entities configured on the node
+        path_request = request.srv6_path_request  # pylint: disable=no-member
+        path_request.fwd_engine = srv6_utils.py_to_grpc_fwd_engine[fwd_engine]
+        path_request.paths.add(destination='', table=-1)
+        behavior_request = (request               # pylint: disable=no-member
+                            .srv6_behavior_request)
+        behavior_request.fwd_engine = \
+            srv6_utils.py_to_grpc_fwd_engine[fwd_engine]
+        behavior_request.behaviors.add(segment='', table=-1)
+        response = stub.Get(request)
+        utils.raise_exception_on_error(response.status)
+        return list(response.paths), list(response.behaviors)
+
+    def push_corrections(self, stub, fwd_engine, corrections):
+        """
+        Push the corrections to a node: the entities of the same type
+        requiring the same operation are sent in batches of at most
+        "batch_size" entities.
+
+        :raises Exception: The node refused a correction (see
+                           :func:`controller.utils.raise_exception_on_error`).
+        """
+        rpcs = {ADD: stub.Create, CHANGE: stub.Update, DEL: stub.Remove}
+        batches = dict()
+        for operation, kind, entity in corrections:
+            batches.setdefault((operation, kind), list()).append(entity)
+        # Removals are pushed first, to free the routes
+        for (operation, kind), entities in sorted(
+                batches.items(), key=lambda item: item[0][0] != DEL):
+            for start in range(0, len(entities), self.batch_size):
+                batch = entities[start:start + self.batch_size]
+                request = srv6_manager_pb2.SRv6ManagerRequest()
+                # pylint: disable=no-member
+                entity_request = request.srv6_path_request if kind == PATH \
+                    else request.srv6_behavior_request
+                entity_request.fwd_engine = \
+                    srv6_utils.py_to_grpc_fwd_engine[fwd_engine]
+                for entity in batch:
+                    if kind == PATH and operation == DEL:
+                        entity_request.paths.add().CopyFrom(entity)
+                    elif kind == PATH:
+                        srv6_utils.fill_srv6_path(
+                            entity_request.paths.add(), entity.doc)
+                    elif operation == DEL:
+                        entity_request.behaviors.add().CopyFrom(entity)
+                    else:
+                        srv6_utils.fill_srv6_behavior(
+                            entity_request.behaviors.add(), entity.doc)
+                self.rate_limiter.acquire(len(batch))
+                status = rpcs[operation](request).status
+                utils.raise_exception_on_error(status)
+
+    @tracing.traced()
+    def reconcile_node(self, address, port, fwd_engine, intents):
+        """
+        Reconcile a node.
+
+        :param address: The IP address of the node.
+        :type address: str
+        :param port: The port of the gRPC server running on the node.
+        :type port: int
+        :param fwd_engine: The forwarding engine of the entities.
+        :type fwd_engine: str
+        :param intents: The Intent objects of the node, indexed by key.
+        :type intents: dict
+        :return: The report of the reconciliation.
+        :rtype: NodeReport
+        """
+        # pylint: disable=too-many-arguments
+        report = NodeReport(address, port)
+        report.intents = len(intents)
+        try:
+            stub = srv6_manager_pb2_grpc.SRv6ManagerStub(
+                self.channel_pool.get(address, port))
+            if not self.prune and self.get_node_fingerprint(
+                    stub, fwd_engine) == fingerprint(
+                        (intent.kind, intent.canonical)
+                        for intent in intents.values()):
+                # The node applied all the entities in the database
+                report.fingerprint_match = True
+                return report
+            paths, behaviors = self.get_node_state(stub, fwd_engine)
+            corrections = self.diff(intents, paths, behaviors)
+            for operation, _, _ in corrections:
+                report.corrections[operation] += 1
+            if corrections:
+                logger.info('Node %s:%s: %s', address, port,
+                            ', '.join('%s=%s' % item for item
+                                      in report.corrections.items()))
+            if corrections and not self.dry_run:
+                self.push_corrections(stub, fwd_engine, corrections)
+        except grpc.RpcError as err:
+            report.error = err.code().name
+        except Exception as err:    # pylint: disable=broad-except
+            # The status codes returned by the node are raised as different
+            # exceptions by utils.raise_exception_on_error()
+            report.error = type(err).__name__
+        if report.error is not None:
+            logger.error('Cannot reconcile node %s:%s: %s', address, port,
+                         report.error)
+        return report
+
+    @tracing.traced()
+    def reconcile_once(self):
+        """
+        Reconcile all the nodes having entities in the database, waiting
+        for the end of the reconciliation. If prune is True, the nodes
+        returned by the node loader are reconciled too, in order to remove
+        their entities not in the database.
+
+        :return: The reports of the nodes.
+        :rtype: list
+        """
+        nodes = self.group_intents(self.intent_loader())
+        if self.prune and self.node_loader is not None:
+            for node in self.node_loader():
+                nodes.setdefault(node, dict())
+        if self._executor is None:
+            self._executor = futures.ThreadPoolExecutor(
+                max_workers=self.max_workers)
+        pending = [self._executor.submit(self.reconcile_node, address, port,
+                                         fwd_engine, intents)
+                   for (address, port, fwd_engine), intents in nodes.items()]
+        reports = [future.result()
+                   for future in futures.as_completed(pending)]
+        logger.info('Reconciled %s nodes: %s in sync, %s corrected, '
+                    '%s errors', len(reports),
+                    sum(report.in_sync for report in reports),
+                    sum(report.error is None and not report.in_sync
+                        for report in reports),
+                    sum(report.error is not None for report in reports))
+        self.last_reports = reports
+        return reports
+
+    def _run(self):
+        """
+        Reconciliation loop.
+        """
+        while not self._stop_event.is_set():
+            try:
+                self.reconcile_once()
+            except Exception:    # pylint: disable=broad-except
+                logger.exception('Reconciliation failed')
+            self._stop_event.wait(self.interval * (
+                1 + random.uniform(-self.jitter, self.jitter)))
+
+    def start(self):
+        """
+        Start the reconciliation thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='srv6-reconciler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the reconciliation thread and close the channels.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.channel_pool.close()
@@ -29,18 +29,17 @@ Control-Plane functionalities for SRv6 Manager
 """
 
 # General imports
+import functools
 import logging
-import math
 import pprint
 from ipaddress import IPv6Address
 
-from pyaml import yaml
-
 # Proto dependencies
 import commons_pb2
 # Controller dependencies
 from controller import srv6_utils
 from controller import topo_utils
+from controller import tracing
 from controller import utils
 try:
     from controller import arangodb_driver
@@ -89,6 +88,230 @@ class InvalidSIDError(srv6_utils.SRv6Exception):
     """
 
 
+class USIDFormat:
+    """
+    A uSID format (e.g. F3216, i.e. 32 bits of locator block and 16 bits of
+    uSID identifier).
+
+    Masks and shifts for every uSID slot are computed only once, when the
+    format is created, so that encoding and decoding a SID is reduced to a
+    few integer operations. Use :func:`get_usid_format` to get a cached
+    instance of a format.
+
+    :param locator_bits: Number of bits of the locator part of the SIDs
+    :type locator_bits: int
+    :param usid_id_bits: Number of bits of the uSID identifiers
+    :type usid_id_bits: int
+    :raises InvalidConfigurationError: The bit widths are not valid
+    """
+
+    def __init__(self, locator_bits=DEFAULT_LOCATOR_BITS,
+                 usid_id_bits=DEFAULT_USID_ID_BITS):
+        locator_bits = int(locator_bits)
+        usid_id_bits = int(usid_id_bits)
+        # Validate the bit widths
+        if locator_bits < 0 or usid_id_bits <= 0 or \
+                locator_bits + usid_id_bits > 128:
+            logger.error('Invalid uSID format: locator_bits=%s, '
+                         'usid_id_bits=%s', locator_bits, usid_id_bits)
+            raise InvalidConfigurationError
+        self.locator_bits = locator_bits
+        self.usid_id_bits = usid_id_bits
+        # Locator mask, used to extract the locator from the SIDs
+        self.locator_mask = ((1 << locator_bits) - 1) << (128 - locator_bits)
+        # Mask of a uSID identifier (aligned to the least significant bit)
+        self.usid_id_max = (1 << usid_id_bits) - 1
+        # Max number of uSID identifiers that fit in a uSID
+        self.max_usids = (128 - locator_bits) // usid_id_bits
+        # Shift of each uSID slot: slot 'i' is stored at bit offset
+        # 'shifts[i]' starting from the least significant bit
+        self.shifts = tuple(128 - locator_bits - (i + 1) * usid_id_bits
+                            for i in range(self.max_usids))
+        # Mask of the bits following the first uSID identifier; these bits
+        # must be zero in a SID
+        self.trailing_mask = (1 << self.shifts[0]) - 1 \
+            if self.max_usids > 0 else 0
+
+    def __repr__(self):
+        return 'USIDFormat(locator_bits=%s, usid_id_bits=%s)' % (
+            self.locator_bits, self.usid_id_bits)
+
+    def get_locator(self, sid):
+        """
+        Extract the locator from a SID.
+
+        :param sid: SID
+        :type sid: int
+        :return: The locator
+        :rtype: int
+        """
+        return sid & self.locator_mask
+
+    def get_usid_id(self, sid, slot=0):
+        """
+        Extract a uSID identifier from a SID.
+
+        :param sid: SID
+        :type sid: int
+        :param slot: Position of the uSID identifier in the SID
+        :type slot: int
+        :return: The uSID identifier
+        :rtype: int
+        """
+        return (sid >> self.shifts[slot]) & self.usid_id_max
+
+    def encode(self, locator, usid_ids):
+        """
+        Build a uSID from a locator and a list of uSID identifiers.
+
+        :param locator: The locator of the uSID
+        :type locator: int
+        :param usid_ids: The uSID identifiers
+        :type usid_ids: list
+        :return: The uSID
+        :rtype: int
+        :raises TooManySegmentsError: Too many uSID identifiers
+        """
+        if len(usid_ids) > self.max_usids:
+            logger.error('Too many segments')
+            raise TooManySegmentsError
+        usid = locator
+        for usid_id, shift in zip(usid_ids, self.shifts):
+            usid |= (usid_id & self.usid_id_max) << shift
+        return usid
+
+    def decode(self, usid):
+        """
+        Split a uSID in locator and uSID identifiers. Decoding stops at the
+        first empty slot.
+
+        :param usid: The uSID
+        :type usid: int
+        :return: Tuple (locator, list of uSID identifiers)
+        :rtype: tuple
+        """
+        usid_ids = list()
+        for shift in self.shifts:
+            usid_id = (usid >> shift) & self.usid_id_max
+            if usid_id == 0:
+                break
+            usid_ids.append(usid_id)
+        return usid & self.locator_mask, usid_ids
+
+    def usid_id_to_sid(self, usid_id, locator):
+        """
+        Convert a uSID identifier into a SID.
+
+        :param usid_id: The uSID identifier
+        :type usid_id: int
+        :param locator: The locator
+        :type locator: int
+        :return: The SID
+        :rtype: int
+        """
+        return locator | ((usid_id & self.usid_id_max) << self.shifts[0])
+
+
+@functools.lru_cache(maxsize=None)
+def get_usid_format(locator_bits=DEFAULT_LOCATOR_BITS,
+                    usid_id_bits=DEFAULT_USID_ID_BITS):
+    """
+    Return the :class:`USIDFormat` for the given bit widths. Formats are
+    cached, so their tables are computed only once per process.
+
+    :param locator_bits: Number of bits of the locator part of the SIDs
+    :type locator_bits: int
+    :param usid_id_bits: Number of bits of the uSID identifiers
+    :type usid_id_bits: int
+    :return: The uSID format
+    :rtype: USIDFormat
+    :raises InvalidConfigurationError: The bit widths are not valid
+    """
+    return USIDFormat(locator_bits=locator_bits, usid_id_bits=usid_id_bits)
+
+
+class LocatorTable:
+    """
+    Lookup table mapping the locators defined in a nodes configuration to
+    their uSID format. SIDs not matching any locator use the default format.
+
+    The table is indexed by locator length, so the cost of a lookup depends
+    on the number of distinct locator lengths and not on the number of
+    locators.
+
+    :param nodes_config: Nodes configuration. The optional "locator_bits" and
+                         "usid_id_bits" fields define the default format; the
+                         optional "locators" list contains dicts with the
+                         fields "locator", "locator_bits" and "usid_id_bits".
+    :type nodes_config: dict
+    :raises InvalidConfigurationError: The locators configuration is not
+                                       valid
+    """
+
+    def __init__(self, nodes_config=None):
+        if nodes_config is None:
+            nodes_config = dict()
+        # Default format; a missing or zero value (e.g. an unset protobuf
+        # field) selects the default bit width
+        self.default_format = get_usid_format(
+            locator_bits=nodes_config.get('locator_bits') or
+            DEFAULT_LOCATOR_BITS,
+            usid_id_bits=nodes_config.get('usid_id_bits') or
+            DEFAULT_USID_ID_BITS
+        )
+        # Mapping locator mask -> {locator: uSID format}
+        self.formats_by_mask = dict()
+        for locator in nodes_config.get('locators') or []:
+            if not utils.validate_ipv6_address(locator.get('locator')):
+                logger.error('Invalid locator %s', locator.get('locator'))
+                raise InvalidConfigurationError
+            usid_format = get_usid_format(
+                locator_bits=locator.get('locator_bits') or
+                DEFAULT_LOCATOR_BITS,
+                usid_id_bits=locator.get('usid_id_bits') or
+                DEFAULT_USID_ID_BITS
+            )
+            locator_int = int(IPv6Address(locator['locator']))
+            # Bits outside the locator part must be zero
+            if usid_format.get_locator(locator_int) != locator_int:
+                logger.error('Locator %s is longer than %s bits',
+                             locator['locator'], usid_format.locator_bits)
+                raise InvalidConfigurationError
+            self.formats_by_mask.setdefault(
+                usid_format.locator_mask, dict())[locator_int] = usid_format
+
+    def lookup(self, sid):
+        """
+        Return the uSID format of the locator containing a SID.
+
+        :param sid: The SID (e.g. 'fcbb:bb00:1::')
+        :type sid: str
+        :return: The uSID format
+        :rtype: USIDFormat
+        """
+        sid = int(IPv6Address(sid))
+        for mask, formats in self.formats_by_mask.items():
+            usid_format = formats.get(sid & mask)
+            if usid_format is not None:
+                return usid_format
+        return self.default_format
+
+
+def load_yaml_file(filename):
+    """
+    Load a YAML file.
+
+    :param filename: Name of the YAML file.
+    :type filename: str
+    :return: The content of the file.
+    :rtype: object
+    """
+    # pyaml takes a long time to load, so it is imported on first use
+    from pyaml import yaml
+    with open(filename, 'r') as infile:
+        return yaml.safe_load(infile)
+
+
 def print_nodes(nodes_dict):
     """
     Print the nodes.
@@ -109,8 +332,7 @@ def print_node_to_addr_mapping(nodes_filename):
     :type node_to_addr_filename: str
     """
     # Read the mapping from the file
-    with open(nodes_filename, 'r') as nodes_file:
-        nodes = yaml.safe_load(nodes_file)
+    nodes = load_yaml_file(nodes_filename)
     # Validate the IP addresses
     for addr in [node['grpc_ip'] for node in nodes['nodes'].values()]:
         if not utils.validate_ipv6_address(addr):
@@ -163,8 +385,7 @@ def read_nodes(nodes_filename):
                                        YAML file
     """
     # Read the mapping from the file
-    with open(nodes_filename, 'r') as nodes_file:
-        nodes = yaml.safe_load(nodes_file)
+    nodes = load_yaml_file(nodes_filename)
     # Validate the IP addresses
     for addr in [node['grpc_ip'] for node in nodes['nodes'].values()]:
         if not utils.validate_ipv6_address(addr):
@@ -198,6 +419,8 @@ def read_nodes(nodes_filename):
     if locator_bits is not None and usid_id_bits is not None and \
             int(usid_id_bits) + int(locator_bits) > 128:
         raise InvalidConfigurationError
+    # Validate the uSID formats of the locators
+    LocatorTable(nodes)
     # Enforce case-sensitivity
     for node in nodes['nodes'].values():
         nodes['nodes'][node['name']]['grpc_ip'] = node['grpc_ip'].lower()
@@ -227,64 +450,35 @@ def segments_to_micro_segment(locator, segments,
     :raises SIDLocatorError: SID Locator is wrong for one or more segments
     :raises InvalidSIDError: SID is wrong for one or more segments
     """
-    # Locator mask, used to extract the locator from the SIDs
-    #
-    # It is computed with a binary manipulation
-    # We start from the IPv6 address 111...11111, then we put to zero
-    # the bits of the non-locator part
-    # The remaining part is the locator, which is converted to an IPv6Address
-    locator_mask = str(IPv6Address(int('1' * 128, 2) ^
-                                   int('1' * (128 - locator_bits), 2)))
-    # uSID identifier mask
-    #
-    # It is computed with a binary manipulation
-    # We start from the IPv6 address 111...11111, then we perform a shift
-    # operation
-    usid_id_mask = str(IPv6Address(int('1' * usid_id_bits, 2) <<
-                                   (128 - locator_bits - usid_id_bits)))
-    # Enforce case-sensitivity
-    locator = locator.lower()
-    _segments = list()
-    for segment in segments:
-        _segments.append(segment.lower())
-    segments = _segments
+    # Get the shift and mask tables for the uSID format
+    usid_format = get_usid_format(locator_bits, usid_id_bits)
     # Validation check
     # We need to verify if there is space in the uSID for all the segments
-    if len(segments) > math.floor((128 - locator_bits) / usid_id_bits):
+    if len(segments) > usid_format.max_usids:
         logger.error('Too many segments')
         raise TooManySegmentsError
     # uSIDs always start with the SID Locator
-    usid_int = int(IPv6Address(locator))
-    # Offset of the uSIDs
-    offset = 0
+    locator_int = int(IPv6Address(locator))
+    # uSID identifiers extracted from the segments
+    usid_ids = list()
     # Iterate on the segments
     for segment in segments:
-        # Split the segment in...
-        # ...segment locator
-        segment_locator = \
-            str(IPv6Address(int(IPv6Address(locator_mask)) &
-                            int(IPv6Address(segment))))
-        if locator != segment_locator:
+        segment_int = int(IPv6Address(segment))
+        # Split the segment in segment locator...
+        if usid_format.get_locator(segment_int) != locator_int:
             # All the segments must have the same Locator
-            logger.error('Wrong locator for the SID %s', ''.join(segment))
+            logger.error('Wrong locator for the SID %s', segment)
             raise SIDLocatorError
-        # ...and uSID identifier
-        usid_id = \
-            str(IPv6Address(int(IPv6Address(usid_id_mask)) &
-                            int(IPv6Address(segment))))
         # Other bits should be equal to zero
-        if int(IPv6Address(segment)) & (
-                0b1 * (128 - locator_bits - usid_id_bits)) != 0:
+        if segment_int & usid_format.trailing_mask != 0:
             # The SID is invalid
             logger.error('SID %s is invalid. Final bits should be zero',
                          segment)
             raise InvalidSIDError
-        # And append to the uSID
-        usid_int += int(IPv6Address(usid_id)) >> offset
-        # Increase offset
-        offset += usid_id_bits
-    # Get a string representation of the uSID
-    usid = str(IPv6Address(usid_int))
+        # ...and uSID identifier
+        usid_ids.append(usid_format.get_usid_id(segment_int))
+    # Build the uSID
+    usid = str(IPv6Address(usid_format.encode(locator_int, usid_ids)))
     # Enforce case-sensitivity and return the uSID
     return usid.lower()
 
@@ -302,38 +496,27 @@ def get_sid_locator(sid_list, locator_bits=DEFAULT_LOCATOR_BITS):
     :raises SIDLocatorError: SID Locator is wrong for one or more segments
     """
     # Locator mask, used to extract the locator from the SIDs
-    #
-    # It is computed with a binary manipulation
-    # We start from the IPv6 address 111...11111, then we put to zero
-    # the bits of the non-locator part
-    # The remaining part is the locator, which is converted to an IPv6Address
-    locator_mask = str(IPv6Address(int('1' * 128, 2) ^
-                                   int('1' * (128 - locator_bits), 2)))
-    # Enforce case-sensitivity
-    _sid_list = list()
-    for segment in sid_list:
-        _sid_list.append(segment.lower())
-    sid_list = _sid_list
+    locator_mask = ((1 << locator_bits) - 1) << (128 - locator_bits)
     # Locator
-    locator = ''
+    locator = None
     # Iterate on the SID list
     for segment in sid_list:
-        # Split the segment in...
-        # ...segment locator
-        segment_locator = \
-            str(IPv6Address(int(IPv6Address(locator_mask)) &
-                            int(IPv6Address(segment))))
-        if locator == '':
+        # Extract the segment locator
+        segment_locator = int(IPv6Address(segment)) & locator_mask
+        if locator is None:
             # Store the segment
             locator = segment_locator
         elif locator != segment_locator:
             # All the segments must have the same Locator
             logger.error('Wrong locator')
             raise SIDLocatorError
+    if locator is None:
+        return ''
     # Return the SID Locator
-    return locator
+    return str(IPv6Address(locator))
 
 
+@tracing.traced()
 def sidlist_to_usidlist(sid_list, udt_sids=None,
                         locator_bits=DEFAULT_LOCATOR_BITS,
                         usid_id_bits=DEFAULT_USID_ID_BITS):
@@ -356,9 +539,15 @@ def sidlist_to_usidlist(sid_list, udt_sids=None,
     # Size of the group of SIDs to be compressed in one uSID
     # The size depends on the locator bits and uSID ID bits
     # Last slot should be always leaved free
-    sid_group_size = math.floor((128 - locator_bits) / usid_id_bits) - 1
+    sid_group_size = \
+        get_usid_format(locator_bits, usid_id_bits).max_usids - 1
+    if sid_group_size <= 0:
+        logger.error('uSID format %s/%s leaves no room for the segments',
+                     locator_bits, usid_id_bits)
+        raise TooManySegmentsError
     # Get the locator
-    locator = get_sid_locator(sid_list=sid_list, locator_bits=locator_bits)
+    locator = get_sid_locator(sid_list=sid_list + udt_sids,
+                              locator_bits=locator_bits)
     # Micro segments list
     usid_list = []
     # Iterate on the SID list
@@ -385,6 +574,26 @@ def sidlist_to_usidlist(sid_list, udt_sids=None,
     return usid_list
 
 
+def read_locator_table(nodes_filename):
+    """
+    Build a :class:`LocatorTable` from a YAML file containing the nodes
+    configuration.
+
+    :param nodes_filename: Name of the YAML file containing the nodes
+                           configuration
+    :type nodes_filename: str
+    :return: The locator table
+    :rtype: LocatorTable
+    :raises InvalidConfigurationError: The locators configuration is not
+                                       valid
+    """
+    # Read the nodes configuration from the file
+    nodes = load_yaml_file(nodes_filename)
+    # Build the table
+    return LocatorTable(nodes)
+
+
+@tracing.traced()
 def nodes_to_micro_segments(nodes, node_addrs_filename):
     """
     Convert a list of nodes into a list of micro segments (uSID List)
@@ -406,46 +615,51 @@ def nodes_to_micro_segments(nodes, node_addrs_filename):
     # Convert the list of nodes into a list of IP addresses (SID list)
     # Translation is based on a file containing the mapping
     # of node names to IP addresses
-    nodes_info, locator_bits, usid_id_bits = read_nodes(node_addrs_filename)
+    nodes_info, _, _ = read_nodes(node_addrs_filename)
     sid_list = list()
     for node in nodes:
         if node not in nodes_info:
             raise NodeNotFoundError
         sid_list.append(nodes_info[node]['uN'])
-    if locator_bits is None:
-        locator_bits = DEFAULT_LOCATOR_BITS
-    if usid_id_bits is None:
-        usid_id_bits = DEFAULT_USID_ID_BITS
+    # Get the uSID format of the locator used by the SIDs
+    locator_table = read_locator_table(node_addrs_filename)
+    usid_format = locator_table.default_format
+    if len(sid_list) > 0:
+        usid_format = locator_table.lookup(sid_list[0])
     # Compress the SID list into a uSID list
     usid_list = sidlist_to_usidlist(
         sid_list=sid_list,
-        locator_bits=locator_bits,
-        usid_id_bits=usid_id_bits
+        locator_bits=usid_format.locator_bits,
+        usid_id_bits=usid_format.usid_id_bits
     )
     # Return the uSID list
     return usid_list
 
 
-def validate_usid_id(usid_id):
+def validate_usid_id(usid_id, usid_id_bits=DEFAULT_USID_ID_BITS):
     """
     Validate a uSID identifier. A valid uSID id should be an integer in the
-    range (0, 0xffff).
+    range (0, 2^usid_id_bits - 1), e.g. (0, 0xffff) for 16-bit identifiers.
 
     :param usid_id: uSID idenfier to validate.
     :type usid_id: str
+    :param usid_id_bits: Number of bits of the uSID identifiers
+    :type usid_id_bits: int
     :return: True if the uSID identifier is valid.
     :rtype: bool
     """
     try:
-        # A valid uSID id should be an integer in the range (0, 0xffff)
-        return int(usid_id, 16) >= 0x0 and int(usid_id, 16) <= 0xffff
+        # A valid uSID id should be an integer in the range
+        # (0, 2^usid_id_bits - 1)
+        return 0x0 <= int(usid_id, 16) <= (1 << usid_id_bits) - 1
     except ValueError:
         # The uSID id is invalid
         return False
     return True
 
 
-def usid_id_to_usid(usid_id, locator):
+def usid_id_to_usid(usid_id, locator, locator_bits=DEFAULT_LOCATOR_BITS,
+                    usid_id_bits=DEFAULT_USID_ID_BITS):
     """
     Convert a uSID identifier into a SID.
 
@@ -453,15 +667,21 @@ def usid_id_to_usid(usid_id, locator):
     :type usid_id: str
     :param locator: Locator part to be used for the SID.
     :type locator: str
+    :param locator_bits: Number of bits of the locator part of the SIDs
+    :type locator_bits: int
+    :param usid_id_bits: Number of bits of the uSID identifiers
+    :type usid_id_bits: int
     :return: Generated SID.
     :rtype: str
     """
-    return str(IPv6Address(int(IPv6Address(locator)) +
-                           (int(usid_id, 16) << 80)))
+    usid_format = get_usid_format(locator_bits, usid_id_bits)
+    return str(IPv6Address(usid_format.usid_id_to_sid(
+        int(usid_id, 16), int(IPv6Address(locator)))))
 
 
+@tracing.traced()
 def encode_endpoint_node(node, grpc_ip, grpc_port, fwd_engine, locator,
-                         udt=None):
+                         udt=None, usid_format=None):
     """
     Get a dict-representation of a node (endpoint of the path), starting from
     gRPC IP and port, uDT sid, forwarding engine and locator.
@@ -480,6 +700,9 @@ def encode_endpoint_node(node, grpc_ip, grpc_port, fwd_engine, locator,
     :type fwd_engine: str
     :param locator: Locator part of the SIDs (e.g. fcbb:bbbb::).
     :type locator: str
+    :param usid_format: uSID format of the locator. If not provided, the
+                        default format is used.
+    :type usid_format: USIDFormat, optional
     :return: Dict representation of the node. The dict has the following
              fields:
              - name
@@ -488,9 +711,17 @@ def encode_endpoint_node(node, grpc_ip, grpc_port, fwd_engine, locator,
              - uN
              - uDT
              - fwd_engine
+             None if the node is expressed as a name.
     :rtype: dict
     :raises InvalidConfigurationError: If the node params are invalid.
     """
+    # If the node is expressed as node name, we return None and we expect
+    # to find the node info in the nodes configuration
+    if usid_format is None:
+        usid_format = get_usid_format()
+    is_usid_id = validate_usid_id(node, usid_format.usid_id_bits)
+    if not utils.validate_ipv6_address(node) and not is_usid_id:
+        return None
     # Validation checks
     #
     # Validate gRPC address
@@ -515,28 +746,24 @@ def encode_endpoint_node(node, grpc_ip, grpc_port, fwd_engine, locator,
     # uSID identifier. If it is a uSID identifier, we need to convert it
     # to a SID.
     un = node
-    if validate_usid_id(node):
+    if is_usid_id:
         # Node identifier is a integer, we need to convert it to a SID (IPv6
         # address)
-        un = usid_id_to_usid(node, locator)
-    # If the node is expressed as IPv6 address or uSID identifier, encode it
-    # Otherwise (if the node is expressed as node name), we return None and we
-    # expect to find the node info in the nodes configuration.
-    if utils.validate_ipv6_address(node) or validate_usid_id(node):
-        # Return the dict
-        return {
-            'name': node,
-            'grpc_ip': grpc_ip,
-            'grpc_port': grpc_port,
-            'uN': un,
-            'uDT': udt,
-            'fwd_engine': fwd_engine
-        }
-    # 'Node' is a name. Return None.
-    return None
+        un = usid_id_to_usid(node, locator, usid_format.locator_bits,
+                             usid_format.usid_id_bits)
+    # Return the dict
+    return {
+        'name': node,
+        'grpc_ip': grpc_ip,
+        'grpc_port': grpc_port,
+        'uN': un,
+        'uDT': udt,
+        'fwd_engine': fwd_engine
+    }
 
 
-def encode_intermediate_node(node, locator):
+@tracing.traced()
+def encode_intermediate_node(node, locator, usid_format=None):
     """
     Get a dict-representation of a node (intermediate node of the path),
     starting from gRPC IP and port, uDT sid, forwarding engine and locator.
@@ -548,6 +775,9 @@ def encode_intermediate_node(node, locator):
     :type node: str
     :param locator: Locator part of the SIDs (e.g. fcbb:bbbb::).
     :type locator: str
+    :param usid_format: uSID format of the locator. If not provided, the
+                        default format is used.
+    :type usid_format: USIDFormat, optional
     :return: Dict representation of the node. The dict has the following
              fields:
              - name
@@ -556,9 +786,17 @@ def encode_intermediate_node(node, locator):
              - uN
              - uDT (set to None)
              - fwd_engine (set to None)
+             None if the node is expressed as a name.
     :rtype: dict
     :raises InvalidConfigurationError: If the node params are invalid.
     """
+    # If the node is expressed as node name, we return None and we expect
+    # to find the node info in the nodes configuration
+    if usid_format is None:
+        usid_format = get_usid_format()
+    is_usid_id = validate_usid_id(node, usid_format.usid_id_bits)
+    if not utils.validate_ipv6_address(node) and not is_usid_id:
+        return None
     # Validate params
     #
     # Validate locator
@@ -573,27 +811,25 @@ def encode_intermediate_node(node, locator):
     un = node
     # Node identifier is a integer, we need to convert it to a SID (IPv6
     # address)
-    if validate_usid_id(node):
-        un = usid_id_to_usid(node, locator)
-    # If the node is expressed as IPv6 address or uSID identifier, encode it
-    # Otherwise (if the node is expressed as node name), we return None and we
-    # expect to find the node info in the nodes configuration.
-    if utils.validate_ipv6_address(node) or validate_usid_id(node):
-        return {
-            'name': node,
-            'grpc_ip': None,    # Useless for intermediate nodes
-            'grpc_port': None,    # Useless for intermediate nodes
-            'uN': un,
-            'uDT': None,    # Useless for intermediate nodes
-            'fwd_engine': None    # Useless for intermediate nodes
-        }
-    # 'Node' is a name. Return None.
-    return None
+    if is_usid_id:
+        un = usid_id_to_usid(node, locator, usid_format.locator_bits,
+                             usid_format.usid_id_bits)
+    # Return the dict
+    return {
+        'name': node,
+        'grpc_ip': None,    # Useless for intermediate nodes
+        'grpc_port': None,    # Useless for intermediate nodes
+        'uN': un,
+        'uDT': None,    # Useless for intermediate nodes
+        'fwd_engine': None    # Useless for intermediate nodes
+    }
 
 
+@tracing.traced()
 def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
                     l_fwd_engine=None, r_grpc_ip=None, r_grpc_port=None,
-                    r_fwd_engine=None, decap_sid=None, locator=None):
+                    r_fwd_engine=None, decap_sid=None, locator=None,
+                    locator_table=None):
     """
     Fill 'nodes_info' dict with the nodes containined in the 'nodes' list.
 
@@ -624,8 +860,17 @@ def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
     :type decap_sid: str, optional
     :param locator: Locator part of the SIDs (e.g. fcbb:bbbb::).
     :type locator: str, optional
+    :param locator_table: Table used to get the uSID format of the locator.
+                          If not provided, the default format is used.
+    :type locator_table: LocatorTable, optional
     :raises InvalidConfigurationError: If the node params are invalid.
     """
+    # Get the uSID format of the locator
+    usid_format = get_usid_format()
+    if locator_table is not None:
+        usid_format = locator_table.default_format
+        if locator is not None:
+            usid_format = locator_table.lookup(locator)
     # Convert decap SID to uDT
     udt = None
     if decap_sid is not None:
@@ -637,7 +882,9 @@ def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
         # or a uSID identifier (an integer)
         if not utils.validate_ipv6_address(decap_sid):
             # Integer, we need to convert it to a SID (IPv6 address)
-            udt = usid_id_to_usid(decap_sid, locator)
+            udt = usid_id_to_usid(decap_sid, locator,
+                                  usid_format.locator_bits,
+                                  usid_format.usid_id_bits)
         else:
             # IPv6 address
             udt = decap_sid
@@ -651,7 +898,8 @@ def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
         grpc_port=l_grpc_port,
         udt=udt,
         fwd_engine=l_fwd_engine,
-        locator=locator
+        locator=locator,
+        usid_format=usid_format
     )
     # If we received a node info dict, we add it to the
     # nodes info dictionary
@@ -667,7 +915,8 @@ def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
         grpc_port=r_grpc_port,
         udt=udt,
         fwd_engine=r_fwd_engine,
-        locator=locator
+        locator=locator,
+        usid_format=usid_format
     )
     # If we received a node info dict, we add it to the
     # nodes info dictionary
@@ -680,7 +929,8 @@ def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
         # Encode the node
         node = encode_intermediate_node(
             node=node_name,
-            locator=locator
+            locator=locator,
+            usid_format=usid_format
         )
         # If we received a node info dict, we add it to the
         # nodes info dictionary
@@ -688,6 +938,133 @@ def fill_nodes_info(nodes_info, nodes, l_grpc_ip=None, l_grpc_port=None,
             nodes_info[node_name] = node
 
 
+def get_udt_sids(udt, usid_format):
+    """
+    Split a uDT SID into the list of SIDs to be appended to a uSID list.
+    The uDT SID carries two uSID identifiers, each one is converted to a SID
+    using the locator of the uDT SID.
+
+    :param udt: The uDT SID (e.g. 'fcbb:bbbb:100:f00d::')
+    :type udt: str
+    :param usid_format: uSID format of the locator of the uDT SID
+    :type usid_format: USIDFormat
+    :return: List of SIDs
+    :rtype: list
+    """
+    udt_int = int(IPv6Address(udt))
+    # Locator of the uDT SID
+    locator = usid_format.get_locator(udt_int)
+    # Convert the first two uSID identifiers of the uDT SID into SIDs
+    return [str(IPv6Address(usid_format.usid_id_to_sid(
+        usid_format.get_usid_id(udt_int, slot), locator)))
+        for slot in range(min(2, usid_format.max_usids))]
+
+
+def build_usid_list(segments, udt, locator_table):
+    """
+    Convert the SID list of a path into the uSID list to be used for the
+    encapsulation on the first node of the path.
+
+    :param segments: The SIDs (uN) of the nodes of the path, from the
+                     first node to the last one.
+    :type segments: list
+    :param udt: The uDT SID of the last node of the path.
+    :type udt: str
+    :param locator_table: Table used to get the uSID format of the locators.
+    :type locator_table: LocatorTable
+    :return: The uSID list.
+    :rtype: list
+    """
+    # uSID format of the SID list
+    usid_format = locator_table.lookup(segments[-1])
+    # Build uDT sid list
+    udt_sids = get_udt_sids(udt, usid_format)
+    return sidlist_to_usidlist(
+        sid_list=segments[1:][:-1],
+        udt_sids=[segments[1:][-1]] + udt_sids,
+        locator_bits=usid_format.locator_bits,
+        usid_id_bits=usid_format.usid_id_bits
+    )
+
+
+@tracing.traced()
+def usid_policy_to_paths(policy, nodes_config):
+    """
+    Return the SRv6 paths implementing a uSID policy on its endpoints, in the
+    format of the documents of the "srv6_paths" collection.
+
+    :param policy: The uSID policy, as stored in the "usid_policies"
+                   collection.
+    :type policy: dict
+    :param nodes_config: Nodes configuration, as a dict containing the list
+                         of the nodes ("nodes" key).
+    :type nodes_config: dict
+    :return: The SRv6 paths (left-to-right path on the left node and
+             right-to-left path on the right node).
+    :rtype: list
+    :raises InvalidConfigurationError: The policy or the nodes configuration
+                                       are not valid.
+    :raises NodeNotFoundError: A node of the policy does not exist.
+    """
+    # Nodes information
+    nodes_info = {node['name']: node for node in nodes_config['nodes']}
+    # Build the table of the uSID formats (bit widths) of the locators
+    locator_table = LocatorTable(nodes_config)
+    nodes_lr = policy['lr_nodes']
+    # If right to left nodes list is not provided, we use the reverse
+    # left to right SID list (symmetric path)
+    nodes_rl = policy.get('rl_nodes') or nodes_lr[::-1]
+    fill_nodes_info(
+        nodes_info=nodes_info,
+        nodes=nodes_lr,
+        l_grpc_ip=policy.get('l_grpc_ip'),
+        l_grpc_port=policy.get('l_grpc_port'),
+        l_fwd_engine=policy.get('l_fwd_engine'),
+        r_grpc_ip=policy.get('r_grpc_ip'),
+        r_grpc_port=policy.get('r_grpc_port'),
+        r_fwd_engine=policy.get('r_fwd_engine'),
+        decap_sid=policy.get('decap_sid'),
+        locator=policy.get('locator'),
+        locator_table=locator_table
+    )
+    fill_nodes_info(
+        nodes_info=nodes_info,
+        nodes=nodes_rl,
+        l_grpc_ip=policy.get('r_grpc_ip'),
+        l_grpc_port=policy.get('r_grpc_port'),
+        l_fwd_engine=policy.get('r_fwd_engine'),
+        r_grpc_ip=policy.get('l_grpc_ip'),
+        r_grpc_port=policy.get('l_grpc_port'),
+        r_fwd_engine=policy.get('l_fwd_engine'),
+        decap_sid=policy.get('decap_sid'),
+        locator=policy.get('locator'),
+        locator_table=locator_table
+    )
+    paths = list()
+    for nodes, destination in ((nodes_lr, policy['lr_dst']),
+                               (nodes_rl, policy['rl_dst'])):
+        try:
+            segments = [nodes_info[node]['uN'] for node in nodes]
+        except KeyError as err:
+            raise NodeNotFoundError from err
+        ingress_node = nodes_info[nodes[0]]
+        paths.append({
+            'grpc_address': ingress_node['grpc_ip'],
+            'grpc_port': ingress_node['grpc_port'],
+            'destination': destination,
+            'segments': build_usid_list(
+                segments, nodes_info[nodes[-1]]['uDT'], locator_table),
+            'device': None,
+            'encapmode': 'encap.red',
+            'table': policy.get('table'),
+            'metric': policy.get('metric'),
+            'bsid_addr': None,
+            'fwd_engine': ingress_node['fwd_engine']
+        })
+    return paths
+
+
+@tracing.traced()
 def handle_srv6_usid_policy(operation,
                             lr_destination=None, rl_destination=None,
                             nodes_lr=None,
@@ -696,7 +1073,7 @@ def handle_srv6_usid_policy(operation,
                             l_grpc_port=None, l_fwd_engine=None,
                             r_grpc_ip=None, r_grpc_port=None,
                             r_fwd_engine=None, decap_sid=None, locator=None,
-                            db_conn=None):
+                            db_conn=None, nodes_config=None):
     """
     Handle a SRv6 Policy using uSIDs
 
@@ -739,6 +1116,10 @@ def handle_srv6_usid_policy(operation,
     :type decap_sid: str, optional
     :param locator: Locator prefix (e.g. 'fcbb:bbbb::').
     :type locator: str, optional
+    :param nodes_config: Nodes configuration, as a dict containing the list
+                         of the nodes ("nodes" key). If not provided, the
+                         configuration is retrieved from the database.
+    :type nodes_config: dict, optional
     :return: Status Code of the operation (e.g. 0 for STATUS_SUCCESS)
     :rtype: int
     :raises NodeNotFoundError: Node name not found in the mapping file
@@ -794,16 +1175,21 @@ def handle_srv6_usid_policy(operation,
         print('\n\n')
         return 0
     if operation in ['add', 'del']:
-        # Extract the nodes configuration from the db
-        nodes_config = topo_utils.get_nodes_config()
+        # Extract the nodes configuration from the db, unless it has been
+        # provided by the caller
+        if nodes_config is None:
+            nodes_config = topo_utils.get_nodes_config()
         #
         # In order to perform this translation, a file containing the
         # mapping of node names to IPv6 addresses is required
         #
         # Read nodes from YAML file
         nodes_info = {node['name']: node for node in nodes_config['nodes']}
-        locator_bits = DEFAULT_LOCATOR_BITS  # TODO configurable locator bits
-        usid_id_bits = DEFAULT_USID_ID_BITS  # TODO configurable uSID id bits
+        # Build the table of the uSID formats (bit widths) of the locators
+        try:
+            locator_table = LocatorTable(nodes_config)
+        except InvalidConfigurationError:
+            return commons_pb2.STATUS_INTERNAL_ERROR
         # Add nodes list for the left-to-right path to the 'nodes_info' dict
         if nodes_lr is not None:
             fill_nodes_info(
@@ -816,7 +1202,8 @@ def handle_srv6_usid_policy(operation,
                 r_grpc_port=r_grpc_port,
                 r_fwd_engine=r_fwd_engine,
                 decap_sid=decap_sid,
-                locator=locator
+                locator=locator,
+                locator_table=locator_table
             )
         # Add nodes list for the right-to-left path to the 'nodes_info' dict
         if nodes_rl is not None:
@@ -830,7 +1217,8 @@ def handle_srv6_usid_policy(operation,
                 r_grpc_port=l_grpc_port,
                 r_fwd_engine=l_fwd_engine,
                 decap_sid=decap_sid,
-                locator=locator
+                locator=locator,
+                locator_table=locator_table
             )
         # Add
         if operation == 'add':
@@ -868,7 +1256,8 @@ def handle_srv6_usid_policy(operation,
                         r_grpc_port=policy.get('r_grpc_port'),
                         r_fwd_engine=policy.get('r_fwd_engine'),
                         decap_sid=policy.get('decap_sid'),
-                        locator=policy.get('locator')
+                        locator=policy.get('locator'),
+                        locator_table=locator_table
                     )
                 # Add nodes list for the right-to-left path to the
                 # 'nodes_info' dict
@@ -883,7 +1272,8 @@ def handle_srv6_usid_policy(operation,
                         r_grpc_port=policy.get('l_grpc_port'),
                         r_fwd_engine=policy.get('l_fwd_engine'),
                         decap_sid=policy.get('decap_sid'),
-                        locator=policy.get('locator')
+                        locator=policy.get('locator'),
+                        locator_table=locator_table
                     )
         if len(policies) == 0:
             logger.error('Policy not found')
@@ -954,40 +1344,14 @@ def handle_srv6_usid_policy(operation,
                         if add_colon:
                             bsid_addr += '::'
 
-                    udt_sids = list()
-                    # Locator mask
-                    locator_mask = str(IPv6Address(
-                        int('1' * 128, 2) ^
-                        int('1' * (128 - locator_bits), 2)))
-                    # uDT mask
-                    udt_mask_1 = str(
-                        IPv6Address(int('1' * usid_id_bits, 2) <<
-                                    (128 - locator_bits - usid_id_bits)))
-                    udt_mask_2 = str(
-                        IPv6Address(int('1' * usid_id_bits, 2) <<
-                                    (128 - locator_bits - 2 * usid_id_bits)))
-                    # Build uDT sid list
-                    locator_int = int(IPv6Address(egress_node['uDT'])) & \
-                        int(IPv6Address(locator_mask))
-                    udt_mask_1_int = int(IPv6Address(egress_node['uDT'])) & \
-                        int(IPv6Address(udt_mask_1))
-                    udt_mask_2_int = int(IPv6Address(egress_node['uDT'])) & \
-                        int(IPv6Address(udt_mask_2))
-                    udt_sids += [str(IPv6Address(locator_int +
-                                                 udt_mask_1_int))]
-                    udt_sids += [str(IPv6Address(locator_int +
-                                                 (udt_mask_2_int <<
-                                                  usid_id_bits)))]
                     # We need to convert the SID list into a uSID list
                     #  before creating the SRv6 policy
-                    usid_list = sidlist_to_usidlist(
-                        sid_list=segments_lr[1:][:-1],
-                        udt_sids=[segments_lr[1:][-1]] + udt_sids,
-                        locator_bits=locator_bits,
-                        usid_id_bits=usid_id_bits
-                    )
+                    usid_list = build_usid_list(
+                        segments_lr, egress_node['uDT'], locator_table)
                     # Handle a SRv6 path
-                    response = srv6_utils.handle_srv6_path(
+                    # handle_srv6_path() returns None on success and
+                    # raises an exception on error
+                    srv6_utils.handle_srv6_path(
                         operation=operation,
                         channel=channel,
                         destination=lr_destination,
@@ -999,9 +1363,7 @@ def handle_srv6_usid_policy(operation,
                         fwd_engine=ingress_node['fwd_engine'],
                         update_db=False
                     )
-                    if response != commons_pb2.STATUS_SUCCESS:
-                        # Error
-                        return response
+                    response = commons_pb2.STATUS_SUCCESS
                     # # Create the uN behavior
                     # response = handle_srv6_behavior(
                     #     operation=operation,
@@ -1111,46 +1473,14 @@ def handle_srv6_usid_policy(operation,
                     # if response != commons_pb2.STATUS_SUCCESS:
                     #     # Error
                     #     return response
-                    udt_sids = list()
-                    # Locator mask
-                    locator_mask = str(IPv6Address(
-                        int('1' * 128, 2) ^
-                        int('1' * (128 - locator_bits), 2)))
-                    # uDT mask
-                    udt_mask_1 = str(IPv6Address(int('1' * usid_id_bits, 2) <<
-                                                 (128 - locator_bits -
-                                                  usid_id_bits)))
-                    udt_mask_2 = str(IPv6Address(int('1' * usid_id_bits, 2) <<
-                                                 (128 - locator_bits -
-                                                  2 * usid_id_bits)))
-                    # Build uDT sid list
-                    locator_int = int(
-                        IPv6Address(
-                            ingress_node['uDT'])) & int(
-                                IPv6Address(locator_mask))
-                    udt_mask_1_int = int(
-                        IPv6Address(
-                            ingress_node['uDT'])) & int(
-                                IPv6Address(udt_mask_1))
-                    udt_mask_2_int = int(
-                        IPv6Address(
-                            ingress_node['uDT'])) & int(
-                                IPv6Address(udt_mask_2))
-                    udt_sids += [str(IPv6Address(locator_int +
-                                                 udt_mask_1_int))]
-                    udt_sids += [str(IPv6Address(locator_int +
-                                                 (udt_mask_2_int <<
-                                                  usid_id_bits)))]
                     # We need to convert the SID list into a uSID list
                     #  before creating the SRv6 policy
-                    usid_list = sidlist_to_usidlist(
-                        sid_list=segments_rl[1:][:-1],
-                        udt_sids=[segments_rl[1:][-1]] + udt_sids,
-                        locator_bits=locator_bits,
-                        usid_id_bits=usid_id_bits
-                    )
+                    usid_list = build_usid_list(
+                        segments_rl, ingress_node['uDT'], locator_table)
                     # Handle a SRv6 path
-                    response = srv6_utils.handle_srv6_path(
+                    # handle_srv6_path() returns None on success and
+                    # raises an exception on error
+                    srv6_utils.handle_srv6_path(
                         operation=operation,
                         channel=channel,
                         destination=rl_destination,
@@ -1162,9 +1492,7 @@ def handle_srv6_usid_policy(operation,
                         fwd_engine=egress_node['fwd_engine'],
                         update_db=False
                     )
-                    if response != commons_pb2.STATUS_SUCCESS:
-                        # Error
-                        return response
+                    response = commons_pb2.STATUS_SUCCESS
                 # Persist uSID policy to database
                 if persistency:
                     if operation == 'add':
@@ -41,7 +41,9 @@ import srv6_manager_pb2
 # Controller dependencies
 import srv6_manager_pb2_grpc
 from controller import arangodb_driver
+from controller import tracing
 from controller import utils
+from controller.srv6_entities import SRv6Behavior, SRv6Path
 
 # Global variables definition
 #
@@ -103,6 +105,32 @@ def parse_grpc_error(err):
     return commons_pb2.STATUS_INTERNAL_ERROR
 
 
+def fill_srv6_path(path, doc):
+    """
+    Fill a gRPC SRv6 path from a dict (e.g. a document of the database).
+
+    :param path: The gRPC SRv6 path to fill.
+    :type path: class: `srv6_manager_pb2.SRv6Path`
+    :param doc: The SRv6 path.
+    :type doc: dict
+    """
+    SRv6Path.from_doc(doc).fill_sb(path)
+
+
+def fill_srv6_behavior(behavior, doc):
+    """
+    Fill a gRPC SRv6 behavior from a dict (e.g. a document of the
+    database).
+
+    :param behavior: The gRPC SRv6 behavior to fill.
+    :type behavior: class: `srv6_manager_pb2.SRv6Behavior`
+    :param doc: The SRv6 behavior.
+    :type doc: dict
+    """
+    SRv6Behavior.from_doc(doc).fill_sb(behavior)
+
+
+@tracing.traced()
 def add_srv6_path(grpc_address, grpc_port, destination,
                   segments=None, device='', encapmode='encap', table=-1,
                   metric=-1, bsid_addr='', fwd_engine='linux', key=None,
@@ -113,6 +141,11 @@ def add_srv6_path(grpc_address, grpc_port, destination,
     if segments is None or len(segments) == 0:
         logger.error('*** Missing segments for seg6 route')
         raise utils.InvalidArgumentError
+    # Validate the path
+    entity = SRv6Path(destination=destination, segments=segments,
+                      device=device, encapmode=encapmode, table=table,
+                      metric=metric, bsid_addr=bsid_addr,
+                      fwd_engine=fwd_engine)
     # If database persistency is enabled, we need to check if a SRv6 path with
     # the same key already exists
     if key is not None and \
@@ -151,51 +184,12 @@ def add_srv6_path(grpc_address, grpc_port, destination,
     request = srv6_manager_pb2.SRv6ManagerRequest()
     # Create a new SRv6 path request
     path_request = request.srv6_path_request       # pylint: disable=no-member
-    # Create a new path
-    path = path_request.paths.add()
-    # Set destination
-    path.destination = text_type(destination)
-    # Set device
-    # If the device is not specified (i.e. empty string),
-    # it will be chosen by the gRPC server
-    path.device = text_type(device) if device is not None else ''
-    # Set table ID
-    # If the table ID is not specified (i.e. table=-1),
-    # the main table will be used
-    path.table = int(table) if table is not None else -1
-    # Set metric (i.e. preference value of the route)
-    # If the metric is not specified (i.e. metric=-1),
-    # the decision is left to the Linux kernel
-    path.metric = int(metric) if metric is not None else -1
-    # Set the BSID address (required for VPP)
-    path.bsid_addr = str(bsid_addr) if bsid_addr is not None else ''
-    # Set the encapsulation mode
-    if encapmode is not None and encapmode != '':
-        # encap mode is an optional argument
-        # If it is specified, we use it
-        path.encapmode = text_type(encapmode)
-    else:
-        # By default, if encap mode is not specified, we use
-        # 'encap' mode
-        path.encapmode = 'encap'
-    # Iterate on the segments and build the SID list
-    for segment in segments:
-        # Append the segment to the SID list
-        srv6_segment = path.sr_path.add()
-        srv6_segment.segment = text_type(segment)
-    # Set the forwarding engine
-    try:
-        if fwd_engine is not None and fwd_engine != '':
-            # Encode fwd engine in a format supported by gRPC
-            path_request.fwd_engine = py_to_grpc_fwd_engine[fwd_engine]
-        else:
-            # By default, if forwarding engine is not specified, we use
-            # Linux forwarding engine
-            path_request.fwd_engine = FwdEngine.LINUX.value
-    except ValueError:
-        # An invalid value for fwd_engine has been provided
-        logger.error('Invalid forwarding engine: %s', fwd_engine)
-        raise utils.InvalidArgumentError
+    # Create a new path (by default, the encap mode is "encap", the
+    # device is chosen by the node, the main table is used and the metric
+    # is left to the Linux kernel)
+    entity.fill_sb(path_request.paths.add())
+    # Set the forwarding engine (Linux by default)
+    path_request.fwd_engine = entity.sb_fwd_engine
     # VPP forwarding engine requires some extra steps
     if fwd_engine == 'vpp':
         # VPP requires a SRv6 policy associated to the SRv6 path through the
@@ -252,6 +246,7 @@ def add_srv6_path(grpc_address, grpc_port, destination,
         )
 
 
+@tracing.traced()
 def get_srv6_path(grpc_address, grpc_port, destination,
                   segments=None, device='', encapmode='encap', table=-1,
                   metric=-1, bsid_addr='', fwd_engine='linux', key=None,
@@ -356,10 +351,18 @@ def get_srv6_path(grpc_address, grpc_port, destination,
     return srv6_paths
 
 
+@tracing.traced()
 def change_srv6_path(grpc_address, grpc_port, destination,
                      segments=None, device='', encapmode='encap', table=-1,
                      metric=-1, bsid_addr='', fwd_engine='linux', key=None,
                      update_db=True, db_conn=None, channel=None):
+    # If the flag is True, the gRPC channel is closed after the RPC
+    close_channel_after_rpc = False
+    # Validate the path
+    entity = SRv6Path(destination=destination, segments=segments,
+                      device=device, encapmode=encapmode, table=table,
+                      metric=metric, bsid_addr=bsid_addr,
+                      fwd_engine=fwd_engine)
     # In order to add a SRv6 path we need to interact with the node
     # If no gRPC channel has been provided, we need to open a new channel
     # to the node; in this case, grpc_address and grpc_port arguments are
@@ -383,45 +386,9 @@ def change_srv6_path(grpc_address, grpc_port, destination,
     # Create a new SRv6 path request
     path_request = request.srv6_path_request       # pylint: disable=no-member
     # Create a new path
-    path = path_request.paths.add()
-    # Set destination
-    path.destination = \
-        text_type(destination) if destination is not None else ''
-    # Set device
-    # If the device is not specified (i.e. empty string),
-    # it will be chosen by the gRPC server
-    path.device = text_type(device) if device is not None else ''
-    # Set table ID
-    # If the table ID is not specified (i.e. table=-1),
-    # the main table will be used
-    path.table = int(table) if table is not None else -1
-    # Set metric (i.e. preference value of the route)
-    # If the metric is not specified (i.e. metric=-1),
-    # the decision is left to the Linux kernel
-    path.metric = int(metric) if metric is not None else -1
-    # Set the BSID address (required for VPP)
-    path.bsid_addr = str(bsid_addr) if bsid_addr is not None else ''
-    # Set encapmode
-    path.encapmode = text_type(encapmode) if encapmode is not None else 'encap'
-    # Iterate on the segments and build the SID list
-    if segments is not None:
-        for segment in segments:
-            # Append the segment to the SID list
-            srv6_segment = path.sr_path.add()
-            srv6_segment.segment = text_type(segment)
-    # Set the forwarding engine
-    try:
-        if fwd_engine is not None and fwd_engine != '':
-            # Encode fwd engine in a format supported by gRPC
-            path_request.fwd_engine = py_to_grpc_fwd_engine[fwd_engine]
-        else:
-            # By default, if forwarding engine is not specified, we use
-            # Linux forwarding engine
-            path_request.fwd_engine = FwdEngine.LINUX.value
-    except ValueError:
-        # An invalid value for fwd_engine has been provided
-        logger.error('Invalid forwarding engine: %s', fwd_engine)
-        raise utils.InvalidArgumentError
+    entity.fill_sb(path_request.paths.add())
+    # Set the forwarding engine (Linux by default)
+    path_request.fwd_engine = entity.sb_fwd_engine
     # Let's update the SRv6 path
     try:
         # Get the reference of the stub
@@ -458,12 +425,11 @@ def change_srv6_path(grpc_address, grpc_port, destination,
         )
 
 
+@tracing.traced()
 def del_srv6_path(grpc_address, grpc_port, destination,
                   segments=None, device='', encapmode='encap', table=-1,
                   metric=-1, bsid_addr='', fwd_engine='linux', key=None,
                   update_db=True, db_conn=None, channel=None):
-    # TODO currently channel argument is not used
-    #
     # Remove the SRv6 path
     #
     # We need to support two scenarios:
@@ -528,64 +494,26 @@ def del_srv6_path(grpc_address, grpc_port, destination,
         request = srv6_manager_pb2.SRv6ManagerRequest()
         # Create a new SRv6 path request
         path_request = request.srv6_path_request   # pylint: disable=no-member
-        # Create a new path
-        path = path_request.paths.add()
-        # Set destination
-        path.destination = (text_type(srv6_path['destination'])
-                            if srv6_path['destination'] is not None else '')
-        # Set device
-        # If the device is not specified (i.e. empty string),
-        # it will be chosen by the gRPC server
-        path.device = (text_type(srv6_path['device'])
-                       if srv6_path['device'] is not None else '')
-        # Set table ID
-        # If the table ID is not specified (i.e. table=-1),
-        # the main table will be used
-        path.table = (int(srv6_path['table'])
-                      if srv6_path['table'] is not None else -1)
-        # Set metric (i.e. preference value of the route)
-        # If the metric is not specified (i.e. metric=-1),
-        # the decision is left to the Linux kernel
-        path.metric = (int(srv6_path['metric'])
-                       if srv6_path['metric'] is not None else -1)
-        # Set the BSID address (required for VPP)
-        path.bsid_addr = (str(srv6_path['bsid_addr'])
-                          if srv6_path['bsid_addr'] is not None else '')
-        # Set the forwarding engine
-        try:
-            if fwd_engine is not None and fwd_engine != '':
-                # Encode fwd engine in a format supported by gRPC
-                path_request.fwd_engine = py_to_grpc_fwd_engine[
-                    srv6_path['fwd_engine']]
-            else:
-                # By default, if forwarding engine is not specified, we use
-                # Linux forwarding engine
-                path_request.fwd_engine = FwdEngine.LINUX.value
-        except ValueError:
-            # An invalid value for fwd_engine has been provided
-            logger.error('Invalid forwarding engine: %s', fwd_engine)
-            raise utils.InvalidArgumentError
-        # Set encapmode
-        path.encapmode = (text_type(srv6_path['encapmode'])
-                          if srv6_path['encapmode'] is not None else 'encap')
-        if len(srv6_path['segments']) == 0:
-            logger.error('*** Missing segments for seg6 route')
-            raise utils.InvalidArgumentError
-        # Iterate on the segments and build the SID list
-        for segment in srv6_path['segments']:
-            # Append the segment to the SID list
-            srv6_segment = path.sr_path.add()
-            srv6_segment.segment = text_type(segment)
-        # Get gRPC channel
-        channel = utils.get_grpc_session(
-            server_ip=srv6_path['grpc_address'],
-            server_port=srv6_path['grpc_port']
-        )
-        # Set flag to close the channel after the RPC
-        close_channel_after_rpc = True
+        # Create a new path (the segments are not required to remove a
+        # path)
+        entity = SRv6Path.from_doc(srv6_path)
+        entity.fill_sb(path_request.paths.add())
+        # Set the forwarding engine (Linux by default)
+        path_request.fwd_engine = entity.sb_fwd_engine
+        # Use the gRPC channel provided by the caller, if any
+        rpc_channel = channel
+        close_channel_after_rpc = False
+        if rpc_channel is None:
+            # Get gRPC channel
+            rpc_channel = utils.get_grpc_session(
+                server_ip=srv6_path['grpc_address'],
+                server_port=srv6_path['grpc_port']
+            )
+            # Set flag to close the channel after the RPC
+            close_channel_after_rpc = True
         try:
             # Get the reference of the stub
-            stub = srv6_manager_pb2_grpc.SRv6ManagerStub(channel)
+            stub = srv6_manager_pb2_grpc.SRv6ManagerStub(rpc_channel)
             # Remove the SRv6 path and get the status code
             status = stub.Remove(request).status
         except grpc.RpcError as err:
@@ -595,7 +523,7 @@ def del_srv6_path(grpc_address, grpc_port, destination,
         finally:
             # Close the channel
             if close_channel_after_rpc:
-                channel.close()
+                rpc_channel.close()
             # Raise an exception if an error occurred
             utils.raise_exception_on_error(status)
         # Remove the path from the db
@@ -616,7 +544,9 @@ def del_srv6_path(grpc_address, grpc_port, destination,
             )
 
 
-def handle_srv6_path(operation, grpc_address, grpc_port, destination,
+@tracing.traced()
+def handle_srv6_path(operation, grpc_address=None, grpc_port=None,
+                     destination=None,
                      segments=None, device='', encapmode="encap", table=-1,
                      metric=-1, bsid_addr='', fwd_engine='linux', key=None,
                      update_db=True, db_conn=None, channel=None):
@@ -697,12 +627,15 @@ def handle_srv6_path(operation, grpc_address, grpc_port, destination,
     raise utils.OperationNotSupportedException
 
 
-def handle_srv6_policy(operation, grpc_address, grpc_port,
-                       bsid_addr, segments=None, table=-1, metric=-1,
+@tracing.traced()
+def handle_srv6_policy(operation, grpc_address=None, grpc_port=None,
+                       bsid_addr='', segments=None, table=-1, metric=-1,
                        fwd_engine='linux', channel=None):
     """
     Handle a SRv6 Policy.
     """
+    # If the flag is True, the gRPC channel is closed after the RPC
+    close_channel_after_rpc = False
     # In order to add a SRv6 policy we need to interact with the node
     # If no gRPC channel has been provided, we need to open a new channel
     # to the node; in this case, grpc_address and grpc_port arguments are
@@ -792,14 +725,27 @@ def handle_srv6_policy(operation, grpc_address, grpc_port,
     return srv6_policies
 
 
+@tracing.traced()
 def add_srv6_behavior(grpc_address, grpc_port, segment,
                       action='', device='', table=-1, nexthop="",
                       lookup_table=-1, interface="", segments=None,
                       metric=-1, fwd_engine='linux', key=None,
                       update_db=True, db_conn=None, channel=None):
+    # If the flag is True, the gRPC channel is closed after the RPC
+    close_channel_after_rpc = False
     # If segment list not provided, initialize it to an empty list
     if segments is None:
         segments = []
+    # The SRv6 action is mandatory for "add" operation
+    if action is None or action == '':
+        logger.error('*** Missing action for seg6local route')
+        raise utils.InvalidArgumentError
+    # Validate the behavior
+    entity = SRv6Behavior(segment=segment, action=action, device=device,
+                          table=table, nexthop=nexthop,
+                          lookup_table=lookup_table, interface=interface,
+                          segments=segments, metric=metric,
+                          fwd_engine=fwd_engine)
     # If database persistency is enabled, we need to check if a SRv6 behavior
     # with the same key already exists
     if key is not None and \
@@ -839,57 +785,12 @@ def add_srv6_behavior(grpc_address, grpc_port, segment,
     # Create a new SRv6 behavior request
     behavior_request = (request               # pylint: disable=no-member
                         .srv6_behavior_request)
-    # Create a new SRv6 behavior
-    behavior = behavior_request.behaviors.add()
-    # Set local segment for the seg6local route
-    behavior.segment = text_type(segment)
-    # Set the device
-    # If the device is not specified (i.e. empty string),
-    # it will be chosen by the gRPC server
-    behavior.device = text_type(device) if device is not None else ''
-    # Set the table where the seg6local must be inserted
-    # If the table ID is not specified (i.e. table=-1),
-    # the main table will be used
-    behavior.table = int(table) if table is not None else -1
-    # Set metric (i.e. preference value of the route)
-    # If the metric is not specified (i.e. metric=-1),
-    # the decision is left to the Linux kernel
-    behavior.metric = int(metric) if metric is not None else -1
-    # Set the SRv6 action
-    if action is None or action == '':
-        logger.error('*** Missing action for seg6local route')
-        raise utils.InvalidArgumentError
-    # Set the action for the seg6local route
-    behavior.action = text_type(action)
-    # Set the nexthop for the L3 cross-connect actions
-    # (e.g. End.DX4, End.DX6)
-    behavior.nexthop = text_type(nexthop) if nexthop is not None else ''
-    # Set the table for the "decap and table lookup" actions
-    # (e.g. End.DT4, End.DT6)
-    behavior.lookup_table = \
-        int(lookup_table) if lookup_table is not None else ''
-    # Set the inteface for the L2 cross-connect actions
-    # (e.g. End.DX2)
-    behavior.interface = text_type(interface) if interface is not None else ''
-    # Set the segments for the binding SID actions
-    # (e.g. End.B6, End.B6.Encaps)
-    for seg in segments:
-        # Create a new segment
-        srv6_segment = behavior.segs.add()
-        srv6_segment.segment = text_type(seg)
-    # Set the forwarding engine
-    try:
-        if fwd_engine is not None and fwd_engine != '':
-            # Encode fwd engine in a format supported by gRPC
-            behavior_request.fwd_engine = py_to_grpc_fwd_engine[fwd_engine]
-        else:
-            # By default, if forwarding engine is not specified, we use
-            # Linux forwarding engine
-            behavior_request.fwd_engine = FwdEngine.LINUX.value
-    except ValueError:
-        # An invalid value for fwd_engine has been provided
-        logger.error('Invalid forwarding engine: %s', fwd_engine)
-        raise utils.InvalidArgumentError
+    # Create a new SRv6 behavior (by default, the device is chosen by the
+    # node, the main table is used and the metric is left to the Linux
+    # kernel)
+    entity.fill_sb(behavior_request.behaviors.add())
+    # Set the forwarding engine (Linux by default)
+    behavior_request.fwd_engine = entity.sb_fwd_engine
     # Let's create the SRv6 path
     try:
         # Get the reference of the stub
@@ -928,6 +829,7 @@ def add_srv6_behavior(grpc_address, grpc_port, segment,
         )
 
 
+@tracing.traced()
 def get_srv6_behavior(grpc_address, grpc_port, segment,
                       action='', device='', table=-1, nexthop="",
                       lookup_table=-1, interface="", segments=None,
@@ -1035,11 +937,20 @@ def get_srv6_behavior(grpc_address, grpc_port, segment,
     return srv6_behaviors
 
 
+@tracing.traced()
 def change_srv6_behavior(grpc_address, grpc_port, segment,
                          action='', device='', table=-1, nexthop="",
                          lookup_table=-1, interface="", segments=None,
                          metric=-1, fwd_engine='linux', key=None,
                          update_db=True, db_conn=None, channel=None):
+    # If the flag is True, the gRPC channel is closed after the RPC
+    close_channel_after_rpc = False
+    # Validate the behavior
+    entity = SRv6Behavior(segment=segment, action=action, device=device,
+                          table=table, nexthop=nexthop,
+                          lookup_table=lookup_table, interface=interface,
+                          segments=segments, metric=metric,
+                          fwd_engine=fwd_engine)
     # In order to add a SRv6 behavior we need to interact with the node
     # If no gRPC channel has been provided, we need to open a new channel
     # to the node; in this case, grpc_address and grpc_port arguments are
@@ -1064,53 +975,9 @@ def change_srv6_behavior(grpc_address, grpc_port, segment,
     behavior_request = (request               # pylint: disable=no-member
                         .srv6_behavior_request)
     # Create a new SRv6 behavior
-    behavior = behavior_request.behaviors.add()
-    # Set local segment for the seg6local route
-    behavior.segment = text_type(segment) if segment is not None else ''
-    # Set the device
-    # If the device is not specified (i.e. empty string),
-    # it will be chosen by the gRPC server
-    behavior.device = text_type(device) if device is not None else ''
-    # Set the table where the seg6local must be inserted
-    # If the table ID is not specified (i.e. table=-1),
-    # the main table will be used
-    behavior.table = int(table) if table is not None else -1
-    # Set metric (i.e. preference value of the route)
-    # If the metric is not specified (i.e. metric=-1),
-    # the decision is left to the Linux kernel
-    behavior.metric = int(metric) if metric is not None else -1
-    # Set the action for the seg6local route
-    behavior.action = text_type(action) if action is not None else ''
-    # Set the nexthop for the L3 cross-connect actions
-    # (e.g. End.DX4, End.DX6)
-    behavior.nexthop = text_type(nexthop) if nexthop is not None else ''
-    # Set the table for the "decap and table lookup" actions
-    # (e.g. End.DT4, End.DT6)
-    behavior.lookup_table = \
-        int(lookup_table) if lookup_table is not None else -1
-    # Set the inteface for the L2 cross-connect actions
-    # (e.g. End.DX2)
-    behavior.interface = text_type(interface) if interface is not None else ''
-    # Set the segments for the binding SID actions
-    # (e.g. End.B6, End.B6.Encaps)
-    if segments is not None:
-        for seg in segments:
-            # Create a new segment
-            srv6_segment = behavior.segs.add()
-            srv6_segment.segment = text_type(seg)
-    # Set the forwarding engine
-    try:
-        if fwd_engine is not None and fwd_engine != '':
-            # Encode fwd engine in a format supported by gRPC
-            behavior_request.fwd_engine = py_to_grpc_fwd_engine[fwd_engine]
-        else:
-            # By default, if forwarding engine is not specified, we use
-            # Linux forwarding engine
-            behavior_request.fwd_engine = FwdEngine.LINUX.value
-    except ValueError:
-        # An invalid value for fwd_engine has been provided
-        logger.error('Invalid forwarding engine: %s', fwd_engine)
-        raise utils.InvalidArgumentError
+    entity.fill_sb(behavior_request.behaviors.add())
+    # Set the forwarding engine (Linux by default)
+    behavior_request.fwd_engine = entity.sb_fwd_engine
     # Let's update the SRv6 behavior
     try:
         # Get the reference of the stub
@@ -1149,6 +1016,7 @@ def change_srv6_behavior(grpc_address, grpc_port, segment,
         )
 
 
+@tracing.traced()
 def del_srv6_behavior(grpc_address, grpc_port, segment,
                       action='', device='', table=-1, nexthop="",
                       lookup_table=-1, interface="", segments=None,
@@ -1225,72 +1093,24 @@ def del_srv6_behavior(grpc_address, grpc_port, segment,
         behavior_request = (request               # pylint: disable=no-member
                             .srv6_behavior_request)
         # Create a new SRv6 behavior
-        behavior = behavior_request.behaviors.add()
-        # Set local segment for the seg6local route
-        behavior.segment = (text_type(srv6_behavior['segment'])
-                            if srv6_behavior['segment'] is not None else '')
-        # Set the device
-        # If the device is not specified (i.e. empty string),
-        # it will be chosen by the gRPC server
-        behavior.device = (text_type(srv6_behavior['device'])
-                           if srv6_behavior['device'] is not None else '')
-        # Set the table where the seg6local must be inserted
-        # If the table ID is not specified (i.e. table=-1),
-        # the main table will be used
-        behavior.table = (int(srv6_behavior['table'])
-                          if srv6_behavior['device'] is not None else -1)
-        # Set metric (i.e. preference value of the route)
-        # If the metric is not specified (i.e. metric=-1),
-        # the decision is left to the Linux kernel
-        behavior.metric = (int(srv6_behavior['metric'])
-                           if srv6_behavior['metric'] is not None else -1)
-        # Set the action for the seg6local route
-        behavior.action = (text_type(srv6_behavior['action'])
-                           if srv6_behavior['action'] is not None else '')
-        # Set the nexthop for the L3 cross-connect actions
-        # (e.g. End.DX4, End.DX6)
-        behavior.nexthop = (text_type(srv6_behavior['nexthop'])
-                            if srv6_behavior['nexthop'] is not None else '')
-        # Set the table for the "decap and table lookup" actions
-        # (e.g. End.DT4, End.DT6)
-        behavior.lookup_table = (int(srv6_behavior['lookup_table'])
-                                 if srv6_behavior['lookup_table'] is not None
-                                 else '')
-        # Set the inteface for the L2 cross-connect actions
-        # (e.g. End.DX2)
-        behavior.interface = (text_type(srv6_behavior['interface'])
-                              if srv6_behavior['interface'] is not None
-                              else '')
-        # Set the segments for the binding SID actions
-        # (e.g. End.B6, End.B6.Encaps)
-        for seg in srv6_behavior['segments']:
-            # Create a new segment
-            srv6_segment = behavior.segs.add()
-            srv6_segment.segment = text_type(seg)
-        # Set the forwarding engine
-        try:
-            if fwd_engine is not None and fwd_engine != '':
-                # Encode fwd engine in a format supported by gRPC
-                behavior_request.fwd_engine = py_to_grpc_fwd_engine[
-                    srv6_behavior['fwd_engine']]
-            else:
-                # By default, if forwarding engine is not specified, we use
-                # Linux forwarding engine
-                behavior_request.fwd_engine = FwdEngine.LINUX.value
-        except ValueError:
-            # An invalid value for fwd_engine has been provided
-            logger.error('Invalid forwarding engine: %s', fwd_engine)
-            raise utils.InvalidArgumentError
-        # Get gRPC channel
-        channel = utils.get_grpc_session(
-            server_ip=srv6_behavior['grpc_address'],
-            server_port=srv6_behavior['grpc_port']
-        )
-        # Set flag to close the channel after the RPC
-        close_channel_after_rpc = True
+        entity = SRv6Behavior.from_doc(srv6_behavior)
+        entity.fill_sb(behavior_request.behaviors.add())
+        # Set the forwarding engine (Linux by default)
+        behavior_request.fwd_engine = entity.sb_fwd_engine
+        # Use the gRPC channel provided by the caller, if any
+        rpc_channel = channel
+        close_channel_after_rpc = False
+        if rpc_channel is None:
+            # Get gRPC channel
+            rpc_channel = utils.get_grpc_session(
+                server_ip=srv6_behavior['grpc_address'],
+                server_port=srv6_behavior['grpc_port']
+            )
+            # Set flag to close the channel after the RPC
+            close_channel_after_rpc = True
         try:
             # Get the reference of the stub
-            stub = srv6_manager_pb2_grpc.SRv6ManagerStub(channel)
+            stub = srv6_manager_pb2_grpc.SRv6ManagerStub(rpc_channel)
             # Remove the SRv6 behavior and get the status code
             status = stub.Remove(request).status
         except grpc.RpcError as err:
@@ -1300,7 +1120,7 @@ def del_srv6_behavior(grpc_address, grpc_port, segment,
         finally:
             # Close the channel
             if close_channel_after_rpc:
-                channel.close()
+                rpc_channel.close()
             # Raise an exception if an error occurred
             utils.raise_exception_on_error(status)
         # Remove the path from the db
@@ -1323,7 +1143,9 @@ def del_srv6_behavior(grpc_address, grpc_port, segment,
             )
 
 
-def handle_srv6_behavior(operation, grpc_address, grpc_port, segment,
+@tracing.traced()
+def handle_srv6_behavior(operation, grpc_address=None, grpc_port=None,
+                         segment=None,
                          action='', device='', table=-1, nexthop="",
                          lookup_table=-1, interface="", segments=None,
                          metric=-1, fwd_engine='linux', key=None,
@@ -1419,6 +1241,7 @@ class SRv6Exception(Exception):
     """
 
 
+@tracing.traced()
 def create_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
                            destination, segments, localseg=None,
                            bsid_addr='', fwd_engine='linux', key=None,
@@ -1460,6 +1283,9 @@ def create_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
         if len(tunnels) > 0:
             logger.error('An entity with key %s already exists', key)
             raise utils.InvalidArgumentError
+    # The channels provided by the caller are not closed
+    close_ingress_channel_after_rpc = False
+    close_egress_channel_after_rpc = False
     # Establish a gRPC channel, if no channel has been provided
     if ingress_channel is None:
         # Check arguments
@@ -1491,47 +1317,47 @@ def create_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
     egress_ip = utils.grpc_chan_to_addr_port(egress_channel)[0]
     # Extract the gRPC port from the egress channel
     egress_port = utils.grpc_chan_to_addr_port(egress_channel)[1]
-    # Add seg6 route to <ingress> to steer the packets sent to the
-    # <destination> through the SID list <segments>
-    #
-    # Equivalent to the command:
-    #    ingress: ip -6 route add <destination> encap seg6 mode encap \
-    #            segs <segments> dev <device>
-    handle_srv6_path(
-        operation='add',
-        channel=ingress_channel,
-        destination=destination,
-        segments=segments,
-        bsid_addr=bsid_addr,
-        fwd_engine=fwd_engine,
-        update_db=False,
-        db_conn=db_conn
-    )
-    # Perform "Decapsulaton and Specific IPv6 Table Lookup" function
-    # on the egress node <egress>
-    # The decap function is associated to the <localseg> passed in
-    # as argument. If argument 'localseg' isn't passed in, the behavior
-    # is not added
-    #
-    # Equivalent to the command:
-    #    egress: ip -6 route add <localseg> encap seg6local action \
-    #            End.DT6 table 254 dev <device>
-    if localseg is not None:
-        handle_srv6_behavior(
+    try:
+        # Add seg6 route to <ingress> to steer the packets sent to the
+        # <destination> through the SID list <segments>
+        #
+        # Equivalent to the command:
+        #    ingress: ip -6 route add <destination> encap seg6 mode encap \
+        #            segs <segments> dev <device>
+        handle_srv6_path(
             operation='add',
-            channel=egress_channel,
-            segment=localseg,
-            action='End.DT6',
-            lookup_table=254,
+            channel=ingress_channel,
+            destination=destination,
+            segments=segments,
+            bsid_addr=bsid_addr,
             fwd_engine=fwd_engine,
             update_db=False,
             db_conn=db_conn
         )
-    # If the persistecy is enabled, store the tunnel to the database
-    if os.getenv('ENABLE_PERSISTENCY') in ['true', 'True'] and \
-            update_db:
-        # Save the tunnel to the db
-        try:
+        # Perform "Decapsulaton and Specific IPv6 Table Lookup" function
+        # on the egress node <egress>
+        # The decap function is associated to the <localseg> passed in
+        # as argument. If argument 'localseg' isn't passed in, the behavior
+        # is not added
+        #
+        # Equivalent to the command:
+        #    egress: ip -6 route add <localseg> encap seg6local action \
+        #            End.DT6 table 254 dev <device>
+        if localseg is not None:
+            handle_srv6_behavior(
+                operation='add',
+                channel=egress_channel,
+                segment=localseg,
+                action='End.DT6',
+                lookup_table=254,
+                fwd_engine=fwd_engine,
+                update_db=False,
+                db_conn=db_conn
+            )
+        # If the persistecy is enabled, store the tunnel to the database
+        if os.getenv('ENABLE_PERSISTENCY') in ['true', 'True'] and \
+                update_db:
+            # Save the tunnel to the db
             arangodb_driver.insert_srv6_tunnel(
                 database=db_conn,
                 l_grpc_address=ingress_ip,
@@ -1546,15 +1372,16 @@ def create_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
                 is_unidirectional=True,
                 key=key
             )
-        finally:
-            # Close the channel
-            if close_ingress_channel_after_rpc:
-                ingress_channel.close()
-            # Close the channel
-            if close_egress_channel_after_rpc:
-                egress_channel.close()
+    finally:
+        # Close the channel
+        if close_ingress_channel_after_rpc:
+            ingress_channel.close()
+        # Close the channel
+        if close_egress_channel_after_rpc:
+            egress_channel.close()
 
 
+@tracing.traced()
 def create_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
                        sidlist_lr, sidlist_rl, dest_lr, dest_rl,
                        localseg_lr=None, localseg_rl=None,
@@ -1597,6 +1424,10 @@ def create_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
     """
     # pylint: disable=too-many-arguments
     #
+    # If the flags are True, the gRPC channels are closed after the RPC
+    close_lchannel_after_rpc = False
+    close_rchannel_after_rpc = False
+    #
     # If database persistency is enabled, we need to check if a SRv6 tunnel
     # with the same key already exists
     if key is not None and \
@@ -1643,6 +1474,10 @@ def create_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
     # Create a unidirectional SRv6 tunnel from <node_l> to <node_r>
     try:
         create_uni_srv6_tunnel(
+            ingress_ip=node_l_ip,
+            ingress_port=node_l_port,
+            egress_ip=node_r_ip,
+            egress_port=node_r_port,
             ingress_channel=node_l_channel,
             egress_channel=node_r_channel,
             destination=dest_lr,
@@ -1655,6 +1490,10 @@ def create_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
         )
         # Create a unidirectional SRv6 tunnel from <node_r> to <node_l>
         create_uni_srv6_tunnel(
+            ingress_ip=node_r_ip,
+            ingress_port=node_r_port,
+            egress_ip=node_l_ip,
+            egress_port=node_l_port,
             ingress_channel=node_r_channel,
             egress_channel=node_l_channel,
             destination=dest_rl,
@@ -1695,6 +1534,7 @@ def create_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
         )
 
 
+@tracing.traced()
 def destroy_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
                             destination, localseg=None, bsid_addr='',
                             fwd_engine='linux', ignore_errors=False, key=None,
@@ -1771,6 +1611,9 @@ def destroy_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
         update_db = False
     # Let's remove the SRv6 tunnels
     for srv6_tunnel in srv6_tunnels:
+        # The channels provided by the caller are not closed
+        close_ingress_channel_after_rpc = False
+        close_egress_channel_after_rpc = False
         # Establish a gRPC channel, if no channel has been provided
         if ingress_channel is None:
             # Check arguments
@@ -1794,50 +1637,20 @@ def destroy_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
             egress_channel = utils.get_grpc_session(egress_ip, egress_port)
             # Set flag to close the channel after the RPC
             close_egress_channel_after_rpc = True
-        # Remove seg6 route from <ingress> to steer the packets sent to
-        # <destination> through the SID list <segments>
-        #
-        # Equivalent to the command:
-        #    ingress: ip -6 route del <destination> encap seg6 mode encap \
-        #             segs <segments> dev <device>
         try:
-            handle_srv6_path(
-                operation='del',
-                channel=ingress_channel,
-                destination=srv6_tunnel['dest_lr'],
-                bsid_addr=srv6_tunnel['bsid_addr'],
-                fwd_engine=srv6_tunnel['fwd_engine'],
-                update_db=False,
-                db_conn=db_conn
-            )
-        except utils.NoSuchProcessException:
-            # If an error occurred, abort the operation
-            # If the 'ignore_errors' flag is set, continue
-            if not ignore_errors:
-                pass
-        finally:
-            # Close the channel
-            if close_ingress_channel_after_rpc:
-                ingress_channel.close()
-            # Close the channel
-            if close_egress_channel_after_rpc:
-                egress_channel.close()
-        # Remove "Decapsulaton and Specific IPv6 Table Lookup" function
-        # from the egress node <egress>
-        # The decap function associated to the <localseg> passed in
-        # as argument. If argument 'localseg' isn't passed in, the behavior
-        # is not removed
-        #
-        # Equivalent to the command:
-        #    egress: ip -6 route del <localseg> encap seg6local action \
-        #            End.DT6 table 254 dev <device>
-        if localseg is not None:
+            # Remove seg6 route from <ingress> to steer the packets sent to
+            # <destination> through the SID list <segments>
+            #
+            # Equivalent to the command:
+            #    ingress: ip -6 route del <destination> encap seg6 mode \
+            #             encap segs <segments> dev <device>
             try:
-                handle_srv6_behavior(
+                handle_srv6_path(
                     operation='del',
-                    channel=egress_channel,
-                    segment=localseg,
-                    fwd_engine=fwd_engine,
+                    channel=ingress_channel,
+                    destination=srv6_tunnel['dest_lr'],
+                    bsid_addr=srv6_tunnel['bsid_addr'],
+                    fwd_engine=srv6_tunnel['fwd_engine'],
                     update_db=False,
                     db_conn=db_conn
                 )
@@ -1846,13 +1659,39 @@ def destroy_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
                 # If the 'ignore_errors' flag is set, continue
                 if not ignore_errors:
                     pass
-            finally:
-                # Close the channel
-                if close_ingress_channel_after_rpc:
-                    ingress_channel.close()
-                # Close the channel
-                if close_egress_channel_after_rpc:
-                    egress_channel.close()
+            # Remove "Decapsulaton and Specific IPv6 Table Lookup" function
+            # from the egress node <egress>
+            # The decap function associated to the <localseg> passed in
+            # as argument. If argument 'localseg' isn't passed in, the
+            # behavior is not removed
+            #
+            # Equivalent to the command:
+            #    egress: ip -6 route del <localseg> encap seg6local action \
+            #            End.DT6 table 254 dev <device>
+            if localseg is not None:
+                try:
+                    handle_srv6_behavior(
+                        operation='del',
+                        channel=egress_channel,
+                        segment=localseg,
+                        fwd_engine=fwd_engine,
+                        update_db=False,
+                        db_conn=db_conn
+                    )
+                except utils.NoSuchProcessException:
+                    # If an error occurred, abort the operation
+                    # If the 'ignore_errors' flag is set, continue
+                    if not ignore_errors:
+                        pass
+        finally:
+            # Close the channel
+            if close_ingress_channel_after_rpc:
+                ingress_channel.close()
+                ingress_channel = None
+            # Close the channel
+            if close_egress_channel_after_rpc:
+                egress_channel.close()
+                egress_channel = None
         # Remove the tunnel from the db
         if update_db:
             arangodb_driver.delete_srv6_tunnel(
@@ -1870,6 +1709,7 @@ def destroy_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
             )
 
 
+@tracing.traced()
 def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
                         dest_lr, dest_rl, localseg_lr=None, localseg_rl=None,
                         bsid_addr='', fwd_engine='linux',
@@ -1913,6 +1753,17 @@ def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
     """
     # pylint: disable=too-many-arguments
     #
+    # If the flags are True, the gRPC channels are closed after the RPC
+    close_lchannel_after_rpc = False
+    close_rchannel_after_rpc = False
+    #
+    # If gRPC channels have been provided, extract the gRPC address and port
+    # of the nodes from the channels
+    if node_l_channel is not None:
+        node_l_ip, node_l_port = utils.grpc_chan_to_addr_port(node_l_channel)
+    if node_r_channel is not None:
+        node_r_ip, node_r_port = utils.grpc_chan_to_addr_port(node_r_channel)
+    #
     # Remove the SRv6 behavior
     #
     # We need to support two scenarios:
@@ -1926,10 +1777,10 @@ def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
         srv6_tunnels = arangodb_driver.find_srv6_tunnel(
             database=db_conn,
             key=key,
-            l_grpc_address=utils.grpc_chan_to_addr_port(node_l_channel)[0],
-            l_grpc_port=utils.grpc_chan_to_addr_port(node_l_channel)[1],
-            r_grpc_address=utils.grpc_chan_to_addr_port(node_r_channel)[0],
-            r_grpc_port=utils.grpc_chan_to_addr_port(node_r_channel)[1],
+            l_grpc_address=node_l_ip,
+            l_grpc_port=node_l_port,
+            r_grpc_address=node_r_ip,
+            r_grpc_port=node_r_port,
             dest_lr=dest_lr,
             dest_rl=dest_rl,
             localseg_lr=localseg_lr,
@@ -1949,10 +1800,10 @@ def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
         # arguments
         srv6_tunnels = [{
             '_key': key,
-            'l_grpc_address': utils.grpc_chan_to_addr_port(node_l_channel)[0],
-            'l_grpc_port': utils.grpc_chan_to_addr_port(node_l_channel)[1],
-            'r_grpc_address': utils.grpc_chan_to_addr_port(node_r_channel)[0],
-            'r_grpc_port': utils.grpc_chan_to_addr_port(node_r_channel)[1],
+            'l_grpc_address': node_l_ip,
+            'l_grpc_port': node_l_port,
+            'r_grpc_address': node_r_ip,
+            'r_grpc_port': node_r_port,
             'sidlist_lr': None,
             'sidlist_rl': None,
             'dest_lr': dest_lr,
@@ -1993,6 +1844,10 @@ def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
         try:
             # Remove unidirectional SRv6 tunnel from <node_l> to <node_r>
             destroy_uni_srv6_tunnel(
+                ingress_ip=node_l_ip,
+                ingress_port=node_l_port,
+                egress_ip=node_r_ip,
+                egress_port=node_r_port,
                 ingress_channel=node_l_channel,
                 egress_channel=node_r_channel,
                 destination=srv6_tunnel['dest_lr'],
@@ -2005,6 +1860,10 @@ def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
             )
             # Remove unidirectional SRv6 tunnel from <node_r> to <node_l>
             destroy_uni_srv6_tunnel(
+                ingress_ip=node_r_ip,
+                ingress_port=node_r_port,
+                egress_ip=node_l_ip,
+                egress_port=node_l_port,
                 ingress_channel=node_r_channel,
                 egress_channel=node_l_channel,
                 destination=srv6_tunnel['dest_rl'],
@@ -2041,6 +1900,7 @@ def destroy_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
             )
 
 
+@tracing.traced()
 def get_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
                         destination, segments, localseg=None,
                         bsid_addr='', fwd_engine='linux', key=None,
@@ -2093,6 +1953,7 @@ def get_uni_srv6_tunnel(ingress_ip, ingress_port, egress_ip, egress_port,
     )
 
 
+@tracing.traced()
 def get_srv6_tunnel(node_l_ip, node_l_port, node_r_ip, node_r_port,
                     sidlist_lr, sidlist_rl, dest_lr, dest_rl,
                     localseg_lr=None, localseg_rl=None,
@@ -30,6 +30,7 @@ Topology Information Extraction utilities
 
 # General imports
 import errno
+import importlib
 import json
 import logging
 import os
@@ -40,29 +41,18 @@ import telnetlib
 import time
 from argparse import ArgumentParser
 
+# Controller dependencies
+from controller import topo_model
+
 # Logger reference
 logging.basicConfig(level=logging.NOTSET)
 logger = logging.getLogger(__name__)
 
-# Optional imports:
+# Optional imports, loaded on first use (see import_optional_module()):
 #     NetworkX      - only required to export the topology in JSON format
 #                     and to draw the topology
 #     pyaml         - only required to export the topology in YAML format
 #     pygraphviz    - only required to export the topology to an image file
-try:
-    import networkx as nx
-    from networkx.drawing.nx_agraph import write_dot
-    from networkx.readwrite import json_graph
-except ImportError:
-    logger.warning('networkx library is not installed')
-try:
-    from pyaml import yaml
-except ImportError:
-    logger.warning('pyaml library is not installed')
-try:
-    import pygraphviz  # pylint: disable=unused-import # noqa: F401
-except ImportError:
-    logger.warning('pygraphviz library is not installed')
 
 
 # Global variables definition
@@ -88,6 +78,21 @@ DOT_FILE_TOPO_GRAPH = '/tmp/topology.dot'
 DEFAULT_VERBOSE = False
 
 
+def import_optional_module(name):
+    """
+    Import an optional module on first use.
+
+    :param name: The name of the module (e.g. "networkx").
+    :type name: str
+    :return: The module, or None if it is not installed.
+    :rtype: module
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
 class OptionalModuleNotLoadedError(Exception):
     """
     The requested feature depends on an optional module that has not been
@@ -116,8 +121,9 @@ def dump_topo_json(graph, topo_file):
     # This function depends on the NetworkX library, which is a
     # optional dependency for this script
     #
-    # Check if the NetworkX library has been imported
-    if 'networkx' not in sys.modules:
+    # Import the NetworkX library
+    json_graph = import_optional_module('networkx.readwrite.json_graph')
+    if json_graph is None:
         logger.critical('NetworkX library required by dump_topo_json() '
                         'has not been imported. Is it installed?')
         raise OptionalModuleNotLoadedError
@@ -156,44 +162,33 @@ def dump_topo_yaml(nodes, edges, node_to_systemid,
     """
     #
     # This function depends on the pyaml library, which is a
-    # optional dependency for this script
+    # optional dependency for this script, required to export the YAML
+    # files
     #
-    # Check if the pyaml library has been imported
-    if 'pyaml' not in sys.modules:
-        logger.critical('pyaml library required by dump_topo_yaml() '
-                        'has not been imported. Is it installed?')
-        return None, None
+    # Import the pyaml library
+    pyaml = None
+    if nodes_file_yaml is not None or edges_file_yaml is not None:
+        pyaml = import_optional_module('pyaml')
+        if pyaml is None:
+            logger.critical('pyaml library required by dump_topo_yaml() '
+                            'has not been imported. Is it installed?')
+            return None, None
+    # Build the documents from the topology
+    nodes, edges = topo_model.build_topology(nodes, edges, node_to_systemid)
     # Export nodes in YAML format
-    nodes_yaml = [{
-        '_key': node,
-        'type': 'router',
-        'ip_address': None,
-        'ext_reachability': node_to_systemid[node]
-    } for node in nodes]
+    nodes_yaml = [node.to_doc() for node in nodes]
     # Write nodes to file
     if nodes_file_yaml is not None:
         logger.info('*** Exporting topology nodes to %s', nodes_file_yaml)
         with open(nodes_file_yaml, 'w') as outfile:
-            yaml.dump(nodes_yaml, outfile)
+            pyaml.yaml.dump(nodes_yaml, outfile)
     # Export edges in YAML format
-    # Character '/' is not accepted in key strign in arango, using
-    # '-' instead
-    edges_yaml = [{
-        '_key': '%s-dir1' % edge[2].replace('/', '-'),
-        '_from': 'nodes/%s' % edge[0],
-        '_to': 'nodes/%s' % edge[1],
-        'type': 'core'
-    } for edge in edges] + [{
-        '_key': '%s-dir2' % edge[2].replace('/', '-'),
-        '_from': 'nodes/%s' % edge[1],
-        '_to': 'nodes/%s' % edge[0],
-        'type': 'core'
-    } for edge in edges]
+    edges_yaml = [edge.to_doc() for edge in edges]
     # Write edges to file
     if edges_file_yaml is not None:
         logger.info('*** Exporting topology edges to %s', edges_file_yaml)
         with open(edges_file_yaml, 'w') as outfile:
-            yaml.dump(edges_yaml, outfile)
+            pyaml.yaml.dump(edges_yaml, outfile)
     logger.info('Topology exported\n')
     return nodes_yaml, edges_yaml
 
@@ -230,8 +225,9 @@ def build_topo_graph(nodes, edges):
     # This function depends on the NetworkX library, which is a
     # optional dependency for this script
     #
-    # Check if the NetworkX library has been imported
-    if 'networkx' not in sys.modules:
+    # Import the NetworkX library
+    nx = import_optional_module('networkx')
+    if nx is None:
         logger.critical('NetworkX library required by build_topo_graph() '
                         'has not been imported. Is it installed?')
         return None
@@ -258,23 +254,249 @@ def draw_topo(graph, svg_topo_file, dot_topo_file=DOT_FILE_TOPO_GRAPH):
     # This function depends on the NetworkX library, which is a
     # optional dependency for this script
     #
-    # Check if the NetworkX library has been imported
-    if 'networkx' not in sys.modules:
+    # Import the NetworkX library
+    nx_agraph = import_optional_module('networkx.drawing.nx_agraph')
+    if nx_agraph is None:
         logger.critical('NetworkX library required by draw_topo() '
                         'has not been imported. Is it installed?')
         return
-    if 'pygraphviz' not in sys.modules:
+    if import_optional_module('pygraphviz') is None:
         logger.critical('pygraphviz library required by dump_topo_yaml() '
                         'has not been imported. Is it installed?')
         return
     # Create dot topology file, an intermediate representation
     # of the topology used to export as an image
     logger.info('*** Saving topology graph image to %s', svg_topo_file)
-    write_dot(graph, dot_topo_file)
+    nx_agraph.write_dot(graph, dot_topo_file)
     os.system('dot -Tsvg %s -o %s' % (dot_topo_file, svg_topo_file))
     logger.info('Topology exported\n')
 
 
+def isisd_command(router, port, password, commands):
+    """
+    Establish a telnet connection to the isisd process running on a router
+    and execute a list of commands.
+
+    :param router: The IP address of the router.
+    :type router: str
+    :param port: The port of the isisd VTY.
+    :type port: str
+    :param password: The password of the isisd daemon.
+    :type password: str
+    :param commands: The commands (e.g. ['show isis hostname']).
+    :type commands: list
+    :return: The output of the commands, or None if the commands cannot be
+             executed.
+    :rtype: str
+    """
+    # Init telnet and try to establish a connection to the router
+    try:
+        telnet_conn = telnetlib.Telnet(router, port)
+    except socket.error:
+        print("Error: cannot establish a connection to " +
+              str(router) + " on port " + str(port) + "\n")
+        return None
+    try:
+        # Insert isisd password
+        if password:
+            telnet_conn.read_until(b"Password: ")
+            telnet_conn.write(password.encode('ascii') + b"\r\n")
+        # terminal length set to 0 to not have interruptions
+        telnet_conn.write(b"terminal length 0" + b"\r\n")
+        # Execute the commands
+        for command in commands:
+            telnet_conn.write(command.encode('ascii') + b"\r\n")
+        # Close
+        telnet_conn.write(b"q" + b"\r\n")
+        # Get results
+        return telnet_conn.read_all().decode('ascii')
+    except (BrokenPipeError, EOFError, ConnectionResetError):
+        logger.error('Broken pipe. Is the password correct?')
+        return None
+    finally:
+        # Close telnet
+        telnet_conn.close()
+
+
+def parse_isis_hostnames(hostname_details):
+    """
+    Parse the output of the "show isis hostname" command.
+
+    :return: Tuple containing the mapping System ID to hostname and the
+             mapping hostname to System ID. The hostnames and the System IDs
+             are interned, so that they are shared by all the
+             representations of the topology.
+    :rtype: tuple
+    """
+    # Mapping System ID to hostname
+    system_id_to_hostname = dict()
+    # Mapping hostname to System ID
+    hostname_to_system_id = dict()
+    for line in hostname_details.splitlines():
+        # Get System ID and hostname
+        match = re.search('(\\d+.\\d+.\\d+)\\s+(\\S+)', line)
+        if match:
+            # Extract System ID
+            system_id = sys.intern(match.group(1))
+            # Extract hostname
+            hostname = sys.intern(match.group(2))
+            # Update mappings
+            system_id_to_hostname[system_id] = hostname
+            hostname_to_system_id[hostname] = system_id
+    return system_id_to_hostname, hostname_to_system_id
+
+
+# LSP entry in the output of "show isis database [detail]"
+# (e.g. "r1.00-00   *    146   0x00000004  0x5d3f     842    0/0/0")
+LSP_ENTRY_REGEX = re.compile(
+    '^\\s*(\\S+)\\.([0-9a-fA-F]{2})-([0-9a-fA-F]{2})\\s+(?:\\*\\s+)?\\d+\\s+'
+    '(0x[0-9a-fA-F]+)\\s+(0x[0-9a-fA-F]+)\\s')
+# Level of the link-state database
+LEVEL_REGEX = re.compile('IS-IS Level-(\\d) link-state database')
+
+
+def parse_isis_database(database):
+    """
+    Parse the output of the "show isis database" or
+    "show isis database detail" commands.
+
+    :param database: The output of the command.
+    :type database: str
+    :return: Dict mapping (level, LSP ID) to the LSP, in the order of the
+             database. Each LSP is represented as a dict containing the
+             following fields:
+             -    system: the system (hostname or System ID) originating
+                  the LSP;
+             -    seq_num: the sequence number;
+             -    checksum: the checksum;
+             -    hostname: the hostname advertised in the LSP (detail
+                  output only, None for the LSP fragments);
+             -    reachability: set of the System IDs of the neighbors
+                  (detail output only);
+             -    ipv6_reachability: list of the IPv6 prefixes (detail
+                  output only).
+    :rtype: dict
+    """
+    lsps = dict()
+    level = None
+    lsp = None
+    for line in database.splitlines():
+        # Get level
+        match = LEVEL_REGEX.search(line)
+        if match:
+            level = int(match.group(1))
+            continue
+        # Get LSP entry
+        match = LSP_ENTRY_REGEX.search(line)
+        if match:
+            lsp_id = '%s.%s-%s' % match.group(1, 2, 3)
+            lsp = {
+                'system': sys.intern(match.group(1)),
+                'seq_num': int(match.group(4), 16),
+                'checksum': int(match.group(5), 16),
+                'hostname': None,
+                'reachability': set(),
+                'ipv6_reachability': list()
+            }
+            lsps[(level, lsp_id)] = lsp
+            continue
+        if lsp is None:
+            continue
+        # Get hostname
+        match = re.search('Hostname: (\\S+)', line)
+        if match:
+            # Extract hostname
+            lsp['hostname'] = sys.intern(match.group(1))
+        # Get extended reachability
+        match = re.search(
+            'Extended Reachability: (\\d+.\\d+.\\d+).\\d+', line)
+        if match:
+            # Extract extended reachability info
+            lsp['reachability'].add(sys.intern(match.group(1)))
+        #   IPv6 Reachability: fcf0:0:6:8::/64 (Metric: 10)
+        match = re.search('IPv6 Reachability: (.+/\\d{1,3})', line)
+        if match:
+            lsp['ipv6_reachability'].append(match.group(1))
+    return lsps
+
+
+def build_topology_isis(system_id_to_hostname, hostname_to_system_id, lsps,
+                        verbose=DEFAULT_VERBOSE):
+    """
+    Build the network topology from the IS-IS link-state database.
+
+    :param system_id_to_hostname: Mapping System ID to hostname.
+    :type system_id_to_hostname: dict
+    :param hostname_to_system_id: Mapping hostname to System ID.
+    :type hostname_to_system_id: dict
+    :param lsps: The LSPs, as returned by :func:`parse_isis_database`.
+    :type lsps: dict
+    :return: Tuple containing the set of nodes, the set of edges and the
+             mapping hostname to System ID.
+    :rtype: tuple
+    """
+    # Mapping hostname to reachability
+    reachability_info = dict()
+    # IPv6 subnet addresses of edges
+    ipv6_reachability = dict()
+    for lsp in lsps.values():
+        # The hostname is advertised in the first fragment of the LSP;
+        # other fragments and pseudonode LSPs are attributed to the
+        # system originating them
+        hostname = lsp['hostname']
+        if hostname is None:
+            hostname = system_id_to_hostname.get(lsp['system'], lsp['system'])
+        if hostname not in reachability_info:
+            # Update reachability info dict
+            reachability_info[hostname] = set()
+        for reachability in lsp['reachability']:
+            # Update reachability info dict
+            if reachability != hostname_to_system_id.get(hostname):
+                reachability_info[hostname].add(reachability)
+        for ip_addr in lsp['ipv6_reachability']:
+            if ip_addr not in ipv6_reachability:
+                # Update IPv6 reachability dict
+                ipv6_reachability[ip_addr] = list()
+            # add hostname to hosts list of the ip address in the ipv6
+            # reachability dict
+            if hostname not in ipv6_reachability[ip_addr]:
+                ipv6_reachability[ip_addr].append(hostname)
+    # Build the topology graph
+    #
+    # Nodes
+    nodes = set(hostname_to_system_id)
+    # Edges
+    _edges = set()
+    # Edges with subnet IP address
+    edges = set()
+    for hostname, system_ids in reachability_info.items():
+        for system_id in system_ids:
+            if system_id in system_id_to_hostname:
+                _edges.add((hostname, system_id_to_hostname[system_id]))
+    for ip_addr in ipv6_reachability:
+        # Edge link is bidirectional in this case
+        # Only take IP addresses of links between 2 nodes
+        if len(ipv6_reachability[ip_addr]) == 2:
+            (node1, node2) = ipv6_reachability[ip_addr]
+            edges.add((node1, node2, ip_addr))
+            _edges.discard((node1, node2))
+            _edges.discard((node2, node1))
+    for (node1, node2) in _edges.copy():
+        if (node1, node2) not in _edges:
+            continue
+        edges.add((node1, node2, None))
+        _edges.discard((node1, node2))
+        _edges.discard((node2, node1))
+    # Print nodes and edges
+    if verbose:
+        print('Topology extraction completed\n')
+        print("Nodes:", nodes)
+        print("Edges:", edges)
+        print("***************************************")
+    # Return topology information
+    return nodes, edges, hostname_to_system_id
+
+
 def connect_and_extract_topology_isis(ips_ports,
                                       isisd_pwd=DEFAULT_ISISD_PASSWORD,
                                       verbose=DEFAULT_VERBOSE):
@@ -282,8 +504,6 @@ def connect_and_extract_topology_isis(ips_ports,
     Establish a telnet connection to isisd process running on a router
     and extract the network topology from the router
     """
-    #
-    # pylint: disable=too-many-branches, too-many-locals, too-many-statements
     # ISIS password
     password = isisd_pwd
     # Let's parse the input
@@ -298,171 +518,203 @@ def connect_and_extract_topology_isis(ips_ports,
     # Connect to a router and extract the topology
     for router, port in zip(routers, ports):
         print("\n********* Connecting to %s-%s *********" % (router, port))
-        # Init telnet and try to establish a connection to the router
-        try:
-            telnet_conn = telnetlib.Telnet(router, port)
-        except socket.error:
-            print("Error: cannot establish a connection to " +
-                  str(router) + " on port " + str(port) + "\n")
-            continue
         #
         # Extract router hostnames
-        #
-        # Insert isisd password
-        if password:
-            telnet_conn.read_until(b"Password: ")
-            telnet_conn.write(password.encode('ascii') + b"\r\n")
-        try:
-            # terminal length set to 0 to not have interruptions
-            telnet_conn.write(b"terminal length 0" + b"\r\n")
-            # Get routing info from isisd database
-            telnet_conn.write(b"show isis hostname" + b"\r\n")
-            # Close
-            telnet_conn.write(b"q" + b"\r\n")
-            # Get results
-            hostname_details = telnet_conn.read_all().decode('ascii')
-        except BrokenPipeError:
-            logger.error('Broken pipe. Is the password correct?')
+        hostname_details = isisd_command(router, port, password,
+                                         ['show isis hostname'])
+        if hostname_details is None:
             continue
-        finally:
-            # Close telnet
-            telnet_conn.close()
         #
         # Extract router database
-        #
-        # Init telnet and try to establish a connection to the router
-        try:
-            telnet_conn = telnetlib.Telnet(router, port)
-        except socket.error:
-            print("Error: cannot establish a connection to " +
-                  str(router) + " on port " + str(port) + "\n")
+        database_details = isisd_command(router, port, password,
+                                         ['show isis database detail'])
+        if database_details is None:
             continue
-        # Insert isisd password
-        if password:
-            telnet_conn.read_until(b"Password: ")
-            telnet_conn.write(password.encode('ascii') + b"\r\n")
-        # terminal length set to 0 to not have interruptions
-        telnet_conn.write(b"terminal length 0" + b"\r\n")
-        # Get routing info from isisd database
-        telnet_conn.write(b"show isis database detail" + b"\r\n")
-        # Close
-        telnet_conn.write(b"q" + b"\r\n")
-        # Get results
-        database_details = telnet_conn.read_all().decode('ascii')
-        # Close telnet
-        telnet_conn.close()
-        # Set of System IDs
-        system_ids = set()
-        # Set of hostnames
-        hostnames = set()
-        # Mapping System ID to hostname
-        system_id_to_hostname = dict()
-        # Mapping hostname to System ID
-        hostname_to_system_id = dict()
         # Process hostnames
-        for line in hostname_details.splitlines():
-            # Get System ID and hostname
-            match = re.search('(\\d+.\\d+.\\d+)\\s+(\\S+)', line)
-            if match:
-                # Extract System ID
-                system_id = match.group(1)
-                # Extract hostname
-                hostname = match.group(2)
-                # Update System IDs
-                system_ids.add(system_id)
-                # Update hostnames
-                hostnames.add(hostname)
-                # Update mappings
-                system_id_to_hostname[system_id] = hostname
-                hostname_to_system_id[hostname] = system_id
-        # Mapping hostname to reachability
-        reachability_info = dict()
-        # Process isis database
-        hostname = None
-        # IPv6 subnet addresses of edges
-        ipv6_reachability = dict()
-        for line in database_details.splitlines():
-            # Get hostname
-            match = re.search('Hostname: (\\S+)', line)
-            if match:
-                # Extract hostname
-                hostname = match.group(1)
-                # Update reachability info dict
-                reachability_info[hostname] = set()
-            # Get extended reachability
-            match = re.search(
-                'Extended Reachability: (\\d+.\\d+.\\d+).\\d+', line)
-            if match:
-                # Extract extended reachability info
-                reachability = match.group(1)
-                # Update reachability info dict
-                if reachability != hostname_to_system_id[hostname]:
-                    reachability_info[hostname].add(reachability)
-            #   IPv6 Reachability: fcf0:0:6:8::/64 (Metric: 10)
-            match = re.search('IPv6 Reachability: (.+/\\d{1,3})', line)
-            if match:
-                ip_addr = match.group(1)
-                if ip_addr not in ipv6_reachability:
-                    # Update IPv6 reachability dict
-                    ipv6_reachability[ip_addr] = list()
-                # add hostname to hosts list of the ip address in the ipv6
-                # reachability dict
-                ipv6_reachability[ip_addr].append(hostname)
-        # Build the topology graph
-        #
-        # Nodes
-        nodes = hostnames
-        # Edges
-        _edges = set()
-        # Edges with subnet IP address
-        edges = set()
-        for hostname, system_ids in reachability_info.items():
-            for system_id in system_ids:
-                _edges.add((hostname, system_id_to_hostname[system_id]))
-        for ip_addr in ipv6_reachability:
-            # Edge link is bidirectional in this case
-            # Only take IP addresses of links between 2 nodes
-            if len(ipv6_reachability[ip_addr]) == 2:
-                (node1, node2) = ipv6_reachability[ip_addr]
-                edges.add((node1, node2, ip_addr))
-                _edges.remove((node1, node2))
-                _edges.remove((node2, node1))
-        for (node1, node2) in _edges.copy():
-            edges.add((node1, node2, None))
-            _edges.remove((node1, node2))
-            _edges.remove((node2, node1))
-        # Print nodes and edges
-        if verbose:
-            print('Topology extraction completed\n')
-            print("Nodes:", nodes)
-            print("Edges:", edges)
-            print("***************************************")
-        # Return topology information
-        return nodes, edges, hostname_to_system_id
+        system_id_to_hostname, hostname_to_system_id = \
+            parse_isis_hostnames(hostname_details)
+        # Process isis database and build the topology graph
+        return build_topology_isis(
+            system_id_to_hostname=system_id_to_hostname,
+            hostname_to_system_id=hostname_to_system_id,
+            lsps=parse_isis_database(database_details),
+            verbose=verbose
+        )
     # No router available to extract the topology
     return None, None, None
 
 
+class ISISTopologyWatcher:
+    """
+    Change-driven topology extraction.
+
+    Instead of dumping the whole link-state database at every extraction,
+    the watcher polls the LSP summary ("show isis database"), which only
+    contains the sequence number and the checksum of each LSP, and
+    retrieves the details only for the LSPs that changed. The parsed LSPs
+    are cached, so the topology is rebuilt without parsing the LSPs that
+    did not change. A full extraction is performed on the first poll or
+    when more than "full_extraction_ratio" of the LSPs changed.
+
+    :param ips_ports: List of "<ip>-<port>" strings of the isisd daemons.
+    :type ips_ports: list
+    :param isisd_pwd: The password of the isisd daemons.
+    :type isisd_pwd: str, optional
+    :param full_extraction_ratio: Fraction of changed LSPs above which a
+                                  full extraction is performed.
+    :type full_extraction_ratio: float, optional
+    :param verbose: Define whether to enable or not the verbose mode.
+    :type verbose: bool, optional
+    """
+
+    def __init__(self, ips_ports, isisd_pwd=DEFAULT_ISISD_PASSWORD,
+                 full_extraction_ratio=0.5, verbose=DEFAULT_VERBOSE):
+        self.ips_ports = [ip_port.split('-') for ip_port in ips_ports]
+        self.isisd_pwd = isisd_pwd
+        self.full_extraction_ratio = full_extraction_ratio
+        self.verbose = verbose
+        # Cached state
+        self.lsps = None
+        self.system_id_to_hostname = dict()
+        self.hostname_to_system_id = dict()
+        self.topology = (None, None, None)
+        # Statistics
+        self.full_extractions = 0
+        self.partial_extractions = 0
+
+    def _full_extraction(self, router, port):
+        """
+        Retrieve hostnames and the whole link-state database.
+        """
+        hostname_details = isisd_command(router, port, self.isisd_pwd,
+                                         ['show isis hostname'])
+        database_details = isisd_command(router, port, self.isisd_pwd,
+                                         ['show isis database detail'])
+        if hostname_details is None or database_details is None:
+            return False
+        self.system_id_to_hostname, self.hostname_to_system_id = \
+            parse_isis_hostnames(hostname_details)
+        self.lsps = parse_isis_database(database_details)
+        self.full_extractions += 1
+        return True
+
+    def _partial_extraction(self, router, port, summary, changed, removed):
+        """
+        Retrieve the details of the changed LSPs and update the cache.
+        """
+        # pylint: disable=too-many-arguments
+        if changed:
+            lsp_ids = sorted({lsp_id for _, lsp_id in changed})
+            details = isisd_command(
+                router, port, self.isisd_pwd,
+                ['show isis database detail %s' % lsp_id
+                 for lsp_id in lsp_ids])
+            if details is None:
+                return False
+            lsps = parse_isis_database(details)
+            if any(key not in lsps for key in changed):
+                # LSP aged out or changed again in the meantime
+                return self._full_extraction(router, port)
+        else:
+            lsps = dict()
+        # New systems or removed LSPs may change the hostnames
+        if removed or any(key not in self.lsps for key in changed):
+            hostname_details = isisd_command(router, port, self.isisd_pwd,
+                                             ['show isis hostname'])
+            if hostname_details is None:
+                return False
+            self.system_id_to_hostname, self.hostname_to_system_id = \
+                parse_isis_hostnames(hostname_details)
+        # Update the cache, keeping the order of the database
+        cache = self.lsps
+        cache.update(lsps)
+        self.lsps = {key: cache[key] for key in summary if key in cache}
+        self.partial_extractions += 1
+        return True
+
+    def poll(self):
+        """
+        Check the link-state database and update the topology if needed.
+
+        :return: Tuple (changed, nodes, edges, node_to_systemid), where
+                 "changed" is True if the topology has been updated. Nodes,
+                 edges and node_to_systemid are None if no router is
+                 available.
+        :rtype: tuple
+        """
+        for router, port in self.ips_ports:
+            if self.lsps is None:
+                if not self._full_extraction(router, port):
+                    continue
+            else:
+                # Get the LSP summary
+                summary = isisd_command(router, port, self.isisd_pwd,
+                                        ['show isis database'])
+                if summary is None:
+                    continue
+                summary = parse_isis_database(summary)
+                # Compare sequence numbers and checksums
+                changed = [key for key, lsp in summary.items()
+                           if key not in self.lsps or
+                           (lsp['seq_num'], lsp['checksum']) !=
+                           (self.lsps[key]['seq_num'],
+                            self.lsps[key]['checksum'])]
+                removed = [key for key in self.lsps if key not in summary]
+                if not changed and not removed:
+                    # Nothing changed
+                    return (False,) + self.topology
+                if len(changed) > self.full_extraction_ratio * len(summary):
+                    success = self._full_extraction(router, port)
+                else:
+                    success = self._partial_extraction(
+                        router, port, summary, changed, removed)
+                if not success:
+                    continue
+            # Rebuild the topology
+            self.topology = build_topology_isis(
+                system_id_to_hostname=self.system_id_to_hostname,
+                hostname_to_system_id=self.hostname_to_system_id,
+                lsps=self.lsps,
+                verbose=self.verbose
+            )
+            return (True,) + self.topology
+        # No router available to extract the topology
+        return False, None, None, None
+
+
 def topology_information_extraction_isis(routers, period, isisd_pwd,
                                          topo_file_json=None,
                                          nodes_file_yaml=None,
                                          edges_file_yaml=None,
                                          topo_graph=None,
-                                         verbose=DEFAULT_VERBOSE):
+                                         verbose=DEFAULT_VERBOSE,
+                                         change_detection=False):
     """
     Run Topology Information Extraction from a set of routers.
-    Optionally export the topology to a JSON file, YAML file or SVG image
+    Optionally export the topology to a JSON file, YAML file or SVG image.
+    If change_detection is True, the link-state database is checked every
+    'period' seconds and the topology is extracted and exported only when
+    it changes (see :class:`ISISTopologyWatcher`).
     """
     #
     # pylint: disable=too-many-arguments
+    # Watcher used to detect the changes of the topology
+    watcher = None
+    if change_detection:
+        watcher = ISISTopologyWatcher(routers, isisd_pwd, verbose=verbose)
     # Topology Information Extraction
     while True:
         # Extract the topology information
-        nodes, edges, node_to_systemid = \
-            connect_and_extract_topology_isis(
-                routers, isisd_pwd, verbose)
+        if watcher is not None:
+            changed, nodes, edges, node_to_systemid = watcher.poll()
+        else:
+            changed = True
+            nodes, edges, node_to_systemid = \
+                connect_and_extract_topology_isis(
+                    routers, isisd_pwd, verbose)
         # Build and export the topology graph
-        if topo_file_json is not None or topo_graph is not None:
+        if changed and (topo_file_json is not None or
+                        topo_graph is not None):
             # Builg topology graph
             graph = build_topo_graph(nodes, edges)
             # Dump relevant information of the network graph to a JSON file
@@ -472,7 +724,7 @@ def topology_information_extraction_isis(routers, period, isisd_pwd,
             if topo_graph is not None:
                 draw_topo(graph, topo_graph)
         # Dump relevant information of the network graph to a YAML file
-        if nodes_file_yaml is not None or edges_file_yaml:
+        if changed and (nodes_file_yaml is not None or edges_file_yaml):
             dump_topo_yaml(
                 nodes=nodes,
                 edges=edges,
@@ -538,6 +790,13 @@ def parse_arguments():
         '-w', '--password', action='store_true', dest='password',
         default=DEFAULT_ISISD_PASSWORD, help='Password of the isisd daemon'
     )
+    # Change detection
+    parser.add_argument(
+        '-c', '--change-detection', action='store_true',
+        dest='change_detection', default=False,
+        help='Check the LSP summary every period and extract the topology '
+        'only when it changes'
+    )
     # Debug logs
     parser.add_argument(
         '-d', '--debug', action='store_true', help='Activate debug logs'
@@ -598,7 +857,8 @@ def __main():
         nodes_file_yaml=nodes_file_yaml,
         edges_file_yaml=edges_file_yaml,
         topo_graph=topo_graph,
-        verbose=verbose
+        verbose=verbose,
+        change_detection=args.change_detection
     )
 
 
@@ -0,0 +1,242 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Topology deltas
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Incremental representation of the network topology.
+
+A topology is a list of nodes and a list of edges (see
+:mod:`controller.topo_model`, or dicts as returned by
+:func:`controller.ti_extraction.dump_topo_yaml`) identified by the '_key'
+field. This module computes the differences (deltas) between two
+versions of a topology and keeps a log of the last deltas, identified by
+increasing sequence numbers, so that a subscriber can receive a snapshot
+once and then only the changes, and can resume from the last sequence
+number received. The sequence numbers are only meaningful within a log:
+each log has a random identifier (epoch), which the subscribers send back
+with the sequence number when they resume.
+"""
+
+# General imports
+import threading
+import uuid
+from collections import deque
+
+# Default number of deltas kept in the log
+DEFAULT_MAX_DELTAS = 256
+
+
+class TopologyDelta:
+    """
+    Changes between two versions of a topology. Added and changed elements
+    are dicts; removed elements are represented by their key.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    __slots__ = ('added_nodes', 'removed_nodes', 'changed_nodes',
+                 'added_edges', 'removed_edges', 'changed_edges')
+
+    def __init__(self, added_nodes=None, removed_nodes=None,
+                 changed_nodes=None, added_edges=None, removed_edges=None,
+                 changed_edges=None):
+        # pylint: disable=too-many-arguments
+        self.added_nodes = added_nodes or []
+        self.removed_nodes = removed_nodes or []
+        self.changed_nodes = changed_nodes or []
+        self.added_edges = added_edges or []
+        self.removed_edges = removed_edges or []
+        self.changed_edges = changed_edges or []
+
+    def is_empty(self):
+        """
+        Return True if the delta contains no changes.
+        """
+        return not (self.added_nodes or self.removed_nodes or
+                    self.changed_nodes or self.added_edges or
+                    self.removed_edges or self.changed_edges)
+
+    def __repr__(self):
+        return ('TopologyDelta(+%d -%d ~%d nodes, +%d -%d ~%d edges)'
+                % (len(self.added_nodes), len(self.removed_nodes),
+                   len(self.changed_nodes), len(self.added_edges),
+                   len(self.removed_edges), len(self.changed_edges)))
+
+
+def _diff(old, new):
+    """
+    Compare two dicts of elements indexed by key. Return the lists of added
+    elements, removed keys and changed elements.
+    """
+    added = [elem for key, elem in new.items() if key not in old]
+    removed = [key for key in old if key not in new]
+    changed = [elem for key, elem in new.items()
+               if key in old and old[key] != elem]
+    return added, removed, changed
+
+
+def compute_delta(old_nodes, old_edges, new_nodes, new_edges):
+    """
+    Compute the changes between two versions of a topology.
+
+    :param old_nodes: Nodes of the old topology, indexed by key.
+    :type old_nodes: dict
+    :param old_edges: Edges of the old topology, indexed by key.
+    :type old_edges: dict
+    :param new_nodes: Nodes of the new topology, indexed by key.
+    :type new_nodes: dict
+    :param new_edges: Edges of the new topology, indexed by key.
+    :type new_edges: dict
+    :return: The delta.
+    :rtype: TopologyDelta
+    """
+    added_nodes, removed_nodes, changed_nodes = _diff(old_nodes, new_nodes)
+    added_edges, removed_edges, changed_edges = _diff(old_edges, new_edges)
+    return TopologyDelta(
+        added_nodes=added_nodes,
+        removed_nodes=removed_nodes,
+        changed_nodes=changed_nodes,
+        added_edges=added_edges,
+        removed_edges=removed_edges,
+        changed_edges=changed_edges
+    )
+
+
+def apply_delta(nodes, edges, delta):
+    """
+    Apply a delta to a topology.
+
+    :param nodes: Nodes of the topology, indexed by key (updated in place).
+    :type nodes: dict
+    :param edges: Edges of the topology, indexed by key (updated in place).
+    :type edges: dict
+    :param delta: The delta.
+    :type delta: TopologyDelta
+    """
+    for key in delta.removed_nodes:
+        nodes.pop(key, None)
+    for node in delta.added_nodes + delta.changed_nodes:
+        nodes[node['_key']] = node
+    for key in delta.removed_edges:
+        edges.pop(key, None)
+    for edge in delta.added_edges + delta.changed_edges:
+        edges[edge['_key']] = edge
+
+
+def index_by_key(elems):
+    """
+    Convert a list of nodes or edges to a dict indexed by key.
+    """
+    return {elem['_key']: elem for elem in elems}
+
+
+class TopologyLog:
+    """
+    Current version of a topology and log of the last deltas.
+
+    Each call to :meth:`update` that changes the topology increments the
+    sequence number and appends the delta to the log. The log is bounded:
+    subscribers that fall behind the oldest delta must start again from a
+    snapshot. The log is identified by a random epoch, so that the sequence
+    numbers of a log are not mistaken for the ones of another log (e.g.
+    after a restart).
+
+    :param max_deltas: Max number of deltas kept in the log.
+    :type max_deltas: int, optional
+    """
+
+    def __init__(self, max_deltas=DEFAULT_MAX_DELTAS):
+        self.max_deltas = max_deltas
+        # Random identifier of the log
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self.nodes = dict()
+        self.edges = dict()
+        self._deltas = deque(maxlen=max_deltas)
+        self._lock = threading.Lock()
+
+    def update(self, nodes, edges):
+        """
+        Replace the topology with a new version.
+
+        :param nodes: Nodes of the new topology.
+        :type nodes: list
+        :param edges: Edges of the new topology.
+        :type edges: list
+        :return: A tuple (seq, delta), or None if the topology has not
+                 changed.
+        :rtype: tuple
+        """
+        nodes = index_by_key(nodes)
+        edges = index_by_key(edges)
+        with self._lock:
+            delta = compute_delta(self.nodes, self.edges, nodes, edges)
+            if delta.is_empty() and self.seq > 0:
+                return None
+            self.seq += 1
+            self.nodes = nodes
+            self.edges = edges
+            self._deltas.append((self.seq, delta))
+            return self.seq, delta
+
+    def snapshot(self):
+        """
+        Return the current version of the topology.
+
+        :return: A tuple (seq, nodes, edges).
+        :rtype: tuple
+        """
+        with self._lock:
+            return (self.seq, list(self.nodes.values()),
+                    list(self.edges.values()))
+
+    def deltas_since(self, seq, epoch=None):
+        """
+        Return the deltas following a sequence number.
+
+        :param seq: The sequence number of the last update received.
+        :type seq: int
+        :param epoch: The epoch of the last update received. If it is
+                      provided and it is not the epoch of the log, the
+                      sequence number refers to another log and a snapshot
+                      is required.
+        :type epoch: str, optional
+        :return: A list of (seq, delta) tuples (empty if there are no new
+                 updates), or None if the deltas are no longer available
+                 (or the sequence number is unknown) and a snapshot is
+                 required.
+        :rtype: list
+        """
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return None
+            if seq <= 0 or seq > self.seq:
+                return None
+            if seq == self.seq:
+                return []
+            if not self._deltas or self._deltas[0][0] > seq + 1:
+                return None
+            return [(_seq, delta) for _seq, delta in self._deltas
+                    if _seq > seq]
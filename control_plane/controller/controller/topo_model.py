@@ -0,0 +1,261 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Topology model
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Compact representation of the network topology.
+
+The nodes and the edges of the topology are :class:`TopologyNode` and
+:class:`TopologyEdge` objects (classes with __slots__). They are created
+once from the topology extracted from the link-state database (see
+:func:`build_topology`) and then enriched with the addresses and the hosts,
+loaded on the database and sent to the gRPC clients, without converting
+the whole topology to other representations:
+
+* the node names are interned by the parser: a node, its edges and the
+  mappings of the parser share the same strings;
+* the edges refer to the nodes by name; the "_from" and "_to" fields of
+  the documents ("nodes/<name>") are built when the documents are built;
+* the documents of the database are built one at a time, when they are
+  loaded (see :func:`iter_docs`).
+
+The nodes and the edges can also be read as the documents of the database
+(e.g. node['_key']), so that the code handling the documents (e.g.
+:mod:`controller.topo_delta`) works with both.
+"""
+
+# Name of the collection containing the nodes
+NODES_COLLECTION = 'nodes'
+
+
+def node_id(key):
+    """
+    Return the document ID of a node (e.g. "nodes/r1").
+    """
+    return '%s/%s' % (NODES_COLLECTION, key)
+
+
+def node_key(_id):
+    """
+    Return the name of a node from its document ID (e.g. "r1" from
+    "nodes/r1").
+    """
+    return _id.rsplit('/', 1)[-1]
+
+
+def edge_key(subnet, direction):
+    """
+    Return the key of an edge from the subnet of the link and the direction
+    (1 or 2). Character '/' is not accepted in the keys of ArangoDB, so it
+    is replaced by '-'.
+    """
+    return '%s-dir%d' % (subnet.replace('/', '-'), direction)
+
+
+class TopologyElement:
+    """
+    Base class of the nodes and the edges. The fields of an element are
+    listed in __slots__.
+    """
+
+    __slots__ = ()
+
+    def to_doc(self):
+        """
+        Return the document of the database representing the element.
+
+        :rtype: dict
+        """
+        raise NotImplementedError
+
+    def __getitem__(self, name):
+        if name == '_key':
+            return self.key    # pylint: disable=no-member
+        return self.to_doc()[name]
+
+    def get(self, name, default=None):
+        """
+        Return a field of the document representing the element.
+        """
+        return self.to_doc().get(name, default)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name)
+            for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self.__slots__))
+
+
+class TopologyNode(TopologyElement):
+    """
+    A node of the topology.
+
+    :param key: The name of the node.
+    :type key: str
+    :param _type: The type of the node ("router" or "host").
+    :type _type: str
+    :param ip_address: The IP address of the node.
+    :type ip_address: str, optional
+    :param ext_reachability: The System ID of the router.
+    :type ext_reachability: str, optional
+    """
+
+    __slots__ = ('key', 'type', 'ip_address', 'ext_reachability')
+
+    def __init__(self, key, _type, ip_address=None, ext_reachability=None):
+        self.key = key
+        self.type = _type
+        self.ip_address = ip_address
+        self.ext_reachability = ext_reachability
+
+    @property
+    def id(self):
+        """
+        The document ID of the node (e.g. "nodes/r1").
+        """
+        # pylint: disable=invalid-name
+        return node_id(self.key)
+
+    def to_doc(self):
+        """
+        Return the document of the "nodes" collection representing the
+        node.
+
+        :rtype: dict
+        """
+        doc = {
+            '_key': self.key,
+            'type': self.type,
+            'ip_address': self.ip_address
+        }
+        if self.ext_reachability is not None:
+            doc['ext_reachability'] = self.ext_reachability
+        return doc
+
+
+class TopologyEdge(TopologyElement):
+    """
+    A unidirectional edge of the topology.
+
+    :param key: The key of the edge.
+    :type key: str
+    :param source: The name of the source node.
+    :type source: str
+    :param target: The name of the target node.
+    :type target: str
+    :param _type: The type of the edge ("core" or "edge").
+    :type _type: str
+    """
+
+    __slots__ = ('key', 'source', 'target', 'type')
+
+    def __init__(self, key, source, target, _type):
+        self.key = key
+        self.source = source
+        self.target = target
+        self.type = _type
+
+    @property
+    def source_id(self):
+        """
+        The document ID of the source node (e.g. "nodes/r1").
+        """
+        return node_id(self.source)
+
+    @property
+    def target_id(self):
+        """
+        The document ID of the target node (e.g. "nodes/r2").
+        """
+        return node_id(self.target)
+
+    def to_doc(self):
+        """
+        Return the document of the "edges" collection representing the
+        edge.
+
+        :rtype: dict
+        """
+        return {
+            '_key': self.key,
+            '_from': self.source_id,
+            '_to': self.target_id,
+            'type': self.type
+        }
+
+
+def _link_key(edge, direction):
+    """
+    Return the key of an edge from a (node1, node2, subnet) tuple. The links
+    without IPv6 addresses are identified by the nodes.
+    """
+    subnet = edge[2]
+    if subnet is None:
+        subnet = '%s-%s' % (edge[0], edge[1])
+    return edge_key(subnet, direction)
+
+
+def build_topology(nodes, edges, node_to_systemid):
+    """
+    Build the topology from the nodes and the edges extracted from the
+    link-state database (see
+    :func:`controller.ti_extraction.build_topology_isis`). Each link is
+    represented by two unidirectional edges.
+
+    :param nodes: The names of the routers.
+    :type nodes: set
+    :param edges: The links, as (node1, node2, subnet) tuples. The subnet
+                  is None if the link has no IPv6 address.
+    :type edges: set
+    :param node_to_systemid: Mapping node name to System ID.
+    :type node_to_systemid: dict
+    :return: Tuple containing the list of the nodes and the list of the
+             edges.
+    :rtype: tuple
+    """
+    _nodes = [TopologyNode(node, 'router',
+                           ext_reachability=node_to_systemid[node])
+              for node in nodes]
+    # All the "dir1" edges, then all the "dir2" edges
+    _edges = [TopologyEdge(_link_key(edge, 1), edge[0], edge[1], 'core')
+              for edge in edges] + \
+        [TopologyEdge(_link_key(edge, 2), edge[1], edge[0], 'core')
+         for edge in edges]
+    return _nodes, _edges
+
+
+def iter_docs(elems):
+    """
+    Iterate over the documents representing a list of nodes or edges. The
+    documents are built one at a time; the elements that are already
+    documents (dicts) are returned as they are.
+    """
+    for elem in elems:
+        yield elem if isinstance(elem, dict) else elem.to_doc()
@@ -0,0 +1,431 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Topology subscription service
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Topology subscription service.
+
+The service runs a single topology extraction loop ("feed") for each
+routing domain, no matter how many subscribers are interested in it, and
+fans the updates out to all the subscribers. Each subscriber has a bounded
+queue: a subscriber that does not consume its updates fast enough is
+dropped, so that it cannot slow down the feed or make the memory grow. A
+dropped subscriber can subscribe again and resume from the sequence number
+and the epoch of the last update it received. A feed started after the
+previous one has ended (e.g. after a restart) has a new epoch, so the
+subscribers resuming from the old feed receive a snapshot.
+
+Updates are snapshots or deltas of the topology (see
+:mod:`controller.topo_delta`). They are encoded once per feed by the
+"snapshot_encoder" and "delta_encoder" functions (e.g. to build gRPC
+messages) and the encoded updates are shared by all the subscribers.
+"""
+
+# General imports
+import logging
+import os
+import queue
+import threading
+
+# Controller dependencies
+from controller import topo_delta
+
+# Configuration parameters
+#
+# Max number of updates queued for each subscriber
+TOPOLOGY_SUBSCRIBER_QUEUE_SIZE = int(
+    os.getenv('TOPOLOGY_SUBSCRIBER_QUEUE_SIZE', '64'))
+
+# Global variables definition
+#
+#
+# Logger reference
+logging.basicConfig(level=logging.NOTSET)
+logger = logging.getLogger(__name__)
+
+# Marker put in the queue of a subscriber when its subscription ends
+_END = object()
+
+
+def default_snapshot_encoder(seq, nodes, edges, epoch=None):
+    """
+    Default encoder for snapshots: return a tuple ('snapshot', seq, nodes,
+    edges). The epoch is available in the subscription.
+    """
+    # pylint: disable=unused-argument
+    return 'snapshot', seq, nodes, edges
+
+
+def default_delta_encoder(seq, delta, epoch=None):
+    """
+    Default encoder for deltas: return a tuple ('delta', seq, delta). The
+    epoch is available in the subscription.
+    """
+    # pylint: disable=unused-argument
+    return 'delta', seq, delta
+
+
+class TopologySubscription:
+    """
+    A subscription to a topology feed. Iterating over the subscription
+    returns the encoded updates, until the subscription is closed (or the
+    subscriber is dropped).
+
+    :param queue_size: Max number of queued updates.
+    :type queue_size: int
+    """
+
+    def __init__(self, queue_size):
+        self._queue = queue.Queue(maxsize=queue_size + 1)
+        self.queue_size = queue_size
+        self.feed = None
+        # Epoch of the feed (see :class:`controller.topo_delta.TopologyLog`)
+        self.epoch = None
+        self.closed = False
+        # True if the subscriber must receive a snapshot
+        self.needs_snapshot = False
+        # True if the subscriber has been dropped because it was too slow
+        self.dropped = False
+        # Error which ended the feed
+        self.error = None
+
+    def _put(self, update):
+        """
+        Queue an update. Return False if the queue is full.
+        """
+        if self._queue.qsize() >= self.queue_size:
+            return False
+        self._queue.put_nowait(update)
+        return True
+
+    def _end(self):
+        """
+        End the subscription. The marker never blocks, since one slot of
+        the queue is reserved for it.
+        """
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait(_END)
+
+    def get(self, timeout=None):
+        """
+        Return the next update.
+
+        :param timeout: Max time (in seconds) to wait for an update.
+        :type timeout: float, optional
+        :return: The encoded update, or None if the subscription is ended.
+        :raises queue.Empty: No updates received before the timeout.
+        """
+        update = self._queue.get(timeout=timeout)
+        if update is _END:
+            # Keep the marker for the next calls
+            self._queue.put_nowait(_END)
+            return None
+        return update
+
+    def __iter__(self):
+        while True:
+            update = self.get()
+            if update is None:
+                return
+            yield update
+
+    def close(self):
+        """
+        Unsubscribe.
+        """
+        if self.feed is not None:
+            self.feed.unsubscribe(self)
+        else:
+            self._end()
+
+
+class TopologyFeed:
+    """
+    Topology extraction loop shared by the subscribers of a routing domain.
+    The loop is started by the first subscriber and stopped when the last
+    subscriber leaves.
+
+    :param key: Identifier of the routing domain.
+    :type key: object
+    :param stream_factory: Function returning an iterator of (nodes, edges)
+                           tuples, e.g. the generator returned by
+                           :func:`controller.arangodb_utils.
+                           extract_topo_from_isis_and_load_on_arango_stream`.
+    :type stream_factory: function
+    :param snapshot_encoder: Function used to encode the snapshots, called
+                             with the sequence number, the nodes, the
+                             edges and the epoch (keyword argument).
+    :type snapshot_encoder: function
+    :param delta_encoder: Function used to encode the deltas, called with
+                          the sequence number, the delta and the epoch
+                          (keyword argument).
+    :type delta_encoder: function
+    :param on_stop: Function called with the feed when the loop ends.
+    :type on_stop: function, optional
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, key, stream_factory, snapshot_encoder, delta_encoder,
+                 on_stop=None):
+        # pylint: disable=too-many-arguments
+        self.key = key
+        self.stream_factory = stream_factory
+        self.snapshot_encoder = snapshot_encoder
+        self.delta_encoder = delta_encoder
+        self.on_stop = on_stop
+        self.log = topo_delta.TopologyLog()
+        # Subscribers, in order of subscription (dict keys)
+        self.subscribers = dict()
+        # Encoded deltas, indexed by sequence number
+        self._encoded = dict()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        # True when the loop is ended
+        self.stopped = False
+
+    def _encoded_delta(self, seq, delta):
+        """
+        Return the encoded delta, encoding it if needed.
+        """
+        encoded = self._encoded.get(seq)
+        if encoded is None:
+            encoded = self.delta_encoder(seq, delta, epoch=self.log.epoch)
+            self._encoded[seq] = encoded
+            # Forget the deltas no longer in the log
+            for _seq in [_seq for _seq in self._encoded
+                         if _seq <= seq - self.log.max_deltas]:
+                del self._encoded[_seq]
+        return encoded
+
+    def _encoded_snapshot(self):
+        """
+        Encode the current version of the topology.
+        """
+        return self.snapshot_encoder(*self.log.snapshot(),
+                                     epoch=self.log.epoch)
+
+    def _initial_updates(self, resume_from_seq, resume_epoch, max_updates):
+        """
+        Updates sent to a new subscriber: the deltas following
+        "resume_from_seq" or, if they are not available (or they do not fit
+        in the queue of the subscriber, or "resume_epoch" is not the epoch
+        of the feed), a snapshot. Nothing is sent if the topology has not
+        been extracted yet.
+        """
+        if self.log.seq == 0:
+            return []
+        # The sequence numbers of another epoch are not valid in this feed
+        deltas = self.log.deltas_since(resume_from_seq,
+                                       epoch=resume_epoch or '')
+        if deltas is None or len(deltas) > max_updates:
+            return [self._encoded_snapshot()]
+        return [self._encoded_delta(seq, delta) for seq, delta in deltas]
+
+    def subscribe(self, subscription, resume_from_seq=0, resume_epoch=None):
+        """
+        Add a subscriber and start the loop if it is not running.
+
+        :return: False if the loop is already ended and the feed cannot be
+                 used anymore, True otherwise.
+        :rtype: bool
+        """
+        with self._lock:
+            if self.stopped:
+                return False
+            subscription.feed = self
+            subscription.epoch = self.log.epoch
+            updates = self._initial_updates(resume_from_seq, resume_epoch,
+                                            subscription.queue_size)
+            for update in updates:
+                subscription._put(update)    # pylint: disable=protected-access
+            # If the topology has not been extracted yet, the first update
+            # sent to the subscriber will be a snapshot
+            subscription.needs_snapshot = self.log.seq == 0
+            self.subscribers[subscription] = None
+            # The loop may be stopping because the last subscriber left
+            self._stop_event.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='topology-feed', daemon=True)
+                self._thread.start()
+            return True
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a subscriber. The loop is stopped when the last subscriber
+        leaves.
+        """
+        with self._lock:
+            self.subscribers.pop(subscription, None)
+            subscription._end()    # pylint: disable=protected-access
+            if not self.subscribers:
+                self._stop_event.set()
+
+    def _publish(self, nodes, edges):
+        """
+        Update the topology, send the changes to all the subscribers and
+        drop the slow ones.
+        """
+        with self._lock:
+            update = self.log.update(nodes, edges)
+            if update is None:
+                # The topology has not changed
+                return
+            seq, delta = update
+            encoded = self._encoded_delta(seq, delta)
+            snapshot = None
+            for subscription in list(self.subscribers):
+                update = encoded
+                if subscription.needs_snapshot:
+                    # The subscriber has not received the topology yet
+                    if snapshot is None:
+                        snapshot = self._encoded_snapshot()
+                    update = snapshot
+                    subscription.needs_snapshot = False
+                # pylint: disable=protected-access
+                if not subscription._put(update):
+                    logger.warning('Dropping slow topology subscriber '
+                                   '(feed %s, seq %s)', self.key, seq)
+                    subscription.dropped = True
+                    self.subscribers.pop(subscription, None)
+                    subscription._end()
+            if not self.subscribers:
+                self._stop_event.set()
+
+    def _run(self):
+        """
+        Extraction loop.
+        """
+        error = None
+        try:
+            for nodes, edges in self.stream_factory():
+                self._publish(nodes, edges)
+                if self._stop_event.is_set():
+                    # The decision to stop is taken under the lock: a
+                    # subscriber may have arrived after the last one left
+                    with self._lock:
+                        if not self.subscribers:
+                            # From now on, the new subscribers start a new
+                            # feed
+                            self.stopped = True
+                            break
+                        self._stop_event.clear()
+        except Exception as err:    # pylint: disable=broad-except
+            logger.error('Error in topology feed %s: %s', self.key, err)
+            error = err
+        # The loop is ended, end all the subscriptions
+        with self._lock:
+            self.stopped = True
+            for subscription in self.subscribers:
+                subscription.error = error
+                subscription._end()    # pylint: disable=protected-access
+            self.subscribers.clear()
+        if self.on_stop is not None:
+            self.on_stop(self)
+
+    def join(self, timeout=None):
+        """
+        Wait for the extraction loop to end.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+class TopologyService:
+    """
+    Fan-out hub for the topology updates. Subscribers of the same routing
+    domain share a single :class:`TopologyFeed`.
+
+    :param queue_size: Max number of updates queued for each subscriber.
+    :type queue_size: int, optional
+    :param snapshot_encoder: Function used to encode the snapshots.
+    :type snapshot_encoder: function, optional
+    :param delta_encoder: Function used to encode the deltas.
+    :type delta_encoder: function, optional
+    """
+
+    def __init__(self, queue_size=TOPOLOGY_SUBSCRIBER_QUEUE_SIZE,
+                 snapshot_encoder=default_snapshot_encoder,
+                 delta_encoder=default_delta_encoder):
+        self.queue_size = queue_size
+        self.snapshot_encoder = snapshot_encoder
+        self.delta_encoder = delta_encoder
+        self.feeds = dict()
+        self._lock = threading.Lock()
+
+    def _on_feed_stop(self, feed):
+        """
+        Forget a feed when its loop ends.
+        """
+        with self._lock:
+            if self.feeds.get(feed.key) is feed:
+                del self.feeds[feed.key]
+
+    def subscribe(self, key, stream_factory, resume_from_seq=0,
+                  resume_epoch=None):
+        """
+        Subscribe to the topology updates of a routing domain. If the
+        routing domain has no feed, a new feed is started using
+        "stream_factory"; otherwise, the running feed is shared and
+        "stream_factory" is ignored.
+
+        :param key: Identifier of the routing domain (e.g. the protocol and
+                    the nodes used for the extraction).
+        :type key: object
+        :param stream_factory: Function returning an iterator of
+                               (nodes, edges) tuples.
+        :type stream_factory: function
+        :param resume_from_seq: Sequence number of the last update received
+                                by the subscriber (0 to start with a
+                                snapshot).
+        :type resume_from_seq: int, optional
+        :param resume_epoch: Epoch of the last update received by the
+                             subscriber (see :attr:`TopologySubscription.
+                             epoch`); a snapshot is sent if it is not the
+                             epoch of the feed.
+        :type resume_epoch: str, optional
+        :return: The subscription.
+        :rtype: TopologySubscription
+        """
+        subscription = TopologySubscription(queue_size=self.queue_size)
+        with self._lock:
+            feed = self.feeds.get(key)
+            if feed is None or \
+                    not feed.subscribe(subscription, resume_from_seq,
+                                       resume_epoch):
+                # No feed running for the routing domain, start a new one
+                feed = TopologyFeed(
+                    key=key,
+                    stream_factory=stream_factory,
+                    snapshot_encoder=self.snapshot_encoder,
+                    delta_encoder=self.delta_encoder,
+                    on_stop=self._on_feed_stop
+                )
+                self.feeds[key] = feed
+                feed.subscribe(subscription, resume_from_seq, resume_epoch)
+        return subscription
@@ -33,7 +33,7 @@ management.
 import os
 
 # Controller dependencies
-from controller import arangodb_driver
+from controller import arangodb_driver, tracing
 
 
 def load_nodes_config(nodes):
@@ -63,6 +63,7 @@ def load_nodes_config(nodes):
     )
 
 
+@tracing.traced()
 def get_nodes_config():
     """
     Retrieve the nodes configuration from a ArangoDB database.
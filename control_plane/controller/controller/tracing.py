@@ -0,0 +1,76 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Controller tracing and profiling
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Tracing and profiling of the controller operations.
+
+The tracing is implemented by :mod:`telemetry.tracing`, shared with the
+node manager; this module applies the configuration of the controller.
+The controller records a span for each northbound RPC, for the functions
+of :mod:`controller.srv6_utils` and :mod:`controller.arangodb_driver` and
+for each southbound RPC, and propagates the traces and the profiling
+requests to the nodes.
+
+When a trace is completed, it is logged and, if TRACING_FILE is set,
+appended to TRACING_FILE as a JSON line.
+"""
+
+# General imports
+import os
+import tempfile
+
+# Telemetry dependencies
+import telemetry.tracing
+
+# Configuration parameters
+#
+# Define whether to enable the tracing or not
+ENABLE_TRACING = os.getenv('ENABLE_TRACING', 'False').lower() == 'true'
+# Fraction of the traces started by the controller that are recorded
+# (traces received from the callers are always recorded)
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', '1.0'))
+# File where the traces are appended as JSON lines (optional)
+TRACING_FILE = os.getenv('TRACING_FILE')
+# Define whether the RPCs can request to be profiled or not
+ENABLE_PROFILING = os.getenv('ENABLE_PROFILING', 'False').lower() == 'true'
+# Directory where the profiles are saved
+PROFILING_DIR = os.getenv('PROFILING_DIR',
+                          os.path.join(tempfile.gettempdir(),
+                                       'controller-profiles'))
+
+# Apply the configuration to the tracing
+telemetry.tracing.ENABLE_TRACING = ENABLE_TRACING
+telemetry.tracing.TRACING_SAMPLE_RATE = TRACING_SAMPLE_RATE
+telemetry.tracing.TRACING_FILE = TRACING_FILE
+telemetry.tracing.ENABLE_PROFILING = ENABLE_PROFILING
+telemetry.tracing.PROFILING_DIR = PROFILING_DIR
+
+# Decorator recording a span for each call of a function
+traced = telemetry.tracing.traced
+# Server interceptor continuing the traces of the northbound RPCs
+ServerTracingInterceptor = telemetry.tracing.ServerTracingInterceptor
+# Channel propagating the traces to a node
+intercept_channel = telemetry.tracing.intercept_channel
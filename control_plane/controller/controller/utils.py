@@ -40,6 +40,8 @@ import grpc
 
 # Proto dependencies
 import commons_pb2
+# Controller dependencies
+from controller import metrics, tracing
 
 # Logger reference
 logging.basicConfig(level=logging.NOTSET)
@@ -106,6 +108,7 @@ def validate_ip_address(ip_address):
 
 
 # Build a grpc stub
+@tracing.traced('grpc.channel')
 def get_grpc_session(server_ip, server_port, secure=False, certificate=None):
     """
     Create a Channel to a server.
@@ -145,6 +148,11 @@ def get_grpc_session(server_ip, server_port, secure=False, certificate=None):
         channel = grpc.secure_channel(server_ip, grpc_client_credentials)
     else:
         channel = grpc.insecure_channel(server_ip)
+    # Record the latency of the RPCs, if the metrics are enabled
+    # (the node is identified by the target without the scheme)
+    channel = metrics.intercept_channel(channel, server_ip.split(':', 1)[1])
+    # Propagate the traces to the node
+    channel = tracing.intercept_channel(channel, server_ip.split(':', 1)[1])
     # Return the channel
     return channel
 
@@ -210,6 +218,10 @@ STATUS_CODE_TO_DESC = {
 
 
 def parse_ip_port(netloc):
+    # Strip the scheme of the gRPC targets (e.g. 'ipv6:[fcff:1::1]:12345')
+    for scheme in ('ipv4:', 'ipv6:'):
+        if netloc.startswith(scheme):
+            netloc = netloc[len(scheme):]
     try:
         ip = ip_address(netloc)
         port = None
@@ -221,7 +233,11 @@ def parse_ip_port(netloc):
 
 
 def grpc_chan_to_addr_port(channel):
-    address, port = parse_ip_port(channel._channel.target().decode())
+    # Unwrap the channels returned by grpc.intercept_channel
+    channel = channel._channel
+    while not hasattr(channel, 'target'):
+        channel = channel._channel
+    address, port = parse_ip_port(channel.target().decode())
     return str(address), port
 
 
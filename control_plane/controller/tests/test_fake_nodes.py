@@ -0,0 +1,65 @@
+#!/usr/bin/python
+
+import pytest
+
+from controller import fake_nodes, srv6_usid, srv6_utils, utils
+
+
+@pytest.fixture
+def fleet():
+    with fake_nodes.FakeNodeFleet(3) as _fleet:
+        yield _fleet
+
+
+def test_srv6_path(fleet):
+    node = fleet.nodes[0]
+    srv6_utils.handle_srv6_path(
+        operation='add', grpc_address=node.address, grpc_port=node.port,
+        destination='fd00::/64', segments=['fcff:2::100'], update_db=False)
+    assert ('fd00::/64', -1) in node.state.paths
+    # The path already exists
+    with pytest.raises(utils.FileExistsException):
+        srv6_utils.handle_srv6_path(
+            operation='add', grpc_address=node.address, grpc_port=node.port,
+            destination='fd00::/64', segments=['fcff:2::100'],
+            update_db=False)
+    srv6_utils.handle_srv6_path(
+        operation='del', grpc_address=node.address, grpc_port=node.port,
+        destination='fd00::/64', update_db=False)
+    assert not node.state.paths
+
+
+def test_srv6_tunnel_with_channels(fleet):
+    node_l, node_r = fleet.nodes[:2]
+    channel_l = utils.get_grpc_session(node_l.address, node_l.port)
+    channel_r = utils.get_grpc_session(node_r.address, node_r.port)
+    try:
+        srv6_utils.create_srv6_tunnel(
+            node_l_ip=None, node_l_port=None, node_r_ip=None,
+            node_r_port=None, sidlist_lr=['fcff:2::100'],
+            sidlist_rl=['fcff:1::100'], dest_lr='fd00:2::/64',
+            dest_rl='fd00:1::/64', localseg_lr='fcff:2::101',
+            update_db=False, node_l_channel=channel_l,
+            node_r_channel=channel_r)
+        assert len(node_l.state.paths) == len(node_r.state.paths) == 1
+        assert len(node_r.state.behaviors) == 1
+        # The channels provided by the caller are still usable
+        srv6_utils.destroy_srv6_tunnel(
+            node_l_ip=None, node_l_port=None, node_r_ip=None,
+            node_r_port=None, dest_lr='fd00:2::/64', dest_rl='fd00:1::/64',
+            localseg_lr='fcff:2::101', update_db=False,
+            node_l_channel=channel_l, node_r_channel=channel_r)
+        assert not node_l.state.paths and not node_r.state.paths
+        assert not node_r.state.behaviors
+    finally:
+        channel_l.close()
+        channel_r.close()
+
+
+def test_usid_policy_with_node_names(fleet):
+    status = srv6_usid.handle_srv6_usid_policy(
+        operation='add', lr_destination='fd00:3::/64',
+        rl_destination='fd00:1::/64', nodes_lr=['node1', 'node2', 'node3'],
+        persistency=False, nodes_config=fleet.nodes_config())
+    assert status == 0
+    assert fleet.nodes[0].state.paths and fleet.nodes[2].state.paths
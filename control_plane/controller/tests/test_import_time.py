@@ -0,0 +1,32 @@
+#!/usr/bin/python
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# The import times are measured by the import time benchmark
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..',
+                                'benchmarks'))
+import bench_import_time  # noqa: E402
+
+# Budget for the import of an entry point (in milliseconds); generous, to
+# catch an optional subsystem imported again at module level rather than
+# small regressions
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+
+# Optional subsystems that must be imported on first use only
+LAZY_MODULES = ['arango', 'kafka', 'networkx', 'numpy', 'pkg_resources',
+                'pyaml', 'yaml', 'db_update']
+
+
+@pytest.mark.parametrize('module', bench_import_time.DEFAULT_MODULES)
+def test_import_time(module):
+    # The node manager and the CLI are tested only if they are installed
+    if importlib.util.find_spec(module.split('.')[0]) is None:
+        pytest.skip('%s is not installed' % module.split('.')[0])
+    modules = bench_import_time.import_time(module)
+    assert module in modules
+    assert [name for name in LAZY_MODULES if name in modules] == []
+    assert modules[module] / 1000 < IMPORT_TIME_BUDGET_MS
@@ -0,0 +1,56 @@
+#!/usr/bin/python
+
+import json
+
+from controller import kafka_utils
+
+
+def make_publisher(broker, batch_size=100):
+    producer = kafka_utils.FakeKafkaProducer(
+        broker=broker,
+        value_serializer=kafka_utils.json_serializer,
+        batch_size=batch_size)
+    return kafka_utils.KafkaPublisher(
+        bootstrap_servers=['fake:9092'], producer=producer)
+
+
+def test_publisher_batches_until_flush():
+    broker = kafka_utils.FakeKafkaBroker()
+    publisher = make_publisher(broker)
+    for interval in range(10):
+        publisher.send(topic='twamp', value={'interval': interval})
+    # Records are buffered by the producer
+    assert broker.messages('twamp') == []
+    assert publisher.sent == 10 and publisher.delivered == 0
+    publisher.flush()
+    assert [json.loads(msg)['interval']
+            for msg in broker.messages('twamp')] == list(range(10))
+    assert publisher.delivered == 10
+
+
+def test_publisher_batch_size():
+    broker = kafka_utils.FakeKafkaBroker()
+    publisher = make_publisher(broker, batch_size=4)
+    for interval in range(6):
+        publisher.send(topic='iperf', value={'interval': interval})
+    assert len(broker.messages('iperf')) == 4
+    publisher.close()
+    assert len(broker.messages('iperf')) == 6
+
+
+def test_publisher_delivery_errors():
+    broker = kafka_utils.FakeKafkaBroker(fail_topics=['twamp'])
+    publisher = make_publisher(broker)
+    publisher.send(topic='twamp', value={'interval': 1})
+    publisher.send(topic='iperf', value={'interval': 1})
+    publisher.close()
+    assert publisher.failed == 1 and publisher.delivered == 1
+
+
+def test_publisher_without_kafka(monkeypatch):
+    monkeypatch.setattr(kafka_utils, 'import_kafka', lambda: False)
+    publisher = kafka_utils.KafkaPublisher(bootstrap_servers=['fake:9092'])
+    # The records are dropped, the error is not raised to the caller
+    assert publisher.send(topic='twamp', value={'interval': 1}) is None
+    assert not publisher.enabled and publisher.failed == 1
+    publisher.close()
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+
+import threading
+import urllib.request
+from concurrent import futures
+
+import grpc
+
+import srv6_manager_pb2_grpc
+import telemetry.metrics
+from controller import fake_nodes, metrics, srv6_utils, utils
+
+
+def test_histogram_threads():
+    registry = list()
+    histogram = metrics.Histogram('test_duration_seconds', 'Test',
+                                  ['function'], registry=registry,
+                                  buckets=(0.1, 1.0))
+    counter = metrics.Counter('test_total', 'Test', registry=registry)
+
+    def run():
+        for value in (0.05, 0.5, 5):
+            histogram.labels('f').observe(value)
+            counter.labels().inc()
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    output = telemetry.metrics.generate_latest(registry)
+    assert '# TYPE test_duration_seconds histogram' in output
+    assert 'test_duration_seconds_bucket{function="f",le="0.1"} 8' in output
+    assert 'test_duration_seconds_bucket{function="f",le="1.0"} 16' in output
+    assert 'test_duration_seconds_bucket{function="f",le="+Inf"} 24' in output
+    assert 'test_duration_seconds_count{function="f"} 24' in output
+    assert 'test_total 24' in output
+
+
+def test_timed_labels(monkeypatch):
+    monkeypatch.setattr(telemetry.metrics, 'ENABLE_METRICS', True)
+    registry = list()
+    histogram = metrics.Histogram('test_timed_seconds', 'Test', ['label'],
+                                  registry=registry)
+
+    @metrics.timed(histogram)
+    def by_name():
+        pass
+
+    @metrics.timed(histogram, lambda value: 'value-%s' % value)
+    def by_argument(value):
+        return value
+    by_name()
+    assert by_argument(1) == 1
+    output = telemetry.metrics.generate_latest(registry)
+    assert 'test_timed_seconds_count{label="by_name"} 1' in output
+    assert 'test_timed_seconds_count{label="value-1"} 1' in output
+
+
+def test_rpc_metrics_over_http(monkeypatch):
+    monkeypatch.setattr(telemetry.metrics, 'ENABLE_METRICS', True)
+    # Node serving the RPCs through the metrics interceptor
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4),
+                         interceptors=[metrics.ServerMetricsInterceptor()])
+    srv6_manager_pb2_grpc.add_SRv6ManagerServicer_to_server(
+        fake_nodes.FakeSRv6Manager(fake_nodes.FakeNodeState()), server)
+    port = server.add_insecure_port('[::1]:0')
+    server.start()
+    http_server = metrics.start_http_server(port=0, address='::1')
+    try:
+        srv6_utils.handle_srv6_path(
+            operation='add', grpc_address='::1', grpc_port=port,
+            destination='fd00::/64', segments=['fcff:2::100'],
+            update_db=False)
+        assert utils.grpc_chan_to_addr_port(
+            utils.get_grpc_session('::1', port)) == ('::1', port)
+        with urllib.request.urlopen('http://[::1]:%d/metrics'
+                                    % http_server.server_address[1]) as res:
+            output = res.read().decode()
+    finally:
+        http_server.shutdown()
+        server.stop(None)
+    method = '/srv6_manager.SRv6Manager/Create'
+    assert 'controller_nb_rpc_duration_seconds_count{method="%s"} 1' \
+        % method in output
+    assert 'controller_nb_rpc_in_flight{method="%s"} 0' % method in output
+    assert 'controller_sb_rpc_duration_seconds_count{node="[::1]:%d",' \
+        'method="%s"} 1' % (port, method) in output
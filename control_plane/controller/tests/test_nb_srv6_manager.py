@@ -0,0 +1,136 @@
+#!/usr/bin/python
+
+import nb_commons_pb2
+import nb_srv6_manager_pb2
+import pytest
+
+from controller import fake_nodes
+from controller.nb_grpc_server import srv6_manager
+
+
+@pytest.fixture
+def fleet():
+    with fake_nodes.FakeNodeFleet(3) as _fleet:
+        yield _fleet
+
+
+@pytest.fixture
+def manager():
+    _manager = srv6_manager.SRv6Manager(max_workers=2)
+    yield _manager
+    _manager.channel_pool.close()
+
+
+def add_path(request, node, destination, operation='add'):
+    srv6_path = request.srv6_paths.add()
+    srv6_path.operation = operation
+    srv6_path.grpc_address = node.address
+    srv6_path.grpc_port = node.port
+    srv6_path.destination = destination
+    srv6_path.segments.append('fcff:2::100')
+    srv6_path.table = -1
+    srv6_path.metric = -1
+
+
+def test_handle_srv6_path(fleet, manager):
+    node1, node2, node3 = fleet.nodes
+    request = nb_srv6_manager_pb2.SRv6PathRequest()
+    for i in range(10):
+        add_path(request, fleet.nodes[i % 3], 'fd00:%d::/64' % i)
+    # The items of a node are executed in order
+    add_path(request, node1, 'fd00:0::/64')
+    add_path(request, node2, 'fd00:1::/64', operation='del')
+    add_path(request, node3, 'fd00:2::/64', operation='change')
+    response = manager.HandleSRv6Path(request, None)
+    # The status of each item is reported, in the order of the request
+    assert list(response.item_status) == \
+        [nb_commons_pb2.STATUS_SUCCESS] * 10 + \
+        [nb_commons_pb2.STATUS_FILE_EXISTS, nb_commons_pb2.STATUS_SUCCESS,
+         nb_commons_pb2.STATUS_SUCCESS]
+    assert response.status == nb_commons_pb2.STATUS_FILE_EXISTS
+    assert not response.srv6_paths
+    assert len(node1.state.paths) == 4
+    assert len(node2.state.paths) == 2
+    assert len(node3.state.paths) == 3
+    # A channel for each node
+    assert len(manager.channel_pool) == 3
+
+
+def test_unreachable_node(fleet, manager):
+    node1, node2 = fleet.nodes[:2]
+    node2.stop()
+    request = nb_srv6_manager_pb2.SRv6PathRequest()
+    add_path(request, node2, 'fd00:1::/64')
+    add_path(request, node1, 'fd00:2::/64')
+    response = manager.HandleSRv6Path(request, None)
+    assert list(response.item_status) == \
+        [nb_commons_pb2.STATUS_GRPC_SERVICE_UNAVAILABLE,
+         nb_commons_pb2.STATUS_SUCCESS]
+    assert response.status == nb_commons_pb2.STATUS_GRPC_SERVICE_UNAVAILABLE
+    assert list(node1.state.paths) == [('fd00:2::/64', -1)]
+
+
+def path_operation(operation_id, node, destination, operation='add'):
+    request = nb_srv6_manager_pb2.SRv6PathRequest()
+    add_path(request, node, destination, operation=operation)
+    return nb_srv6_manager_pb2.SRv6Operation(id=operation_id,
+                                             srv6_path=request.srv6_paths[0])
+
+
+def test_stream_srv6_operations(fleet):
+    manager = srv6_manager.SRv6Manager(max_workers=2, stream_window=50,
+                                       stream_batch_size=100)
+    try:
+        operations = [path_operation(i, fleet.nodes[i % 3],
+                                     'fd00:%d::/64' % i)
+                      for i in range(250)]
+        # A path already added fails, the paths after it are applied
+        operations.insert(100, path_operation(250, fleet.nodes[0],
+                                              'fd00:0::/64'))
+        # An operation without entity
+        operations.append(nb_srv6_manager_pb2.SRv6Operation(id=251))
+        results = {result.id: result.status for result in
+                   manager.StreamSRv6Operations(iter(operations), None)}
+        expected = {i: nb_commons_pb2.STATUS_SUCCESS for i in range(250)}
+        expected[250] = nb_commons_pb2.STATUS_FILE_EXISTS
+        expected[251] = nb_commons_pb2.STATUS_BAD_REQUEST
+        assert results == expected
+        assert sum(len(node.state.paths) for node in fleet.nodes) == 250
+        # The paths are sent to the nodes in batches
+        assert fleet.rpcs() < 30
+    finally:
+        manager.channel_pool.close()
+
+
+def test_stream_unreachable_node(fleet, manager):
+    node1, node2 = fleet.nodes[:2]
+    node2.stop()
+    operations = [path_operation(1, node2, 'fd00:1::/64'),
+                  path_operation(2, node1, 'fd00:2::/64'),
+                  path_operation(3, node2, 'fd00:3::/64')]
+    results = {result.id: result.status for result in
+               manager.StreamSRv6Operations(iter(operations), None)}
+    assert results == {1: nb_commons_pb2.STATUS_GRPC_SERVICE_UNAVAILABLE,
+                       2: nb_commons_pb2.STATUS_SUCCESS,
+                       3: nb_commons_pb2.STATUS_GRPC_SERVICE_UNAVAILABLE}
+
+
+def test_invalid_path(fleet, manager):
+    node1 = fleet.nodes[0]
+    request = nb_srv6_manager_pb2.SRv6PathRequest()
+    add_path(request, node1, 'fd00:1::/64')
+    add_path(request, node1, 'fd00:2::/64')
+    # Unknown forwarding engine
+    request.srv6_paths[0].fwd_engine = 42
+    response = manager.HandleSRv6Path(request, None)
+    assert list(response.item_status) == \
+        [nb_commons_pb2.STATUS_BAD_REQUEST, nb_commons_pb2.STATUS_SUCCESS]
+    operations = [path_operation(1, node1, 'fd00:3::/64'),
+                  path_operation(2, node1, 'fd00:4::/64')]
+    operations[1].srv6_path.fwd_engine = 42
+    results = {result.id: result.status for result in
+               manager.StreamSRv6Operations(iter(operations), None)}
+    assert results == {1: nb_commons_pb2.STATUS_SUCCESS,
+                       2: nb_commons_pb2.STATUS_BAD_REQUEST}
+    assert sorted(node1.state.paths) == [('fd00:2::/64', -1),
+                                         ('fd00:3::/64', -1)]
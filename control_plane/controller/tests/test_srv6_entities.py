@@ -0,0 +1,107 @@
+#!/usr/bin/python
+
+import nb_commons_pb2
+import nb_srv6_manager_pb2
+import pytest
+import srv6_manager_pb2
+
+from controller import utils
+from controller.srv6_entities import (SRv6Behavior, SRv6BidiTunnel,
+                                      SRv6MicroSIDPolicy, SRv6Path)
+
+
+def nb_path(**kwargs):
+    path = nb_srv6_manager_pb2.SRv6Path(
+        grpc_address='fcff:1::1', grpc_port=12345, destination='fd00::/64',
+        table=-1, metric=-1)
+    path.segments.extend(['fcff:2::1', 'fcff:3::1'])
+    for name, value in kwargs.items():
+        setattr(path, name, value)
+    return path
+
+
+def test_path_from_nb():
+    path = SRv6Path.from_nb(nb_path(encapmode=nb_commons_pb2.INLINE))
+    # The fields not specified are None
+    assert path.to_dict() == {
+        'grpc_address': 'fcff:1::1', 'grpc_port': 12345,
+        'destination': 'fd00::/64', 'segments': ['fcff:2::1', 'fcff:3::1'],
+        'device': None, 'encapmode': 'inline', 'table': None,
+        'metric': None, 'bsid_addr': None, 'fwd_engine': None, 'key': None}
+    # The same entity is converted to all the representations
+    assert SRv6Path.from_doc(path.to_doc()) == path
+    reply = nb_srv6_manager_pb2.SRv6Path()
+    path.fill_nb(reply)
+    assert SRv6Path.from_nb(reply) == path
+
+
+def test_path_fill_sb():
+    path = SRv6Path(destination='fd00::/64', segments=['fcff:2::1'],
+                    table='10', key='path1')
+    request = srv6_manager_pb2.SRv6ManagerRequest()
+    path.fill_sb(request.srv6_path_request.paths.add())
+    request.srv6_path_request.fwd_engine = path.sb_fwd_engine
+    sb_path = request.srv6_path_request.paths[0]
+    # Defaults of the southbound API
+    assert sb_path.encapmode == 'encap'
+    assert sb_path.device == ''
+    assert sb_path.metric == -1
+    assert sb_path.table == 10
+    assert [segment.segment for segment in sb_path.sr_path] == ['fcff:2::1']
+    assert request.srv6_path_request.fwd_engine == srv6_manager_pb2.LINUX
+    assert SRv6Path.from_sb(sb_path).segments == ['fcff:2::1']
+    assert path.to_doc()['_key'] == 'path1'
+
+
+def test_behavior_round_trip():
+    behavior = SRv6Behavior(grpc_address='fcff:1::1', grpc_port=12345,
+                            segment='fcff:1::100', action='End.DT6',
+                            lookup_table=254, fwd_engine='linux')
+    nb_behavior = nb_srv6_manager_pb2.SRv6Behavior()
+    behavior.fill_nb(nb_behavior)
+    assert nb_behavior.action == nb_commons_pb2.END_DT6
+    assert SRv6Behavior.from_nb(nb_behavior) == behavior
+    sb_behavior = srv6_manager_pb2.SRv6Behavior()
+    behavior.fill_sb(sb_behavior)
+    assert (sb_behavior.action, sb_behavior.lookup_table) == ('End.DT6', 254)
+    # The lookup table is optional
+    SRv6Behavior(segment='fcff:1::100', action='End').fill_sb(sb_behavior)
+    assert sb_behavior.lookup_table == -1
+
+
+@pytest.mark.parametrize('kwargs', [{'fwd_engine': 'dpdk'},
+                                    {'encapmode': 'tunnel'},
+                                    {'table': 'main'}])
+def test_invalid_path(kwargs):
+    with pytest.raises(utils.InvalidArgumentError):
+        SRv6Path(destination='fd00::/64', **kwargs)
+
+
+def test_invalid_nb_enum():
+    with pytest.raises(utils.InvalidArgumentError):
+        SRv6Path.from_nb(nb_path(fwd_engine=42))
+
+
+def test_biditunnel_from_doc():
+    doc = {'l_grpc_address': 'fcff:1::1', 'l_grpc_port': 12345,
+           'r_grpc_address': 'fcff:2::1', 'r_grpc_port': 12345,
+           'sidlist_lr': ['fcff:2::100'], 'sidlist_rl': ['fcff:1::100'],
+           'dest_lr': 'fd00:2::/64', 'dest_rl': 'fd00:1::/64',
+           'localseg_lr': None, 'localseg_rl': None, 'bsid_addr': None,
+           'fwd_engine': 'vpp', 'is_unidirectional': False, '_key': 't1'}
+    tunnel = nb_srv6_manager_pb2.SRv6BidiTunnel()
+    SRv6BidiTunnel.from_doc(doc).fill_nb(tunnel)
+    assert (tunnel.node_r_ip, tunnel.node_r_port) == ('fcff:2::1', 12345)
+    assert list(tunnel.sidlist_rl) == ['fcff:1::100']
+    assert tunnel.localseg_lr == ''
+    assert tunnel.fwd_engine == nb_commons_pb2.VPP
+    assert tunnel.key == 't1'
+
+
+def test_micro_sid_nodes():
+    micro_sid = nb_srv6_manager_pb2.SRv6MicroSID(
+        nodes_lr='r1, r2,,r3', l_fwd_engine=nb_commons_pb2.LINUX)
+    policy = SRv6MicroSIDPolicy.from_nb(micro_sid)
+    assert policy.nodes_lr == ['r1', 'r2', 'r3']
+    assert policy.nodes_rl is None
+    assert (policy.l_fwd_engine, policy.r_fwd_engine) == ('linux', '')
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import commons_pb2  # noqa: E402
+import srv6pm_manager_pb2  # noqa: E402
+
+from controller import srv6_pm, srv6_pm_analytics  # noqa: E402
+from controller.nb_grpc_server import srv6pm_manager  # noqa: E402
+
+
+def make_record(interval, ss_tx, rf_rx, rf_tx, ss_rx, measure_id=1,
+                delay=None):
+    record = {
+        'measure_id': measure_id,
+        'interval': interval,
+        'timestamp': str(interval),
+        'sender_tx_counter': ss_tx,
+        'reflector_rx_counter': rf_rx,
+        'reflector_tx_counter': rf_tx,
+        'sender_rx_counter': ss_rx,
+    }
+    if delay is not None:
+        record['delay'] = delay
+    return record
+
+
+def test_loss_per_interval():
+    analytics = srv6_pm_analytics.PMAnalytics()
+    metrics = analytics.process([
+        make_record(1, 100, 90, 90, 90),
+        make_record(2, 200, 200, 200, 150),
+        make_record(1, 10, 10, 10, 10, measure_id=2),
+    ])
+    assert [m['fw_loss'] for m in metrics] == [10, 0, 0]
+    assert [m['rv_loss'] for m in metrics] == [0, 50, 0]
+    assert metrics[0]['fw_loss_ratio'] == pytest.approx(0.1)
+    assert metrics[1]['rv_loss_ratio'] == pytest.approx(0.25)
+    assert metrics[1]['window_fw_loss_ratio'] == pytest.approx(10 / 300)
+    assert metrics[2]['window_intervals'] == 1
+
+
+def test_counter_wrap_around():
+    # 32-bit cumulative counters wrapping between the two records
+    analytics = srv6_pm_analytics.PMAnalytics(counter_bits=32,
+                                              cumulative=True)
+    start = 2 ** 32 - 50
+    metrics = analytics.process([
+        make_record(1, start, start, start, start),
+        make_record(2, 50, 40, 50, 50),
+    ])
+    assert metrics[1]['fw_loss'] == 10
+    assert metrics[1]['fw_loss_ratio'] == pytest.approx(0.1)
+    assert metrics[1]['rv_loss'] == 0
+
+
+def test_ring_buffer_window_and_delay():
+    analytics = srv6_pm_analytics.PMAnalytics(window=4)
+    analytics.process([make_record(i, 100, 100 - i, 100, 100, delay=i)
+                       for i in range(10)])
+    metrics = analytics.get_session_metrics(1)
+    assert metrics['window_intervals'] == 4
+    # Only the last 4 intervals (6, 7, 8, 9) are kept
+    assert metrics['window_fw_loss_ratio'] == pytest.approx(30 / 400)
+    assert metrics['delay_p50'] == pytest.approx(7.5)
+
+
+def test_stop_experiment_frees_session(monkeypatch):
+    monkeypatch.setattr(srv6_pm, 'ENABLE_PM_ANALYTICS', True)
+    monkeypatch.setattr(srv6_pm, 'PM_CUMULATIVE_COUNTERS', True)
+    monkeypatch.setattr(srv6_pm, '_pm_analytics', None)
+    monkeypatch.setattr(srv6_pm, 'stop_experiment',
+                        lambda **kwargs: commons_pb2.STATUS_SUCCESS)
+    analytics = srv6_pm.get_pm_analytics()
+    assert analytics.cumulative
+    analytics.process([make_record(1, 100, 90, 90, 90, measure_id=7),
+                       make_record(1, 100, 90, 90, 90, measure_id=8)])
+    manager = srv6pm_manager.SRv6PMManager()
+    manager.StopExperiment(srv6pm_manager_pb2.SRv6PMExperimentRequest(
+        measure_id=7,
+        sender=srv6pm_manager_pb2.Node(address='fcff:1::1', port=12345),
+        reflector=srv6pm_manager_pb2.Node(address='fcff:2::1', port=12345)),
+        None)
+    assert analytics.get_session_metrics(7) is None
+    assert analytics.get_session_metrics(8) is not None
@@ -0,0 +1,125 @@
+#!/usr/bin/python
+
+import threading
+import time
+
+from controller import srv6_pm_scheduler
+
+
+class FakeChannel:
+
+    def __init__(self, address, port):
+        self.address = address
+        self.port = port
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def fake_channel_factory(address, port, secure=False, certificate=None):
+    return FakeChannel(address, port)
+
+
+def make_result(measure_id, interval):
+    return {
+        'measure_id': measure_id,
+        'interval': interval,
+        'timestamp': str(interval),
+        'fw_color': 0,
+        'rv_color': 0,
+        'sender_seq_num': interval,
+        'reflector_seq_num': interval,
+        'sender_tx_counter': 100,
+        'sender_rx_counter': 100,
+        'reflector_tx_counter': 100,
+        'reflector_rx_counter': 100,
+    }
+
+
+def test_concurrent_polling_and_store():
+    # The fake poll function blocks until all the sessions are being
+    # polled, so the test fails if the sessions are polled sequentially
+    sessions = 4
+    barrier = threading.Barrier(sessions, timeout=5)
+    calls = list()
+
+    def poll_func(sender_channel, reflector_channel, send_refl_sidlist,
+                  refl_send_sidlist):
+        barrier.wait()
+        measure_id = int(send_refl_sidlist[0].split('::')[1])
+        calls.append((sender_channel, reflector_channel))
+        return [make_result(measure_id, interval) for interval in (1, 2, 3)]
+
+    pool = srv6_pm_scheduler.ChannelPool(
+        channel_factory=fake_channel_factory)
+    scheduler = srv6_pm_scheduler.PMScheduler(
+        poll_interval=10, jitter=0.1, max_workers=sessions,
+        channel_pool=pool, poll_func=poll_func)
+    for measure_id in range(sessions):
+        scheduler.register(
+            measure_id=measure_id,
+            sender_address='fcff:1::1', sender_port=12345,
+            reflector_address='fcff:%d::1' % (measure_id % 2 + 2),
+            reflector_port=12345,
+            send_refl_sidlist=['fcff::%d' % measure_id],
+            refl_send_sidlist=['fcff::1'])
+    # The first poll is scheduled within a polling interval, the next ones
+    # every 10s +/- 10%
+    now = time.monotonic() + 10
+    assert scheduler.poll(now=now) == sessions
+    assert scheduler.poll(now=now + 10 * 0.89) == 0
+    assert scheduler.poll(now=now + 10 * 1.11) == sessions
+    # Channels to the same node are shared by the sessions
+    assert len(pool) == 3
+    assert len({id(sender) for sender, _ in calls}) == 1
+    # Results are stored once per interval
+    assert len(calls) == 2 * sessions
+    assert [result['interval'] for result in scheduler.get_results(2)] == \
+        [1, 2, 3]
+    assert [result['interval']
+            for result in scheduler.get_results(2, since_interval=1)] == \
+        [2, 3]
+    scheduler.unregister(2)
+    assert scheduler.get_session(2) is None
+    assert len(scheduler.get_results(2)) == 3
+    scheduler.stop()
+    assert len(pool) == 0
+
+
+def test_result_store_capacity():
+    store = srv6_pm_scheduler.ResultStore(max_results=2)
+    assert store.add(1, [make_result(1, 1), make_result(1, 2)]) == 2
+    assert store.add(1, [make_result(1, 2), make_result(1, 3)]) == 1
+    assert [result['interval'] for result in store.get(1)] == [2, 3]
+    assert store.get(2) == []
+
+
+def test_unexpected_errors_do_not_stop_polling():
+    calls = list()
+
+    def poll_func(sender_channel, reflector_channel, send_refl_sidlist,
+                  refl_send_sidlist):
+        calls.append(send_refl_sidlist)
+        raise KeyError('sender_seq_num')
+
+    scheduler = srv6_pm_scheduler.PMScheduler(
+        poll_interval=0.01, jitter=0, max_workers=1,
+        channel_pool=srv6_pm_scheduler.ChannelPool(
+            channel_factory=fake_channel_factory),
+        poll_func=poll_func)
+    scheduler.register(
+        measure_id=1, sender_address='fcff:1::1', sender_port=12345,
+        reflector_address='fcff:2::1', reflector_port=12345,
+        send_refl_sidlist=['fcff::1'], refl_send_sidlist=['fcff::2'])
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(calls) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The session is polled again and the errors are counted
+        assert len(calls) >= 3
+        assert scheduler._thread.is_alive()
+        assert scheduler.get_session(1).errors >= 2
+    finally:
+        scheduler.stop()
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+
+import pytest
+
+from controller import srv6_pm_serializers
+
+TWAMP_RECORD = {
+    'measure_id': 1,
+    'interval': 10,
+    'timestamp': '1600000000.123',
+    'fw_color': 1,
+    'rv_color': 0,
+    'sender_seq_num': 120,
+    'reflector_seq_num': 120,
+    'sender_tx_counter': 123456,
+    'sender_rx_counter': 123450,
+    'reflector_tx_counter': 123455,
+    'reflector_rx_counter': 123451,
+}
+
+IPERF_RECORD = {
+    'from': 'client',
+    'measure_id': 1,
+    'generator_id': 2,
+    'interval': '0.00-1.00',
+    'transfer': 1.5,
+    'transfer_dim': 'MBytes',
+    'bitrate': 12.5,
+    'bitrate_dim': 'Mbits/sec',
+    'retr': 3,
+    'cwnd': 64.0,
+    'cwnd_dim': 'KBytes',
+}
+
+
+@pytest.mark.parametrize('name', ['json', 'protobuf', 'struct'])
+def test_round_trip(name):
+    serializer = srv6_pm_serializers.get_serializer(name)
+    assert serializer.deserialize_twamp(
+        serializer.serialize_twamp(TWAMP_RECORD)) == TWAMP_RECORD
+    assert serializer.deserialize_iperf(
+        serializer.serialize_iperf(IPERF_RECORD)) == IPERF_RECORD
+
+
+@pytest.mark.parametrize('name', ['protobuf', 'struct'])
+def test_binary_formats_are_smaller(name):
+    serializer = srv6_pm_serializers.get_serializer(name)
+    json_size = len(srv6_pm_serializers.get_serializer(
+        'json').serialize_twamp(TWAMP_RECORD))
+    assert len(serializer.serialize_twamp(TWAMP_RECORD)) * 3 < json_size
+
+
+def test_schema_headers():
+    serializer = srv6_pm_serializers.get_serializer('struct')
+    assert srv6_pm_serializers.get_serializer_from_headers(
+        serializer.headers()) is serializer
+    # Records without headers are JSON
+    assert srv6_pm_serializers.get_serializer_from_headers(None).name == \
+        'json'
+    with pytest.raises(srv6_pm_serializers.SchemaError):
+        srv6_pm_serializers.get_serializer_from_headers(
+            [('schema', b'struct/99')])
+
+
+def test_struct_long_strings():
+    serializer = srv6_pm_serializers.get_serializer('struct')
+    record = dict(TWAMP_RECORD, timestamp='\u00e8' * 300)
+    assert serializer.deserialize_twamp(
+        serializer.serialize_twamp(record)) == record
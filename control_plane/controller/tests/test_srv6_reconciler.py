@@ -0,0 +1,179 @@
+#!/usr/bin/python
+
+import functools
+
+import pytest
+
+from controller import fake_nodes, srv6_reconciler, srv6_usid
+
+
+@pytest.fixture
+def fleet():
+    with fake_nodes.FakeNodeFleet(3) as _fleet:
+        yield _fleet
+
+
+def path(node, destination, segments, **kwargs):
+    doc = {'grpc_address': node.address, 'grpc_port': node.port,
+           'destination': destination, 'segments': segments,
+           'device': None, 'encapmode': None, 'table': None, 'metric': None,
+           'bsid_addr': None, 'fwd_engine': 'linux'}
+    doc.update(kwargs)
+    return (srv6_reconciler.PATH, doc)
+
+
+def behavior(node, segment, action, **kwargs):
+    doc = {'grpc_address': node.address, 'grpc_port': node.port,
+           'segment': segment, 'action': action, 'device': None,
+           'table': None, 'nexthop': None, 'lookup_table': None,
+           'interface': None, 'segments': None, 'metric': None,
+           'fwd_engine': 'linux'}
+    doc.update(kwargs)
+    return (srv6_reconciler.BEHAVIOR, doc)
+
+
+def test_canonical_forms():
+    intent = srv6_reconciler.Intent(*path(
+        fake_nodes.FakeNode('node1'), 'fd00:0::1', ['fcff:0002::100']))
+    assert intent.key == ('path', 'fd00::1/128', 254)
+    assert intent.fields == ('segments', 'encapmode')
+    # Values not specified in the database are not compared
+    assert intent.matches(srv6_reconciler.canonical_path({
+        'destination': 'fd00::1/128', 'segments': ['fcff:2::100'],
+        'encapmode': 'encap', 'device': 'eth0', 'table': 254,
+        'metric': 1024}))
+    assert not intent.matches(srv6_reconciler.canonical_path({
+        'destination': 'fd00::1/128', 'segments': ['fcff:3::100'],
+        'encapmode': 'encap', 'table': 254}))
+
+
+def test_fingerprint():
+    node = fake_nodes.FakeNode('node1')
+    paths = [srv6_reconciler.Intent(*path(node, 'fd00:%d::/64' % i,
+                                          ['fcff:%d::100' % i]))
+             for i in range(1, 4)]
+    entities = [(intent.kind, intent.canonical) for intent in paths]
+    # The fingerprint does not depend on the order of the entities
+    assert srv6_reconciler.fingerprint(entities) == \
+        srv6_reconciler.fingerprint(entities[::-1])
+    assert srv6_reconciler.fingerprint(entities) != \
+        srv6_reconciler.fingerprint(entities[1:])
+
+
+def test_reconcile(fleet):
+    node1, node2 = fleet.nodes[:2]
+    intents = [
+        path(node1, 'fd00:1::/64', ['fcff:2::100']),
+        path(node1, 'fd00:2::/64', ['fcff:3::100']),
+        behavior(node2, 'fcff:2::100', 'End.DT6', lookup_table=254)
+    ]
+    reconciler = srv6_reconciler.Reconciler(lambda: intents, rate=0)
+    try:
+        reports = reconciler.reconcile_once()
+        assert len(reports) == 2
+        assert sum(report.corrections['add'] for report in reports) == 3
+        assert len(node1.state.paths) == 2
+        assert len(node2.state.behaviors) == 1
+        # The nodes are in sync: only the fingerprints are retrieved
+        rpcs = fleet.rpcs()
+        reports = reconciler.reconcile_once()
+        assert all(report.in_sync and report.fingerprint_match
+                   for report in reports)
+        assert fleet.rpcs() == rpcs + 2
+        # Drift: a path is removed and a behavior is changed on the nodes
+        del node1.state.paths[('fd00:2::/64', -1)]
+        node2.state.behaviors[('fcff:2::100', -1)].lookup_table = 100
+        reports = reconciler.reconcile_once()
+        assert not any(report.fingerprint_match for report in reports)
+        assert sum(report.corrections['add'] for report in reports) == 1
+        assert sum(report.corrections['change'] for report in reports) == 1
+        assert len(node1.state.paths) == 2
+        assert node2.state.behaviors[('fcff:2::100', -1)].lookup_table == 254
+    finally:
+        reconciler.stop()
+
+
+def test_prune_and_dry_run(fleet):
+    node = fleet.nodes[0]
+    intents = [path(node, 'fd00:1::/64', ['fcff:2::100'])]
+    reconciler = srv6_reconciler.Reconciler(lambda: intents, rate=0,
+                                            prune=True, dry_run=True)
+    try:
+        reconciler.reconcile_once()
+        # Dry run: the drift is reported but not corrected
+        assert not node.state.paths
+        reconciler.dry_run = False
+        reconciler.reconcile_once()
+        # A path not in the database is removed
+        intents.append(path(node, 'fd00:2::/64', ['fcff:3::100']))
+        reconciler.reconcile_once()
+        intents.pop()
+        reports = reconciler.reconcile_once()
+        assert reports[0].corrections == {'add': 0, 'change': 0, 'del': 1}
+        assert list(node.state.paths) == [('fd00:1::/64', -1)]
+    finally:
+        reconciler.stop()
+
+
+def test_prune_known_nodes(fleet):
+    node1, node2 = fleet.nodes[:2]
+    intents = [path(node1, 'fd00:1::/64', ['fcff:2::100']),
+               path(node2, 'fd00:2::/64', ['fcff:3::100'])]
+    reconciler = srv6_reconciler.Reconciler(lambda: intents, rate=0)
+    try:
+        reconciler.reconcile_once()
+        # node2 has no more entities in the database
+        intents.pop()
+        reconciler.prune = True
+        reconciler.reconcile_once()
+        assert list(node2.state.paths) == [('fd00:2::/64', -1)]
+        # Nodes known from the nodes configuration are pruned too
+        reconciler.node_loader = functools.partial(
+            srv6_reconciler.load_nodes, fleet.nodes_config())
+        reports = reconciler.reconcile_once()
+        assert len(reports) == 3
+        assert not node2.state.paths
+        assert list(node1.state.paths) == [('fd00:1::/64', -1)]
+        # Without prune, the nodes without entities are not reconciled
+        reconciler.prune = False
+        assert len(reconciler.reconcile_once()) == 1
+    finally:
+        reconciler.stop()
+
+
+def test_usid_policy(fleet):
+    policy = {'lr_dst': 'fd00:3::/64', 'rl_dst': 'fd00:1::/64',
+              'lr_nodes': ['node1', 'node2', 'node3'], 'rl_nodes': None}
+    intents = [(srv6_reconciler.PATH, doc) for doc in
+               srv6_usid.usid_policy_to_paths(policy, fleet.nodes_config())]
+    reconciler = srv6_reconciler.Reconciler(lambda: intents, rate=0)
+    try:
+        reconciler.reconcile_once()
+        reference = fake_nodes.FakeNodeFleet(3)
+        # The paths are the same configured by handle_srv6_usid_policy()
+        with reference:
+            srv6_usid.handle_srv6_usid_policy(
+                operation='add', lr_destination='fd00:3::/64',
+                rl_destination='fd00:1::/64',
+                nodes_lr=['node1', 'node2', 'node3'], persistency=False,
+                nodes_config=reference.nodes_config())
+            for node, ref_node in zip(fleet.nodes, reference.nodes):
+                assert [(p.destination, [s.segment for s in p.sr_path])
+                        for p in node.state.paths.values()] == \
+                    [(p.destination, [s.segment for s in p.sr_path])
+                     for p in ref_node.state.paths.values()]
+        assert all(report.in_sync for report in reconciler.reconcile_once())
+    finally:
+        reconciler.stop()
+
+
+def test_unreachable_node(fleet):
+    node = fleet.nodes[0]
+    node.stop()
+    reconciler = srv6_reconciler.Reconciler(
+        lambda: [path(node, 'fd00:1::/64', ['fcff:2::100'])], rate=0)
+    try:
+        reports = reconciler.reconcile_once()
+        assert reports[0].error == 'UNAVAILABLE'
+    finally:
+        reconciler.stop()
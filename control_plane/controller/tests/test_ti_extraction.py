@@ -0,0 +1,68 @@
+#!/usr/bin/python
+
+from controller import fake_isisd, ti_extraction
+
+
+class RecordingISISD:
+    """
+    Execute the isisd commands on a fake database, without telnet, and
+    record them.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.commands = list()
+
+    def __call__(self, router, port, password, commands):
+        self.commands += commands
+        return '\n'.join(self.database.execute(command)
+                         for command in commands)
+
+
+def test_generate_topology():
+    assert len(fake_isisd.ring_topology(10)[1]) == 10
+    nodes, links = fake_isisd.grid_topology(4)
+    assert len(nodes) == 16 and len(links) == 24
+    nodes, links = fake_isisd.fat_tree_topology(4)
+    assert len(nodes) == 20 and len(links) == 32
+
+
+def test_extract_topology_over_telnet():
+    database = fake_isisd.FakeISISDatabase.from_topology('ring', 4)
+    with fake_isisd.FakeISISDServer(database, port=0) as server:
+        nodes, edges, node_to_systemid = \
+            ti_extraction.connect_and_extract_topology_isis([server.ip_port])
+    assert nodes == {'r1', 'r2', 'r3', 'r4'}
+    assert node_to_systemid['r3'] == '0000.0000.0003'
+    assert edges == {('r1', 'r2', 'fcf0:0:1::/64'),
+                     ('r2', 'r3', 'fcf0:0:2::/64'),
+                     ('r3', 'r4', 'fcf0:0:3::/64'),
+                     ('r1', 'r4', 'fcf0:0:4::/64')}
+
+
+def test_watcher_change_detection(monkeypatch):
+    database = fake_isisd.FakeISISDatabase.from_topology('ring', 10)
+    isisd = RecordingISISD(database)
+    monkeypatch.setattr(ti_extraction, 'isisd_command', isisd)
+    watcher = ti_extraction.ISISTopologyWatcher(['fcff:1::1-2608'])
+    changed, nodes, edges, _ = watcher.poll()
+    assert changed and len(nodes) == 10 and len(edges) == 10
+    # Unchanged database: only the summary is retrieved
+    del isisd.commands[:]
+    changed, _, _, _ = watcher.poll()
+    assert not changed
+    assert isisd.commands == ['show isis database']
+    # A link goes down: only the two LSPs that changed are retrieved
+    database.set_link_state('r3', 'r4', up=False)
+    del isisd.commands[:]
+    changed, nodes, edges, _ = watcher.poll()
+    assert changed
+    assert isisd.commands == ['show isis database',
+                              'show isis database detail r3.00-00',
+                              'show isis database detail r4.00-00']
+    assert watcher.partial_extractions == 1
+    # The incremental topology matches a full extraction
+    assert (nodes, edges) == \
+        ti_extraction.connect_and_extract_topology_isis(
+            ['fcff:1::1-2608'])[:2]
+    assert ('r3', 'r4', 'fcf0:0:3::/64') not in edges
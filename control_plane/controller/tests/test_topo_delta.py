@@ -0,0 +1,66 @@
+#!/usr/bin/python
+
+from controller import topo_delta
+
+
+def make_topology(routers, links, ip_addresses=None):
+    ip_addresses = ip_addresses or dict()
+    nodes = [{'_key': router, 'type': 'router',
+              'ext_reachability': router,
+              'ip_address': ip_addresses.get(router)}
+             for router in routers]
+    edges = [{'_key': '%s-%s' % (src, dst), '_from': 'nodes/%s' % src,
+              '_to': 'nodes/%s' % dst, 'type': 'core'}
+             for src, dst in links]
+    return nodes, edges
+
+
+def test_topology_log_deltas():
+    log = topo_delta.TopologyLog()
+    seq, delta = log.update(*make_topology(['r1', 'r2'], [('r1', 'r2')]))
+    assert seq == 1
+    assert len(delta.added_nodes) == 2 and len(delta.added_edges) == 1
+    # An unchanged topology produces no update
+    assert log.update(*make_topology(['r1', 'r2'], [('r1', 'r2')])) is None
+    # r3 added, r2 changed, link r1-r2 removed
+    seq, delta = log.update(*make_topology(
+        ['r1', 'r2', 'r3'], [('r2', 'r3')], {'r2': 'fcff:2::1'}))
+    assert seq == 2
+    assert [node['_key'] for node in delta.added_nodes] == ['r3']
+    assert [node['_key'] for node in delta.changed_nodes] == ['r2']
+    assert delta.removed_edges == ['r1-r2']
+    assert [edge['_key'] for edge in delta.added_edges] == ['r2-r3']
+    # Resume
+    assert log.deltas_since(2) == []
+    assert [_seq for _seq, _ in log.deltas_since(1)] == [2]
+    # Unknown sequence numbers require a snapshot
+    assert log.deltas_since(0) is None
+    assert log.deltas_since(3) is None
+    # Sequence numbers of another log require a snapshot
+    assert log.deltas_since(1, epoch=log.epoch) is not None
+    assert log.deltas_since(1, epoch=topo_delta.TopologyLog().epoch) is None
+
+
+def test_topology_log_replay():
+    log = topo_delta.TopologyLog(max_deltas=2)
+    versions = [
+        make_topology(['r1'], []),
+        make_topology(['r1', 'r2'], [('r1', 'r2')]),
+        make_topology(['r2', 'r3'], [('r2', 'r3')]),
+    ]
+    for nodes, edges in versions:
+        log.update(nodes, edges)
+    # Rebuild the last version from the first one applying the deltas
+    nodes = topo_delta.index_by_key(versions[0][0])
+    edges = topo_delta.index_by_key(versions[0][1])
+    for _, delta in log.deltas_since(1):
+        topo_delta.apply_delta(nodes, edges, delta)
+    seq, snapshot_nodes, snapshot_edges = log.snapshot()
+    assert seq == 3
+    assert nodes == topo_delta.index_by_key(snapshot_nodes)
+    assert edges == topo_delta.index_by_key(snapshot_edges)
+    # The first delta has been discarded from the log
+    assert log.deltas_since(0) is None
+    assert len(log.deltas_since(1)) == 2
+    log.update(*make_topology(['r3'], []))
+    assert log.deltas_since(1) is None
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+
+import queue
+
+import grpc
+import pytest
+import topology_manager_pb2
+
+from controller import arangodb_utils, topo_model, topo_service
+from controller.nb_grpc_server import topo_manager
+
+
+class AbortError(Exception):
+    pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.code = None
+
+    def add_callback(self, callback):
+        pass
+
+    def abort(self, code, details):
+        self.code = code
+        raise AbortError(details)
+
+
+def request(**kwargs):
+    _request = topology_manager_pb2.TopologyManagerRequest(
+        protocol=topo_manager.RoutingProtocol.ISIS.value, period=60, **kwargs)
+    _request.nodes.add(address='fcff:1::1', port=2608)
+    return _request
+
+
+def test_topology_feed_key():
+    nodes = ['fcff:1::1-2608', 'fcff:2::1-2608']
+    key = topo_manager.topology_feed_key(request(password='zebra'), nodes)
+    assert key == topo_manager.topology_feed_key(request(password='zebra'),
+                                                 nodes[::-1])
+    # The password is not kept in clear
+    assert 'zebra' not in repr(key)
+    # Streams with different parameters do not share the feed
+    for other in (
+            topo_manager.topology_feed_key(request(password='other'),
+                                           nodes),
+            topo_manager.topology_feed_key(request(password='zebra',
+                                                   verbose=True), nodes),
+            topo_manager.topology_feed_key(
+                request(password='zebra'), nodes,
+                addrs_config=[{'node': 'r1', 'ip_address': 'fd00::1'}])):
+        assert other != key
+    _request = request(password='zebra')
+    _request.period = 1
+    assert topo_manager.topology_feed_key(_request, nodes) != key
+
+
+def test_slow_subscriber_aborted(monkeypatch):
+    topologies = queue.Queue()
+    for index in range(1, 6):
+        topologies.put(([topo_model.TopologyNode('r%d' % router, 'router')
+                         for router in range(index)], []))
+    topologies.put(None)
+
+    def fake_stream(**kwargs):
+        while True:
+            topology = topologies.get(timeout=5)
+            if topology is None:
+                return
+            yield topology
+    monkeypatch.setenv('ENABLE_PERSISTENCY', 'true')
+    monkeypatch.setattr(
+        arangodb_utils, 'extract_topo_from_isis_and_load_on_arango_stream',
+        fake_stream)
+    manager = topo_manager.TopologyManager()
+    manager.topology_service = topo_service.TopologyService(
+        queue_size=1, snapshot_encoder=topo_manager.snapshot_to_grpc,
+        delta_encoder=topo_manager.delta_to_grpc)
+    context = FakeContext()
+    responses = manager.ExtractAndLoadTopology(request(), context)
+    first = next(responses)
+    assert first.seq == 1
+    for feed in list(manager.topology_service.feeds.values()):
+        feed.join(timeout=5)
+    # The subscriber did not consume the updates and has been dropped: the
+    # client is told to resume from the last update received
+    with pytest.raises(AbortError, match=first.epoch):
+        list(responses)
+    assert context.code == grpc.StatusCode.RESOURCE_EXHAUSTED
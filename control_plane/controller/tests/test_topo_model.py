@@ -0,0 +1,137 @@
+#!/usr/bin/python
+
+import pytest
+import topology_manager_pb2
+
+from controller import arangodb_utils, fake_isisd, ti_extraction
+from controller import topo_delta, topo_model
+from controller.nb_grpc_server import topo_manager
+
+
+def extract(topology, size):
+    database = fake_isisd.FakeISISDatabase.from_topology(topology, size)
+    system_id_to_hostname, hostname_to_system_id = \
+        ti_extraction.parse_isis_hostnames(
+            database.execute('show isis hostname'))
+    lsps = ti_extraction.parse_isis_database(
+        database.execute('show isis database detail'))
+    return ti_extraction.build_topology_isis(
+        system_id_to_hostname, hostname_to_system_id, lsps)
+
+
+def test_build_topology():
+    nodes, edges, node_to_systemid = extract('ring', 4)
+    _nodes, _edges = topo_model.build_topology(nodes, edges,
+                                               node_to_systemid)
+    # The documents are the ones exported by dump_topo_yaml
+    assert [node.to_doc() for node in _nodes] == [
+        {'_key': node, 'type': 'router', 'ip_address': None,
+         'ext_reachability': node_to_systemid[node]} for node in nodes]
+    docs = {edge['_key']: edge.to_doc() for edge in _edges}
+    assert docs['fcf0:0:1::-64-dir1'] == {
+        '_key': 'fcf0:0:1::-64-dir1', '_from': 'nodes/r1',
+        '_to': 'nodes/r2', 'type': 'core'}
+    assert docs['fcf0:0:1::-64-dir2']['_from'] == 'nodes/r2'
+    # The edges share the names of the nodes
+    names = {node.key: node.key for node in _nodes}
+    assert all(edge.source is names[edge.source] for edge in _edges)
+    # Links without IPv6 addresses are identified by the nodes
+    _, _edges = topo_model.build_topology(
+        {'r1', 'r2'}, {('r1', 'r2', None)}, {'r1': '1', 'r2': '2'})
+    assert [edge.key for edge in _edges] == ['r1-r2-dir1', 'r1-r2-dir2']
+
+
+def test_enrichment():
+    nodes, edges = topo_model.build_topology(
+        ['r1', 'r2'], [('r1', 'r2', 'fcf0::/64')], {'r1': '1', 'r2': '2'})
+    arangodb_utils.fill_ip_addresses_from_list(
+        nodes, [{'node': 'r1', 'ip_address': 'fcff:1::1'},
+                {'node': 'r2', 'ip_address': 'fcff:2::1'}])
+    arangodb_utils.add_hosts_from_list(
+        nodes, edges, [{'name': 'h1', 'ip_address': 'fd00:1::2/64',
+                        'gw': 'r1'}])
+    assert nodes[1]['ip_address'] == 'fcff:2::1'
+    assert nodes[2].to_doc() == {'_key': 'h1', 'type': 'host',
+                                 'ip_address': 'fd00:1::2/64'}
+    assert [edge.to_doc() for edge in edges[2:]] == [
+        {'_key': 'fd00:1::-64-dir1', '_from': 'nodes/h1', '_to': 'nodes/r1',
+         'type': 'edge'},
+        {'_key': 'fd00:1::-64-dir2', '_from': 'nodes/r1', '_to': 'nodes/h1',
+         'type': 'edge'}]
+
+
+def test_topology_log_and_grpc():
+    log = topo_delta.TopologyLog()
+    nodes, edges, node_to_systemid = extract('grid', 3)
+    log.update(*topo_model.build_topology(nodes, edges, node_to_systemid))
+    _nodes, _edges = topo_model.build_topology(nodes, edges,
+                                               node_to_systemid)
+    assert log.update(_nodes, _edges) is None
+    _nodes[0].ip_address = 'fcff:1::1'
+    seq, delta = log.update(_nodes, _edges)
+    assert delta.changed_nodes == [_nodes[0]]
+    # gRPC serialization
+    reply = topo_manager.delta_to_grpc(seq, delta, epoch=log.epoch)
+    assert reply.delta.changed_nodes[0].ip_address == 'fcff:1::1'
+    assert reply.epoch == log.epoch
+    reply = topo_manager.snapshot_to_grpc(*log.snapshot())
+    assert len(reply.topology.nodes) == 9
+    assert len(reply.topology.links) == 24
+    link = reply.topology.links[0]
+    assert link.source.startswith('nodes/')
+    assert link.type == topology_manager_pb2.CORE
+
+
+def test_enrichment_from_yaml(tmp_path):
+    # The files are read and written by the DB update modules
+    pytest.importorskip('db_update')
+    nodes, edges = topo_model.build_topology(
+        ['r1', 'r2'], [('r1', 'r2', 'fcf0::/64')], {'r1': '1', 'r2': '2'})
+    addrs_yaml = tmp_path / 'addrs.yaml'
+    addrs_yaml.write_text('- {node: r1, ip_address: "fcff:1::1"}\n'
+                          '- {node: r9, ip_address: "fcff:9::1"}\n')
+    hosts_yaml = tmp_path / 'hosts.yaml'
+    hosts_yaml.write_text('- &h1 {name: h1, ip_address: "fd00:1::2/64", '
+                          'gw: r1}\n'
+                          '- *h1\n'
+                          '- {name: h2, ip_address: "fd00:2::2/64", '
+                          'gw: r9}\n'
+                          '- {name: h3, ip_address: "fd00:3::2/64", '
+                          'gw: r2}\n')
+    nodes_index = arangodb_utils.index_nodes(nodes)
+    arangodb_utils.fill_ip_addresses(nodes, str(addrs_yaml), nodes_index)
+    arangodb_utils.add_hosts(nodes, edges, str(hosts_yaml), nodes_index)
+    # Unknown nodes are skipped and the nodes without address keep None
+    assert [node.ip_address for node in nodes[:2]] == ['fcff:1::1', None]
+    # Duplicate hosts and hosts with an unknown gateway are skipped
+    assert [node.key for node in nodes[2:]] == ['h1', 'h3']
+    assert len(edges) == 6
+    assert nodes_index['h3'] is nodes[3]
+    # Empty files
+    empty_yaml = tmp_path / 'empty.yaml'
+    empty_yaml.write_text('')
+    assert list(arangodb_utils.iter_dump(str(empty_yaml))) == []
+    # Files not containing a list
+    hosts_yaml.write_text('name: h1\n')
+    with pytest.raises(ValueError):
+        list(arangodb_utils.iter_dump(str(hosts_yaml)))
+
+
+def test_topology_dumps(tmp_path):
+    # The files are read and written by the DB update modules
+    pytest.importorskip('db_update')
+    nodes, edges = topo_model.build_topology(
+        ['r1', 'r2'], [('r1', 'r2', 'fcf0::/64')], {'r1': '1', 'r2': '2'})
+    docs = [edge.to_doc() for edge in edges]
+    # JSON lines and YAML files are read one item at a time
+    for name in ('edges.jsonl', 'edges.yaml'):
+        filename = str(tmp_path / name)
+        arangodb_utils.save_dump(topo_model.iter_docs(edges), filename)
+        assert list(arangodb_utils.iter_dump(filename)) == docs
+    assert arangodb_utils.load_yaml_dump(filename) == docs
+    # The JSON lines files can be used for the enrichment
+    hosts_jsonl = tmp_path / 'hosts.jsonl'
+    hosts_jsonl.write_text('{"name": "h1", "ip_address": "fd00:1::2/64", '
+                           '"gw": "r2"}\n\n')
+    arangodb_utils.add_hosts(nodes, edges, str(hosts_jsonl))
+    assert nodes[-1].key == 'h1'
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+
+import queue
+
+from controller import topo_service
+
+
+def make_topology(routers):
+    nodes = [{'_key': router, 'type': 'router'} for router in routers]
+    edges = [{'_key': '%s-%s' % (src, dst), '_from': src, '_to': dst,
+              'type': 'core'} for src, dst in zip(routers, routers[1:])]
+    return nodes, edges
+
+
+class FakeStream:
+    """
+    Extraction loop returning the topologies pushed by the test.
+    """
+
+    def __init__(self):
+        self.topologies = queue.Queue()
+        self.started = 0
+
+    def __call__(self):
+        self.started += 1
+        while True:
+            topology = self.topologies.get(timeout=5)
+            if topology is None:
+                return
+            yield topology
+
+
+def kinds(updates):
+    return [(update[0], update[1]) for update in updates]
+
+
+def test_fan_out():
+    service = topo_service.TopologyService(queue_size=8)
+    stream = FakeStream()
+    sub1 = service.subscribe('domain', stream)
+    sub2 = service.subscribe('domain', stream)
+    for routers in (['r1', 'r2'], ['r1', 'r2'], ['r1', 'r2', 'r3']):
+        stream.topologies.put(make_topology(routers))
+    stream.topologies.put(None)
+    service.feeds['domain'].join(timeout=5)
+    # A single extraction loop, the unchanged cycle is not sent
+    assert stream.started == 1
+    assert kinds(sub1) == [('snapshot', 1), ('delta', 2)]
+    assert kinds(sub2) == [('snapshot', 1), ('delta', 2)]
+    # The feed is removed when the loop ends
+    assert 'domain' not in service.feeds
+
+
+def test_slow_subscriber_dropped_and_resume():
+    service = topo_service.TopologyService(queue_size=2)
+    stream = FakeStream()
+    slow = service.subscribe('domain', stream)
+    fast = service.subscribe('domain', stream)
+    routers = ['r0']
+    for i in range(1, 4):
+        routers = routers + ['r%d' % i]
+        stream.topologies.put(make_topology(routers))
+        update = fast.get(timeout=5)
+        assert update[1] == i
+    # The slow subscriber did not consume its updates and has been dropped
+    assert slow.dropped
+    assert kinds(slow) == [('snapshot', 1), ('delta', 2)]
+    # Resume from the last update received
+    resumed = service.subscribe('domain', stream, resume_from_seq=2,
+                                resume_epoch=slow.epoch)
+    assert kinds([resumed.get(timeout=5)]) == [('delta', 3)]
+    # Sequence numbers without the epoch of the feed require a snapshot
+    unknown = service.subscribe('domain', stream, resume_from_seq=2)
+    assert kinds([unknown.get(timeout=5)]) == [('snapshot', 3)]
+    unknown.close()
+    fast.close()
+    resumed.close()
+    stream.topologies.put(None)
+    assert stream.started == 1
+
+
+def test_resume_on_new_feed():
+    service = topo_service.TopologyService(queue_size=8)
+    stream = FakeStream()
+    first = service.subscribe('domain', stream)
+    stream.topologies.put(make_topology(['r1']))
+    stream.topologies.put(make_topology(['r1', 'r2']))
+    assert kinds([first.get(timeout=5), first.get(timeout=5)]) == \
+        [('snapshot', 1), ('delta', 2)]
+    epoch = first.epoch
+    # The last subscriber leaves, the feed ends
+    first.close()
+    stream.topologies.put(make_topology(['r1', 'r2']))
+    service.feeds['domain'].join(timeout=5)
+    assert 'domain' not in service.feeds
+    # A new feed has a new epoch: resuming from the sequence number of the
+    # old feed returns a snapshot, not the deltas of an unrelated log
+    stream = FakeStream()
+    resumed = service.subscribe('domain', stream, resume_from_seq=1,
+                                resume_epoch=epoch)
+    assert resumed.epoch != epoch
+    for routers in (['r3'], ['r3', 'r4']):
+        stream.topologies.put(make_topology(routers))
+    assert kinds([resumed.get(timeout=5), resumed.get(timeout=5)]) == \
+        [('snapshot', 1), ('delta', 2)]
+    resumed.close()
+    stream.topologies.put(None)
+
+
+def test_subscribe_while_stopping():
+    service = topo_service.TopologyService(queue_size=8)
+    stream = FakeStream()
+    first = service.subscribe('domain', stream)
+    feed = service.feeds['domain']
+    late = topo_service.TopologySubscription(queue_size=8)
+
+    class RacingEvent(type(feed._stop_event)):
+        # A subscriber arrives right after the loop has seen the stop event
+        def is_set(self):
+            is_set = super().is_set()
+            if is_set and late.feed is None:
+                assert feed.subscribe(late)
+            return is_set
+
+    feed._stop_event = RacingEvent()
+    stream.topologies.put(make_topology(['r1']))
+    assert kinds([first.get(timeout=5)]) == [('snapshot', 1)]
+    # The last subscriber leaves
+    first.close()
+    stream.topologies.put(make_topology(['r1', 'r2']))
+    stream.topologies.put(make_topology(['r1', 'r2', 'r3']))
+    # The loop keeps running for the late subscriber
+    assert kinds([late.get(timeout=5), late.get(timeout=5)]) == \
+        [('snapshot', 2), ('delta', 3)]
+    late.close()
+    stream.topologies.put(make_topology(['r1']))
+    feed.join(timeout=5)
+    assert feed.stopped and late.error is None
+    assert stream.started == 1
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+import os
+from concurrent import futures
+
+import grpc
+import pytest
+
+import srv6_manager_pb2_grpc
+import telemetry.tracing
+from controller import fake_nodes, srv6_utils, tracing
+
+
+@pytest.fixture
+def traces(monkeypatch, tmp_path):
+    monkeypatch.setattr(telemetry.tracing, 'ENABLE_TRACING', True)
+    monkeypatch.setattr(telemetry.tracing, 'ENABLE_PROFILING', True)
+    monkeypatch.setattr(telemetry.tracing, 'PROFILING_DIR', str(tmp_path))
+    exported = list()
+    monkeypatch.setattr(telemetry.tracing, 'EXPORTERS', [exported.append])
+    return exported
+
+
+@pytest.fixture
+def node():
+    # Node continuing the traces received from the controller
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4),
+                         interceptors=[tracing.ServerTracingInterceptor()])
+    srv6_manager_pb2_grpc.add_SRv6ManagerServicer_to_server(
+        fake_nodes.FakeSRv6Manager(fake_nodes.FakeNodeState()), server)
+    port = server.add_insecure_port('[::1]:0')
+    server.start()
+    yield port
+    server.stop(None)
+
+
+def test_trace_propagation(traces, node):
+    with telemetry.tracing.span('northbound') as root:
+        srv6_utils.handle_srv6_path(
+            operation='add', grpc_address='::1', grpc_port=node,
+            destination='fd00::/64', segments=['fcff:2::100'],
+            update_db=False)
+    # One trace exported by the node and one by the controller
+    assert len(traces) == 2
+    node_spans, controller_spans = traces
+    spans = {entry.name: entry for entry in controller_spans}
+    assert set(spans) == {'northbound', 'srv6_utils.handle_srv6_path',
+                          'srv6_utils.add_srv6_path', 'grpc.channel',
+                          '/srv6_manager.SRv6Manager/Create'}
+    client = spans['/srv6_manager.SRv6Manager/Create']
+    assert client.trace_id == root.trace_id
+    assert client.attributes['node'] == '[::1]:%d' % node
+    assert spans['srv6_utils.add_srv6_path'].parent_id == \
+        spans['srv6_utils.handle_srv6_path'].span_id
+    # The node continues the trace of the controller
+    assert len(node_spans) == 1
+    assert node_spans[0].trace_id == root.trace_id
+    assert node_spans[0].parent_id == client.span_id
+
+
+def test_not_sampled(traces, node, monkeypatch):
+    monkeypatch.setattr(telemetry.tracing, 'TRACING_SAMPLE_RATE', 0)
+    srv6_utils.handle_srv6_path(
+        operation='add', grpc_address='::1', grpc_port=node,
+        destination='fd00::/64', segments=['fcff:2::100'], update_db=False)
+    assert not traces
+
+
+def test_profiling_request(traces, node, tmp_path):
+    with telemetry.tracing.profiling('cprofile'):
+        srv6_utils.handle_srv6_path(
+            operation='add', grpc_address='::1', grpc_port=node,
+            destination='fd00::/64', segments=['fcff:2::100'],
+            update_db=False)
+    profiles = os.listdir(str(tmp_path))
+    assert len(profiles) == 1
+    assert profiles[0].endswith('srv6_manager.SRv6Manager_Create.prof')
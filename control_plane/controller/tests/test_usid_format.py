@@ -0,0 +1,97 @@
+#!/usr/bin/python
+
+import os
+import pytest
+from ipaddress import IPv6Address
+
+from controller import srv6_usid
+
+hypothesis = pytest.importorskip('hypothesis')
+st = pytest.importorskip('hypothesis.strategies')
+
+NODES_3_YAML = os.path.join(os.path.dirname(__file__), 'nodes_3.yml')
+
+
+@st.composite
+def usid_formats(draw):
+    locator_bits = draw(st.integers(min_value=0, max_value=120))
+    usid_id_bits = draw(st.integers(min_value=1,
+                                    max_value=128 - locator_bits))
+    return srv6_usid.get_usid_format(locator_bits, usid_id_bits)
+
+
+@st.composite
+def usid_format_and_ids(draw):
+    usid_format = draw(usid_formats())
+    locator = draw(st.integers(min_value=0, max_value=(1 << 128) - 1)) & \
+        usid_format.locator_mask
+    usid_ids = draw(st.lists(
+        st.integers(min_value=1, max_value=usid_format.usid_id_max),
+        max_size=usid_format.max_usids))
+    return usid_format, locator, usid_ids
+
+
+@hypothesis.given(usid_format_and_ids())
+def test_usid_format_round_trip(args):
+    usid_format, locator, usid_ids = args
+    usid = usid_format.encode(locator, usid_ids)
+    assert usid_format.decode(usid) == (locator, usid_ids)
+
+
+@hypothesis.given(usid_format_and_ids())
+def test_segments_to_micro_segment_round_trip(args):
+    usid_format, locator, usid_ids = args
+    segments = [str(IPv6Address(usid_format.usid_id_to_sid(usid_id, locator)))
+                for usid_id in usid_ids]
+    usid = srv6_usid.segments_to_micro_segment(
+        str(IPv6Address(locator)), segments,
+        locator_bits=usid_format.locator_bits,
+        usid_id_bits=usid_format.usid_id_bits)
+    assert usid_format.decode(int(IPv6Address(usid))) == (locator, usid_ids)
+
+
+@hypothesis.given(usid_format_and_ids())
+def test_sidlist_to_usidlist_round_trip(args):
+    usid_format, locator, usid_ids = args
+    hypothesis.assume(usid_format.max_usids > 1 and len(usid_ids) > 0)
+    sid_list = [str(IPv6Address(usid_format.usid_id_to_sid(usid_id, locator)))
+                for usid_id in usid_ids]
+    usid_list = srv6_usid.sidlist_to_usidlist(
+        sid_list, locator_bits=usid_format.locator_bits,
+        usid_id_bits=usid_format.usid_id_bits)
+    decoded = list()
+    for usid in usid_list:
+        _locator, _usid_ids = usid_format.decode(int(IPv6Address(usid)))
+        assert _locator == locator
+        # The last slot of each uSID is always left free
+        assert len(_usid_ids) < usid_format.max_usids
+        decoded += _usid_ids
+    assert decoded == usid_ids
+
+
+def test_usid_format_invalid():
+    with pytest.raises(srv6_usid.InvalidConfigurationError):
+        srv6_usid.get_usid_format(120, 16)
+    with pytest.raises(srv6_usid.InvalidConfigurationError):
+        srv6_usid.get_usid_format(32, 0)
+
+
+def test_locator_table_lookup():
+    locator_table = srv6_usid.read_locator_table(NODES_3_YAML)
+    assert locator_table.lookup('fcbb:bb00:1::').locator_bits == 32
+    assert locator_table.lookup('fcbb:bbbb:cc00:3::').locator_bits == 48
+    assert locator_table.lookup('fcbb:bbbb:cc00:3::').usid_id_bits == 16
+
+
+def test_nodes_to_micro_segments_multiple_formats():
+    # F3216 locator
+    assert srv6_usid.nodes_to_micro_segments(['R1', 'R2'], NODES_3_YAML) == \
+        [str(IPv6Address('fcbb:bb00:1:2::'))]
+    # F4816 locator, 4 uSIDs per SID
+    assert srv6_usid.nodes_to_micro_segments(
+        ['R3', 'R4', 'R5', 'R6', 'R7'], NODES_3_YAML) == [
+            str(IPv6Address('fcbb:bbbb:cc00:3:4:5:6::')),
+            str(IPv6Address('fcbb:bbbb:cc00:7::'))]
+    # Mixed locators
+    with pytest.raises(srv6_usid.SIDLocatorError):
+        srv6_usid.nodes_to_micro_segments(['R1', 'R3'], NODES_3_YAML)
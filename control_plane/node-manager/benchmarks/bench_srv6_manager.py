@@ -0,0 +1,450 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# SRv6 Manager benchmark
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+"""Benchmark of the SRv6 Manager on the Linux forwarding engine.
+
+The benchmark creates an isolated network namespace with a few dummy
+links (or veth pairs, if the kernel does not support dummy links) and
+runs a SRv6Manager inside it. For each workload (seg6 routes and every
+seg6local action registered in the behavior handlers), batch size (number
+of entities carried by a request) and concurrency level, it installs,
+reads and removes a set of entities through the Create, Get and Remove
+RPCs and reports installs/sec, removals/sec and the memory used by the
+process.
+
+By default the RPCs are invoked directly on the servicer, in order to
+measure the netlink path; with --grpc, they go through a gRPC server
+running in the namespace.
+
+This script must be run as root.
+
+Usage::
+
+    python benchmarks/bench_srv6_manager.py --batch-size 1 \\
+        --batch-size 100 --concurrency 1 --concurrency 8 --ops 200
+"""
+
+# General imports
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent import futures
+from ipaddress import IPv6Address
+
+# pyroute2 dependencies
+try:
+    from pyroute2 import IPRoute, netns
+    from pyroute2.netlink.exceptions import NetlinkError
+except ImportError:
+    print('pyroute2 is required by the SRv6 Manager benchmark')
+    sys.exit(-2)
+
+# gRPC dependencies
+import grpc
+
+# Proto dependencies
+import commons_pb2
+import srv6_manager_pb2
+import srv6_manager_pb2_grpc
+# Node manager dependencies
+from node_manager import srv6_manager
+
+# Logger reference
+LOGGER = logging.getLogger(__name__)
+
+# Name of the network namespace used by the benchmark
+DEFAULT_NETNS = 'srv6-mgr-bench'
+# Number of links created in the namespace
+DEFAULT_LINKS = 2
+# Kind of the links ('dummy' or 'veth')
+DEFAULT_LINK_KIND = 'dummy'
+# Default batch sizes (entities carried by a request)
+DEFAULT_BATCH_SIZES = [1, 10, 100]
+# Default concurrency levels
+DEFAULT_CONCURRENCY = [1, 8]
+# Default number of requests for each workload and level
+DEFAULT_OPS = 100
+# Default directory where the results are saved
+DEFAULT_RESULTS_DIR = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'results')
+# Routing table used by the seg6local actions performing a lookup
+LOOKUP_TABLE = 254
+# Prefix of the addresses assigned to the entities
+ENTITIES_PREFIX = IPv6Address('fcbb::')
+
+
+def setup_netns(name, num_links, link_kind):
+    """Create the network namespace and enter it. Return the names of
+    the links created in the namespace and their kind"""
+
+    netns.create(name)
+    netns.pushns(name)
+    ip_route = IPRoute()
+    try:
+        # Enable SRv6 and the forwarding in the namespace
+        for sysctl in ['net/ipv6/conf/all/seg6_enabled',
+                       'net/ipv6/conf/all/forwarding',
+                       'net/ipv4/conf/all/forwarding']:
+            with open(os.path.join('/proc/sys', sysctl), 'w') as sysctl_file:
+                sysctl_file.write('1')
+        # Bring the loopback interface up
+        ip_route.link('set', index=ip_route.link_lookup(ifname='lo')[0],
+                      state='up')
+        links = list()
+        for index in range(num_links):
+            ifname = 'bench%d' % index
+            if link_kind == 'dummy':
+                try:
+                    ip_route.link('add', ifname=ifname, kind='dummy')
+                except NetlinkError:
+                    # Dummy links not supported, fall back to veth pairs
+                    LOGGER.warning('Dummy links not supported, using veth')
+                    link_kind = 'veth'
+            if link_kind == 'veth':
+                ip_route.link('add', ifname=ifname, kind='veth',
+                              peer='%sp' % ifname)
+                ip_route.link('set', state='up',
+                              index=ip_route.link_lookup(
+                                  ifname='%sp' % ifname)[0])
+            idx = ip_route.link_lookup(ifname=ifname)[0]
+            ip_route.link('set', index=idx, state='up')
+            # Addresses used as nexthops of the seg6local actions
+            ip_route.addr('add', index=idx, address='fcf0:%x::1' % index,
+                          prefixlen=64)
+            ip_route.addr('add', index=idx, address='10.%d.0.1' % index,
+                          prefixlen=24)
+            links.append(ifname)
+        return links, link_kind
+    finally:
+        ip_route.close()
+
+
+def teardown_netns(name):
+    """Leave and remove the network namespace"""
+
+    netns.popns()
+    netns.remove(name)
+
+
+def get_rss():
+    """Return the current and the peak resident set size of the process
+    (in KiB)"""
+
+    rss = 0
+    with open('/proc/self/status') as status_file:
+        for line in status_file:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1])
+    return rss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def entity_address(index):
+    """Return the address of the index-th entity"""
+
+    return str(ENTITIES_PREFIX + (index << 64))
+
+
+def behavior_params(action, links):
+    """Return the parameters required by a seg6local action"""
+
+    if action in ['End.X', 'End.DX6']:
+        return {'nexthop': 'fcf0:0::2'}
+    if action == 'End.DX4':
+        return {'nexthop': '10.0.0.2'}
+    if action in ['End.T', 'End.DT6', 'End.DT4']:
+        return {'lookup_table': LOOKUP_TABLE}
+    if action == 'End.DX2':
+        return {'interface': links[-1]}
+    if action in ['End.B6', 'End.B6.Encaps']:
+        return {'segs': ['fcff:1::100', 'fcff:2::100']}
+    return dict()
+
+
+def build_request(workload, first, batch_size, links):
+    """Build a SRv6ManagerRequest carrying "batch_size" entities of a
+    workload, starting from the first-th entity"""
+
+    request = srv6_manager_pb2.SRv6ManagerRequest()
+    if workload == 'path':
+        path_request = request.srv6_path_request  # pylint: disable=no-member
+        path_request.fwd_engine = srv6_manager_pb2.LINUX
+        for index in range(first, first + batch_size):
+            path = path_request.paths.add()
+            path.destination = '%s/64' % entity_address(index)
+            path.device = links[0]
+            path.encapmode = 'encap'
+            path.table = -1
+            path.metric = -1
+            for segment in ['fcff:1::100', 'fcff:2::100']:
+                path.sr_path.add().segment = segment
+        return request
+    # seg6local action
+    action = workload.split(':', 1)[1]
+    params = behavior_params(action, links)
+    behavior_request = \
+        request.srv6_behavior_request  # pylint: disable=no-member
+    behavior_request.fwd_engine = srv6_manager_pb2.LINUX
+    for index in range(first, first + batch_size):
+        behavior = behavior_request.behaviors.add()
+        behavior.segment = entity_address(index)
+        behavior.action = action
+        behavior.device = links[0]
+        behavior.table = -1
+        behavior.metric = -1
+        behavior.nexthop = params.get('nexthop', '')
+        behavior.lookup_table = params.get('lookup_table', -1)
+        behavior.interface = params.get('interface', '')
+        for segment in params.get('segs', []):
+            behavior.segs.add().segment = segment
+    return request
+
+
+def run_requests(rpc, requests, concurrency):
+    """Send the requests with "concurrency" parallel workers. Return the
+    elapsed time and the status codes of the failed requests"""
+
+    errors = list()
+
+    def run(request):
+        try:
+            status = rpc(request).status
+        except grpc.RpcError as err:
+            status = err.code().name
+        except Exception as err:    # pylint: disable=broad-except
+            # Unhandled error in the servicer
+            status = type(err).__name__
+        if status != commons_pb2.STATUS_SUCCESS:
+            errors.append(status)
+
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, requests))
+    return time.perf_counter() - start, errors
+
+
+def status_name(status):
+    """Return the name of a status code"""
+
+    if isinstance(status, str):
+        return status
+    return commons_pb2.StatusCode.Name(status)
+
+
+def run_level(stub, workload, batch_size, concurrency, ops, links,
+              first=0):
+    """Install, get and remove "ops" requests of "batch_size" entities,
+    starting from the first-th entity, and return the statistics"""
+
+    # pylint: disable=too-many-arguments, too-many-locals
+    requests = [build_request(workload, first + index * batch_size,
+                              batch_size, links) for index in range(ops)]
+    entities = ops * batch_size
+    rss_before, _ = get_rss()
+    install_time, install_errors = run_requests(
+        stub.Create, requests, concurrency)
+    rss_installed, peak_rss = get_rss()
+    get_time, get_errors = run_requests(stub.Get, requests, concurrency)
+    remove_time, remove_errors = run_requests(
+        stub.Remove, requests, concurrency)
+    errors = dict()
+    for status in install_errors + remove_errors:
+        errors[status_name(status)] = errors.get(status_name(status), 0) + 1
+    return {
+        'workload': workload,
+        'batch_size': batch_size,
+        'concurrency': concurrency,
+        'requests': ops,
+        'entities': entities,
+        'installs_per_sec': entities / install_time if install_time else 0,
+        'gets_per_sec': entities / get_time if get_time else 0,
+        'removals_per_sec': entities / remove_time if remove_time else 0,
+        'install_errors': len(install_errors),
+        'get_errors': len(get_errors),
+        'remove_errors': len(remove_errors),
+        'errors': errors,
+        'rss_kib': rss_installed,
+        'rss_delta_kib': rss_installed - rss_before,
+        'peak_rss_kib': peak_rss
+    }
+
+
+def start_grpc_server(servicer):
+    """Start a gRPC server for the servicer on a free port of the
+    loopback interface. Return the server and a stub connected to it"""
+
+    server = grpc.server(futures.ThreadPoolExecutor())
+    srv6_manager_pb2_grpc.add_SRv6ManagerServicer_to_server(servicer, server)
+    port = server.add_insecure_port('[::1]:0')
+    server.start()
+    channel = grpc.insecure_channel('ipv6:[::1]:%d' % port)
+    return server, srv6_manager_pb2_grpc.SRv6ManagerStub(channel)
+
+
+class DirectStub():
+    '''
+    Invoke the RPCs directly on the servicer, without gRPC
+    '''
+
+    def __init__(self, servicer):
+        self.servicer = servicer
+
+    def Create(self, request):
+        # pylint: disable=invalid-name
+        """Create RPC"""
+
+        return self.servicer.Create(request, None)
+
+    def Get(self, request):
+        # pylint: disable=invalid-name
+        """Get RPC"""
+
+        return self.servicer.Get(request, None)
+
+    def Remove(self, request):
+        # pylint: disable=invalid-name
+        """Remove RPC"""
+
+        return self.servicer.Remove(request, None)
+
+
+def print_results(results):
+    """Print the results"""
+
+    print('%-22s %5s %5s %7s %11s %11s %8s %9s  %s' % (
+        'workload', 'batch', 'conc', 'entities', 'installs/s', 'removals/s',
+        'errors', 'rss_kib', 'error codes'))
+    for result in results['levels']:
+        print('%-22s %5d %5d %7d %11.1f %11.1f %8d %9d  %s' % (
+            result['workload'], result['batch_size'], result['concurrency'],
+            result['entities'], result['installs_per_sec'],
+            result['removals_per_sec'],
+            result['install_errors'] + result['remove_errors'],
+            result['rss_kib'],
+            ', '.join('%s=%d' % item
+                      for item in sorted(result['errors'].items()))))
+
+
+def parse_arguments():
+    """Command-line arguments parser"""
+
+    parser = ArgumentParser(description='SRv6 Manager benchmark')
+    parser.add_argument('--workload', action='append', dest='workloads',
+                        help='Workload to run ("path" or "behavior:<action>",'
+                        ' e.g. behavior:End.DT6); can be repeated '
+                        '(default: all)')
+    parser.add_argument('--batch-size', action='append', type=int,
+                        dest='batch_sizes',
+                        help='Entities carried by each request; can be '
+                        'repeated')
+    parser.add_argument('--concurrency', action='append', type=int,
+                        help='Concurrency level; can be repeated')
+    parser.add_argument('--ops', type=int, default=DEFAULT_OPS,
+                        help='Requests for each workload and level')
+    parser.add_argument('--grpc', action='store_true',
+                        help='Send the requests through a gRPC server')
+    parser.add_argument('--netns', default=DEFAULT_NETNS,
+                        help='Name of the network namespace')
+    parser.add_argument('--links', type=int, default=DEFAULT_LINKS,
+                        help='Number of links created in the namespace')
+    parser.add_argument('--link-kind', choices=['dummy', 'veth'],
+                        default=DEFAULT_LINK_KIND,
+                        help='Kind of the links created in the namespace')
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR,
+                        help='Directory where the results are saved')
+    parser.add_argument('--no-save', action='store_true',
+                        help='Do not save the results')
+    parser.add_argument('-d', '--debug', action='store_true',
+                        help='Activate debug logs')
+    return parser.parse_args()
+
+
+def __main():
+    """Entry point for this script"""
+
+    # pylint: disable=too-many-locals
+    args = parse_arguments()
+    # Setup properly the logger; the node manager logs a warning for
+    # each failed netlink operation
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.ERROR)
+    LOGGER.setLevel(logging.INFO)
+    # This script must be run as root
+    if not srv6_manager.check_root():
+        LOGGER.critical('*** %s must be run as root.\n', sys.argv[0])
+        sys.exit(1)
+    links, link_kind = setup_netns(args.netns, max(args.links, 1),
+                                   args.link_kind)
+    server = None
+    try:
+        # The servicer must be created in the namespace, since it opens
+        # its netlink socket when it is initialized
+        servicer = srv6_manager.SRv6Manager()
+        workloads = args.workloads or (
+            ['path'] + ['behavior:%s' % action for action in
+                        servicer.srv6_mgr_linux.behavior_handlers])
+        if args.grpc:
+            server, stub = start_grpc_server(servicer)
+        else:
+            stub = DirectStub(servicer)
+        results = {
+            'benchmark': 'srv6_manager',
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'grpc': args.grpc,
+            'link_kind': link_kind,
+            'levels': list()
+        }
+        # Each level uses new entities, so that the entities left by a
+        # failed removal do not affect the next levels
+        first = 0
+        for workload in workloads:
+            for batch_size in args.batch_sizes or DEFAULT_BATCH_SIZES:
+                for concurrency in args.concurrency or DEFAULT_CONCURRENCY:
+                    results['levels'].append(run_level(
+                        stub, workload, batch_size, concurrency, args.ops,
+                        links, first))
+                    first += batch_size * args.ops
+    finally:
+        if server is not None:
+            server.stop(None)
+        teardown_netns(args.netns)
+    print_results(results)
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        filename = os.path.join(args.results_dir, 'srv6_manager_%s.json'
+                                % time.strftime('%Y%m%d-%H%M%S'))
+        with open(filename, 'w') as outfile:
+            json.dump(results, outfile, indent=2)
+        print('\nResults saved to %s' % filename)
+
+
+if __name__ == '__main__':
+    __main()
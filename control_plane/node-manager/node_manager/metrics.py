@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Node Manager metrics
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+"""Metrics of the node manager, exposed in the Prometheus text format.
+
+The metrics are enabled by the ENABLE_METRICS setting of the node manager
+configuration (see node_mgr.Config). The implementation of the metrics is
+shared with the controller (see telemetry.metrics); this module defines
+the metrics of the node manager.
+
+Metrics:
+
+- node_manager_rpc_duration_seconds{method}
+- node_manager_rpc_in_flight{method}
+- node_manager_rpc_errors_total{method}
+- node_manager_netlink_duration_seconds{operation}
+- node_manager_vppctl_duration_seconds{command}
+"""
+
+# Telemetry dependencies
+import telemetry.metrics
+from telemetry.metrics import Counter, Gauge, Histogram
+
+# Default IP address of the HTTP server exposing the metrics
+DEFAULT_METRICS_IP = telemetry.metrics.DEFAULT_METRICS_IP
+# Default port of the HTTP server exposing the metrics
+DEFAULT_METRICS_PORT = 8001
+
+# Decorator recording the execution time of a function in a histogram
+timed = telemetry.metrics.timed
+
+# Metrics of the node manager
+RPC_DURATION = Histogram(
+    'node_manager_rpc_duration_seconds',
+    'Latency of the RPCs served by the node manager', ['method'])
+RPC_IN_FLIGHT = Gauge(
+    'node_manager_rpc_in_flight',
+    'RPCs in progress', ['method'])
+RPC_ERRORS = Counter(
+    'node_manager_rpc_errors_total',
+    'RPCs raising an exception', ['method'])
+NETLINK_DURATION = Histogram(
+    'node_manager_netlink_duration_seconds',
+    'Latency of the netlink route operations', ['operation'])
+VPPCTL_DURATION = Histogram(
+    'node_manager_vppctl_duration_seconds',
+    'Latency of the commands sent to VPP through vppctl', ['command'])
+
+
+class ServerMetricsInterceptor(telemetry.metrics.ServerMetricsInterceptor):
+    """Server interceptor recording latency, in-flight count and errors
+    of the RPCs"""
+
+    def __init__(self):
+        super().__init__(RPC_DURATION, RPC_IN_FLIGHT, RPC_ERRORS)
+
+
+def start_http_server(port=DEFAULT_METRICS_PORT, address=DEFAULT_METRICS_IP):
+    """Start a HTTP server exposing the metrics in a daemon thread and
+    return it"""
+
+    return telemetry.metrics.start_http_server(port, address)
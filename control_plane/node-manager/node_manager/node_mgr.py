@@ -31,6 +31,7 @@ import importlib
 import logging
 import os
 import sys
+import tempfile
 import time
 from argparse import ArgumentParser
 from concurrent import futures
@@ -41,11 +42,12 @@ from socket import AF_INET, AF_INET6
 import grpc
 # python-dotenv dependencies
 from dotenv import load_dotenv
-# pkg_resources dependencies
-from pkg_resources import resource_filename
+# Telemetry dependencies
+import telemetry.metrics
+import telemetry.tracing
 
 # Node Manager dependencies
-from node_manager import utils
+from node_manager import metrics, state_store, utils
 from node_manager.utils import get_address_family
 
 # Folder containing this script
@@ -69,9 +71,20 @@ DEFAULT_CERTIFICATE = 'cert_server.pem'
 # Server key
 DEFAULT_KEY = 'key_server.pem'
 # Default path to the .env file
-DEFAULT_ENV_FILE_PATH = resource_filename(__name__, 'config/node_manager.env')
+DEFAULT_ENV_FILE_PATH = os.path.join(BASE_PATH, 'config/node_manager.env')
 # Define whether to enable the debug mode or not
 DEFAULT_DEBUG = False
+# Define whether to expose the metrics or not
+DEFAULT_ENABLE_METRICS = False
+# Define whether to enable the tracing or not
+DEFAULT_ENABLE_TRACING = False
+# Define whether the RPCs can request to be profiled or not
+DEFAULT_ENABLE_PROFILING = False
+# Directory where the profiles are saved
+DEFAULT_PROFILING_DIR = os.path.join(tempfile.gettempdir(),
+                                     'node-manager-profiles')
+# Define whether to keep a snapshot of the SRv6 entities or not
+DEFAULT_ENABLE_STATE_SNAPSHOT = False
 
 # Module imported dynamically
 SRV6_MANAGER = None
@@ -85,9 +98,15 @@ def start_server(grpc_ip=DEFAULT_GRPC_IP,
                  grpc_port=DEFAULT_GRPC_PORT,
                  secure=DEFAULT_SECURE,
                  certificate=DEFAULT_CERTIFICATE,
-                 key=DEFAULT_KEY):
+                 key=DEFAULT_KEY,
+                 enable_metrics=DEFAULT_ENABLE_METRICS,
+                 metrics_ip=metrics.DEFAULT_METRICS_IP,
+                 metrics_port=metrics.DEFAULT_METRICS_PORT,
+                 store=None):
     """Start a gRPC server"""
 
+    # pylint: disable=too-many-arguments
+
     # Get family of the gRPC IP
     addr_family = get_address_family(grpc_ip)
     # Build address depending on the family
@@ -101,11 +120,24 @@ def start_server(grpc_ip=DEFAULT_GRPC_IP,
         # Invalid address
         logger.fatal('Invalid gRPC address: %s', grpc_ip)
         sys.exit(-2)
+    # Interceptors of the gRPC server
+    interceptors = list()
+    if enable_metrics:
+        # Record the metrics and expose them over HTTP
+        telemetry.metrics.ENABLE_METRICS = True
+        interceptors.append(metrics.ServerMetricsInterceptor())
+        metrics.start_http_server(metrics_port, metrics_ip)
+    if telemetry.tracing.ENABLE_TRACING or \
+            telemetry.tracing.ENABLE_PROFILING:
+        # Continue the traces of the controller and run the profiler
+        # requested in the RPCs
+        interceptors.append(telemetry.tracing.ServerTracingInterceptor())
     # Create the server and add the handlers
-    grpc_server = grpc.server(futures.ThreadPoolExecutor())
+    grpc_server = grpc.server(futures.ThreadPoolExecutor(),
+                              interceptors=interceptors)
     # SRv6 Manager
     SRV6_MANAGER_PB2_GRPC.add_SRv6ManagerServicer_to_server(
-        SRV6_MANAGER.SRv6Manager(), grpc_server)
+        SRV6_MANAGER.SRv6Manager(store=store), grpc_server)
     # PM Manager
     try:
         pm_manager.add_pm_manager_to_server(grpc_server)
@@ -172,6 +204,31 @@ class Config:
         self.srv6_pm_xdp_ebpf_path = None
         # Path to the 'rose-srv6-data-plane' repository
         self.rose_srv6_data_plane_path = None
+        # Define whether to expose the metrics or not
+        self.enable_metrics = DEFAULT_ENABLE_METRICS
+        # IP address of the HTTP server exposing the metrics
+        self.metrics_ip = metrics.DEFAULT_METRICS_IP
+        # Port of the HTTP server exposing the metrics
+        self.metrics_port = metrics.DEFAULT_METRICS_PORT
+        # Define whether to enable the tracing or not
+        self.enable_tracing = DEFAULT_ENABLE_TRACING
+        # Fraction of the traces started by the node manager that are
+        # recorded
+        self.tracing_sample_rate = telemetry.tracing.TRACING_SAMPLE_RATE
+        # File where the traces are appended (optional)
+        self.tracing_file = None
+        # Define whether the RPCs can request to be profiled or not
+        self.enable_profiling = DEFAULT_ENABLE_PROFILING
+        # Directory where the profiles are saved
+        self.profiling_dir = DEFAULT_PROFILING_DIR
+        # Define whether to keep a snapshot of the SRv6 entities or not
+        self.enable_state_snapshot = DEFAULT_ENABLE_STATE_SNAPSHOT
+        # Directory where the snapshot is saved
+        self.state_dir = state_store.DEFAULT_STATE_DIR
+        # Number of stale records that triggers a compaction of the
+        # snapshot
+        self.state_compaction_threshold = \
+            state_store.DEFAULT_COMPACTION_THRESHOLD
 
     # Load configuration from .env file
     def load_config(self, env_file):
@@ -251,6 +308,78 @@ class Config:
         if os.getenv('ROSE_SRV6_DATA_PLANE_PATH') is not None:
             self.rose_srv6_data_plane_path = \
                 os.getenv('ROSE_SRV6_DATA_PLANE_PATH')
+        # Define whether to expose the metrics or not
+        if os.getenv('ENABLE_METRICS') is not None:
+            self.enable_metrics = os.getenv('ENABLE_METRICS')
+            # Values provided in .env files are returned as strings
+            # We need to convert them to bool
+            if self.enable_metrics.lower() == 'true':
+                self.enable_metrics = True
+            elif self.enable_metrics.lower() == 'false':
+                self.enable_metrics = False
+            else:
+                # Invalid value for this parameter
+                self.enable_metrics = None
+        # IP address of the HTTP server exposing the metrics
+        if os.getenv('METRICS_IP') is not None:
+            self.metrics_ip = os.getenv('METRICS_IP')
+        # Port of the HTTP server exposing the metrics
+        if os.getenv('METRICS_PORT') is not None:
+            self.metrics_port = int(os.getenv('METRICS_PORT'))
+        # Define whether to enable the tracing or not
+        if os.getenv('ENABLE_TRACING') is not None:
+            self.enable_tracing = os.getenv('ENABLE_TRACING')
+            # Values provided in .env files are returned as strings
+            # We need to convert them to bool
+            if self.enable_tracing.lower() == 'true':
+                self.enable_tracing = True
+            elif self.enable_tracing.lower() == 'false':
+                self.enable_tracing = False
+            else:
+                # Invalid value for this parameter
+                self.enable_tracing = None
+        # Fraction of the traces started by the node manager that are
+        # recorded
+        if os.getenv('TRACING_SAMPLE_RATE') is not None:
+            self.tracing_sample_rate = float(os.getenv('TRACING_SAMPLE_RATE'))
+        # File where the traces are appended
+        if os.getenv('TRACING_FILE') is not None:
+            self.tracing_file = os.getenv('TRACING_FILE')
+        # Define whether the RPCs can request to be profiled or not
+        if os.getenv('ENABLE_PROFILING') is not None:
+            self.enable_profiling = os.getenv('ENABLE_PROFILING')
+            # Values provided in .env files are returned as strings
+            # We need to convert them to bool
+            if self.enable_profiling.lower() == 'true':
+                self.enable_profiling = True
+            elif self.enable_profiling.lower() == 'false':
+                self.enable_profiling = False
+            else:
+                # Invalid value for this parameter
+                self.enable_profiling = None
+        # Directory where the profiles are saved
+        if os.getenv('PROFILING_DIR') is not None:
+            self.profiling_dir = os.getenv('PROFILING_DIR')
+        # Define whether to keep a snapshot of the SRv6 entities or not
+        if os.getenv('ENABLE_STATE_SNAPSHOT') is not None:
+            self.enable_state_snapshot = os.getenv('ENABLE_STATE_SNAPSHOT')
+            # Values provided in .env files are returned as strings
+            # We need to convert them to bool
+            if self.enable_state_snapshot.lower() == 'true':
+                self.enable_state_snapshot = True
+            elif self.enable_state_snapshot.lower() == 'false':
+                self.enable_state_snapshot = False
+            else:
+                # Invalid value for this parameter
+                self.enable_state_snapshot = None
+        # Directory where the snapshot is saved
+        if os.getenv('STATE_DIR') is not None:
+            self.state_dir = os.getenv('STATE_DIR')
+        # Number of stale records that triggers a compaction of the
+        # snapshot
+        if os.getenv('STATE_COMPACTION_THRESHOLD') is not None:
+            self.state_compaction_threshold = \
+                int(os.getenv('STATE_COMPACTION_THRESHOLD'))
 
     def validate_config(self):
         """Check if the configuration is valid"""
@@ -266,6 +395,31 @@ class Config:
         if self.grpc_port <= 0 or self.grpc_port >= 65536:
             logger.critical('GRPC_PORT out of range: %s', self.grpc_port)
             success = False
+        # Validate metrics parameters
+        if self.enable_metrics is None:
+            logger.critical('ENABLE_METRICS must be True or False')
+            success = False
+        if self.enable_metrics and \
+                (self.metrics_port < 0 or self.metrics_port >= 65536):
+            logger.critical('METRICS_PORT out of range: %s',
+                            self.metrics_port)
+            success = False
+        # Validate tracing and profiling parameters
+        if self.enable_tracing is None:
+            logger.critical('ENABLE_TRACING must be True or False')
+            success = False
+        if self.enable_profiling is None:
+            logger.critical('ENABLE_PROFILING must be True or False')
+            success = False
+        if self.tracing_sample_rate < 0 or self.tracing_sample_rate > 1:
+            logger.critical('TRACING_SAMPLE_RATE out of range: %s',
+                            self.tracing_sample_rate)
+            success = False
+        # Validate state snapshot parameters
+        if self.enable_state_snapshot and self.state_compaction_threshold < 0:
+            logger.critical('STATE_COMPACTION_THRESHOLD must be positive: '
+                            '%s', self.state_compaction_threshold)
+            success = False
         # Validate SRv6 PFPLM configuration parameters
         if self.enable_srv6_pm_manager:
             # SRv6 PM functionalities depends on SRv6 features
@@ -349,6 +503,22 @@ class Config:
                   % self.srv6_pm_xdp_ebpf_path)
             print('Path of the rose-srv6-data-plane repository: %s'
                   % self.rose_srv6_data_plane_path)
+        print('Enable metrics: %s' % self.enable_metrics)
+        if self.enable_metrics:
+            print('Metrics endpoint: %s:%s'
+                  % (self.metrics_ip, self.metrics_port))
+        print('Enable tracing: %s' % self.enable_tracing)
+        if self.enable_tracing:
+            print('Tracing sample rate: %s' % self.tracing_sample_rate)
+            print('Tracing file: %s' % self.tracing_file)
+        print('Enable profiling: %s' % self.enable_profiling)
+        if self.enable_profiling:
+            print('Profiling directory: %s' % self.profiling_dir)
+        print('Enable state snapshot: %s' % self.enable_state_snapshot)
+        if self.enable_state_snapshot:
+            print('State directory: %s' % self.state_dir)
+            print('State compaction threshold: %s'
+                  % self.state_compaction_threshold)
         print()
         print('***************************************************')
         print()
@@ -372,6 +542,15 @@ class Config:
             SRV6PMSERVICE_PB2_GRPC = importlib.import_module(
                 'srv6pmService_pb2_grpc')
 
+    def setup_tracing(self):
+        """Configure the tracing and the profiling"""
+
+        telemetry.tracing.ENABLE_TRACING = bool(self.enable_tracing)
+        telemetry.tracing.TRACING_SAMPLE_RATE = self.tracing_sample_rate
+        telemetry.tracing.TRACING_FILE = self.tracing_file
+        telemetry.tracing.ENABLE_PROFILING = bool(self.enable_profiling)
+        telemetry.tracing.PROFILING_DIR = self.profiling_dir
+
 
 # Parse options
 def parse_arguments():
@@ -474,14 +653,23 @@ def __main():
     config.print_config()
     # Import dependencies
     config.import_dependencies()
+    # Setup tracing and profiling
+    config.setup_tracing()
     # Extract parameters from the configuration
     grpc_ip = config.grpc_ip
     grpc_port = config.grpc_port
     secure = config.grpc_secure
     certificate = config.grpc_server_certificate_path
     key = config.grpc_server_key_path
+    # Restore the snapshot of the SRv6 entities
+    store = None
+    if config.enable_srv6_manager and config.enable_state_snapshot:
+        store = state_store.StateStore(config.state_dir,
+                                       config.state_compaction_threshold)
     # Start the server
-    start_server(grpc_ip, grpc_port, secure, certificate, key)
+    start_server(grpc_ip, grpc_port, secure, certificate, key,
+                 config.enable_metrics, config.metrics_ip,
+                 config.metrics_port, store)
 
 
 if __name__ == '__main__':
@@ -42,7 +42,10 @@ import grpc
 import commons_pb2
 import srv6_manager_pb2
 import srv6_manager_pb2_grpc
+# Telemetry dependencies
+from telemetry import tracing
 # Node manager dependencies
+from node_manager import state_store
 from node_manager.utils import get_address_family
 from node_manager.srv6_mgr_linux import SRv6ManagerLinux
 from node_manager.srv6_mgr_vpp import SRv6ManagerVPP  # TODO
@@ -85,13 +88,39 @@ DEFAULT_KEY = 'key_server.pem'
 class SRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
     """gRPC request handler"""
 
-    def __init__(self):
+    def __init__(self, store=None):
         # SRv6 Manager for Linux Forwarding Engine
         self.srv6_mgr_linux = SRv6ManagerLinux()
         # SRv6 Manager for VPP Forwarding Engine
         # self.srv6_mgr_vpp = None TODO remove
         self.srv6_mgr_vpp = SRv6ManagerVPP()      # TODO
-
+        # Snapshot of the SRv6 entities applied (optional)
+        self.store = store
+        if store is not None:
+            # Verify the snapshot restored after a restart against the
+            # routes configured in the kernel
+            self.verify_state(FWD_ENGINE['linux'])
+            LOGGER.info('*** SRv6 state fingerprint: %s',
+                        store.fingerprint(FWD_ENGINE['linux'])[0])
+
+    @tracing.traced()
+    def verify_state(self, fwd_engine):
+        """Verify the snapshot of the SRv6 entities against the state of
+        the forwarding engine, retrieved with a single dump"""
+
+        if fwd_engine != FWD_ENGINE['linux']:
+            # The state of the other forwarding engines cannot be
+            # retrieved: their snapshot is not verified
+            return False
+        # An empty destination (or segment) and table -1 match all the
+        # entities configured in the kernel
+        paths = self.srv6_mgr_linux.get_srv6_paths(
+            [srv6_manager_pb2.SRv6Path(destination='', table=-1)])
+        behaviors = self.srv6_mgr_linux.get_srv6_behaviors(
+            [srv6_manager_pb2.SRv6Behavior(segment='', table=-1)])
+        return self.store.verify(fwd_engine, paths, behaviors)
+
+    @tracing.traced()
     def handle_srv6_path_request(self, operation, request, context):
         # pylint: disable=unused-argument
         """Handler for SRv6 paths"""
@@ -114,6 +143,7 @@ class SRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
         return srv6_manager_pb2.SRv6ManagerReply(status=commons_pb2.StatusCode.Value(
             'STATUS_INTERNAL_ERROR'))  # TODO creare un errore specifico
 
+    @tracing.traced()
     def handle_srv6_policy_request(self, operation, request, context):
         # pylint: disable=unused-argument
         """Handler for SRv6 policies"""
@@ -135,6 +165,7 @@ class SRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
         return srv6_manager_pb2.SRv6ManagerReply(status=commons_pb2.StatusCode.Value(
             'STATUS_INTERNAL_ERROR'))  # TODO creare un errore specifico
 
+    @tracing.traced()
     def handle_srv6_behavior_request(self, operation, request, context):
         # pylint: disable=unused-argument
         """Handler for SRv6 behaviors"""
@@ -158,6 +189,25 @@ class SRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
         return srv6_manager_pb2.SRv6ManagerReply(status=commons_pb2.StatusCode.Value(
             'STATUS_INTERNAL_ERROR'))  # TODO creare un errore specifico
 
+    def execute_entities(self, handler, operation, request, field, context):
+        """Execute the entities carried by a path (or behavior) request one
+        at a time and stop at the first error: the reply reports the number
+        of entities applied before the error"""
+
+        if operation == 'get':
+            return handler(operation, request, context)
+        applied = 0
+        for entity in getattr(request, field):
+            entity_request = type(request)(fwd_engine=request.fwd_engine)
+            getattr(entity_request, field).append(entity)
+            res = handler(operation, entity_request, context)
+            if res.status != commons_pb2.STATUS_SUCCESS:
+                res.applied = applied
+                return res
+            applied += 1
+        return srv6_manager_pb2.SRv6ManagerReply(
+            status=commons_pb2.STATUS_SUCCESS, applied=applied)
+
     def execute(self, operation, request, context):
         """This function dispatch the gRPC requests based
         on the entity carried in them"""
@@ -165,22 +215,43 @@ class SRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
         # Handle operation
         # The operation to be executed depends on
         # the entity carried by the request message
-        res = srv6_manager_pb2.SRv6ManagerReply(
+        # The entities returned by the handlers (for the "get" operation)
+        # are merged in a single reply
+        reply = srv6_manager_pb2.SRv6ManagerReply(
             status=commons_pb2.STATUS_SUCCESS)
         if request.HasField('srv6_path_request'):
-            res = self.handle_srv6_path_request(
-                operation, request.srv6_path_request, context)
+            res = self.execute_entities(
+                self.handle_srv6_path_request, operation,
+                request.srv6_path_request, 'paths', context)
+            # Record the paths applied, even if an error occurred
+            if self.store is not None and operation != 'get':
+                self.store.record(operation, state_store.PATH,
+                                  request.srv6_path_request.fwd_engine,
+                                  request.srv6_path_request.paths[
+                                      :res.applied])
             if res.status != commons_pb2.STATUS_SUCCESS:
                 return res
+            reply.paths.extend(res.paths)
         if request.HasField('srv6_policy_request'):
             res = self.handle_srv6_policy_request(
                 operation, request.srv6_policy_request, context)
             if res.status != commons_pb2.STATUS_SUCCESS:
                 return res
+            reply.policies.extend(res.policies)
         if request.HasField('srv6_behavior_request'):
-            res = self.handle_srv6_behavior_request(
-                operation, request.srv6_behavior_request, context)
-        return res
+            res = self.execute_entities(
+                self.handle_srv6_behavior_request, operation,
+                request.srv6_behavior_request, 'behaviors', context)
+            # Record the behaviors applied, even if an error occurred
+            if self.store is not None and operation != 'get':
+                self.store.record(operation, state_store.BEHAVIOR,
+                                  request.srv6_behavior_request.fwd_engine,
+                                  request.srv6_behavior_request.behaviors[
+                                      :res.applied])
+            if res.status != commons_pb2.STATUS_SUCCESS:
+                return res
+            reply.behaviors.extend(res.behaviors)
+        return reply
 
     def Create(self, request, context):
         # pylint: disable=invalid-name
@@ -210,6 +281,22 @@ class SRv6Manager(srv6_manager_pb2_grpc.SRv6ManagerServicer):
         # Handle Remove operation
         return self.execute('del', request, context)
 
+    def GetFingerprint(self, request, context):
+        # pylint: disable=invalid-name
+        """RPC used to get the fingerprint of the SRv6 entities"""
+
+        if self.store is None:
+            # The snapshot is not enabled
+            return srv6_manager_pb2.SRv6FingerprintReply(
+                status=commons_pb2.STATUS_OPERATION_NOT_SUPPORTED)
+        if request.verify:
+            self.verify_state(request.fwd_engine)
+        fingerprint, paths, behaviors = \
+            self.store.fingerprint(request.fwd_engine)
+        return srv6_manager_pb2.SRv6FingerprintReply(
+            status=commons_pb2.STATUS_SUCCESS, fingerprint=fingerprint or '',
+            paths=paths, behaviors=behaviors)
+
 
 # Start gRPC server
 def start_server(grpc_ip=DEFAULT_GRPC_IP,
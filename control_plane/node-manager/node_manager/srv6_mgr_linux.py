@@ -30,6 +30,7 @@ import logging
 # General imports
 import os
 import sys
+from ipaddress import ip_network
 from socket import AF_INET6
 
 # pyroute2 dependencies
@@ -41,6 +42,12 @@ from pyroute2.netlink.rtnl.ifinfmsg import IFF_LOOPBACK
 import commons_pb2
 import srv6_manager_pb2
 
+# Telemetry dependencies
+from telemetry import tracing
+
+# Node manager dependencies
+from node_manager import metrics
+
 # Load environment variables from .env file
 # load_dotenv()
 
@@ -56,6 +63,24 @@ NETLINK_ERROR_NO_SUCH_PROCESS = 3
 NETLINK_ERROR_FILE_EXISTS = 17
 NETLINK_ERROR_NO_SUCH_DEVICE = 19
 NETLINK_ERROR_OPERATION_NOT_SUPPORTED = 95
+# Lightweight tunnel encapsulation types
+LWTUNNEL_ENCAP_SEG6 = 5
+LWTUNNEL_ENCAP_SEG6_LOCAL = 7
+# Main routing table
+RT_TABLE_MAIN = 254
+# seg6local actions, indexed by the value of SEG6_LOCAL_ACTION
+SEG6_LOCAL_ACTIONS = {
+    1: 'End',
+    2: 'End.X',
+    3: 'End.T',
+    4: 'End.DX2',
+    5: 'End.DX6',
+    6: 'End.DX4',
+    7: 'End.DT6',
+    8: 'End.DT4',
+    9: 'End.B6',
+    10: 'End.B6.Encaps'
+}
 # Logger reference
 LOGGER = logging.getLogger(__name__)
 #
@@ -102,6 +127,10 @@ class SRv6ManagerLinux():
     def __init__(self):
         # Setup ip route
         self.ip_route = IPRoute()
+        # Record the execution time of the netlink route operations
+        self.ip_route.route = tracing.traced('netlink.route')(metrics.timed(
+            metrics.NETLINK_DURATION,
+            lambda command, *args, **kwargs: command)(self.ip_route.route))
         # Non-loopback interfaces
         self.non_loopback_interfaces = list()
         # Loopback interfaces
@@ -141,6 +170,135 @@ class SRv6ManagerLinux():
             'uN': self.handle_un_behavior_request,
         }
 
+    def dump_srv6_routes(self, encap_type):
+        """Return the IPv6 routes of all the tables having the given
+        lightweight tunnel encapsulation (seg6 or seg6local)"""
+
+        return [route for route in self.ip_route.route('dump',
+                                                       family=AF_INET6)
+                if route.get_attr('RTA_ENCAP_TYPE') == encap_type]
+
+    @staticmethod
+    def route_matches(route, destination, table, device_idx):
+        """Check if a route matches the filters of a get request; empty
+        filters (i.e. '', -1 or None) match any value"""
+
+        if destination != '':
+            if ip_network(destination, strict=False) != ip_network(
+                    '%s/%s' % (route.get_attr('RTA_DST'), route['dst_len'])):
+                return False
+        if table != -1:
+            if (route.get_attr('RTA_TABLE') or RT_TABLE_MAIN) != table:
+                return False
+        if device_idx is not None:
+            if route.get_attr('RTA_OIF') != device_idx:
+                return False
+        return True
+
+    def _get_srv6_routes(self, entities, encap_type, key):
+        """Return the routes matching the entities of a get request,
+        without duplicates, or None if an entity with a non-empty key
+        ("destination" or "segment") does not match any route"""
+
+        routes = self.dump_srv6_routes(encap_type)
+        found = dict()
+        for entity in entities:
+            device_idx = None
+            if entity.device != '':
+                device_idx = self.interface_to_idx.get(entity.device)
+                if device_idx is None:
+                    return None
+            matched = False
+            for route in routes:
+                if self.route_matches(route, getattr(entity, key),
+                                      entity.table, device_idx):
+                    matched = True
+                    found[(route.get_attr('RTA_DST'), route['dst_len'],
+                           route.get_attr('RTA_TABLE'))] = route
+            if not matched and getattr(entity, key) != '':
+                return None
+        return list(found.values())
+
+    @staticmethod
+    def _route_to_entity(route, entity, idx_to_interface):
+        """Fill the common fields of a path or behavior from a route"""
+
+        entity.device = idx_to_interface.get(route.get_attr('RTA_OIF'), '')
+        entity.table = route.get_attr('RTA_TABLE') or RT_TABLE_MAIN
+        if route.get_attr('RTA_PRIORITY') is not None:
+            entity.metric = route.get_attr('RTA_PRIORITY')
+
+    def get_srv6_paths(self, paths):
+        """Return the SRv6 paths matching the paths of a get request (an
+        empty destination matches any path), or None if a path is not
+        found"""
+
+        routes = self._get_srv6_routes(paths, LWTUNNEL_ENCAP_SEG6,
+                                       'destination')
+        if routes is None:
+            return None
+        idx_to_interface = {idx: interface for interface, idx
+                            in self.interface_to_idx.items()}
+        result = list()
+        for route in routes:
+            path = srv6_manager_pb2.SRv6Path()
+            path.destination = '%s/%s' % (route.get_attr('RTA_DST'),
+                                          route['dst_len'])
+            self._route_to_entity(route, path, idx_to_interface)
+            srh = route.get_attr('RTA_ENCAP').get_attr('SEG6_IPTUNNEL_SRH')
+            path.encapmode = srh.get('mode', '')
+            # pyroute2 returns the segments in reverse order
+            for segment in reversed(srh.get('segs', [])):
+                path.sr_path.add().segment = segment
+            result.append(path)
+        return result
+
+    def get_srv6_behaviors(self, behaviors):
+        """Return the SRv6 behaviors matching the behaviors of a get
+        request (an empty segment matches any behavior), or None if a
+        behavior is not found"""
+
+        routes = self._get_srv6_routes(behaviors, LWTUNNEL_ENCAP_SEG6_LOCAL,
+                                       'segment')
+        if routes is None:
+            return None
+        # Filter on the action
+        actions = set(behavior.action for behavior in behaviors)
+        idx_to_interface = {idx: interface for interface, idx
+                            in self.interface_to_idx.items()}
+        result = list()
+        for route in routes:
+            encap = route.get_attr('RTA_ENCAP')
+            action = encap.get_attr('SEG6_LOCAL_ACTION')
+            action = SEG6_LOCAL_ACTIONS.get(action, str(action))
+            if '' not in actions and action not in actions:
+                continue
+            behavior = srv6_manager_pb2.SRv6Behavior()
+            behavior.segment = '%s/%s' % (route.get_attr('RTA_DST'),
+                                          route['dst_len'])
+            behavior.action = action
+            self._route_to_entity(route, behavior, idx_to_interface)
+            nexthop = encap.get_attr('SEG6_LOCAL_NH6') or \
+                encap.get_attr('SEG6_LOCAL_NH4')
+            if nexthop is not None:
+                behavior.nexthop = nexthop
+            lookup_table = encap.get_attr('SEG6_LOCAL_TABLE') or \
+                encap.get_attr('SEG6_LOCAL_VRFTABLE')
+            if lookup_table is not None:
+                behavior.lookup_table = lookup_table
+            if encap.get_attr('SEG6_LOCAL_OIF') is not None:
+                behavior.interface = idx_to_interface.get(
+                    encap.get_attr('SEG6_LOCAL_OIF'), '')
+            srh = encap.get_attr('SEG6_LOCAL_SRH')
+            # Some pyroute2 versions do not decode the segments
+            if srh is not None and isinstance(srh.get('segs'), list):
+                # pyroute2 returns the segments in reverse order
+                for segment in reversed(srh['segs']):
+                    behavior.segs.add().segment = segment
+            result.append(behavior)
+        return result
+
+    @tracing.traced()
     def handle_srv6_path_request(self, operation, request, context):
         # pylint: disable=unused-argument
         """Handler for SRv6 paths"""
@@ -178,8 +336,13 @@ class SRv6ManagerLinux():
                                                'mode': path.encapmode,
                                                'segs': segments})
             elif operation == 'get':
+                # Retrieve the SRv6 paths matching the request
+                paths = self.get_srv6_paths(request.paths)
+                if paths is None:
+                    return srv6_manager_pb2.SRv6ManagerReply(
+                        status=commons_pb2.STATUS_NO_SUCH_PROCESS)
                 return srv6_manager_pb2.SRv6ManagerReply(
-                    status=commons_pb2.STATUS_OPERATION_NOT_SUPPORTED)
+                    status=commons_pb2.STATUS_SUCCESS, paths=paths)
             else:
                 # Operation unknown: this is a bug
                 LOGGER.error('Unrecognized operation: %s', operation)
@@ -254,7 +417,7 @@ class SRv6ManagerLinux():
             encap = {
                 'type': 'seg6local',
                 'action': 'End.X',
-                'nh4': nexthop
+                'nh6': nexthop
             }
             # Handle route
             self.ip_route.route(operation, family=AF_INET6,
@@ -334,7 +497,7 @@ class SRv6ManagerLinux():
             encap = {
                 'type': 'seg6local',
                 'action': 'End.DX2',
-                'oif': interface
+                'oif': self.interface_to_idx[interface]
             }
             # Handle route
             self.ip_route.route(operation, family=AF_INET6,
@@ -638,6 +801,7 @@ class SRv6ManagerLinux():
         LOGGER.error('BUG - Unrecognized operation: %s', operation)
         sys.exit(-1)
 
+    @tracing.traced()
     def handle_srv6_behavior_del_request(self, behavior):
         """Delete a route"""
 
@@ -655,6 +819,7 @@ class SRv6ManagerLinux():
         # Return success
         return commons_pb2.STATUS_SUCCESS
 
+    @tracing.traced()
     def handle_srv6_behavior_get_request(self, behavior):
         # pylint checks on this method are temporary disabled
         # pylint: disable=no-self-use, unused-argument
@@ -663,6 +828,7 @@ class SRv6ManagerLinux():
         LOGGER.info('get opertion not yet implemented\n')
         return commons_pb2.STATUS_OPERATION_NOT_SUPPORTED
 
+    @tracing.traced()
     def dispatch_srv6_behavior(self, operation, behavior):
         """Pass the request to the right handler"""
 
@@ -675,6 +841,7 @@ class SRv6ManagerLinux():
         LOGGER.error('Error: Unrecognized action: %s', behavior.action)
         return commons_pb2.STATUS_INVALID_ACTION
 
+    @tracing.traced()
     def handle_srv6_behavior_request(self, operation, request, context):
         # pylint: disable=unused-argument
         """Handler for SRv6 behaviors"""
@@ -682,15 +849,22 @@ class SRv6ManagerLinux():
         LOGGER.debug('config received:\n%s', request)
         # Let's process the request
         try:
+            if operation == 'get':
+                # Retrieve the SRv6 behaviors matching the request
+                behaviors = self.get_srv6_behaviors(request.behaviors)
+                if behaviors is None:
+                    return srv6_manager_pb2.SRv6ManagerReply(
+                        status=commons_pb2.STATUS_NO_SUCH_PROCESS)
+                return srv6_manager_pb2.SRv6ManagerReply(
+                    status=commons_pb2.STATUS_SUCCESS, behaviors=behaviors)
             for behavior in request.behaviors:
                 if operation == 'del':
                     res = self.handle_srv6_behavior_del_request(behavior)
-                    return srv6_manager_pb2.SRv6ManagerReply(status=res)
-                if operation == 'get':
-                    res = self.handle_srv6_behavior_get_request(behavior)
-                    return srv6_manager_pb2.SRv6ManagerReply(status=res)
-                # Pass the request to the right handler
-                res = self.dispatch_srv6_behavior(operation, behavior)
+                else:
+                    # Pass the request to the right handler
+                    res = self.dispatch_srv6_behavior(operation, behavior)
+                # Stop at the first error, otherwise process all the
+                # behaviors carried by the request
                 if res != commons_pb2.STATUS_SUCCESS:
                     return srv6_manager_pb2.SRv6ManagerReply(status=res)
             # and create the response
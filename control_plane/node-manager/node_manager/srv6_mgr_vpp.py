@@ -44,6 +44,9 @@ import sys
 
 # Proto dependencies
 import srv6_manager_pb2
+# Telemetry dependencies
+from telemetry import tracing
+from node_manager import metrics
 from node_manager.constants import STATUS_CODE
 
 # Folder containing this script
@@ -84,6 +87,9 @@ class SRv6ManagerVPP():
             'End.B6.Encaps': self.handle_end_b6_encaps_behavior_request,
         }
 
+    @tracing.traced('vppctl')
+    @metrics.timed(metrics.VPPCTL_DURATION,
+                   lambda self, cmd: ' '.join(cmd.split()[:2]))
     def exec_vpp_cmd(self, cmd):
         '''
         Helper function used to send a command to VPP through vppctl
@@ -138,6 +144,7 @@ class SRv6ManagerVPP():
         LOGGER.error('Unrecognized operation: %s', operation)
         sys.exit(-1)
 
+    @tracing.traced()
     def handle_srv6_policy_request(self, operation, request, context):
         '''
         This function is used to create, delete or change a SRv6 policy,
@@ -208,6 +215,7 @@ class SRv6ManagerVPP():
         LOGGER.error('Unrecognized operation: %s', operation)
         sys.exit(-1)
 
+    @tracing.traced()
     def handle_srv6_path_request(self, operation, request, context):
         '''
         Handler for SRv6 paths
@@ -916,6 +924,7 @@ class SRv6ManagerVPP():
         LOGGER.error('Error: Unrecognized action: %s', behavior.action)
         return STATUS_CODE['STATUS_INVALID_ACTION']
 
+    @tracing.traced()
     def handle_srv6_behavior_request(self, operation, request, context):
         # pylint: disable=unused-argument
         """Handler for SRv6 behaviors"""
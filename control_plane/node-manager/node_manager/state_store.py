@@ -0,0 +1,330 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Snapshot of the SRv6 entities applied by the node manager
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+"""On-disk snapshot of the SRv6 paths and behaviors applied by the node
+manager.
+
+The entities are stored in a compact canonical form, as an append-only
+log of JSON records ("add" or "del"). When the number of records exceeds
+the number of live entities by "compaction_threshold" records, the log
+is rewritten with one record for each live entity. After a restart, the
+snapshot is verified against the state of the forwarding engine and the
+entities no longer configured are dropped.
+
+The fingerprint of the entities is a hash of their canonical forms and
+it is computed in the same way by the controller
+(controller.srv6_reconciler.fingerprint): when the fingerprints match,
+the controller does not need to push the entities again.
+"""
+
+# General imports
+import hashlib
+import json
+import logging
+import os
+import threading
+from ipaddress import ip_address, ip_network
+
+# Logger reference
+LOGGER = logging.getLogger(__name__)
+
+# Default directory of the snapshot
+DEFAULT_STATE_DIR = '/var/lib/node-manager'
+# Default number of stale records that triggers a compaction of the log
+DEFAULT_COMPACTION_THRESHOLD = 1000
+# Name of the log file
+LOG_FILENAME = 'srv6_state.log'
+
+# Main routing table, used when the table is not specified
+RT_TABLE_MAIN = 254
+
+# Entity types
+PATH = 'path'
+BEHAVIOR = 'behavior'
+# Fields identifying an entity
+KEY_FIELDS = {
+    PATH: ('destination', 'table'),
+    BEHAVIOR: ('segment', 'table')
+}
+# Fields compared when they are specified
+COMPARED_FIELDS = {
+    PATH: ('segments', 'encapmode', 'device', 'metric'),
+    BEHAVIOR: ('action', 'nexthop', 'lookup_table', 'interface', 'segments',
+               'device', 'metric')
+}
+
+
+def _canonical_prefix(prefix):
+    """Return the canonical form of an IP address or prefix"""
+
+    if prefix == '':
+        return None
+    try:
+        return str(ip_network(prefix, strict=False))
+    except ValueError:
+        return prefix
+
+
+def _canonical_address(address):
+    """Return the canonical form of an IP address"""
+
+    if address == '':
+        return None
+    try:
+        return str(ip_address(address))
+    except ValueError:
+        return address
+
+
+def _canonical_table(table):
+    """Return the canonical form of a table ID (-1 means main table)"""
+
+    return RT_TABLE_MAIN if table in [-1, 0] else table
+
+
+def _canonical_int(value):
+    """Return the canonical form of an optional integer"""
+
+    return None if value == -1 else value
+
+
+def _canonical_segments(segments):
+    """Return the canonical form of a SID list"""
+
+    return [_canonical_address(segment.segment)
+            for segment in segments] or None
+
+
+def canonical_path(path):
+    """Return the canonical form of a gRPC SRv6 path"""
+
+    encapmode = path.encapmode
+    if encapmode in ['', 'encap.red']:
+        # "encap.red" routes are reported as "encap" routes by the kernel
+        encapmode = 'encap'
+    return {
+        'destination': _canonical_prefix(path.destination),
+        'table': _canonical_table(path.table),
+        'segments': _canonical_segments(path.sr_path),
+        'encapmode': encapmode,
+        'device': path.device or None,
+        'metric': _canonical_int(path.metric)
+    }
+
+
+def canonical_behavior(behavior):
+    """Return the canonical form of a gRPC SRv6 behavior"""
+
+    return {
+        'segment': _canonical_prefix(behavior.segment),
+        'table': _canonical_table(behavior.table),
+        'action': behavior.action or None,
+        'nexthop': _canonical_address(behavior.nexthop),
+        'lookup_table': _canonical_int(behavior.lookup_table),
+        'interface': behavior.interface or None,
+        'segments': _canonical_segments(behavior.segs),
+        'device': behavior.device or None,
+        'metric': _canonical_int(behavior.metric)
+    }
+
+
+# Functions returning the canonical form of each entity type
+CANONICAL_FORMS = {
+    PATH: canonical_path,
+    BEHAVIOR: canonical_behavior
+}
+
+
+def entity_key(kind, canonical):
+    """Return the key identifying an entity"""
+
+    return (kind,) + tuple(canonical[field] for field in KEY_FIELDS[kind])
+
+
+def fingerprint(entities):
+    """Return the fingerprint of a list of (kind, canonical) tuples"""
+
+    digests = sorted(
+        hashlib.sha1(json.dumps([kind, canonical], sort_keys=True,
+                                separators=(',', ':')).encode()).hexdigest()
+        for kind, canonical in entities)
+    return hashlib.sha256('\n'.join(digests).encode()).hexdigest()
+
+
+class StateStore:
+    """Append-only log of the SRv6 entities applied by the node manager"""
+
+    def __init__(self, directory=DEFAULT_STATE_DIR,
+                 compaction_threshold=DEFAULT_COMPACTION_THRESHOLD):
+        self.filename = os.path.join(directory, LOG_FILENAME)
+        self.compaction_threshold = compaction_threshold
+        # Entities (kind, canonical), indexed by forwarding engine and key
+        self._entities = dict()
+        # Forwarding engines whose entities have been verified
+        self._verified = set()
+        # Number of records in the log
+        self._records = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        self._file = open(self.filename, 'a')
+
+    def _load(self):
+        """Replay the log"""
+
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename) as infile:
+            for line in infile:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Truncated record, written during a crash
+                    LOGGER.warning('Skipping invalid record in %s',
+                                   self.filename)
+                    continue
+                self._apply(record)
+                self._records += 1
+        LOGGER.info('*** Loaded %s SRv6 entities from %s',
+                    sum(len(entities) for entities
+                        in self._entities.values()), self.filename)
+
+    def _apply(self, record):
+        """Apply a record to the entities"""
+
+        entities = self._entities.setdefault(record['fwd_engine'], dict())
+        key = entity_key(record['kind'], record['entity'])
+        if record['op'] == 'del':
+            entities.pop(key, None)
+        else:
+            entities[key] = (record['kind'], record['entity'])
+
+    def _write(self, records):
+        """Append records to the log and compact it if required"""
+
+        for record in records:
+            self._apply(record)
+            self._file.write(json.dumps(record, separators=(',', ':')) +
+                             '\n')
+        self._file.flush()
+        self._records += len(records)
+        live = sum(len(entities) for entities in self._entities.values())
+        if self._records - live > self.compaction_threshold:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the log with one record for each live entity"""
+
+        tmp_filename = self.filename + '.tmp'
+        records = 0
+        with open(tmp_filename, 'w') as outfile:
+            for fwd_engine, entities in self._entities.items():
+                for kind, canonical in entities.values():
+                    outfile.write(json.dumps(
+                        {'op': 'add', 'fwd_engine': fwd_engine,
+                         'kind': kind, 'entity': canonical},
+                        separators=(',', ':')) + '\n')
+                    records += 1
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        self._file.close()
+        os.replace(tmp_filename, self.filename)
+        self._file = open(self.filename, 'a')
+        LOGGER.debug('Compacted %s: %s records', self.filename, records)
+        self._records = records
+
+    def record(self, operation, kind, fwd_engine, entities):
+        """Record the entities of a successful add, change or del
+        request"""
+
+        op = 'del' if operation == 'del' else 'add'
+        with self._lock:
+            current = self._entities.get(fwd_engine, dict())
+            records = list()
+            for entity in entities:
+                canonical = CANONICAL_FORMS[kind](entity)
+                stored = current.get(entity_key(kind, canonical))
+                if op == 'del':
+                    # The request carries only the key of the entity
+                    if stored is None:
+                        continue
+                    canonical = stored[1]
+                elif operation == 'change' and stored is not None:
+                    # The request carries only the changed fields
+                    if kind == PATH and not entity.encapmode:
+                        canonical['encapmode'] = None
+                    canonical = dict(stored[1], **{
+                        field: value for field, value in canonical.items()
+                        if value is not None})
+                records.append({'op': op, 'fwd_engine': fwd_engine,
+                                'kind': kind, 'entity': canonical})
+            self._write(records)
+
+    def verify(self, fwd_engine, paths, behaviors):
+        """Verify the entities of a forwarding engine against the paths
+        and behaviors configured on it; the entities no longer configured
+        are dropped from the snapshot"""
+
+        state = dict()
+        for kind, entities in ((PATH, paths), (BEHAVIOR, behaviors)):
+            for entity in entities:
+                canonical = CANONICAL_FORMS[kind](entity)
+                state[entity_key(kind, canonical)] = canonical
+        with self._lock:
+            records = list()
+            for key, (kind, canonical) in list(
+                    self._entities.get(fwd_engine, dict()).items()):
+                current = state.get(key)
+                # Only the fields specified in the request are compared
+                if current is None or any(
+                        canonical[field] is not None and
+                        canonical[field] != current[field]
+                        for field in COMPARED_FIELDS[kind]):
+                    records.append({'op': 'del', 'fwd_engine': fwd_engine,
+                                    'kind': kind, 'entity': canonical})
+            self._write(records)
+            self._verified.add(fwd_engine)
+        if records:
+            LOGGER.warning('*** %s SRv6 entities of the snapshot are not '
+                           'configured', len(records))
+        return not records
+
+    def fingerprint(self, fwd_engine):
+        """Return the fingerprint and the number of paths and behaviors of
+        a forwarding engine (the fingerprint is None if the entities have
+        not been verified)"""
+
+        with self._lock:
+            entities = list(self._entities.get(fwd_engine, dict()).values())
+            verified = fwd_engine in self._verified
+        paths = sum(kind == PATH for kind, _ in entities)
+        return (fingerprint(entities) if verified else None, paths,
+                len(entities) - paths)
+
+    def close(self):
+        """Close the log"""
+
+        with self._lock:
+            self._file.close()
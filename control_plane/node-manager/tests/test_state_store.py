@@ -0,0 +1,159 @@
+#!/usr/bin/python
+
+import pytest
+import srv6_manager_pb2
+
+from node_manager import state_store
+
+FWD_ENGINE = 0
+
+
+def path(destination, segments=(), **kwargs):
+    # Unspecified table and metric, as sent by the controller
+    kwargs.setdefault('table', -1)
+    kwargs.setdefault('metric', -1)
+    _path = srv6_manager_pb2.SRv6Path(destination=destination, **kwargs)
+    for segment in segments:
+        _path.sr_path.add(segment=segment)
+    return _path
+
+
+def behavior(segment, action='', **kwargs):
+    kwargs.setdefault('table', -1)
+    kwargs.setdefault('metric', -1)
+    return srv6_manager_pb2.SRv6Behavior(segment=segment, action=action,
+                                         **kwargs)
+
+
+def entities(store, fwd_engine=FWD_ENGINE):
+    # pylint: disable=protected-access
+    return sorted(store._entities.get(fwd_engine, dict()).values(),
+                  key=str)
+
+
+def records(store):
+    with open(store.filename) as infile:
+        return len(infile.readlines())
+
+
+def test_record_and_replay(tmp_path):
+    store = state_store.StateStore(str(tmp_path))
+    store.record('add', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:1::/64', ['fcff:2::100'], encapmode='inline'),
+                  path('fd00:2::/64', ['fcff:3::100'])])
+    store.record('add', state_store.BEHAVIOR, FWD_ENGINE,
+                 [behavior('fcff:1::100', 'End.DT6', lookup_table=254)])
+    store.record('del', state_store.PATH, FWD_ENGINE, [path('fd00:2::/64')])
+    expected = entities(store)
+    assert len(expected) == 2
+    store.close()
+    # The entities are replayed from the log after a restart
+    store = state_store.StateStore(str(tmp_path))
+    assert entities(store) == expected
+    store.close()
+
+
+def test_truncated_record(tmp_path):
+    store = state_store.StateStore(str(tmp_path))
+    store.record('add', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:1::/64', ['fcff:2::100'])])
+    store.close()
+    with open(store.filename, 'a') as outfile:
+        outfile.write('{"op":"add","fwd_')
+    store = state_store.StateStore(str(tmp_path))
+    assert len(entities(store)) == 1
+    store.close()
+
+
+def test_del_unknown_key(tmp_path):
+    store = state_store.StateStore(str(tmp_path))
+    store.record('del', state_store.PATH, FWD_ENGINE, [path('fd00:1::/64')])
+    assert not entities(store)
+    assert records(store) == 0
+    store.close()
+
+
+def test_change_merges_fields(tmp_path):
+    store = state_store.StateStore(str(tmp_path))
+    store.record('add', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:1::/64', ['fcff:2::100'], encapmode='inline',
+                       device='eth0')])
+    store.record('change', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:1::/64', ['fcff:3::100'])])
+    [(_, canonical)] = entities(store)
+    # The fields not carried by the request are preserved
+    assert canonical['segments'] == ['fcff:3::100']
+    assert (canonical['encapmode'], canonical['device']) == \
+        ('inline', 'eth0')
+    store.close()
+
+
+def test_compaction(tmp_path):
+    store = state_store.StateStore(str(tmp_path), compaction_threshold=2)
+    store.record('add', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:1::/64', ['fcff:2::100'])])
+    for _ in range(2):
+        store.record('add', state_store.PATH, FWD_ENGINE,
+                     [path('fd00:2::/64', ['fcff:3::100'])])
+        store.record('del', state_store.PATH, FWD_ENGINE,
+                     [path('fd00:2::/64')])
+    # 5 records, 1 live entity: the log has been compacted
+    assert records(store) == 1
+    store.record('add', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:3::/64', ['fcff:4::100'])])
+    expected = entities(store)
+    store.close()
+    store = state_store.StateStore(str(tmp_path))
+    assert entities(store) == expected
+    store.close()
+
+
+def test_verify(tmp_path):
+    store = state_store.StateStore(str(tmp_path))
+    store.record('add', state_store.PATH, FWD_ENGINE,
+                 [path('fd00:1::/64', ['fcff:2::100']),
+                  path('fd00:2::/64', ['fcff:3::100']),
+                  path('fd00:3::/64', ['fcff:4::100'])])
+    # Not verified yet
+    assert store.fingerprint(FWD_ENGINE) == (None, 3, 0)
+    # A path is missing and the segments of another one have changed; the
+    # fields not specified in the request are not compared
+    assert not store.verify(
+        FWD_ENGINE,
+        [path('fd00:1::/64', ['fcff:2::100'], device='eth0', metric=1024),
+         path('fd00:2::/64', ['fcff:5::100'])], [])
+    assert [canonical['destination']
+            for _, canonical in entities(store)] == ['fd00:1::/64']
+    assert store.fingerprint(FWD_ENGINE)[1:] == (1, 0)
+    assert store.verify(FWD_ENGINE, [path('fd00:1::/64', ['fcff:2::100'])],
+                        [])
+    store.close()
+
+
+def test_fingerprint_matches_controller(tmp_path):
+    srv6_reconciler = pytest.importorskip('controller.srv6_reconciler')
+    srv6_utils = pytest.importorskip('controller.srv6_utils')
+    docs = [
+        (srv6_reconciler.PATH,
+         {'destination': 'fd00:1::/64', 'segments': ['fcff:2::100'],
+          'encapmode': 'inline', 'device': None, 'table': None,
+          'metric': 100}),
+        (srv6_reconciler.BEHAVIOR,
+         {'segment': 'fcff:1::100', 'action': 'End.DT6',
+          'lookup_table': 254, 'device': 'eth0', 'table': None,
+          'nexthop': None, 'interface': None, 'segments': None,
+          'metric': None})]
+    intents = [srv6_reconciler.Intent(kind, doc) for kind, doc in docs]
+    # Entities pushed by the reconciler
+    store = state_store.StateStore(str(tmp_path))
+    _path = srv6_manager_pb2.SRv6Path()
+    srv6_utils.fill_srv6_path(_path, docs[0][1])
+    _behavior = srv6_manager_pb2.SRv6Behavior()
+    srv6_utils.fill_srv6_behavior(_behavior, docs[1][1])
+    store.record('add', state_store.PATH, FWD_ENGINE, [_path])
+    store.record('add', state_store.BEHAVIOR, FWD_ENGINE, [_behavior])
+    store.verify(FWD_ENGINE, [_path], [_behavior])
+    assert store.fingerprint(FWD_ENGINE) == (
+        srv6_reconciler.fingerprint([(intent.kind, intent.canonical)
+                                     for intent in intents]), 1, 1)
+    store.close()
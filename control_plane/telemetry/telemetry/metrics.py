@@ -0,0 +1,545 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Metrics shared by the controller and the node manager
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Metrics exposed in the Prometheus text format, shared by the controller
+and the node manager.
+
+This module implements counters, gauges and histograms, the gRPC
+interceptors recording the latency of the RPCs and the HTTP server
+exposing the metrics. The metrics themselves (names, labels) and the
+configuration are defined by the controller (:mod:`controller.metrics`)
+and by the node manager (:mod:`node_manager.metrics`).
+
+The metrics are disabled by default; they are enabled by setting
+ENABLE_METRICS. When the metrics are disabled, the instrumentation
+functions return immediately.
+
+Counters, gauges and histograms are updated without locks: each thread
+updates its own shard of the values and the shards are summed when the
+metrics are collected.
+"""
+
+# General imports
+import bisect
+import functools
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from socket import AF_INET6
+
+# gRPC dependencies
+import grpc
+
+# Global variables definition
+#
+#
+# Logger reference
+logger = logging.getLogger(__name__)
+
+# Define whether to collect the metrics or not (set by the controller and
+# the node manager according to their configuration)
+ENABLE_METRICS = False
+# Default IP address of the HTTP server exposing the metrics
+DEFAULT_METRICS_IP = '::'
+
+# Default buckets of the histograms (in seconds)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Content type of the Prometheus text format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Metrics registered, in order of creation
+REGISTRY = list()
+
+
+class _ShardedValues:
+    """
+    A fixed-size array of values updated without locks. Each thread
+    updates its own shard; :meth:`values` returns the sum of the shards.
+
+    :param size: Number of values.
+    :type size: int
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._local = threading.local()
+        self._shards = list()
+
+    def shard(self):
+        """
+        Return the shard of the calling thread.
+        """
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0] * self.size
+            self._local.shard = shard
+            # list.append is atomic
+            self._shards.append(shard)
+            return shard
+
+    def values(self):
+        """
+        Return the sum of the shards.
+        """
+        values = [0] * self.size
+        for shard in list(self._shards):
+            for index, value in enumerate(shard):
+                values[index] += value
+        return values
+
+
+class _CounterChild:
+    """
+    A counter with a given set of label values.
+    """
+
+    def __init__(self):
+        self._values = _ShardedValues(1)
+
+    def inc(self, amount=1):
+        """
+        Increment the counter.
+        """
+        self._values.shard()[0] += amount
+
+    def samples(self, name, labels):
+        """
+        Return the samples of the counter.
+        """
+        return [(name, labels, self._values.values()[0])]
+
+
+class _GaugeChild(_CounterChild):
+    """
+    A gauge with a given set of label values. The gauge can be
+    incremented by a thread and decremented by another one.
+    """
+
+    def dec(self, amount=1):
+        """
+        Decrement the gauge.
+        """
+        self._values.shard()[0] -= amount
+
+
+class _HistogramChild:
+    """
+    A histogram with a given set of label values.
+
+    :param buckets: Upper bounds of the buckets (sorted).
+    :type buckets: tuple
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One value for each bucket, one for +Inf and one for the sum
+        self._values = _ShardedValues(len(buckets) + 2)
+
+    def observe(self, value):
+        """
+        Observe a value.
+        """
+        shard = self._values.shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def samples(self, name, labels):
+        """
+        Return the samples of the histogram (cumulative buckets, sum and
+        count).
+        """
+        values = self._values.values()
+        samples = list()
+        count = 0
+        for bound, value in zip(self.buckets + (float('inf'),), values):
+            count += value
+            samples.append((name + '_bucket',
+                            labels + (('le', _format_value(bound)),), count))
+        samples.append((name + '_sum', labels, values[-1]))
+        samples.append((name + '_count', labels, count))
+        return samples
+
+
+class _Metric:
+    """
+    A metric family: a set of children, one for each combination of label
+    values.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param documentation: The help text of the metric.
+    :type documentation: str
+    :param labelnames: The names of the labels.
+    :type labelnames: tuple, optional
+    :param registry: The list where the metric is registered (default:
+                     REGISTRY).
+    :type registry: list, optional
+    """
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = dict()
+        registry.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *labelvalues):
+        """
+        Return the child of the metric for the given label values.
+        """
+        child = self._children.get(labelvalues)
+        if child is None:
+            # dict.setdefault is atomic: concurrent threads get the same
+            # child
+            child = self._children.setdefault(labelvalues,
+                                              self._new_child())
+        return child
+
+    def collect(self):
+        """
+        Return the samples of the metric.
+        """
+        samples = list()
+        for labelvalues, child in sorted(self._children.items()):
+            samples += child.samples(
+                self.name, tuple(zip(self.labelnames, labelvalues)))
+        return samples
+
+
+class Counter(_Metric):
+    """
+    A counter.
+    """
+
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    """
+    A gauge.
+    """
+
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    """
+    A histogram.
+
+    :param buckets: Upper bounds of the buckets.
+    :type buckets: tuple, optional
+    """
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=REGISTRY, buckets=DEFAULT_BUCKETS):
+        # pylint: disable=too-many-arguments
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+def _format_value(value):
+    """
+    Format a value for the Prometheus text format.
+    """
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return '%.1f' % value
+    return repr(value)
+
+
+def _escape(value):
+    """
+    Escape a label value.
+    """
+    return str(value).replace('\\', r'\\').replace('\n', r'\n') \
+        .replace('"', r'\"')
+
+
+def generate_latest(registry=None):
+    """
+    Return the metrics in the Prometheus text format.
+
+    :param registry: The metrics (default: all the metrics).
+    :type registry: list, optional
+    :rtype: str
+    """
+    lines = list()
+    for metric in registry if registry is not None else REGISTRY:
+        lines.append('# HELP %s %s' % (metric.name, metric.documentation))
+        lines.append('# TYPE %s %s' % (metric.name, metric.type_name))
+        for name, labels, value in metric.collect():
+            if labels:
+                name += '{%s}' % ','.join('%s="%s"' % (key, _escape(val))
+                                          for key, val in labels)
+            lines.append('%s %s' % (name, _format_value(value)))
+    return '\n'.join(lines) + '\n'
+
+
+def timed(histogram, label=None):
+    """
+    Decorator recording the execution time of a function in a histogram
+    with one label. The label value is the name of the function, unless
+    "label" is provided; "label" can also be a function called with the
+    arguments of the decorated function.
+    """
+    def decorator(func):
+        label_func = label
+        if not callable(label_func):
+            child_label = label if label is not None else func.__name__
+
+            def label_func(*args, **kwargs):
+                # pylint: disable=unused-argument
+                return child_label
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLE_METRICS:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.labels(label_func(*args, **kwargs)).observe(
+                    time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _wrap_rpc_method_handler(handler, duration, in_flight, errors):
+    """
+    Wrap the behavior of a RPC method handler in order to record latency,
+    in-flight count and errors.
+    """
+    def wrap_unary_response(behavior):
+        def wrapper(request_or_iterator, context):
+            start = time.perf_counter()
+            in_flight.inc()
+            try:
+                return behavior(request_or_iterator, context)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                in_flight.dec()
+                duration.observe(time.perf_counter() - start)
+        return wrapper
+
+    def wrap_stream_response(behavior):
+        def wrapper(request_or_iterator, context):
+            start = time.perf_counter()
+            in_flight.inc()
+            try:
+                for response in behavior(request_or_iterator, context):
+                    yield response
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                in_flight.dec()
+                duration.observe(time.perf_counter() - start)
+        return wrapper
+
+    if handler.unary_unary is not None:
+        return grpc.unary_unary_rpc_method_handler(
+            wrap_unary_response(handler.unary_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer)
+    if handler.unary_stream is not None:
+        return grpc.unary_stream_rpc_method_handler(
+            wrap_stream_response(handler.unary_stream),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer)
+    if handler.stream_unary is not None:
+        return grpc.stream_unary_rpc_method_handler(
+            wrap_unary_response(handler.stream_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer)
+    return grpc.stream_stream_rpc_method_handler(
+        wrap_stream_response(handler.stream_stream),
+        request_deserializer=handler.request_deserializer,
+        response_serializer=handler.response_serializer)
+
+
+class ServerMetricsInterceptor(grpc.ServerInterceptor):
+    """
+    Server interceptor recording latency, in-flight count and errors of
+    the RPCs. The metrics have one label, the method of the RPC.
+
+    :param duration: Histogram of the latency of the RPCs.
+    :type duration: Histogram
+    :param in_flight: Gauge of the RPCs in progress.
+    :type in_flight: Gauge
+    :param errors: Counter of the RPCs raising an exception.
+    :type errors: Counter
+    """
+
+    def __init__(self, duration, in_flight, errors):
+        self.duration = duration
+        self.in_flight = in_flight
+        self.errors = errors
+        # Wrapped handlers, indexed by method and handler
+        self._handlers = dict()
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or not ENABLE_METRICS:
+            return handler
+        method = handler_call_details.method
+        wrapped = self._handlers.get((method, handler))
+        if wrapped is None:
+            wrapped = _wrap_rpc_method_handler(
+                handler, self.duration.labels(method),
+                self.in_flight.labels(method), self.errors.labels(method))
+            self._handlers[(method, handler)] = wrapped
+        return wrapped
+
+
+class ClientMetricsInterceptor(grpc.UnaryUnaryClientInterceptor,
+                               grpc.UnaryStreamClientInterceptor):
+    """
+    Client interceptor recording the latency of the RPCs sent to a node.
+
+    :param duration: Histogram of the latency of the RPCs, with two
+                     labels: the node and the method of the RPC.
+    :type duration: Histogram
+    :param node: The node (e.g. "address:port").
+    :type node: str
+    """
+
+    def __init__(self, duration, node):
+        self.duration = duration
+        self.node = node
+
+    def _intercept(self, continuation, client_call_details, request):
+        start = time.perf_counter()
+        call = continuation(client_call_details, request)
+        child = self.duration.labels(self.node, client_call_details.method)
+        # The callback is invoked immediately if the RPC is completed
+        call.add_done_callback(
+            lambda _: child.observe(time.perf_counter() - start))
+        return call
+
+    def intercept_unary_unary(self, continuation, client_call_details,
+                              request):
+        return self._intercept(continuation, client_call_details, request)
+
+    def intercept_unary_stream(self, continuation, client_call_details,
+                               request):
+        return self._intercept(continuation, client_call_details, request)
+
+
+def intercept_channel(channel, duration, node):
+    """
+    Return a channel recording the latency of the RPCs sent to a node in
+    the histogram "duration", or the channel itself if the metrics are
+    disabled.
+    """
+    if not ENABLE_METRICS:
+        return channel
+    return grpc.intercept_channel(channel,
+                                  ClientMetricsInterceptor(duration, node))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler serving the metrics.
+    """
+
+    def do_GET(self):    # pylint: disable=invalid-name
+        """
+        Serve the metrics.
+        """
+        if self.path.split('?')[0] not in ['/', '/metrics']:
+            self.send_error(404)
+            return
+        output = generate_latest().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(output)))
+        self.end_headers()
+        self.wfile.write(output)
+
+    def log_message(self, format, *args):
+        # pylint: disable=redefined-builtin
+        logger.debug('Metrics request: ' + format, *args)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server handling each request in a thread.
+    """
+
+    daemon_threads = True
+
+
+def start_http_server(port, address=DEFAULT_METRICS_IP):
+    """
+    Start a HTTP server exposing the metrics in a daemon thread.
+
+    :param port: The port of the HTTP server (0 to choose a free port).
+    :type port: int
+    :param address: The address of the HTTP server.
+    :type address: str, optional
+    :return: The HTTP server.
+    :rtype: http.server.HTTPServer
+    """
+    server_class = _ThreadingHTTPServer
+    if ':' in address:
+        # IPv6 address
+        server_class = type('_ThreadingHTTPServerV6',
+                            (_ThreadingHTTPServer,),
+                            {'address_family': AF_INET6})
+    server = server_class((address, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever,
+                              name='metrics-http-server', daemon=True)
+    thread.start()
+    logger.info('*** Metrics exposed on http://%s:%s/metrics',
+                address if ':' not in address else '[%s]' % address,
+                server.server_address[1])
+    return server
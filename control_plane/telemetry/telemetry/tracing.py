@@ -0,0 +1,529 @@
+#!/usr/bin/python
+
+##########################################################################
+# Copyright (C) 2020 Carmine Scarpitta
+# (Consortium GARR and University of Rome "Tor Vergata")
+# www.garr.it - www.uniroma2.it/netgroup
+#
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Tracing and profiling shared by the controller and the node manager
+#
+# @author Carmine Scarpitta <carmine.scarpitta@uniroma2.it>
+#
+
+
+"""
+Tracing and profiling, shared by the controller and the node manager.
+
+A trace is a tree of spans; each span records the execution time of an
+operation (e.g. a northbound RPC, a function of the controller, a
+southbound RPC, a netlink operation on a node). The current span is
+stored in a context variable, so that the spans opened by nested calls
+become its children.
+
+The trace is propagated in the metadata of the RPCs
+(:data:`TRACE_ID_KEY`, :data:`PARENT_SPAN_ID_KEY`): the controller
+propagates its traces to the nodes and the node manager continues the
+trace received from the controller. In the same way, the northbound RPCs
+can carry a trace started by the caller.
+
+A RPC can also request to be profiled, by setting :data:`PROFILE_KEY` in
+its metadata to 'cprofile' or 'pyinstrument' (sampling profiler, optional
+dependency). The profile is saved to PROFILING_DIR and the request is
+propagated to the nodes. Profiling must be enabled by setting
+ENABLE_PROFILING.
+
+When a trace is completed, it is logged and, if TRACING_FILE is set,
+appended to TRACING_FILE as a JSON line.
+
+The tracing and the profiling are disabled by default; the settings are
+applied by the controller (:mod:`controller.tracing`) and by the node
+manager according to their configuration.
+"""
+
+# General imports
+import contextlib
+import contextvars
+import cProfile
+import functools
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+# gRPC dependencies
+import grpc
+
+# Global variables definition
+#
+#
+# Logger reference
+logger = logging.getLogger(__name__)
+
+# Define whether to enable the tracing or not
+ENABLE_TRACING = False
+# Fraction of the traces started by this process that are recorded
+# (traces received from the callers are always recorded)
+TRACING_SAMPLE_RATE = 1.0
+# File where the traces are appended as JSON lines (optional)
+TRACING_FILE = None
+# Define whether the RPCs can request to be profiled or not
+ENABLE_PROFILING = False
+# Directory where the profiles are saved
+PROFILING_DIR = os.path.join(tempfile.gettempdir(), 'profiles')
+
+# Metadata keys
+TRACE_ID_KEY = 'x-trace-id'
+PARENT_SPAN_ID_KEY = 'x-parent-span-id'
+PROFILE_KEY = 'x-profile'
+# Supported profilers
+PROFILERS = ('cprofile', 'pyinstrument')
+
+# Current span
+_CURRENT_SPAN = contextvars.ContextVar('current_span', default=None)
+# Profiler requested for the current RPC
+_CURRENT_PROFILER = contextvars.ContextVar('current_profiler', default=None)
+# Marker of a trace that is not recorded
+_NOT_SAMPLED = object()
+
+# Lock protecting the tracing file
+_file_lock = threading.Lock()
+
+
+def _new_id(bits=64):
+    """
+    Return a random identifier, as an hex string.
+    """
+    return '%0*x' % (bits // 4, random.getrandbits(bits))
+
+
+class Span:
+    """
+    An operation of a trace.
+
+    :param name: The name of the operation.
+    :type name: str
+    :param trace_id: The ID of the trace.
+    :type trace_id: str
+    :param parent_id: The ID of the parent span (None for a root span).
+    :type parent_id: str
+    :param spans: The list where the spans of the trace are collected.
+    :type spans: list
+    :param local_root: True if the span is the root of the trace in this
+                       process.
+    :type local_root: bool, optional
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, name, trace_id, parent_id, spans, local_root=False):
+        # pylint: disable=too-many-arguments
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.attributes = dict()
+        self.start_time = time.time()
+        self.duration = None
+        self.local_root = local_root
+        self._spans = spans
+        self._start = time.perf_counter()
+
+    def set_attribute(self, key, value):
+        """
+        Set an attribute of the span.
+        """
+        self.attributes[key] = value
+
+    def finish(self):
+        """
+        Record the duration of the span and add it to the trace.
+        """
+        self.duration = time.perf_counter() - self._start
+        # list.append is atomic
+        self._spans.append(self)
+
+    def to_dict(self):
+        """
+        Return the span as a dict.
+        """
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'attributes': self.attributes
+        }
+
+
+def _log_trace(spans):
+    """
+    Log a completed trace, as a tree of spans.
+    """
+    children = dict()
+    for entry in sorted(spans, key=lambda entry: entry.start_time):
+        children.setdefault(entry.parent_id, list()).append(entry)
+    span_ids = set(entry.span_id for entry in spans)
+    lines = ['*** Trace %s' % spans[-1].trace_id]
+
+    def add_lines(entry, depth):
+        lines.append('%s%s %.3f ms%s' % (
+            '  ' * depth, entry.name, entry.duration * 1000,
+            ''.join(' %s=%s' % item for item in entry.attributes.items())))
+        for child in children.get(entry.span_id, list()):
+            add_lines(child, depth + 1)
+    # The roots are the spans whose parent is not in this process
+    for parent_id, roots in children.items():
+        if parent_id not in span_ids:
+            for root in roots:
+                add_lines(root, 1)
+    logger.info('\n'.join(lines))
+
+
+def _write_trace(spans):
+    """
+    Append a completed trace to the tracing file.
+    """
+    if TRACING_FILE is None:
+        return
+    line = json.dumps({'trace_id': spans[-1].trace_id,
+                       'spans': [entry.to_dict() for entry in spans]})
+    with _file_lock:
+        with open(TRACING_FILE, 'a') as outfile:
+            outfile.write(line + '\n')
+
+
+# Functions called with the list of the spans of each completed trace
+EXPORTERS = [_log_trace, _write_trace]
+
+
+def start_span(name, trace_id=None, parent_id=None):
+    """
+    Start a span, child of the current span. The span is not made current.
+    If there is no current span, a new trace is started, continuing the
+    remote trace "trace_id" (if provided).
+
+    :return: The span, or None if the trace is not recorded.
+    :rtype: Span
+    """
+    parent = _CURRENT_SPAN.get()
+    if parent is _NOT_SAMPLED:
+        return None
+    if parent is not None:
+        # pylint: disable=protected-access
+        return Span(name, parent.trace_id, parent.span_id, parent._spans)
+    # Sample the traces started by this process
+    if trace_id is None and random.random() >= TRACING_SAMPLE_RATE:
+        return None
+    return Span(name, trace_id or _new_id(128), parent_id, list(),
+                local_root=True)
+
+
+def finish_span(current):
+    """
+    Finish a span. If the span is the root of the trace in this process,
+    the trace is exported.
+    """
+    # pylint: disable=protected-access
+    current.finish()
+    if current.local_root:
+        for exporter in EXPORTERS:
+            try:
+                exporter(list(current._spans))
+            except Exception:    # pylint: disable=broad-except
+                logger.exception('Cannot export the trace %s',
+                                 current.trace_id)
+
+
+@contextlib.contextmanager
+def span(name, trace_id=None, parent_id=None, **attributes):
+    """
+    Context manager recording a span and making it current. It yields the
+    span, or None if the tracing is disabled or the trace is not recorded.
+    """
+    if not ENABLE_TRACING:
+        yield None
+        return
+    current = start_span(name, trace_id, parent_id)
+    # Even when the trace is not recorded, the marker is set so that the
+    # nested operations do not start new traces
+    token = _CURRENT_SPAN.set(current if current is not None
+                              else _NOT_SAMPLED)
+    try:
+        if current is not None:
+            current.attributes.update(attributes)
+        yield current
+    except Exception as err:
+        if current is not None:
+            current.set_attribute('error', type(err).__name__)
+        raise
+    finally:
+        _CURRENT_SPAN.reset(token)
+        if current is not None:
+            finish_span(current)
+
+
+def traced(name=None):
+    """
+    Decorator recording a span for each call of a function. The name of
+    the span is "module.function", unless "name" is provided.
+    """
+    def decorator(func):
+        span_name = name
+        if span_name is None:
+            span_name = '%s.%s' % (func.__module__.rsplit('.', 1)[-1],
+                                   func.__qualname__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLE_TRACING:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextlib.contextmanager
+def profiling(profiler='cprofile'):
+    """
+    Context manager requesting the southbound RPCs sent in the context to
+    be profiled by the nodes.
+    """
+    if profiler not in PROFILERS:
+        raise ValueError('Unknown profiler: %s' % profiler)
+    token = _CURRENT_PROFILER.set(profiler)
+    try:
+        yield
+    finally:
+        _CURRENT_PROFILER.reset(token)
+
+
+def _profile_filename(trace_id, method, extension):
+    """
+    Return the path of the file where a profile is saved.
+    """
+    method = re.sub(r'[^A-Za-z0-9_.]+', '_', method).strip('_')
+    return os.path.join(PROFILING_DIR, '%s-%s-%s.%s' % (
+        time.strftime('%Y%m%d-%H%M%S'), trace_id or _new_id(), method,
+        extension))
+
+
+def run_profiled(profiler, trace_id, method, func, *args):
+    """
+    Run a function under a profiler and save the profile to PROFILING_DIR.
+    If the profiler is not available, the function is executed anyway.
+    """
+    os.makedirs(PROFILING_DIR, exist_ok=True)
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning('pyinstrument is not installed: cannot profile '
+                           '%s', method)
+            return func(*args)
+        profile = Profiler()
+        profile.start()
+        try:
+            return func(*args)
+        finally:
+            profile.stop()
+            filename = _profile_filename(trace_id, method, 'txt')
+            with open(filename, 'w') as outfile:
+                outfile.write(profile.output_text())
+            logger.info('*** Profile of %s saved to %s', method, filename)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler is active in this thread
+        logger.warning('Cannot profile %s: another profiler is active',
+                       method)
+        return func(*args)
+    try:
+        return func(*args)
+    finally:
+        profile.disable()
+        filename = _profile_filename(trace_id, method, 'prof')
+        profile.dump_stats(filename)
+        logger.info('*** Profile of %s saved to %s', method, filename)
+
+
+def _wrap_rpc_method_handler(handler, method):
+    """
+    Wrap the behavior of a RPC method handler in order to continue the
+    trace received in the metadata and to run the profiler requested in
+    the metadata.
+    """
+    def parse_metadata(context):
+        metadata = dict(context.invocation_metadata())
+        profiler = metadata.get(PROFILE_KEY)
+        if not ENABLE_PROFILING or profiler not in PROFILERS:
+            profiler = None
+        return (metadata.get(TRACE_ID_KEY), metadata.get(PARENT_SPAN_ID_KEY),
+                profiler)
+
+    def wrap_unary_response(behavior):
+        def wrapper(request_or_iterator, context):
+            trace_id, parent_id, profiler = parse_metadata(context)
+            token = _CURRENT_PROFILER.set(profiler)
+            try:
+                with span(method, trace_id, parent_id) as current:
+                    if profiler is None:
+                        return behavior(request_or_iterator, context)
+                    return run_profiled(
+                        profiler, current.trace_id if current else trace_id,
+                        method, behavior, request_or_iterator, context)
+            finally:
+                _CURRENT_PROFILER.reset(token)
+        return wrapper
+
+    def wrap_stream_response(behavior):
+        def wrapper(request_or_iterator, context):
+            trace_id, parent_id, _ = parse_metadata(context)
+            # The generator can be resumed in different contexts: the span
+            # is handled in a context owned by the generator
+            ctx = contextvars.copy_context()
+            manager = span(method, trace_id, parent_id)
+            ctx.run(manager.__enter__)
+            try:
+                iterator = ctx.run(behavior, request_or_iterator, context)
+                while True:
+                    try:
+                        response = ctx.run(next, iterator)
+                    except StopIteration:
+                        break
+                    yield response
+            except BaseException as err:
+                ctx.run(manager.__exit__, type(err), err, err.__traceback__)
+                raise
+            ctx.run(manager.__exit__, None, None, None)
+        return wrapper
+
+    if handler.unary_unary is not None:
+        return grpc.unary_unary_rpc_method_handler(
+            wrap_unary_response(handler.unary_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer)
+    if handler.unary_stream is not None:
+        return grpc.unary_stream_rpc_method_handler(
+            wrap_stream_response(handler.unary_stream),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer)
+    if handler.stream_unary is not None:
+        return grpc.stream_unary_rpc_method_handler(
+            wrap_unary_response(handler.stream_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer)
+    return grpc.stream_stream_rpc_method_handler(
+        wrap_stream_response(handler.stream_stream),
+        request_deserializer=handler.request_deserializer,
+        response_serializer=handler.response_serializer)
+
+
+class ServerTracingInterceptor(grpc.ServerInterceptor):
+    """
+    Server interceptor recording a span for each RPC served and
+    running the profiler requested in the metadata.
+    """
+
+    def __init__(self):
+        # Wrapped handlers, indexed by method and handler
+        self._handlers = dict()
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or not (ENABLE_TRACING or ENABLE_PROFILING):
+            return handler
+        method = handler_call_details.method
+        wrapped = self._handlers.get((method, handler))
+        if wrapped is None:
+            wrapped = _wrap_rpc_method_handler(handler, method)
+            self._handlers[(method, handler)] = wrapped
+        return wrapped
+
+
+class _ClientCallDetails(
+        namedtuple('_ClientCallDetails',
+                   ('method', 'timeout', 'metadata', 'credentials',
+                    'wait_for_ready', 'compression')),
+        grpc.ClientCallDetails):
+    """
+    Details of a southbound RPC, with the metadata updated.
+    """
+
+
+class ClientTracingInterceptor(grpc.UnaryUnaryClientInterceptor,
+                               grpc.UnaryStreamClientInterceptor):
+    """
+    Client interceptor recording a span for each southbound RPC sent to a
+    node and propagating the trace and the profiling request in the
+    metadata.
+
+    :param node: The node (e.g. "address:port").
+    :type node: str
+    """
+
+    def __init__(self, node):
+        self.node = node
+
+    def _intercept(self, continuation, client_call_details, request):
+        current = None
+        if ENABLE_TRACING:
+            current = start_span(client_call_details.method)
+        profiler = _CURRENT_PROFILER.get()
+        if current is None and profiler is None:
+            return continuation(client_call_details, request)
+        metadata = list(client_call_details.metadata or ())
+        if current is not None:
+            current.set_attribute('node', self.node)
+            metadata.append((TRACE_ID_KEY, current.trace_id))
+            metadata.append((PARENT_SPAN_ID_KEY, current.span_id))
+        if profiler is not None:
+            metadata.append((PROFILE_KEY, profiler))
+        call = continuation(_ClientCallDetails(
+            client_call_details.method, client_call_details.timeout,
+            metadata, client_call_details.credentials,
+            client_call_details.wait_for_ready,
+            client_call_details.compression), request)
+        if current is not None:
+            # The callback is invoked immediately if the RPC is completed
+            call.add_done_callback(lambda _: finish_span(current))
+        return call
+
+    def intercept_unary_unary(self, continuation, client_call_details,
+                              request):
+        return self._intercept(continuation, client_call_details, request)
+
+    def intercept_unary_stream(self, continuation, client_call_details,
+                               request):
+        return self._intercept(continuation, client_call_details, request)
+
+
+def intercept_channel(channel, node):
+    """
+    Return a channel propagating the traces to a node, or the channel
+    itself if the tracing and the profiling are disabled.
+    """
+    if not (ENABLE_TRACING or ENABLE_PROFILING):
+        return channel
+    return grpc.intercept_channel(channel, ClientTracingInterceptor(node))
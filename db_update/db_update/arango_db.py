@@ -2,14 +2,44 @@
 
 """ArangoDB utilities"""
 
+import json
+
 import yaml
 from arango import ArangoClient
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.resolver import Resolver
+
+try:
+    # LibYAML parser (C)
+    from yaml.cyaml import CParser
+except ImportError:
+    CParser = None
 
 USER = "root"
 PASSWORD = "12345678"
 ARANGO_URL = "http://localhost:8529"
 NODES_FILE = "nodes_hc.yaml"
 EDGES_FILE = "edges_hc.yaml"
+# Max number of documents sent to ArangoDB in a single request
+BATCH_SIZE = 10000
+# Extensions of the JSON lines files (one document per line)
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+
+
+if CParser is not None:
+    class StreamLoader(CParser, Composer, SafeConstructor, Resolver):
+        """YAML loader parsing the file with LibYAML and building the
+        documents in Python, so that the items of a list can be built one
+        at a time"""
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+else:
+    StreamLoader = yaml.SafeLoader
 
 
 def initialize_db(
@@ -145,3 +175,118 @@ def populate_yaml2(nodes, edges, nodes_file=NODES_FILE, edges_file=EDGES_FILE):
                 edges.insert(edge)
             else:  # only specified fields are changed
                 edges.update(edge)
+
+
+# ##############################################
+# ########### populate graph (bulk) ############
+# ##############################################
+
+def iter_batches(docs, batch_size=BATCH_SIZE):
+    """Split an iterable of documents in lists of at most batch_size
+    documents"""
+
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_documents(collection, docs, batch_size=BATCH_SIZE):
+    """Insert the documents in a collection, one request per batch of
+    batch_size documents. Documents whose key already exists are
+    updated (only specified fields are changed). Return the number of
+    created and updated documents"""
+
+    created = updated = 0
+    for batch in iter_batches(docs, batch_size):
+        result = collection.import_bulk(
+            batch, halt_on_error=True, details=False, on_duplicate='update')
+        created += result['created']
+        updated += result['updated']
+    return created, updated
+
+
+def populate_bulk(nodes, edges, nodes_dict, edges_dict,
+                  batch_size=BATCH_SIZE):
+    """Populate database from nodes and edges dicts (same as populate2,
+    using bulk imports)"""
+
+    # nodes
+    import_documents(nodes, nodes_dict, batch_size)
+
+    # edges
+    # edges without a key are always inserted
+    import_documents(edges, edges_dict, batch_size)
+
+
+def iter_yaml_documents(file):
+    """Iterate over the documents of a YAML file containing a list of
+    documents, building them one at a time"""
+
+    loader = StreamLoader(file)
+    try:
+        # stream start
+        loader.get_event()
+        if loader.check_event(yaml.StreamEndEvent):
+            # empty file
+            return
+        # document start
+        loader.get_event()
+        if not loader.check_event(yaml.SequenceStartEvent):
+            raise ValueError('%s does not contain a list' % file.name)
+        loader.get_event()
+        # items of the list
+        while not loader.check_event(yaml.SequenceEndEvent):
+            yield loader.construct_document(loader.compose_node(None, None))
+    finally:
+        loader.dispose()
+
+
+def iter_json_lines(file):
+    """Iterate over the documents of a JSON lines file (one document per
+    line, empty lines are skipped)"""
+
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_documents(filename):
+    """Iterate over the documents of a YAML file containing a list or of a
+    JSON lines file (.jsonl or .ndjson), reading the file incrementally"""
+
+    with open(filename) as file:
+        if filename.endswith(JSON_LINES_EXTENSIONS):
+            yield from iter_json_lines(file)
+        else:
+            yield from iter_yaml_documents(file)
+
+
+def save_documents(docs, filename):
+    """Export documents to a JSON lines file (.jsonl or .ndjson), writing
+    them one at a time, or to a YAML file containing a list"""
+
+    with open(filename, 'w') as file:
+        if filename.endswith(JSON_LINES_EXTENSIONS):
+            for doc in docs:
+                file.write(json.dumps(doc))
+                file.write('\n')
+        else:
+            yaml.dump(list(docs), file)
+
+
+def populate_yaml_bulk(nodes, edges, nodes_file=NODES_FILE,
+                       edges_file=EDGES_FILE, batch_size=BATCH_SIZE):
+    """Populate database from YAML or JSON lines files (same as
+    populate_yaml2, using bulk imports). The files are read incrementally:
+    at most batch_size documents are kept in memory"""
+
+    # nodes
+    import_documents(nodes, iter_documents(nodes_file), batch_size)
+
+    # edges
+    import_documents(edges, iter_documents(edges_file), batch_size)
@@ -8,6 +8,8 @@ from arango import ArangoClient
 USER = "root"
 PASSWORD = "12345678"
 ARANGO_URL = "http://localhost:8529"
+# Max number of documents sent to ArangoDB in a single request
+BATCH_SIZE = 10000
 
 # Initialize the ArangoDB client.
 client = ArangoClient(hosts=ARANGO_URL)
@@ -93,38 +95,47 @@ else:
 # ############### populate graph ###############
 # ##############################################
 
+
+def import_documents(collection, docs):
+    """Insert the documents in a collection, BATCH_SIZE documents per
+    request (only specified fields of existing documents are changed)"""
+    for i in range(0, len(docs), BATCH_SIZE):
+        collection.import_bulk(docs[i:i + BATCH_SIZE], halt_on_error=True,
+                               details=False, on_duplicate='update')
+
+
 # nodes
+# the nodes are grouped by collection and imported in batches
+nodes_by_collection = {
+    "router": (routers, []),
+    "provider_host": (provider_hosts, []),
+    "customer_host": (customer_hosts, [])
+}
 with open('nodes_hc.yaml') as f:
     nodes_dict = yaml.load(f, Loader=yaml.FullLoader)
     for node in nodes_dict:
-        if node["type"] == "router":
-            if not routers.has(node["_key"]):
-                routers.insert(node)
-            else:  # only specified fields are changed
-                routers.update(node)
-        elif node["type"] == "provider_host":
-            if not provider_hosts.has(node["_key"]):
-                provider_hosts.insert(node)
-            else:  # only specified fields are changed
-                provider_hosts.update(node)
-        elif node["type"] == "customer_host":
-            if not customer_hosts.has(node["_key"]):
-                customer_hosts.insert(node)
-            else:  # only specified fields are changed
-                provider_hosts.update(node)
+        if node["type"] in nodes_by_collection:
+            nodes_by_collection[node["type"]][1].append(node)
         else:
             print("node type error")
+for collection, docs in nodes_by_collection.values():
+    import_documents(collection, docs)
 
 
 # edges
+# the edges are grouped by collection and imported in batches
+edges_by_collection = {
+    "core": (core_links, []),
+    "provider_host": (provider_host_links, []),
+    "customer_host": (customer_host_links, [])
+}
 with open('edges_3_collections.yaml') as f:
     edges_dict = yaml.load(f, Loader=yaml.FullLoader)
     for edge in edges_dict:
-        if edge["type"] == "core":
-            core_links.insert(edge)      # no control on key
-        elif edge["type"] == "provider_host":
-            provider_host_links.insert(edge)      # no control on key
-        elif edge["type"] == "customer_host":
-            customer_host_links.insert(edge)      # no control on key
+        if edge["type"] in edges_by_collection:
+            # no control on key
+            edges_by_collection[edge["type"]][1].append(edge)
         else:
             print("edge type error")
+for collection, docs in edges_by_collection.values():
+    import_documents(collection, docs)